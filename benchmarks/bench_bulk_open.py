@@ -0,0 +1,104 @@
+"""Bank.open_accounts_bulk against a loop of Bank.open_account calls.
+
+Both variants open the same mix of base, savings, premium and investment accounts
+(shared options objects, as a partner portfolio file would produce) on a fresh bank
+with --clients clients; the best of --repeat runs is reported.
+
+Run with: python benchmarks/bench_bulk_open.py [--accounts N] [--clients N] [--repeat N]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from banking.account_options import InvestmentOptions, PremiumOptions, SavingsOptions  # noqa: E402
+from banking.bank import AccountSpec, Bank  # noqa: E402
+from banking.client import Client  # noqa: E402
+from banking.credentials import PasswordHasher  # noqa: E402
+from banking.types import AccountType, Currency  # noqa: E402
+
+NOON = datetime(2024, 1, 1, 12, 0)
+KINDS = [
+    (AccountType.BASE, None),
+    (AccountType.SAVINGS, SavingsOptions(monthly_interest_rate=Decimal("0.01"))),
+    (AccountType.PREMIUM, PremiumOptions(overdraft_limit=Decimal("500.00"), withdraw_fee=Decimal("0.50"))),
+    (AccountType.INVESTMENT, InvestmentOptions(expected_yearly_growth=Decimal("0.05"))),
+]
+
+
+def make_specs(n_accounts: int, n_clients: int, seed: int = 1) -> list[AccountSpec]:
+    rng = random.Random(seed)
+    specs = []
+    for _ in range(n_accounts):
+        account_type, options = rng.choice(KINDS)
+        specs.append(
+            AccountSpec(
+                f"C-{rng.randrange(n_clients):08d}",
+                account_type,
+                rng.choice(list(Currency)),
+                Decimal(rng.randrange(0, 100_000)) / 100,
+                options,
+            )
+        )
+    return specs
+
+
+def fresh_bank(n_clients: int) -> Bank:
+    bank = Bank(_hasher=PasswordHasher(n=2 ** 4))
+    for i in range(n_clients):
+        bank.add_client(Client(full_name=f"Client {i}", client_id=f"C-{i:08d}", age=30), password="pw")
+    return bank
+
+
+def one_by_one(bank: Bank, specs: list[AccountSpec]) -> None:
+    for spec in specs:
+        bank.open_account(
+            spec.client_id,
+            account_type=spec.account_type,
+            currency=spec.currency,
+            balance=spec.balance,
+            now=NOON,
+            options=spec.options,
+        )
+
+
+def bulk(bank: Bank, specs: list[AccountSpec]) -> None:
+    result = bank.open_accounts_bulk(specs, now=NOON)
+    assert not result.errors, result.errors
+
+
+def best_of(repeat: int, n_clients: int, specs: list[AccountSpec], run) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        bank = fresh_bank(n_clients)
+        started = time.perf_counter()
+        run(bank, specs)
+        best = min(best, time.perf_counter() - started)
+        bank.close()
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--accounts", type=int, default=100_000)
+    parser.add_argument("--clients", type=int, default=25_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    specs = make_specs(args.accounts, args.clients)
+    single = best_of(args.repeat, args.clients, specs, one_by_one)
+    batched = best_of(args.repeat, args.clients, specs, bulk)
+    print(f"open_account loop:  {args.accounts / single:>10,.0f} accounts/sec")
+    print(f"open_accounts_bulk: {args.accounts / batched:>10,.0f} accounts/sec")
+    print(f"speedup:            {single / batched:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Cost of the account event stream on the deposit hot path.
+
+Times Bank.deposit with no subscribers (the stream is inactive and publishing is a
+single attribute check), with one idle DROP subscriber, and with a consumer thread
+draining a BLOCK subscriber. The best of --repeat runs is reported.
+
+Run with: python benchmarks/bench_events.py [--deposits N] [--repeat N]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from banking.bank import Bank  # noqa: E402
+from banking.client import Client  # noqa: E402
+from banking.credentials import PasswordHasher  # noqa: E402
+from banking.events import Overflow  # noqa: E402
+
+NOON = datetime(2024, 1, 1, 12, 0)
+AMOUNT = Decimal("1.00")
+
+
+def fresh_bank() -> tuple[Bank, str]:
+    bank = Bank(_hasher=PasswordHasher(n=2 ** 4))
+    bank.add_client(Client(full_name="Bench Client", client_id="C-1", age=30), password="pw")
+    return bank, bank.open_account("C-1", now=NOON).id
+
+
+def deposits(bank: Bank, account_id: str, count: int) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        bank.deposit(account_id, AMOUNT, now=NOON)
+    return time.perf_counter() - started
+
+
+def no_subscribers(count: int) -> float:
+    bank, account_id = fresh_bank()
+    return deposits(bank, account_id, count)
+
+
+def idle_subscriber(count: int) -> float:
+    bank, account_id = fresh_bank()
+    bank.events.subscribe(overflow=Overflow.DROP)
+    return deposits(bank, account_id, count)
+
+
+def draining_consumer(count: int) -> float:
+    bank, account_id = fresh_bank()
+    subscription = bank.events.subscribe(overflow=Overflow.BLOCK)
+    consumer = threading.Thread(target=lambda: sum(1 for _ in subscription))
+    consumer.start()
+    elapsed = deposits(bank, account_id, count)
+    subscription.close()
+    consumer.join()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--deposits", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = None
+    for label, run in (
+        ("no subscribers", no_subscribers),
+        ("idle DROP subscriber", idle_subscriber),
+        ("draining BLOCK consumer", draining_consumer),
+    ):
+        best = min(run(args.deposits) for _ in range(args.repeat))
+        baseline = baseline or best
+        print(f"{label:>24}: {args.deposits / best:>10,.0f} deposits/sec  ({baseline / best - 1:+.1%} throughput)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Transaction history: recording cost and statement seeks.
+
+Times Bank.deposit with history recording on and off, then fills one account
+with --entries postings spread evenly over --years years (a file-backed history
+with a stepped clock) and times a one-month statement from the end of the range
+and a full CSV statement, then the CSV's peak Python memory in a second pass.
+
+Run with: python benchmarks/bench_history.py [--deposits N] [--entries N] [--years N]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from banking.bank import Bank  # noqa: E402
+from banking.client import Client  # noqa: E402
+from banking.credentials import PasswordHasher  # noqa: E402
+from banking.history import TransactionHistory  # noqa: E402
+
+NOON = datetime(2024, 1, 1, 12, 0)
+START = datetime(2015, 1, 1)
+AMOUNT = Decimal("1.00")
+
+
+def fresh_bank(history: TransactionHistory) -> tuple[Bank, str]:
+    bank = Bank(_hasher=PasswordHasher(n=2 ** 4), _history=history)
+    bank.add_client(Client(full_name="Bench Client", client_id="C-1", age=30), password="pw")
+    return bank, bank.open_account("C-1", now=NOON).id
+
+
+def deposit_rate(recording: bool, count: int) -> float:
+    bank, account_id = fresh_bank(TransactionHistory())
+    bank._history.recording = recording
+    started = time.perf_counter()
+    for _ in range(count):
+        bank.deposit(account_id, AMOUNT, now=NOON)
+    return count / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--deposits", type=int, default=100_000)
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--years", type=int, default=10)
+    args = parser.parse_args()
+
+    off = max(deposit_rate(False, args.deposits) for _ in range(3))
+    on = max(deposit_rate(True, args.deposits) for _ in range(3))
+    print(f"deposits/sec, recording off: {off:>10,.0f}")
+    print(f"deposits/sec, recording on:  {on:>10,.0f}  ({on / off - 1:+.1%})")
+
+    step = timedelta(days=365 * args.years) / args.entries
+    stamps = (round((START + step * i).timestamp() * 1e6) * 1000 for i in range(args.entries))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bank.history"
+        bank, account_id = fresh_bank(TransactionHistory(path, clock=lambda: next(stamps)))
+        started = time.perf_counter()
+        for _ in range(args.entries):
+            bank.deposit(account_id, AMOUNT, now=NOON)
+        print(f"filled {args.entries:,} entries in {time.perf_counter() - started:.1f} s "
+              f"({os.path.getsize(path) / 2**20:.1f} MiB on disk)")
+
+        end = START + step * args.entries
+        started = time.perf_counter()
+        month = sum(1 for _ in bank.statement(account_id, end - timedelta(days=30), end))
+        print(f"last-month statement:  {month:>8,} lines in {(time.perf_counter() - started) * 1e3:.1f} ms")
+
+        with open(os.devnull, "w") as out:
+            started = time.perf_counter()
+            rows = bank.write_statement(account_id, out)
+            elapsed = time.perf_counter() - started
+            # Second pass under tracemalloc, which slows it down, for the peak only.
+            tracemalloc.start()
+            bank.write_statement(account_id, out)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        print(f"full CSV statement:    {rows:>8,} lines in {elapsed:.1f} s, peak memory {peak / 2**20:.1f} MiB")
+        bank.close()
+
+
+if __name__ == "__main__":
+    main()
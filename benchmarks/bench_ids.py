@@ -0,0 +1,46 @@
+"""Account id generation: the old 8-hex-digit uuid4 prefix against Snowflake ids.
+
+Reports ids/sec for uuid4().hex[:8], SnowflakeIds.next_id() and block reservation
+with SnowflakeIds.reserve(), plus how many duplicates each produced.
+
+Run with: python benchmarks/bench_ids.py [--count N] [--block N]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from banking.ids import SnowflakeIds  # noqa: E402
+
+
+def run(name: str, produce, count: int) -> None:
+    started = time.perf_counter()
+    ids = produce(count)
+    elapsed = time.perf_counter() - started
+    duplicates = count - len(set(ids))
+    print(f"{name:>22}: {count / elapsed:>12,.0f} ids/sec  duplicates {duplicates:,}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--block", type=int, default=10_000, help="ids per reserve() call")
+    args = parser.parse_args()
+
+    generator = SnowflakeIds(1)
+    run("uuid4().hex[:8]", lambda n: [uuid.uuid4().hex[:8] for _ in range(n)], args.count)
+    run("SnowflakeIds.next_id", lambda n: [generator.next_id() for _ in range(n)], args.count)
+    run(
+        "SnowflakeIds.reserve",
+        lambda n: [value for _ in range(0, n, args.block) for value in generator.reserve(args.block)][:n],
+        args.count,
+    )
+
+
+if __name__ == "__main__":
+    main()
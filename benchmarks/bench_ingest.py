@@ -0,0 +1,61 @@
+"""Throughput of bulk ingestion, single process vs sharded worker processes.
+
+Run with: python benchmarks/bench_ingest.py [--rows N] [--accounts N] [--workers 0,2,4]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from banking.bank import Bank  # noqa: E402
+from banking.client import Client  # noqa: E402
+from banking.ingest import ingest_file  # noqa: E402
+
+NOON = datetime(2024, 1, 1, 12, 0)
+
+
+def build(n_accounts: int) -> tuple[Bank, list[str]]:
+    bank = Bank()
+    bank.add_client(Client(full_name="Bench Client", client_id="C-1", age=30), password="pw")
+    ids = [bank.open_account("C-1", balance=Decimal("100.00"), now=NOON).id for _ in range(n_accounts)]
+    return bank, ids
+
+
+def write_rows(path: Path, ids: list[str], n_rows: int, seed: int = 1) -> None:
+    rng = random.Random(seed)
+    with open(path, "w") as handle:
+        handle.write("account_id,op,amount\n")
+        for _ in range(n_rows):
+            op = "deposit" if rng.random() < 0.6 else "withdraw"
+            handle.write(f"{rng.choice(ids)},{op},{rng.randrange(1, 5000) / 100:.2f}\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--workers", default="0,2,4")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "batch.csv"
+        snapshot = Path(tmp) / "bank.snap"
+        bank, ids = build(args.accounts)
+        bank.snapshot(snapshot)
+        write_rows(path, ids, args.rows)
+        for workers in (int(value) for value in args.workers.split(",")):
+            # Every run starts from the same snapshot so the file applies identically.
+            stats = ingest_file(
+                Bank.load_snapshot(snapshot), path, rejects_path=Path(tmp) / "rejects.jsonl", workers=workers
+            )
+            print(f"workers {workers}: {stats}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Ledger: as-of balance queries against a full replay.
+
+Times Bank.deposit with and without the ledger, then fills a Ledger with
+--accounts accounts and --postings postings spread evenly over one year (stepped
+clock) and times, for a moment in the last quarter: one account's balance, the
+bank-wide total, and every account's balance in one pass (with and without
+NumPy), each against replaying the entries from zero.
+
+Run with: python benchmarks/bench_ledger.py [--deposits N] [--accounts N] [--postings N]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from banking.bank import Bank  # noqa: E402
+from banking.client import Client  # noqa: E402
+from banking.credentials import PasswordHasher  # noqa: E402
+from banking.ledger import Ledger, np  # noqa: E402
+from banking.types import Currency, PostingKind  # noqa: E402
+
+NOON = datetime(2024, 1, 1, 12, 0)
+START = datetime(2023, 1, 1)
+AMOUNT = Decimal("1.00")
+
+
+def deposit_rate(ledger: bool, count: int) -> float:
+    bank = Bank(_hasher=PasswordHasher(n=2 ** 4))
+    bank.add_client(Client(full_name="Bench Client", client_id="C-1", age=30), password="pw")
+    account_id = bank.open_account("C-1", now=NOON).id
+    if ledger:
+        bank.enable_ledger()
+    started = time.perf_counter()
+    for _ in range(count):
+        bank.deposit(account_id, AMOUNT, now=NOON)
+    return count / (time.perf_counter() - started)
+
+
+def timed(fn, repeat: int = 5) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1e3, result
+
+
+def replay(entries: list[tuple[int, str, int]], until: int) -> dict[str, int]:
+    balances: dict[str, int] = {}
+    for stamp, account_id, cents in entries:
+        if stamp > until:
+            break
+        balances[account_id] = balances.get(account_id, 0) + cents
+    return balances
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--deposits", type=int, default=100_000)
+    parser.add_argument("--accounts", type=int, default=100_000)
+    parser.add_argument("--postings", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    off = max(deposit_rate(False, args.deposits) for _ in range(3))
+    on = max(deposit_rate(True, args.deposits) for _ in range(3))
+    print(f"deposits/sec, no ledger: {off:>10,.0f}")
+    print(f"deposits/sec, ledger:    {on:>10,.0f}  ({on / off - 1:+.1%})")
+
+    total = args.accounts + args.postings
+    step = timedelta(days=365) / total
+    stamps = iter([round((START + step * i).timestamp() * 1e6) * 1000 for i in range(total)])
+    ledger = Ledger(use_numpy=False, clock=lambda: next(stamps))
+    entries: list[tuple[int, str, int]] = []
+    rng = random.Random(7)
+    ids = [f"A{i:07d}" for i in range(args.accounts)]
+    started = time.perf_counter()
+    for account_id in ids:
+        ledger.open(account_id, Currency.USD, 10_000)
+    for _ in range(args.postings):
+        account_id = ids[rng.randrange(args.accounts)]
+        cents = rng.randrange(-500, 1_000)
+        ledger.post(account_id, PostingKind.DEPOSIT if cents >= 0 else PostingKind.WITHDRAW, cents)
+    print(f"filled {total:,} entries in {time.perf_counter() - started:.1f} s")
+    for position in range(total):
+        entries.append((ledger._times[position], ids[ledger._rows[position]], ledger._cents[position]))
+
+    moment = START + timedelta(days=300, hours=23, minutes=59)
+    until = round(moment.timestamp() * 1e6)
+    expected = replay(entries, until)
+    target = ids[len(ids) // 2]
+
+    ms, _ = timed(lambda: replay(entries, until), repeat=1)
+    print(f"full replay:            {ms:>10.1f} ms")
+    ms, balance = timed(lambda: ledger.balance_at(target, moment))
+    assert balance == expected[target]
+    print(f"balance_at:             {ms:>10.4f} ms")
+    ms, totals = timed(lambda: ledger.total_at(moment))
+    assert totals.total_cents() == sum(expected.values())
+    print(f"total_at:               {ms:>10.4f} ms")
+    ms, balances = timed(lambda: ledger.balances_at(moment), repeat=1)
+    assert balances == expected
+    print(f"balances_at (loop):     {ms:>10.1f} ms")
+    if np is not None:
+        ledger._use_numpy = True
+        ms, balances = timed(lambda: ledger.balances_at(moment), repeat=3)
+        assert balances == expected
+        print(f"balances_at (NumPy):    {ms:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Overhead of the latency and outcome instrumentation on the Bank hot paths.
+
+Runs the same deposit/withdraw loop (Bank.deposit and Bank.withdraw, each of which
+also goes through the instrumented account method) in one process, alternating
+short slices with the instrumented methods and with the plain functions they wrap
+(swapped in on the classes), so machine noise hits both sides alike. Compares the
+fastest slice of each, the one least disturbed by the rest of the machine. Needs metrics enabled (the default, BANKING_METRICS=1);
+prints the Prometheus export at the end with --show.
+
+Run with: python benchmarks/bench_metrics.py [--ops N] [--slices N] [--show]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from banking import metrics  # noqa: E402
+from banking.accounts.base import BankAccount  # noqa: E402
+from banking.bank import Bank  # noqa: E402
+from banking.client import Client  # noqa: E402
+from banking.credentials import PasswordHasher  # noqa: E402
+
+NOON = datetime(2024, 1, 1, 12, 0)
+AMOUNT = Decimal("1.00")
+
+
+def instrumented_methods() -> dict[tuple[type, str], tuple]:
+    # (class, name) -> (instrumented, plain) for the methods the loop goes through.
+    names = [(Bank, "deposit"), (Bank, "withdraw"), (BankAccount, "deposit"), (BankAccount, "withdraw")]
+    return {(cls, name): (vars(cls)[name], vars(cls)[name].__wrapped__) for cls, name in names}
+
+
+def run_slice(bank: Bank, account_ids: list[str], ops: int) -> float:
+    deposit, withdraw = bank.deposit, bank.withdraw
+    started = time.perf_counter()
+    for i in range(ops):
+        account_id = account_ids[i & 63]
+        deposit(account_id, AMOUNT, now=NOON)
+        withdraw(account_id, AMOUNT, now=NOON)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=500, help="deposit+withdraw pairs per slice")
+    parser.add_argument("--slices", type=int, default=200, help="slices per setting")
+    parser.add_argument("--show", action="store_true", help="print the Prometheus export")
+    args = parser.parse_args()
+    if not metrics.ENABLED:
+        parser.error("metrics are disabled (BANKING_METRICS=0)")
+
+    bank = Bank(_hasher=PasswordHasher(n=2 ** 4))
+    bank.add_client(Client(full_name="Bench Client", client_id="C-1", age=30), password="pw")
+    account_ids = [bank.open_account("C-1", balance=Decimal(1000), now=NOON).id for _ in range(64)]
+    methods = instrumented_methods()
+    timings: dict[bool, list[float]] = {False: [], True: []}
+    run_slice(bank, account_ids, args.ops)  # warm up
+    for index in range(2 * args.slices):
+        on = index % 2 == 0
+        for (cls, name), versions in methods.items():
+            setattr(cls, name, versions[0 if on else 1])
+        timings[on].append(run_slice(bank, account_ids, args.ops))
+    for (cls, name), versions in methods.items():
+        setattr(cls, name, versions[0])
+
+    off, on = min(timings[False]), min(timings[True])
+    calls = 2 * args.ops
+    print(f"metrics off: {calls / off:>10,.0f} ops/sec")
+    print(f"metrics on:  {calls / on:>10,.0f} ops/sec  (timing 1 in {metrics.SAMPLE_EVERY})")
+    print(f"overhead:    {on / off - 1:>10.1%}")
+    if args.show:
+        print(metrics.REGISTRY.render())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Microbenchmarks for the integer-cents Money path.
+
+Run with: python benchmarks/bench_money.py [--loops N]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import timeit
+from decimal import Decimal, ROUND_HALF_UP
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from banking.accounts.base import BankAccount  # noqa: E402
+from banking.accounts.premium import PremiumAccount  # noqa: E402
+from banking.money import MONEY_QUANT, Money  # noqa: E402
+from banking.types import AccountStatus, Currency, Owner  # noqa: E402
+
+
+class LegacyDecimalAccount:
+    # Mirror of the pre-Money BankAccount hot path: status checks, a Decimal(str(x))
+    # round-trip plus quantize per call, and Decimal balance arithmetic.
+    def __init__(self, balance: Decimal) -> None:
+        self._balance = self._to_money(balance)
+        self._status = AccountStatus.ACTIVE
+
+    @staticmethod
+    def _to_money(amount: Decimal) -> Decimal:
+        return Decimal(str(amount)).quantize(MONEY_QUANT, rounding=ROUND_HALF_UP)
+
+    def _validate_amount(self, amount: Decimal) -> Decimal:
+        value = self._to_money(amount)
+        if value < 0:
+            raise ValueError("Amount cannot be negative.")
+        if value == 0:
+            raise ValueError("Amount must be greater than zero.")
+        return value
+
+    def _check_can_operate(self) -> None:
+        if self._status == AccountStatus.FROZEN:
+            raise ValueError("frozen")
+        if self._status == AccountStatus.CLOSED:
+            raise ValueError("closed")
+        if self._status != AccountStatus.ACTIVE:
+            raise ValueError("unknown")
+
+    def deposit(self, amount: Decimal) -> None:
+        self._check_can_operate()
+        self._balance += self._validate_amount(amount)
+
+    def withdraw(self, amount: Decimal) -> None:
+        self._check_can_operate()
+        value = self._validate_amount(amount)
+        if value > self._balance:
+            raise ValueError("Not enough balance.")
+        self._balance -= value
+
+
+def _loop(account, loops: int) -> None:
+    amount = Decimal("12.34")
+    deposit = account.deposit
+    withdraw = account.withdraw
+    for _ in range(loops):
+        deposit(amount)
+        withdraw(amount)
+
+
+def run(loops: int, repeat: int = 5) -> dict[str, float]:
+    owner = Owner("Bench")
+    cases = {
+        "legacy_decimal": lambda: LegacyDecimalAccount(Decimal("1000.00")),
+        "bank_account": lambda: BankAccount(owner=owner, currency=Currency.USD, balance=Decimal("1000.00")),
+        "premium_account": lambda: PremiumAccount(owner=owner, currency=Currency.USD, balance=Decimal("1000.00")),
+    }
+    results = {}
+    for name, factory in cases.items():
+        account = factory()
+        best = min(timeit.repeat(lambda: _loop(account, loops), number=1, repeat=repeat))
+        results[name] = (2 * loops) / best
+    results["money_parse"] = 1 / min(
+        timeit.repeat(lambda: Money.of(Decimal("12.34")), number=loops, repeat=repeat)
+    ) * loops
+    results["decimal_str_parse"] = 1 / min(
+        timeit.repeat(
+            lambda: Decimal(str(Decimal("12.34"))).quantize(MONEY_QUANT, rounding=ROUND_HALF_UP),
+            number=loops,
+            repeat=repeat,
+        )
+    ) * loops
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--loops", type=int, default=100_000)
+    args = parser.parse_args()
+    results = run(args.loops)
+    for name, ops in results.items():
+        print(f"{name:>20}: {ops:>12,.0f} ops/sec")
+    print(f"{'speedup':>20}: {results['bank_account'] / results['legacy_decimal']:.2f}x vs legacy")
+
+
+if __name__ == "__main__":
+    main()
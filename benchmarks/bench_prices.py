@@ -0,0 +1,82 @@
+"""Replay of a recorded price tick file against a book of instrument holdings.
+
+Builds a PriceBook with --accounts accounts each holding --per-account of
+--instruments instruments, records --ticks random ticks to a temporary file and
+times replay_ticks over it with NumPy; the pure-Python fallback replays the first
+4% of the file. The running totals are checked against a full revaluation.
+
+Run with: python benchmarks/bench_prices.py [--accounts N] [--instruments N]
+          [--per-account N] [--ticks N]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from banking.prices import PriceBook, replay_ticks  # noqa: E402
+
+ASSETS = ("stocks", "bonds", "etf")
+
+
+def make_book(args: argparse.Namespace, use_numpy: bool, seed: int = 1) -> PriceBook:
+    rng = random.Random(seed)
+    book = PriceBook(use_numpy=use_numpy)
+    instruments = [f"I{i:06d}" for i in range(args.instruments)]
+    for i, instrument in enumerate(instruments):
+        book.list_instrument(instrument, ASSETS[i % len(ASSETS)], Decimal("100.00"))
+    for a in range(args.accounts):
+        account_id = f"A-{a:08d}"
+        for instrument in rng.sample(instruments, args.per_account):
+            book.add_holding(account_id, instrument, rng.randrange(1, 1_000))
+    return book
+
+
+def write_ticks(path: Path, count: int, args: argparse.Namespace, seed: int = 2) -> None:
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as handle:
+        for _ in range(count):
+            handle.write(f"I{rng.randrange(args.instruments):06d},{rng.randrange(9_000, 11_000) / 100:.2f}\n")
+
+
+def check(book: PriceBook) -> None:
+    # Running values and totals must equal a revaluation from quantities and prices.
+    total = 0
+    for account_id in book._holdings:
+        value = sum(book.value_by_asset_cents(account_id).values())
+        assert value == book.value_cents(account_id), account_id
+        total += value
+    assert Decimal(total) / 100 == book.total_value()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=1_000_000)
+    parser.add_argument("--instruments", type=int, default=10_000)
+    parser.add_argument("--per-account", type=int, default=3)
+    parser.add_argument("--ticks", type=int, default=500_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for use_numpy, count in ((True, args.ticks), (False, args.ticks // 25)):
+            label = "numpy" if use_numpy else "pure Python"
+            path = Path(directory) / f"ticks-{count}.csv"
+            write_ticks(path, count, args)
+            started = time.perf_counter()
+            book = make_book(args, use_numpy)
+            print(f"{label:>12}: built {args.accounts:,} accounts in {time.perf_counter() - started:.1f}s")
+            started = time.perf_counter()
+            count = replay_ticks(book, path)
+            elapsed = time.perf_counter() - started
+            print(f"{label:>12}: {count:,} ticks in {elapsed:.2f}s, {count / elapsed:>10,.0f} ticks/sec")
+            check(book)
+
+
+if __name__ == "__main__":
+    main()
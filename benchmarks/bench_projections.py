@@ -0,0 +1,72 @@
+"""Monte Carlo projection throughput over a book of investment accounts.
+
+Times the deterministic project_yearly_growth loop (one number per account) for
+reference, then project_portfolios with NumPy serially and with --workers processes,
+and the pure-Python engine on a small slice of the book.
+
+Run with: python benchmarks/bench_projections.py [--accounts N] [--scenarios N]
+          [--years N] [--workers N]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from banking.accounts.investment import InvestmentAccount  # noqa: E402
+from banking.projections import project_portfolios  # noqa: E402
+from banking.types import Owner  # noqa: E402
+
+
+def make_book(n_accounts: int, seed: int = 1) -> list[InvestmentAccount]:
+    rng = random.Random(seed)
+    owner = Owner(name="Bench Client", doc_id="C-1")
+    return [
+        InvestmentAccount(
+            owner=owner,
+            account_id=f"A-{i:08d}",
+            portfolios={asset: Decimal(rng.randrange(0, 1_000_000)) / 100 for asset in ("stocks", "bonds", "etf")},
+            expected_yearly_growth=Decimal("0.05"),
+        )
+        for i in range(n_accounts)
+    ]
+
+
+def timed(label: str, n_accounts: int, run) -> object:
+    started = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - started
+    print(f"{label:>30}: {elapsed:8.2f}s  {n_accounts / elapsed:>12,.0f} accounts/sec")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=20_000)
+    parser.add_argument("--scenarios", type=int, default=10_000)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    book = make_book(args.accounts)
+    options = {"years": args.years, "scenarios": args.scenarios, "seed": 1}
+    timed("project_yearly_growth loop", args.accounts, lambda: [a.project_yearly_growth(args.years) for a in book])
+    serial = timed("numpy, 1 process", args.accounts, lambda: project_portfolios(book, **options))
+    parallel = timed(
+        f"numpy, {args.workers} processes",
+        args.accounts,
+        lambda: project_portfolios(book, workers=args.workers, **options),
+    )
+    assert serial == parallel
+    small = book[: max(1, args.accounts // 100)]
+    timed("pure Python (1% of the book)", len(small), lambda: project_portfolios(small, use_numpy=False, **options))
+    print(f"aggregate bands {serial.percentiles}: {', '.join(str(value) for value in serial.aggregate)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Client ranking: cost of one adjust as the number of clients grows.
+
+Builds a ClientRanking for each size in --sizes with random totals, then times
+--adjusts random adjust() calls (the per-posting work done under the bank lock),
+rank() and top(10), in microseconds per call.
+
+Run with: python benchmarks/bench_ranking.py [--sizes 1000,100000,1000000] [--adjusts N]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from banking.ranking import ClientRanking  # noqa: E402
+
+
+def per_call(fn, count: int) -> float:
+    started = time.perf_counter()
+    for i in range(count):
+        fn(i)
+    return (time.perf_counter() - started) / count * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,100000,1000000")
+    parser.add_argument("--adjusts", type=int, default=200_000)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    for size in map(int, args.sizes.split(",")):
+        ids = [f"C-{i:08d}" for i in range(size)]
+        ranking = ClientRanking.from_totals(ids, {client_id: rng.randrange(0, 10**7) for client_id in ids})
+        picks = [ids[rng.randrange(size)] for _ in range(args.adjusts)]
+        deltas = [rng.randrange(-10_000, 10_000) for _ in range(args.adjusts)]
+        adjust = per_call(lambda i: ranking.adjust(picks[i], deltas[i]), args.adjusts)
+        rank = per_call(lambda i: ranking.rank(picks[i]), min(args.adjusts, 20_000))
+        top = per_call(lambda i: ranking.top(10), 20_000)
+        print(f"{size:>10,} clients: adjust {adjust:7.2f} us  rank {rank:7.2f} us  top(10) {top:6.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Load test for the asyncio front end over localhost.
+
+Starts a BankServer in-process and opens many client connections, each pipelining
+deposits against its own account. Reports throughput and latency percentiles.
+Thousands of connections need a raised open-file limit (ulimit -n).
+
+Run with: python benchmarks/bench_server.py [--connections N] [--requests N] [--pipeline N]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from banking.bank import Bank  # noqa: E402
+from banking.client import Client  # noqa: E402
+from banking.remote import AsyncBankClient  # noqa: E402
+from banking.server import BankServer  # noqa: E402
+
+NOON = datetime(2024, 1, 1, 12, 0)
+
+
+async def run(n_connections: int, n_requests: int, pipeline: int) -> None:
+    bank = Bank()
+    bank.add_client(Client(full_name="Bench Client", client_id="C-1", age=30), password="pw")
+    async with BankServer(bank, clock=lambda: NOON) as server:
+        await server.start()
+        host, port = server.address[:2]
+        clients = [await AsyncBankClient.connect(host, port, max_in_flight=pipeline) for _ in range(n_connections)]
+        token = await clients[0].login("C-1", "pw")
+        accounts = [(await client.open_account("C-1", token=token))["id"] for client in clients]
+        latencies: list[float] = []
+
+        async def one(client: AsyncBankClient, account_id: str) -> None:
+            started = time.perf_counter()
+            await client.deposit(account_id, "1.00", token=token)
+            latencies.append(time.perf_counter() - started)
+
+        async def drive(client: AsyncBankClient, account_id: str) -> None:
+            await asyncio.gather(*(one(client, account_id) for _ in range(n_requests)))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(drive(client, account_id) for client, account_id in zip(clients, accounts)))
+        elapsed = time.perf_counter() - started
+        await asyncio.gather(*(client.close() for client in clients))
+
+    latencies.sort()
+    total = n_connections * n_requests
+    print(f"connections {n_connections}  requests {total:,}  pipeline depth {pipeline}")
+    print(f"throughput: {total / elapsed:12,.0f} req/s")
+    print(f"latency p50: {statistics.median(latencies) * 1000:8.2f} ms")
+    print(f"latency p99: {latencies[int(len(latencies) * 0.99) - 1] * 1000:8.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=50, help="requests per connection")
+    parser.add_argument("--pipeline", type=int, default=16, help="max in-flight requests per connection")
+    args = parser.parse_args()
+    asyncio.run(run(args.connections, args.requests, args.pipeline))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Deposit throughput of a ShardedBank as the shard count grows.
+
+Opens --accounts accounts spread over --clients clients, then sends --deposits
+deposits through ShardedBank.execute_many in batches of --batch, for each shard
+count from 1 to --shards (default: the CPU count). An in-process Bank making the
+same deposits is the baseline. Shards only run in parallel with a free core each,
+so the scaling reported is bounded by os.cpu_count().
+
+Run with: python benchmarks/bench_sharding.py [--shards N] [--deposits N] [--batch N]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from banking.bank import Bank  # noqa: E402
+from banking.client import Client  # noqa: E402
+from banking.credentials import PasswordHasher  # noqa: E402
+from banking.sharding import ShardedBank  # noqa: E402
+
+NOON = datetime(2024, 1, 1, 12, 0)
+AMOUNT = Decimal("1.00")
+
+
+def opened(bank, clients: int, accounts: int) -> list[str]:
+    for i in range(clients):
+        bank.add_client(Client(full_name=f"Client {i}", client_id=f"C-{i:08d}", age=30), password="pw")
+    rng = random.Random(1)
+    owners = [f"C-{rng.randrange(clients):08d}" for _ in range(accounts)]
+    if isinstance(bank, Bank):
+        return [bank.open_account(owner, now=NOON).id for owner in owners]
+    result = bank.execute_many([("open_account", {"client_id": owner, "now": NOON}) for owner in owners])
+    return [info["id"] for info in result.results]
+
+
+def in_process(args) -> float:
+    bank = Bank(_hasher=PasswordHasher(n=2 ** 4))
+    ids = opened(bank, args.clients, args.accounts)
+    rng = random.Random(2)
+    targets = [rng.choice(ids) for _ in range(args.deposits)]
+    started = time.perf_counter()
+    for account_id in targets:
+        bank.deposit(account_id, AMOUNT, now=NOON)
+    return args.deposits / (time.perf_counter() - started)
+
+
+def sharded(args, shards: int) -> float:
+    with ShardedBank(shards, bank_options={"_hasher": PasswordHasher(n=2 ** 4)}) as bank:
+        ids = opened(bank, args.clients, args.accounts)
+        rng = random.Random(2)
+        operations = [
+            ("deposit", {"account_id": rng.choice(ids), "amount": AMOUNT, "now": NOON}) for _ in range(args.deposits)
+        ]
+        started = time.perf_counter()
+        for offset in range(0, len(operations), args.batch):
+            bank.execute_many(operations[offset : offset + args.batch])
+        return args.deposits / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shards", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--accounts", type=int, default=20_000)
+    parser.add_argument("--clients", type=int, default=5_000)
+    parser.add_argument("--deposits", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=5_000)
+    args = parser.parse_args()
+
+    print(f"cpu count: {os.cpu_count()}")
+    print(f"{'in-process Bank':>16}: {in_process(args):>10,.0f} deposits/sec")
+    baseline = None
+    for shards in range(1, args.shards + 1):
+        rate = sharded(args, shards)
+        baseline = baseline or rate
+        print(f"{f'{shards} shard(s)':>16}: {rate:>10,.0f} deposits/sec  ({rate / baseline:.2f}x one shard)")
+
+
+if __name__ == "__main__":
+    main()
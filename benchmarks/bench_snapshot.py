@@ -0,0 +1,82 @@
+"""Cold-start benchmark for memory-mapped snapshots.
+
+Builds a bank, writes a snapshot, then measures the time from load_snapshot() to the
+first served request (authenticate + deposit on a random account).
+
+Run with: python benchmarks/bench_snapshot.py [--accounts N] [--clients N]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from banking.bank import Bank  # noqa: E402
+from banking.client import Client  # noqa: E402
+from banking.credentials import PasswordHasher  # noqa: E402
+from banking.types import AccountType  # noqa: E402
+
+NOON = datetime(2024, 1, 1, 12, 0)
+
+
+def build_bank(n_clients: int, n_accounts: int, seed: int = 1) -> Bank:
+    rng = random.Random(seed)
+    # A cheap KDF: hashing tens of thousands of passwords at production cost is not
+    # what this benchmark measures.
+    bank = Bank(_hasher=PasswordHasher(n=2 ** 4))
+    for i in range(n_clients):
+        bank.add_client(Client(full_name=f"Client {i}", client_id=f"C-{i:08d}", age=30), password=f"pw{i}")
+    kinds = [AccountType.BASE, AccountType.SAVINGS, AccountType.PREMIUM, AccountType.INVESTMENT]
+    for _ in range(n_accounts):
+        bank.open_account(
+            f"C-{rng.randrange(n_clients):08d}",
+            account_type=rng.choice(kinds),
+            balance=Decimal(rng.randrange(0, 100_000)) / 100,
+            now=NOON,
+        )
+    return bank
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--accounts", type=int, default=200_000)
+    parser.add_argument("--clients", type=int, default=50_000)
+    args = parser.parse_args()
+
+    bank = build_bank(args.clients, args.accounts)
+    account_ids = list(bank._accounts)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bank.snap"
+        started = time.perf_counter()
+        bank.snapshot(path)
+        written = time.perf_counter() - started
+
+        started = time.perf_counter()
+        loaded = Bank.load_snapshot(path)
+        mapped = time.perf_counter() - started
+        account_id = random.choice(account_ids)
+        owner = loaded._accounts[account_id].owner.doc_id
+        loaded.authenticate_client(owner, "unused")
+        loaded._accounts[account_id].deposit(Decimal("1.00"))
+        first_request = time.perf_counter() - started
+
+        started = time.perf_counter()
+        loaded.get_top_clients(100)
+        first_report = time.perf_counter() - started
+
+        print(f"accounts: {args.accounts:,}  snapshot size: {path.stat().st_size / 1e6:.1f} MB")
+        print(f"write snapshot:            {written * 1000:10.1f} ms")
+        print(f"load (map only):           {mapped * 1000:10.1f} ms")
+        print(f"time to first request:     {first_request * 1000:10.1f} ms")
+        print(f"first ranking (lazy build): {first_report * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""SQLite-backed Bank against the in-memory engine.
+
+Builds the same bank twice, in memory and with Bank.open_store, with --accounts
+accounts over --clients clients (opened with open_accounts_bulk, which the store
+writes with one executemany). Then times deposits, a client search, the top-10
+clients, the total balance, and reopening the database followed by a top-10 query.
+
+Run with: python benchmarks/bench_storage.py [--accounts N] [--clients N] [--deposits N]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from banking.bank import AccountSpec, Bank  # noqa: E402
+from banking.client import Client  # noqa: E402
+from banking.credentials import PasswordHasher  # noqa: E402
+
+NOON = datetime(2024, 1, 1, 12, 0)
+
+
+def timed(fn, repeat: int = 1) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def populate(bank: Bank, n_accounts: int, n_clients: int) -> list[str]:
+    for i in range(n_clients):
+        bank.add_client(Client(full_name=f"Client {i}", client_id=f"C-{i:08d}", age=30), password="pw")
+    rng = random.Random(1)
+    specs = [
+        AccountSpec(f"C-{rng.randrange(n_clients):08d}", balance=Decimal(rng.randrange(0, 100_000)) / 100)
+        for _ in range(n_accounts)
+    ]
+    return [account.id for account in bank.open_accounts_bulk(specs, now=NOON).opened]
+
+
+def measure(label: str, bank: Bank, args) -> list[str]:
+    started = time.perf_counter()
+    ids = populate(bank, args.accounts, args.clients)
+    print(f"{label}: populated in {time.perf_counter() - started:.2f} s")
+    rng = random.Random(2)
+    targets = [rng.choice(ids) for _ in range(args.deposits)]
+    elapsed = timed(lambda: [bank.deposit(account_id, Decimal("1.00"), now=NOON) for account_id in targets])
+    print(f"  deposits/sec:            {args.deposits / elapsed:>12,.0f}")
+    print(f"  search_accounts(client): {timed(lambda: bank.search_accounts(client_id='C-00000042'), 100) * 1e3:>12.3f} ms")
+    print(f"  get_top_clients(10):     {timed(lambda: bank.get_top_clients(10), 100) * 1e3:>12.3f} ms")
+    print(f"  get_total_balance():     {timed(bank.get_total_balance, 100) * 1e3:>12.3f} ms")
+    return ids
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=1_000_000)
+    parser.add_argument("--clients", type=int, default=100_000)
+    parser.add_argument("--deposits", type=int, default=100_000)
+    args = parser.parse_args()
+
+    measure("in-memory", Bank(_hasher=PasswordHasher(n=2 ** 4)), args)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bank.db"
+        bank = Bank.open_store(path)
+        bank._hasher = PasswordHasher(n=2 ** 4)
+        measure("sqlite", bank, args)
+        bank.close()
+        started = time.perf_counter()
+        reopened = Bank.open_store(path)
+        top = reopened.get_top_clients(10)
+        print(f"  reopen + top 10:         {(time.perf_counter() - started) * 1e3:>12.3f} ms ({top[0][0]})")
+        print(f"  database size:           {sum(f.stat().st_size for f in Path(tmp).iterdir()) / 2**20:>12.1f} MiB")
+        reopened.close()
+
+
+if __name__ == "__main__":
+    main()
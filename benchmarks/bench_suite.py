@@ -0,0 +1,174 @@
+"""Performance baseline for the Bank and account hot paths.
+
+For each bank size (number of accounts, a mix of Savings, Premium and Investment
+accounts over size/4 clients) this times deposit, withdraw, open_account,
+search_accounts and get_clients_ranking call by call and reports ops/sec with p50
+and p99 latency. Results can be written as JSON and compared with a stored baseline;
+the run exits with status 1 when a case got slower than the threshold allows.
+
+Very large sizes (1e7) need tens of GB of memory and a long build; the default sizes
+finish in about a minute.
+
+Run with: python benchmarks/bench_suite.py [--sizes 1000,100000] [--ops N]
+          [--output results.json] [--baseline baseline.json] [--threshold 0.10]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from banking.account_options import InvestmentOptions, PremiumOptions, SavingsOptions  # noqa: E402
+from banking.bank import Bank  # noqa: E402
+from banking.client import Client  # noqa: E402
+from banking.credentials import PasswordHasher  # noqa: E402
+from banking.types import AccountStatus, AccountType, Currency  # noqa: E402
+
+NOON = datetime(2024, 1, 1, 12, 0)
+AMOUNT = Decimal("1.00")
+KINDS = [
+    (AccountType.SAVINGS, SavingsOptions(monthly_interest_rate=Decimal("0.01"))),
+    (AccountType.PREMIUM, PremiumOptions(overdraft_limit=Decimal("500.00"), withdraw_fee=Decimal("0.50"))),
+    (AccountType.INVESTMENT, InvestmentOptions(expected_yearly_growth=Decimal("0.05"))),
+]
+CURRENCIES = list(Currency)
+
+
+def build_bank(n_accounts: int, seed: int = 1) -> Bank:
+    rng = random.Random(seed)
+    # A cheap KDF: registering clients is setup here, not the thing being measured.
+    bank = Bank(_hasher=PasswordHasher(n=2 ** 4))
+    n_clients = max(1, n_accounts // 4)
+    for i in range(n_clients):
+        bank.add_client(Client(full_name=f"Client {i}", client_id=f"C-{i:08d}", age=30), password="pw")
+    for _ in range(n_accounts):
+        account_type, options = rng.choice(KINDS)
+        bank.open_account(
+            f"C-{rng.randrange(n_clients):08d}",
+            account_type=account_type,
+            currency=rng.choice(CURRENCIES),
+            balance=Decimal(rng.randrange(100_000, 200_000)) / 100,
+            now=NOON,
+            options=options,
+        )
+    return bank
+
+
+def measure(operation: Callable[[int], object], ops: int) -> dict[str, float]:
+    # Time each call separately; operation receives the iteration number.
+    clock = time.perf_counter_ns
+    samples = [0] * ops
+    started = clock()
+    for i in range(ops):
+        begin = clock()
+        operation(i)
+        samples[i] = clock() - begin
+    elapsed = clock() - started
+    samples.sort()
+    return {
+        "ops": ops,
+        "ops_per_sec": ops / (elapsed / 1e9),
+        "p50_us": samples[ops // 2] / 1e3,
+        "p99_us": samples[min(ops - 1, ops * 99 // 100)] / 1e3,
+    }
+
+
+def run_size(n_accounts: int, ops: int, seed: int = 1) -> dict[str, dict[str, float]]:
+    bank = build_bank(n_accounts, seed)
+    rng = random.Random(seed + 1)
+    account_ids = list(bank._accounts)
+    client_ids = list(bank._clients)
+    picks = [rng.choice(account_ids) for _ in range(ops)]
+    owners = [rng.choice(client_ids) for _ in range(ops)]
+    # Whole-bank scans get fewer iterations so big sizes stay tractable.
+    scan_ops = max(5, min(ops, 2_000_000 // n_accounts))
+
+    cases: dict[str, tuple[Callable[[int], object], int]] = {
+        "deposit": (lambda i: bank.deposit(picks[i], AMOUNT, now=NOON), ops),
+        "withdraw": (lambda i: bank.withdraw(picks[i], AMOUNT, now=NOON), ops),
+        "open_account": (
+            lambda i: bank.open_account(owners[i], account_type=KINDS[i % 3][0], options=KINDS[i % 3][1], now=NOON),
+            ops,
+        ),
+        "search_accounts_by_client": (lambda i: bank.search_accounts(client_id=owners[i]), ops),
+        "search_accounts_by_status": (
+            lambda i: bank.search_accounts(status=AccountStatus.ACTIVE, currency=CURRENCIES[i % 5]),
+            scan_ops,
+        ),
+        "get_clients_ranking": (lambda i: bank.get_clients_ranking(), scan_ops),
+    }
+    results = {}
+    for name, (operation, count) in cases.items():
+        results[name] = measure(operation, count)
+    bank.close()
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    # Cases whose throughput fell by more than threshold (a fraction) against baseline.
+    regressions = []
+    for size, cases in current["results"].items():
+        for name, result in cases.items():
+            before = baseline.get("results", {}).get(size, {}).get(name)
+            if before is None:
+                continue
+            change = result["ops_per_sec"] / before["ops_per_sec"] - 1
+            if change < -threshold:
+                regressions.append(
+                    f"{name} @ {size}: {before['ops_per_sec']:,.0f} -> {result['ops_per_sec']:,.0f} ops/sec"
+                    f" ({change:+.1%})"
+                )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,100000", help="comma-separated account counts")
+    parser.add_argument("--ops", type=int, default=20_000, help="calls per hot path")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--baseline", help="JSON from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed ops/sec drop, e.g. 0.10")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "ops": args.ops,
+            "seed": args.seed,
+        },
+        "results": {},
+    }
+    for size in (int(value) for value in args.sizes.split(",")):
+        report["results"][str(size)] = cases = run_size(size, args.ops, args.seed)
+        print(f"{size:,} accounts")
+        for name, result in cases.items():
+            print(
+                f"  {name:>26}: {result['ops_per_sec']:>12,.0f} ops/sec"
+                f"  p50 {result['p50_us']:>9.1f} us  p99 {result['p99_us']:>9.1f} us"
+            )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    if args.baseline:
+        regressions = compare(report, json.loads(Path(args.baseline).read_text()), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Synthetic credential-stuffing load on the failed-login tracker.
+
+Threads record failures for --keys distinct source addresses in random order, as a
+botnet spraying guesses would. The report shows the update rate, how many keys ended
+up locked, the memory held while the attack is inside the window, and the memory
+left once the window has passed and the lazy sweep has run. A simulated clock keeps
+the run short while the lockouts still expire through the timer wheel.
+
+Run with: python benchmarks/bench_throttle.py [--keys N] [--threads N] [--attempts N]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import resource
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from banking.bank import FAILED_LOGIN_WINDOW, LOCKOUT_SECONDS, MAX_FAILED_ATTEMPTS  # noqa: E402
+from banking.throttle import FailureTracker  # noqa: E402
+
+
+class SimulatedClock:
+    # Starts at zero and advances one millisecond per call, so a million failures
+    # span about 17 minutes of attack time.
+    def __init__(self) -> None:
+        self._now = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self) -> float:
+        with self._lock:
+            self._now += 0.001
+            return self._now
+
+    def skip(self, seconds: float) -> None:
+        with self._lock:
+            self._now += seconds
+
+
+def max_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keys", type=int, default=1_000_000, help="distinct attacking keys")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--attempts", type=int, default=2, help="failures per key")
+    args = parser.parse_args()
+
+    clock = SimulatedClock()
+    tracker = FailureTracker(MAX_FAILED_ATTEMPTS, window=FAILED_LOGIN_WINDOW, lockout=LOCKOUT_SECONDS, clock=clock)
+    keys = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(args.keys)] * args.attempts
+    random.Random(7).shuffle(keys)
+    chunks = [keys[i::args.threads] for i in range(args.threads)]
+    locked = [0] * args.threads
+    barrier = threading.Barrier(args.threads + 1)
+
+    def attacker(index: int) -> None:
+        barrier.wait()
+        record = tracker.record_failure
+        count = 0
+        for key in chunks[index]:
+            count += record(key)
+        locked[index] = count
+
+    threads = [threading.Thread(target=attacker, args=(i,)) for i in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    print(f"{len(keys):,} failures over {args.keys:,} keys with {args.threads} threads")
+    print(f"  {len(keys) / elapsed:,.0f} updates/s, {sum(locked):,} keys locked")
+    print(f"  tracked keys during attack: {len(tracker):,}  (max RSS {max_rss_mb():,.0f} MB)")
+
+    clock.skip(max(FAILED_LOGIN_WINDOW, LOCKOUT_SECONDS) + 1)
+    started = time.perf_counter()
+    released = len(tracker.expired())
+    tracker.record_failure("after-the-attack")  # triggers the lazy sweep
+    elapsed = time.perf_counter() - started
+    print(f"  after the window: {released:,} lockouts expired, {len(tracker):,} keys tracked ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
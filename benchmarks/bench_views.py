@@ -0,0 +1,92 @@
+"""Reports on a read view while deposits keep arriving.
+
+Opens --accounts accounts, then runs a writer thread making deposits while the main
+thread takes read views and computes the clients ranking and total balance on them.
+Reports the cost of taking a view, the report time, the writer's deposit rate with
+and without a report running, and the before-images the view retained.
+
+Run with: python benchmarks/bench_views.py [--accounts N] [--clients N] [--seconds S]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from banking.bank import AccountSpec, Bank  # noqa: E402
+from banking.client import Client  # noqa: E402
+from banking.credentials import PasswordHasher  # noqa: E402
+
+NOON = datetime(2024, 1, 1, 12, 0)
+
+
+def make_bank(n_accounts: int, n_clients: int) -> tuple[Bank, list[str]]:
+    bank = Bank(_hasher=PasswordHasher(n=2 ** 4))
+    for i in range(n_clients):
+        bank.add_client(Client(full_name=f"Client {i}", client_id=f"C-{i:08d}", age=30), password="pw")
+    rng = random.Random(1)
+    specs = [
+        AccountSpec(f"C-{rng.randrange(n_clients):08d}", balance=Decimal(rng.randrange(0, 100_000)) / 100)
+        for _ in range(n_accounts)
+    ]
+    return bank, [account.id for account in bank.open_accounts_bulk(specs, now=NOON).opened]
+
+
+def deposit_rate(bank: Bank, ids: list[str], seconds: float, report=None) -> tuple[float, object]:
+    # Deposits per second made by a writer thread while `report` runs (or for `seconds`).
+    stop = threading.Event()
+    count = 0
+
+    def writer() -> None:
+        nonlocal count
+        rng = random.Random(2)
+        while not stop.is_set():
+            bank.deposit(rng.choice(ids), Decimal("1.00"), now=NOON)
+            count += 1
+
+    thread = threading.Thread(target=writer)
+    started = time.perf_counter()
+    thread.start()
+    result = report() if report is not None else time.sleep(seconds)
+    stop.set()
+    thread.join()
+    return count / (time.perf_counter() - started), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=200_000)
+    parser.add_argument("--clients", type=int, default=50_000)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    bank, ids = make_bank(args.accounts, args.clients)
+    idle_rate, _ = deposit_rate(bank, ids, args.seconds)
+    print(f"deposits/sec, no report:        {idle_rate:>10,.0f}")
+
+    def report() -> tuple[float, float, int, bool]:
+        started = time.perf_counter()
+        with bank.read_view() as view:
+            taken = time.perf_counter() - started
+            first = view.get_clients_ranking(), view.get_total_balance()
+            again = view.get_clients_ranking(), view.get_total_balance()
+            retained = bank._versions.retained
+        return taken, time.perf_counter() - started, retained, first == again
+
+    busy_rate, (taken, elapsed, retained, repeatable) = deposit_rate(bank, ids, args.seconds, report)
+    print(f"deposits/sec, during report:    {busy_rate:>10,.0f}")
+    print(f"read_view() took:               {taken * 1e3:>10.2f} ms")
+    print(f"two reports on the view took:   {elapsed:>10.2f} s (repeatable: {repeatable})")
+    print(f"before-images retained:         {retained:>10,}")
+    print(f"before-images after release:    {bank._versions.retained:>10,}")
+
+
+if __name__ == "__main__":
+    main()
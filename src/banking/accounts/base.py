@@ -1,6 +1,6 @@
-import uuid
 from abc import ABC, abstractmethod
 from decimal import Decimal
+from typing import Callable
 
 from banking.errors import (
     InvalidOperationError,
@@ -8,8 +8,18 @@ from banking.errors import (
     AccountFrozenError,
     AccountClosedError,
 )
-from banking.money import ZERO_MONEY, to_money, validate_amount
-from banking.types import AccountStatus, Currency, Owner
+from banking.events import EventKind, EventStream
+from banking.history import TransactionHistory
+from banking.ids import default_generator
+from banking.locks import DEFAULT_STRIPES
+from banking.metrics import instrumented
+from banking.money import ZERO_MONEY, Money, validate_money
+from banking.types import AccountStatus, Currency, Owner, PostingKind
+
+_ACTIVE = AccountStatus.ACTIVE
+
+# Called after every balance change with the signed delta applied to the balance.
+AccountListener = Callable[["BankAccount", PostingKind, Money], None]
 
 
 class AbstractAccount(ABC):
@@ -22,8 +32,11 @@ class AbstractAccount(ABC):
     ):
         self._id = account_id
         self._owner = owner
-        self._balance = to_money(balance)
+        self._balance = Money.of(balance)
         self._status = status
+        self._listeners: tuple[AccountListener, ...] = ()
+        # Striped lock shared with Bank.transfer; re-entrant so both can hold it.
+        self._lock = DEFAULT_STRIPES.lock_for(account_id)
 
     @property
     def id(self) -> str:
@@ -39,7 +52,27 @@ class AbstractAccount(ABC):
 
     @property
     def balance(self) -> Decimal:
-        return self._balance
+        return self._balance.to_decimal()
+
+    @property
+    def balance_cents(self) -> int:
+        return self._balance.cents
+
+    def add_listener(self, listener: AccountListener) -> None:
+        self._listeners = (*self._listeners, listener)
+
+    def remove_listener(self, listener: AccountListener) -> None:
+        self._listeners = tuple(item for item in self._listeners if item != listener)
+
+    def _apply_posting(self, kind: PostingKind, delta: Money) -> None:
+        # Apply an already-validated balance change, e.g. when replaying a journal.
+        with self._lock:
+            self._balance = self._balance + delta
+            self._notify(kind, delta)
+
+    def _notify(self, kind: PostingKind, delta: Money) -> None:
+        for listener in self._listeners:
+            listener(self, kind, delta)
 
     @abstractmethod
     def deposit(self, amount: Decimal) -> None: ...
@@ -52,6 +85,12 @@ class AbstractAccount(ABC):
 
 
 class BankAccount(AbstractAccount):
+    # Change stream for events the bank cannot see from balance postings; attached by
+    # the bank that holds the account.
+    _events: EventStream | None = None
+    # Statement trail for the same kind of events, e.g. asset purchases.
+    _history: TransactionHistory | None = None
+
     def __init__(
         self,
         owner: Owner,
@@ -61,7 +100,7 @@ class BankAccount(AbstractAccount):
         currency: Currency = Currency.USD,
     ):
         if account_id is None:
-            account_id = uuid.uuid4().hex[:8]  # short uuid
+            account_id = default_generator().next_id()
         self._validate_owner(owner)
         self._validate_amount(balance, allow_zero=True)
         self._validate_currency(currency)
@@ -73,17 +112,39 @@ class BankAccount(AbstractAccount):
     def currency(self) -> Currency:
         return self._currency
 
+    @instrumented("account.deposit")
     def deposit(self, amount: Decimal) -> None:
-        self._check_can_operate()
-        value = self._validate_amount(amount)
-        self._balance += value
+        with self._lock:
+            self._check_can_operate()
+            value = self._validate_amount(amount)
+            self._balance = self._balance + value
+            self._notify(PostingKind.DEPOSIT, value)
 
+    @instrumented("account.withdraw")
     def withdraw(self, amount: Decimal) -> None:
-        self._check_can_operate()
-        value = self._validate_amount(amount)
-        if value > self._balance:
-            raise InsufficientFundsError("Not enough balance to withdraw this amount.")
-        self._balance -= value
+        with self._lock:
+            self._check_can_operate()
+            value = self._validate_amount(amount)
+            if value > self._balance:
+                raise InsufficientFundsError("Not enough balance to withdraw this amount.")
+            self._balance = self._balance - value
+            self._notify(PostingKind.WITHDRAW, -value)
+
+    def attach_events(self, events: EventStream) -> None:
+        self._events = events
+
+    def attach_history(self, history: TransactionHistory) -> None:
+        self._history = history
+
+    def _record(self, kind: EventKind, cents: int, detail: str | None = None) -> None:
+        history = self._history
+        if history is not None and history.recording:
+            history.record(self._id, kind, cents, self._balance.cents, detail)
+
+    def _publish(self, kind: EventKind, cents: int = 0, detail: str | None = None) -> None:
+        events = self._events
+        if events is not None and events.active:
+            events.publish(kind, self._id, self._owner.doc_id or "", cents, detail)
 
     def get_account_info(self) -> dict:
         return {
@@ -92,11 +153,32 @@ class BankAccount(AbstractAccount):
             "owner_name": self._owner.name,
             "owner_doc_id": self._owner.doc_id,
             "status": self._status.value,
-            "balance": self._balance,
+            "balance": self._balance.to_decimal(),
             "currency": self._currency.value,
         }
 
+    def _spawn(self, owner: Owner, account_id: str, balance: Money) -> "BankAccount":
+        # Copy of this already validated account, listeners included, with another
+        # owner, id and opening balance. Bank.open_accounts_bulk uses it so options
+        # shared by many rows are validated once; only the balance rule is checked again.
+        account = object.__new__(type(self))
+        # One dict build is cheaper than setting the attributes one by one.
+        account.__dict__ = {
+            **self.__dict__,
+            "_id": account_id,
+            "_owner": owner,
+            "_balance": balance,
+            "_lock": DEFAULT_STRIPES.lock_for(account_id),
+        }
+        account._check_opening_balance()
+        return account
+
+    def _check_opening_balance(self) -> None:
+        pass
+
     def _check_can_operate(self) -> None:
+        if self._status is _ACTIVE:
+            return
         if self._status == AccountStatus.FROZEN:
             raise AccountFrozenError("Account is frozen. Operations are not allowed.")
         if self._status == AccountStatus.CLOSED:
@@ -117,8 +199,8 @@ class BankAccount(AbstractAccount):
             raise InvalidOperationError("Currency must be one of: RUB, USD, EUR, KZT, CNY.")
 
     @staticmethod
-    def _validate_amount(amount: Decimal, allow_zero: bool = False) -> Decimal:
-        return validate_amount(amount, allow_zero=allow_zero)
+    def _validate_amount(amount: Decimal, allow_zero: bool = False) -> Money:
+        return validate_money(amount, allow_zero=allow_zero)
 
     def __str__(self) -> str:
         last4 = self._id[-4:] if self._id else "????"
@@ -1,11 +1,30 @@
+from __future__ import annotations
+
 from decimal import Decimal, InvalidOperation
+from typing import TYPE_CHECKING, Callable
 
 from banking.accounts.base import BankAccount
-from banking.money import MONEY_QUANT, ZERO_MONEY
+from banking.money import MONEY_QUANT, ZERO_MONEY, Money
 from banking.errors import InsufficientFundsError, InvalidOperationError
+from banking.events import EventKind
+from banking.metrics import instrumented
+from banking.types import Owner, PostingKind
+
+if TYPE_CHECKING:
+    from banking.prices import PriceBook
+
+ASSET_TYPES = ("stocks", "bonds", "etf")
+
+# Called after every asset purchase with the asset type and the amount bought.
+AssetListener = Callable[["InvestmentAccount", str, Money], None]
 
 
 class InvestmentAccount(BankAccount):
+    # _portfolios holds fixed amounts per asset class; instrument holdings are unit
+    # quantities valued at market prices by a shared PriceBook, attached by the bank.
+    _prices: PriceBook | None = None
+    _asset_listeners: tuple[AssetListener, ...] = ()
+
     def __init__(
         self,
         *,
@@ -18,11 +37,7 @@ class InvestmentAccount(BankAccount):
         if growth_val < 0:
             raise InvalidOperationError("Expected yearly growth cannot be negative.")
         self._expected_yearly_growth = growth_val
-        self._portfolios = {
-            "stocks": ZERO_MONEY,
-            "bonds": ZERO_MONEY,
-            "etf": ZERO_MONEY,
-        }
+        self._portfolios = {asset_type: Money() for asset_type in ASSET_TYPES}
         if portfolios:
             for asset_type, value in portfolios.items():
                 if asset_type not in self._portfolios:
@@ -33,38 +48,88 @@ class InvestmentAccount(BankAccount):
                     value, allow_zero=True
                 )
 
+    def _spawn(self, owner: Owner, account_id: str, balance: Money) -> InvestmentAccount:
+        account = super()._spawn(owner, account_id, balance)
+        account._portfolios = dict(self._portfolios)
+        return account
+
     def project_yearly_growth(self, years: int = 1) -> Decimal:
         if years < 0:
             raise InvalidOperationError("Years cannot be negative.")
-        base = self._balance + self.portfolio_value
+        base = self._balance.to_decimal() + self.portfolio_value
         projected = base * ((Decimal("1") + self._expected_yearly_growth) ** years)
         return projected.quantize(MONEY_QUANT)
 
+    @instrumented("account.withdraw")
     def withdraw(self, amount: Decimal) -> None:
-        self._check_can_operate()
-        value = self._validate_amount(amount)
-        if value > self._balance:
-            raise InsufficientFundsError("Not enough balance to withdraw this amount.")
-        self._balance -= value
+        with self._lock:
+            self._check_can_operate()
+            value = self._validate_amount(amount)
+            if value > self._balance:
+                raise InsufficientFundsError("Not enough balance to withdraw this amount.")
+            self._balance = self._balance - value
+            self._notify(PostingKind.WITHDRAW, -value)
 
+    @instrumented("account.add_asset")
     def add_asset(self, asset_type: str, amount: Decimal) -> None:
-        self._check_can_operate()
-        if asset_type not in self._portfolios:
-            raise InvalidOperationError("Asset type must be one of: stocks, bonds, etf.")
-        value = self._validate_amount(amount)
-        self._portfolios[asset_type] = (self._portfolios[asset_type] + value).quantize(
-            MONEY_QUANT
-        )
+        with self._lock:
+            self._check_can_operate()
+            if asset_type not in self._portfolios:
+                raise InvalidOperationError("Asset type must be one of: stocks, bonds, etf.")
+            self._apply_asset(asset_type, self._validate_amount(amount))
+
+    def add_asset_listener(self, listener: AssetListener) -> None:
+        self._asset_listeners = (*self._asset_listeners, listener)
+
+    def _apply_asset(self, asset_type: str, value: Money) -> None:
+        # Apply an already-validated purchase, e.g. when replaying a journal.
+        with self._lock:
+            self._portfolios[asset_type] = self._portfolios[asset_type] + value
+            self._record(EventKind.ASSET_ADDED, value.cents, asset_type)
+            self._publish(EventKind.ASSET_ADDED, value.cents, asset_type)
+            for listener in self._asset_listeners:
+                listener(self, asset_type, value)
+
+    def attach_prices(self, prices: PriceBook) -> None:
+        self._prices = prices
+
+    @instrumented("account.add_holding")
+    def add_holding(self, instrument: str, quantity: int) -> int:
+        # Buy (positive) or sell (negative) whole units; returns the units now held.
+        with self._lock:
+            self._check_can_operate()
+            if self._prices is None:
+                raise InvalidOperationError("Account has no price book attached.")
+            return self._prices.add_holding(self._id, instrument, quantity)
+
+    @property
+    def holdings(self) -> dict[str, int]:
+        return {} if self._prices is None else self._prices.holdings(self._id)
+
+    @property
+    def portfolio_cents(self) -> dict[str, int]:
+        # Fixed amounts plus holdings at current prices, per asset class.
+        cents = {asset_type: value.cents for asset_type, value in self._portfolios.items()}
+        if self._prices is not None:
+            for asset_type, value in self._prices.value_by_asset_cents(self._id).items():
+                cents[asset_type] += value
+        return cents
 
     @property
     def portfolio_value(self) -> Decimal:
-        return sum(self._portfolios.values(), ZERO_MONEY)
+        cents = sum(value.cents for value in self._portfolios.values())
+        if self._prices is not None:
+            cents += self._prices.value_cents(self._id)
+        return Money(cents).to_decimal()
 
     def get_account_info(self) -> dict:
         info = super().get_account_info()
         info.update(
             {
-                "portfolios": dict(self._portfolios),
+                "portfolios": {
+                    asset_type: value.to_decimal() for asset_type, value in self._portfolios.items()
+                },
+                "holdings": self.holdings,
                 "portfolio_value": self.portfolio_value,
                 "expected_yearly_growth": self._expected_yearly_growth,
             }
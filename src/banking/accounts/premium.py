@@ -1,8 +1,10 @@
 from banking.accounts.base import BankAccount
 from decimal import Decimal
 
-from banking.money import DEFAULT_MAX_WITHDRAW, MONEY_QUANT, ZERO_MONEY
+from banking.money import DEFAULT_MAX_WITHDRAW, ZERO_MONEY
 from banking.errors import InsufficientFundsError, InvalidOperationError
+from banking.metrics import instrumented
+from banking.types import PostingKind
 
 
 class PremiumAccount(BankAccount):
@@ -16,6 +18,7 @@ class PremiumAccount(BankAccount):
     ):
         super().__init__(**kwargs)
         self._overdraft_limit = self._validate_amount(overdraft_limit, allow_zero=True)
+        self._overdraft_floor = -self._overdraft_limit
         self._withdraw_fee = self._validate_amount(withdraw_fee, allow_zero=True)
         self._max_withdraw_per_txn = self._validate_amount(
             max_withdraw_per_txn, allow_zero=False
@@ -23,33 +26,40 @@ class PremiumAccount(BankAccount):
 
     @property
     def overdraft_limit(self) -> Decimal:
-        return self._overdraft_limit
+        return self._overdraft_limit.to_decimal()
 
     @property
     def withdraw_fee(self) -> Decimal:
-        return self._withdraw_fee
+        return self._withdraw_fee.to_decimal()
 
     @property
     def max_withdraw_per_txn(self) -> Decimal:
-        return self._max_withdraw_per_txn
+        return self._max_withdraw_per_txn.to_decimal()
 
+    @instrumented("account.withdraw")
     def withdraw(self, amount: Decimal) -> None:
-        self._check_can_operate()
-        amount_val = self._validate_amount(amount)
-        if amount_val > self._max_withdraw_per_txn:
-            raise InvalidOperationError("Withdraw amount exceeds max_withdraw_per_txn.")
-        total_debit = (amount_val + self._withdraw_fee).quantize(MONEY_QUANT)
-        if self._balance - total_debit < -self._overdraft_limit:
-            raise InsufficientFundsError("Overdraft limit exceeded.")
-        self._balance = (self._balance - total_debit).quantize(MONEY_QUANT)
+        with self._lock:
+            self._check_can_operate()
+            amount_val = self._validate_amount(amount)
+            if amount_val > self._max_withdraw_per_txn:
+                raise InvalidOperationError("Withdraw amount exceeds max_withdraw_per_txn.")
+            new_balance = self._balance - amount_val - self._withdraw_fee
+            if new_balance < self._overdraft_floor:
+                raise InsufficientFundsError("Overdraft limit exceeded.")
+            # One posting at a time, so listeners always see the balance their delta produced.
+            self._balance = self._balance - amount_val
+            self._notify(PostingKind.WITHDRAW, -amount_val)
+            if self._withdraw_fee:
+                self._balance = new_balance
+                self._notify(PostingKind.FEE, -self._withdraw_fee)
 
     def get_account_info(self) -> dict:
         info = super().get_account_info()
         info.update(
             {
-                "overdraft_limit": self._overdraft_limit,
-                "withdraw_fee": self._withdraw_fee,
-                "max_withdraw_per_txn": self._max_withdraw_per_txn,
+                "overdraft_limit": self._overdraft_limit.to_decimal(),
+                "withdraw_fee": self._withdraw_fee.to_decimal(),
+                "max_withdraw_per_txn": self._max_withdraw_per_txn.to_decimal(),
             }
         )
         return info
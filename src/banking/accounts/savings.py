@@ -1,8 +1,10 @@
-from decimal import Decimal, InvalidOperation
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
 
 from banking.accounts.base import BankAccount
-from banking.money import MONEY_QUANT, ZERO_MONEY
+from banking.money import ZERO_MONEY
 from banking.errors import InsufficientFundsError, InvalidOperationError
+from banking.metrics import instrumented
+from banking.types import PostingKind
 
 
 class SavingsAccount(BankAccount):
@@ -16,40 +18,48 @@ class SavingsAccount(BankAccount):
         super().__init__(**kwargs)
         self._min_balance = self._validate_amount(min_balance, allow_zero=True)
         self._monthly_interest_rate = self._validate_interest_rate(monthly_interest_rate)
+        self._check_opening_balance()
+
+    def _check_opening_balance(self) -> None:
         if self._balance < self._min_balance:
             raise InvalidOperationError("Initial balance cannot be below min_balance.")
 
     @property
     def min_balance(self) -> Decimal:
-        return self._min_balance
+        return self._min_balance.to_decimal()
 
     @property
     def monthly_interest_rate(self) -> Decimal:
         return self._monthly_interest_rate
 
+    @instrumented("account.apply_monthly_interest")
     def apply_monthly_interest(self) -> None:
-        self._check_can_operate()
-        if self._monthly_interest_rate == 0:
-            return
-        interest = (self._balance * self._monthly_interest_rate).quantize(
-            MONEY_QUANT
-        )
-        self._balance = (self._balance + interest).quantize(MONEY_QUANT)
+        with self._lock:
+            self._check_can_operate()
+            if self._monthly_interest_rate == 0:
+                return
+            # Half-even matches the default context rounding interest has always used.
+            interest = self._balance.multiply(self._monthly_interest_rate, rounding=ROUND_HALF_EVEN)
+            self._balance = self._balance + interest
+            self._notify(PostingKind.INTEREST, interest)
 
+    @instrumented("account.withdraw")
     def withdraw(self, amount: Decimal) -> None:
-        self._check_can_operate()
-        value = self._validate_amount(amount)
-        if value > self._balance:
-            raise InsufficientFundsError("Not enough balance to withdraw this amount.")
-        if self._balance - value < self._min_balance:
-            raise InvalidOperationError("Cannot withdraw: min_balance would be violated.")
-        self._balance -= value
+        with self._lock:
+            self._check_can_operate()
+            value = self._validate_amount(amount)
+            if value > self._balance:
+                raise InsufficientFundsError("Not enough balance to withdraw this amount.")
+            if self._balance - value < self._min_balance:
+                raise InvalidOperationError("Cannot withdraw: min_balance would be violated.")
+            self._balance = self._balance - value
+            self._notify(PostingKind.WITHDRAW, -value)
 
     def get_account_info(self) -> dict:
         info = super().get_account_info()
         info.update(
             {
-                "min_balance": self._min_balance,
+                "min_balance": self._min_balance.to_decimal(),
                 "monthly_interest_rate": self._monthly_interest_rate,
             }
         )
@@ -1,9 +1,16 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field, asdict
+import asyncio
+import gc
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field, asdict, fields
 from datetime import datetime, time
 from decimal import Decimal
-from typing import Iterable
+from pathlib import Path
+from typing import IO, Iterable, Iterator
 
 from banking.account_options import (
     AccountOptions,
@@ -17,11 +24,34 @@ from banking.accounts.investment import InvestmentAccount
 from banking.accounts.premium import PremiumAccount
 from banking.accounts.savings import SavingsAccount
 from banking.client import Client
+from banking.columnar import AccountColumns
+from banking.credentials import PasswordHasher, SessionStore
 from banking.errors import InvalidOperationError
-from banking.money import ZERO_MONEY
-from banking.types import AccountStatus, AccountType, ClientStatus, Currency, Owner
+from banking.events import EventKind, EventStream
+from banking.fx import CurrencyTotals, FxRateTable
+from banking.history import StatementLine, TransactionHistory, write_statement_csv
+from banking.ids import IdGenerator, default_generator
+from banking.indexes import AccountIndex
+from banking.journal import Journal, JournalOp, read_journal
+from banking.ledger import Ledger
+from banking.locks import DEFAULT_STRIPES
+from banking.metrics import instrument_public_methods, track_bank
+from banking.money import ZERO_MONEY, Money, validate_money
+from banking.prices import BookChange, PriceBook, replay_ticks
+from banking.projections import ProjectionResult, project_portfolios
+from banking.ranking import ClientRanking
+from banking.security_log import BankSecurityLog, SecurityLog
+from banking.snapshot import AccountRow, LazyAccountMap, LazyMap, SnapshotReader, write_snapshot
+from banking.storage import SqliteStore, StoreAccountMap, StoreMap
+from banking.throttle import FailureTracker
+from banking.types import AccountStatus, AccountType, ClientStatus, Currency, Owner, PostingKind
+from banking.views import ReadView, VersionStore
 
 MAX_FAILED_ATTEMPTS = 3
+# Failed logins from one source address (any client ids) before it is turned away.
+MAX_FAILED_ATTEMPTS_PER_SOURCE = 20
+FAILED_LOGIN_WINDOW = 900.0
+LOCKOUT_SECONDS = 900.0
 QUIET_HOURS_START = time(0, 0)
 QUIET_HOURS_END = time(5, 0)
 ACCOUNT_TYPE_MAP = {
@@ -31,32 +61,134 @@ ACCOUNT_TYPE_MAP = {
     AccountType.PREMIUM: (PremiumAccount, PremiumOptions),
     AccountType.INVESTMENT: (InvestmentAccount, InvestmentOptions),
 }
+# Reverse lookup used when serializing accounts; BASE wins over its BANK alias.
+ACCOUNT_TYPE_BY_CLASS = {
+    account_cls: account_type for account_type, (account_cls, _) in reversed(ACCOUNT_TYPE_MAP.items())
+}
 
+POSTING_EVENTS = {kind: EventKind(kind.value) for kind in PostingKind}
+STATUS_EVENTS = {
+    AccountStatus.ACTIVE: EventKind.UNFROZEN,
+    AccountStatus.FROZEN: EventKind.FROZEN,
+    AccountStatus.CLOSED: EventKind.CLOSED,
+}
 
-@dataclass
-class BankSecurityLog:
+OPTION_FIELDS = {
+    account_type: tuple(option.name for option in fields(options_cls))
+    for account_type, (_, options_cls) in ACCOUNT_TYPE_MAP.items()
+}
+
+
+def _instrument_record(instrument: str, asset_type: str, cents: int) -> dict:
+    return {"instrument": instrument, "asset_type": asset_type, "price": cents}
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    # Bulk paths allocate hundreds of thousands of long-lived objects, and each young
+    # collection they trigger can escalate to a scan of the whole heap. Nothing they
+    # build is cyclic garbage, so the collector is switched off until they are done.
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+@dataclass(frozen=True)
+class AccountSpec:
+    # One row for Bank.open_accounts_bulk; the fields mirror open_account's arguments.
     client_id: str
-    reason: str
-    created_at: datetime
+    account_type: AccountType | str = AccountType.BASE
+    currency: Currency = Currency.USD
+    balance: Decimal = ZERO_MONEY
+    options: AccountOptions | None = None
 
 
+@dataclass
+class BulkOpenResult:
+    # accounts[i] is the account opened for specs[i], or None when that row failed;
+    # errors maps each failed row number to its message.
+    accounts: list[BankAccount | None]
+    errors: dict[int, str]
+
+    @property
+    def opened(self) -> list[BankAccount]:
+        return [account for account in self.accounts if account is not None]
+
+
+@instrument_public_methods("bank")
 @dataclass
 class Bank:
     _clients: dict[str, Client] = field(default_factory=dict)
     _accounts: dict[str, BankAccount] = field(default_factory=dict)
     _credentials: dict[str, str] = field(default_factory=dict)
-    _failed_attempts: dict[str, int] = field(default_factory=dict)
-    _security_log: list[BankSecurityLog] = field(default_factory=list)
+    _failed_attempts: FailureTracker = field(
+        default_factory=lambda: FailureTracker(
+            MAX_FAILED_ATTEMPTS, window=FAILED_LOGIN_WINDOW, lockout=LOCKOUT_SECONDS
+        ),
+        repr=False,
+        compare=False,
+    )
+    _failed_sources: FailureTracker = field(
+        default_factory=lambda: FailureTracker(
+            MAX_FAILED_ATTEMPTS_PER_SOURCE, window=FAILED_LOGIN_WINDOW, lockout=LOCKOUT_SECONDS
+        ),
+        repr=False,
+        compare=False,
+    )
+    # Keeps the newest events in memory; attach_security_archive keeps the rest on disk.
+    _security_log: SecurityLog = field(default_factory=SecurityLog)
+    _index: AccountIndex = field(default_factory=AccountIndex, repr=False)
+    _ranking: ClientRanking = field(default_factory=ClientRanking, repr=False)
+    _currency_totals: CurrencyTotals = field(default_factory=CurrencyTotals, repr=False, compare=False)
+    _fx_rates: FxRateTable | None = field(default=None, repr=False, compare=False)
+    # Instrument prices and holdings shared by every investment account of the bank.
+    _prices: PriceBook = field(default_factory=PriceBook, repr=False, compare=False)
+    # Change-data-capture stream; costs one attribute check per event until subscribed.
+    _events: EventStream = field(default_factory=EventStream, repr=False, compare=False)
+    # Every posting and asset purchase per account, for statements.
+    _history: TransactionHistory = field(default_factory=TransactionHistory, repr=False, compare=False)
+    # Commit versions and the before-images kept for open read views.
+    _versions: VersionStore = field(default_factory=VersionStore, repr=False, compare=False)
+    _columns: AccountColumns | None = field(default=None, repr=False)
+    # Time-ordered balance changes for as-of queries (Bank.enable_ledger).
+    _ledger: Ledger | None = field(default=None, repr=False)
+    _journal: Journal | None = field(default=None, repr=False)
+    # Database the registries write through to (Bank.open_store).
+    _store: SqliteStore | None = field(default=None, repr=False)
+    # Set while the index and ranking have not been built yet (lazily loaded snapshots).
+    _derived_stale: bool = field(default=False, repr=False)
+    # Guards the registries and the shared derived structures (index, ranking, columns,
+    # ledger). Account state itself is guarded by the striped per-account locks; the lock
+    # order is account stripes -> journal batch -> this lock, and the journal is never
+    # entered while this lock is held.
+    _lock: threading.RLock = field(default_factory=threading.RLock, repr=False, compare=False)
+    # _credentials holds scrypt hashes; the executor runs the KDF for async logins.
+    _hasher: PasswordHasher = field(default_factory=PasswordHasher, repr=False, compare=False)
+    _sessions: SessionStore = field(default_factory=SessionStore, repr=False, compare=False)
+    _kdf_executor: ThreadPoolExecutor | None = field(default=None, repr=False, compare=False)
+    # Source of ids for new accounts; the default is unique across processes on a host.
+    _ids: IdGenerator = field(default_factory=default_generator, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # Rebuild derived structures for banks constructed from pre-populated dicts.
+        track_bank(self)
+        self._prices.add_listener(self._on_book_change)
+        for client_id in self._clients:
+            self._ranking.add_client(client_id)
+        for account in self._accounts.values():
+            self._track_account(account)
 
     def add_client(self, client: Client, password: str) -> None:
         # Register a client with initial credentials and reset counters.
-        if client.client_id in self._clients:
-            raise InvalidOperationError("Client already exists.")
         if not password:
             raise InvalidOperationError("Password is required.")
-        self._clients[client.client_id] = client
-        self._credentials[client.client_id] = password
-        self._failed_attempts[client.client_id] = 0
+        if client.client_id in self._clients:
+            raise InvalidOperationError("Client already exists.")
+        self._insert_client(client, self._hasher.hash(password))
 
     def open_account(
         self,
@@ -69,60 +201,223 @@ class Bank:
         options: AccountOptions | None = None,
     ) -> BankAccount:
         # Create a new account for an active client during allowed hours.
+        self._await_event_room()
         self._ensure_operating_hours(now=now, client_id=client_id)
         client = self._get_active_client(client_id)
         owner = Owner(name=client.full_name, doc_id=client.client_id)
-        account_type_normalized = self._normalize_account_type(account_type)
-        if account_type_normalized not in ACCOUNT_TYPE_MAP: raise InvalidOperationError("Unknown account type.")
-        account_cls, options_cls = ACCOUNT_TYPE_MAP[account_type_normalized]
-        opts = self._ensure_options(options, options_cls)
-        account = account_cls(
-            owner=owner,
-            currency=currency,
-            balance=balance,
-            **asdict(opts),
-        )
-        self._accounts[account.id] = account
-        client.add_account(account.id)
+        account = self._build_account(owner, self._ids.next_id(), account_type, currency, balance, options)
+        self._register_account(account, client)
         return account
 
+    def open_accounts_bulk(self, specs: Iterable[AccountSpec], *, now: datetime | None = None) -> BulkOpenResult:
+        # Open many accounts at once, e.g. when onboarding a partner portfolio. Rows
+        # succeed or fail independently. The quiet-hours check and id allocation run
+        # once per batch and client lookups once per client; the first account built
+        # for each (type, currency, options) combination is the template for the rest
+        # of that group, so its options are validated only once.
+        self._await_event_room()
+        specs = list(specs)
+        self._ensure_operating_hours_bulk(now, specs)
+        with _gc_paused():
+            return self._open_accounts_bulk(specs)
+
+    def _open_accounts_bulk(self, specs: list[AccountSpec]) -> BulkOpenResult:
+        ids = self._ids.reserve(len(specs))
+        clients: dict[str, Client] = {}
+        owners: dict[str, Owner] = {}
+        refused: dict[str, str] = {}
+        templates: dict[tuple, BankAccount] = {}
+        balances: dict[Decimal, Money] = {}
+        accounts: list[BankAccount | None] = [None] * len(specs)
+        errors: dict[int, str] = {}
+        listener = self._on_account_event
+        for row, spec in enumerate(specs):
+            client_id = spec.client_id
+            try:
+                owner = owners.get(client_id)
+                if owner is None:
+                    if client_id in refused:
+                        raise InvalidOperationError(refused[client_id])
+                    try:
+                        client = self._get_active_client(client_id)
+                    except InvalidOperationError as exc:
+                        refused[client_id] = str(exc)
+                        raise
+                    clients[client_id] = client
+                    owner = owners[client_id] = Owner(name=client.full_name, doc_id=client.client_id)
+                # id() is stable here because specs keeps every options object alive.
+                group = (spec.account_type, spec.currency, id(spec.options))
+                template = templates.get(group)
+                if template is None:
+                    account = self._build_account(
+                        owner, ids[row], spec.account_type, spec.currency, spec.balance, spec.options
+                    )
+                    account.add_listener(listener)
+                    self._attach_shared(account)
+                    templates[group] = account
+                else:
+                    balance = balances.get(spec.balance)
+                    if balance is None:
+                        balance = balances[spec.balance] = validate_money(spec.balance, allow_zero=True)
+                    account = template._spawn(owner, ids[row], balance)
+            except InvalidOperationError as exc:
+                errors[row] = str(exc)
+            else:
+                accounts[row] = account
+        self._register_accounts(accounts, errors, clients)
+        return BulkOpenResult(accounts, errors)
+
     def close_account(self, account_id: str, *, now: datetime | None = None) -> None:
         # Close account and disallow further operations.
+        self._await_event_room()
         self._ensure_operating_hours(now=now, client_id=self._account_client_id(account_id))
         account = self._get_account(account_id)
-        account._status = AccountStatus.CLOSED
+        with account._lock:
+            self._set_status(account, AccountStatus.CLOSED)
 
     def freeze_account(self, account_id: str, *, now: datetime | None = None) -> None:
         # Freeze account unless already closed.
+        self._await_event_room()
         self._ensure_operating_hours(now=now, client_id=self._account_client_id(account_id))
         account = self._get_account(account_id)
-        if account.status != AccountStatus.CLOSED:
-            account._status = AccountStatus.FROZEN
+        with account._lock:
+            if account.status != AccountStatus.CLOSED:
+                self._set_status(account, AccountStatus.FROZEN)
 
     def unfreeze_account(self, account_id: str, *, now: datetime | None = None) -> None:
         # Restore frozen account back to active status.
+        self._await_event_room()
         self._ensure_operating_hours(now=now, client_id=self._account_client_id(account_id))
         account = self._get_account(account_id)
-        if account.status == AccountStatus.FROZEN:
-            account._status = AccountStatus.ACTIVE
+        with account._lock:
+            if account.status == AccountStatus.FROZEN:
+                self._set_status(account, AccountStatus.ACTIVE)
 
-    def authenticate_client(self, client_id: str, password: str) -> bool:
-        # Track failed attempts and block after 3 incorrect passwords.
-        client = self._clients.get(client_id)
+    def deposit(self, account_id: str, amount: Decimal, *, now: datetime | None = None) -> Decimal:
+        # Deposit through the bank so the quiet-hours rule applies; returns the new balance.
+        self._await_event_room()
+        self._ensure_operating_hours(now=now, client_id=self._account_client_id(account_id))
+        account = self._get_account(account_id)
+        with account._lock:
+            account.deposit(amount)
+            return account.balance
+
+    def withdraw(self, account_id: str, amount: Decimal, *, now: datetime | None = None) -> Decimal:
+        # Withdraw through the bank so the quiet-hours rule applies; returns the new balance.
+        self._await_event_room()
+        self._ensure_operating_hours(now=now, client_id=self._account_client_id(account_id))
+        account = self._get_account(account_id)
+        with account._lock:
+            account.withdraw(amount)
+            return account.balance
+
+    def transfer(
+        self,
+        src_account_id: str,
+        dst_account_id: str,
+        amount: Decimal,
+        *,
+        now: datetime | None = None,
+    ) -> None:
+        # Move money between two accounts of the same currency as one atomic step.
+        self._await_event_room()
+        self._ensure_operating_hours(now=now, client_id=self._account_client_id(src_account_id))
+        if src_account_id == dst_account_id:
+            raise InvalidOperationError("Cannot transfer to the same account.")
+        source = self._get_account(src_account_id)
+        target = self._get_account(dst_account_id)
+        if source.currency != target.currency:
+            raise InvalidOperationError("Transfer currencies must match.")
+        with DEFAULT_STRIPES.hold(source.id, target.id), self._atomic():
+            target._check_can_operate()
+            before = source.balance_cents
+            source.withdraw(amount)
+            try:
+                target.deposit(amount)
+            except Exception:
+                # Undo the withdrawal including any fee it charged.
+                source._apply_posting(PostingKind.DEPOSIT, Money(before - source.balance_cents))
+                raise
+
+    def authenticate_client(self, client_id: str, password: str, *, source: str | None = None) -> bool:
+        # Block a client after 3 incorrect passwords within FAILED_LOGIN_WINDOW, and a
+        # source address after MAX_FAILED_ATTEMPTS_PER_SOURCE; both lockouts lift after
+        # LOCKOUT_SECONDS. The KDF runs on the calling thread; event-loop callers should
+        # use authenticate_client_async.
+        client = self._admit_login(client_id, source)
         if client is None:
             return False
-        if client.status == ClientStatus.BLOCKED:
+        ok, upgraded = self._verify_password(password, self._credentials.get(client_id))
+        return self._finish_authentication(client, ok, upgraded, source)
+
+    async def authenticate_client_async(
+        self, client_id: str, password: str, *, source: str | None = None
+    ) -> bool:
+        # Same checks as authenticate_client with the KDF on a worker thread.
+        client = self._admit_login(client_id, source)
+        if client is None:
             return False
-        if self._credentials.get(client_id) == password:
-            self._failed_attempts[client_id] = 0
-            return True
-        self._failed_attempts[client_id] = self._failed_attempts.get(client_id, 0) + 1
-        if self._failed_attempts[client_id] >= MAX_FAILED_ATTEMPTS:
-            client.status = ClientStatus.BLOCKED
-            self._log_security_event(client_id, "account locked after failed logins")
-        else:
-            self._log_security_event(client_id, "failed login attempt")
-        return False
+        ok, upgraded = await asyncio.get_running_loop().run_in_executor(
+            self._kdf_pool(), self._verify_password, password, self._credentials.get(client_id)
+        )
+        return self._finish_authentication(client, ok, upgraded, source)
+
+    def login(self, client_id: str, password: str, *, source: str | None = None) -> str | None:
+        # Authenticate and open a session; returns a token, or None if the login failed.
+        if not self.authenticate_client(client_id, password, source=source):
+            return None
+        return self._sessions.issue(client_id)
+
+    async def login_async(self, client_id: str, password: str, *, source: str | None = None) -> str | None:
+        if not await self.authenticate_client_async(client_id, password, source=source):
+            return None
+        return self._sessions.issue(client_id)
+
+    def block_client(self, client_id: str) -> None:
+        # Operator block: logins and sessions are refused until unblock_client. Unlike
+        # a lockout after failed logins it does not expire, across restarts too.
+        client = self._clients.get(client_id)
+        if client is None:
+            raise InvalidOperationError("Client not found.")
+        with DEFAULT_STRIPES.lock_for(client_id):
+            self._failed_attempts.unlock(client_id)
+            self._set_client_status(client, ClientStatus.BLOCKED)
+            self._sessions.revoke_client(client_id)
+        self._log_security_event(client_id, "account blocked by operator")
+
+    def unblock_client(self, client_id: str) -> None:
+        # Lift an operator block or a lockout and forget the failed attempts.
+        client = self._clients.get(client_id)
+        if client is None:
+            raise InvalidOperationError("Client not found.")
+        with DEFAULT_STRIPES.lock_for(client_id):
+            if client.status == ClientStatus.ACTIVE:
+                return
+            self._failed_attempts.unlock(client_id)
+            self._failed_attempts.reset(client_id)
+            self._set_client_status(client, ClientStatus.ACTIVE)
+        self._log_security_event(client_id, "account unblocked by operator")
+
+    def failed_attempts(self, client_id: str) -> int:
+        # Failed logins inside the current window that have not led to a lockout.
+        return self._failed_attempts.failures(client_id)
+
+    def session_client(self, token: str | None, *account_ids: str) -> str:
+        # Client behind a live session token; a dict lookup instead of another KDF run.
+        # Any account_ids given must belong to that client.
+        if not token:
+            raise InvalidOperationError("Session token is required.")
+        client_id = self._sessions.client_for(token)
+        client = self._clients.get(client_id) if client_id is not None else None
+        if client is None or client.status != ClientStatus.ACTIVE:
+            raise InvalidOperationError("Session is invalid or expired.")
+        for account_id in account_ids:
+            if self._account_client_id(account_id) != client_id:
+                raise InvalidOperationError("Account does not belong to this session.")
+        return client_id
+
+    def logout(self, token: str) -> None:
+        self._sessions.revoke(token)
 
     def search_accounts(
         self,
@@ -132,38 +427,344 @@ class Bank:
         currency: Currency | None = None,
     ) -> list[BankAccount]:
         # Filter accounts by owner, status, and/or currency.
-        results: Iterable[BankAccount] = self._accounts.values()
-        if client_id is not None:
-            results = [acc for acc in results if acc.owner.doc_id == client_id]
-        if status is not None:
-            results = [acc for acc in results if acc.status == status]
-        if currency is not None:
-            results = [acc for acc in results if acc.currency == currency]
-        return list(results)
-
-    def get_total_balance(self) -> Decimal:
-        # Sum balances across all non-closed accounts.
-        total = ZERO_MONEY
-        for account in self._accounts.values():
-            if account.status != AccountStatus.CLOSED:
-                total += account.balance
-        return total
+        store = self._pushdown()
+        if store is not None:
+            ids = store.search_ids(client_id=client_id, status=status, currency=currency)
+            return [self._accounts[account_id] for account_id in ids]
+        with self._lock:
+            return list(self.iter_accounts(client_id=client_id, status=status, currency=currency))
+
+    def iter_accounts(
+        self,
+        *,
+        client_id: str | None = None,
+        status: AccountStatus | None = None,
+        currency: Currency | None = None,
+    ) -> Iterator[BankAccount]:
+        # Lazy variant of search_accounts backed by the secondary indexes. The iterator
+        # reads live buckets, so use search_accounts while other threads open accounts.
+        self._ensure_derived()
+        ids = self._index.iter_ids(client_id=client_id, status=status, currency=currency)
+        if ids is None:
+            return iter(self._accounts.values())
+        accounts = self._accounts
+        return (accounts[account_id] for account_id in ids)
+
+    def get_total_balance(self, currency: Currency | None = None) -> Decimal:
+        # Sum balances across all non-closed accounts from the per-currency subtotals.
+        # With a currency, each subtotal is converted with the attached FX rates;
+        # without one the amounts are added as they are, so a bank holding more than
+        # one currency raises InvalidOperationError instead of mixing units.
+        store = self._pushdown()
+        if store is not None:
+            return self._total_of(self._stored_totals(store), currency)
+        with self._lock:
+            self._ensure_derived()
+            return self._total_of(self._currency_totals, currency)
+
+    def get_subtotals(self) -> dict[Currency, Decimal]:
+        # Balance of non-closed accounts per currency.
+        store = self._pushdown()
+        if store is not None:
+            return self._stored_totals(store).subtotals()
+        with self._lock:
+            self._ensure_derived()
+            return self._currency_totals.subtotals()
+
+    def project_investments(self, currency: Currency | None = None, **options) -> ProjectionResult:
+        # Monte Carlo bands for the holdings of every open investment account; options
+        # go to projections.project_portfolios. Give a currency to keep the aggregate
+        # in one unit.
+        accounts = [
+            account
+            for account in self.search_accounts(currency=currency)
+            if isinstance(account, InvestmentAccount) and account.status != AccountStatus.CLOSED
+        ]
+        return project_portfolios(accounts, **options)
+
+    def attach_fx_rates(self, rates: FxRateTable | str | Path) -> None:
+        # Rates used by get_total_balance(currency); a path is loaded as a JSON table.
+        table = rates if isinstance(rates, FxRateTable) else FxRateTable(rates)
+        table.current()  # fail now on a missing or malformed file
+        self._fx_rates = table
+
+    def attach_security_archive(self, directory: str | Path, **options) -> None:
+        # Archive security events to gzip segments in directory (created when missing),
+        # so events evicted from memory stay queryable through security_events and a
+        # restart with the same directory keeps the history.
+        self._security_log.attach_archive(directory, **options)
+
+    def replay_price_ticks(self, path: str | Path) -> int:
+        # Apply a recorded "instrument,price" tick file to the bank's price book.
+        return replay_ticks(self._prices, path)
+
+    def read_view(self) -> ReadView:
+        # Point-in-time view for long reports: balances, statuses and the set of
+        # accounts and clients as of the current commit version, unaffected by later
+        # writes. Taking it waits out operations in flight on any account, so a
+        # transfer is never half visible; reading it does not stall writers. Release
+        # it when done so the history it pins can be dropped.
+        with DEFAULT_STRIPES.hold_all(), self._lock:
+            return ReadView(self, self._versions.pin())
 
     def get_clients_ranking(self) -> list[tuple[str, Decimal]]:
         # Rank clients by their total balance across accounts.
-        totals: dict[str, Decimal] = {client_id: ZERO_MONEY for client_id in self._clients}
-        for account in self._accounts.values():
-            if account.status == AccountStatus.CLOSED:
-                continue
-            client_id = account.owner.doc_id
-            if client_id in totals:
-                totals[client_id] += account.balance
-        return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+        store = self._pushdown()
+        if store is not None:
+            return self._stored_ranking(store, 0, None)
+        with self._lock:
+            self._ensure_derived()
+            return self._ranking.items()
+
+    def get_top_clients(self, k: int) -> list[tuple[str, Decimal]]:
+        # First k entries of the ranking without materializing the rest.
+        store = self._pushdown()
+        if store is not None:
+            return self._stored_ranking(store, 0, k)
+        with self._lock:
+            self._ensure_derived()
+            return self._ranking.top(k)
+
+    def get_client_rank(self, client_id: str) -> int:
+        # Zero-based position of the client in get_clients_ranking().
+        store = self._pushdown()
+        if store is not None:
+            return store.rank(client_id)
+        with self._lock:
+            self._ensure_derived()
+            return self._ranking.rank(client_id)
+
+    def get_clients_ranking_page(self, offset: int, limit: int) -> list[tuple[str, Decimal]]:
+        store = self._pushdown()
+        if store is not None:
+            return self._stored_ranking(store, offset, limit)
+        with self._lock:
+            self._ensure_derived()
+            return self._ranking.window(offset, limit)
+
+    def enable_columnar_store(self, *, use_numpy: bool | None = None) -> AccountColumns:
+        # Mirror core account fields into typed columns for bank-wide analytics. The
+        # mirror is opt-in and read only through the returned AccountColumns; the
+        # bank's own aggregates keep using the registries and running totals.
+        with self._lock:
+            if self._columns is None:
+                columns = AccountColumns(use_numpy=use_numpy)
+                for account in self._accounts.values():
+                    columns.append(account)
+                self._columns = columns
+            return self._columns
+
+    def enable_ledger(self, path: str | Path | None = None, **options) -> Ledger:
+        # Start recording balance changes for balance_at and total_balance_at; path and
+        # options go to Ledger. Every account not yet in the ledger gets an opening
+        # entry for its current balance, so its as-of answers start from that moment;
+        # accounts already in a reopened ledger file keep their recorded entries.
+        # Seeding holds only the bank lock: a change made before it but not yet
+        # posted is already in the seeded balance, and _on_account_event skips it.
+        with self._lock:
+            if self._ledger is None:
+                ledger = Ledger(path, **options)
+                for account_id, _, status, currency, cents in self._iter_account_rows():
+                    if account_id not in ledger:
+                        ledger.open(account_id, currency, cents, closed=status == AccountStatus.CLOSED)
+                self._ledger = ledger
+            return self._ledger
+
+    def balance_at(self, account_id: str, moment: datetime) -> Decimal:
+        # Balance of the account after every change made at or before moment.
+        self._get_account(account_id)
+        return Money(self._require_ledger().balance_at(account_id, moment)).to_decimal()
+
+    def total_balance_at(self, moment: datetime, currency: Currency | None = None) -> Decimal:
+        # get_total_balance as of moment; a currency converts with the current FX rates.
+        return self._total_of(self._require_ledger().total_at(moment), currency)
+
+    def balances_at(self, moment: datetime) -> dict[str, Decimal]:
+        # Balance of every account that existed at moment, closed ones included, from
+        # one pass over the ledger.
+        cents = self._require_ledger().balances_at(moment)
+        return {account_id: Money(amount).to_decimal() for account_id, amount in cents.items()}
+
+    @classmethod
+    def recover(
+        cls, path: str | Path, *, history: TransactionHistory | None = None, **journal_options
+    ) -> Bank:
+        # Rebuild a bank by replaying its journal, then keep appending to the same file.
+        # The journal has no timestamps, so replayed postings are not added to the
+        # history; pass the file-backed history the bank was using to keep statements.
+        bank = cls(_history=history or TransactionHistory())
+        bank._history.recording = False
+        for op, data in read_journal(path):
+            bank._replay(op, data)
+        bank._history.recording = True
+        bank.attach_journal(Journal(path, **journal_options))
+        return bank
+
+    def attach_journal(self, journal: Journal) -> None:
+        # Start journaling; an empty journal is seeded with the current state first.
+        with self._lock:
+            if self._journal is not None:
+                raise InvalidOperationError("Journal is already attached.")
+            if journal.is_empty():
+                for client in self._clients.values():
+                    journal.append_json(JournalOp.ADD_CLIENT, self._client_record(client))
+                for account in self._accounts.values():
+                    journal.append_json(JournalOp.OPEN_ACCOUNT, self._account_record(account))
+                book = self._prices.state()
+                for instrument, asset_type, cents in book["instruments"]:
+                    journal.append_json(JournalOp.INSTRUMENT, _instrument_record(instrument, asset_type, cents))
+                for account_id, held in book["holdings"].items():
+                    for instrument, units in held.items():
+                        journal.append_holding(account_id, instrument, units)
+            self._journal = journal
+
+    def snapshot(self, path: str | Path) -> None:
+        # Write the current clients, accounts and credentials to a fixed-layout file.
+        with self._lock:
+            clients = [
+                {
+                    **self._client_record(client),
+                    "accounts": list(client.accounts),
+                    "failed_attempts": self._failed_attempts.failures(client_id),
+                }
+                for client_id, client in self._clients.items()
+            ]
+            accounts = [self._account_record(account) for account in self._accounts.values()]
+            book = self._prices.state()
+        write_snapshot(path, clients, accounts, book)
+
+    @classmethod
+    def load_snapshot(cls, path: str | Path, *, history: TransactionHistory | None = None) -> Bank:
+        # Map a snapshot and decode clients, accounts and credentials on first access.
+        # The index and ranking are rebuilt from raw rows the first time they are needed.
+        reader = SnapshotReader(path)
+        bank = cls(_history=history or TransactionHistory())
+        bank._clients = LazyMap(
+            reader.clients, lambda row: bank._client_from_record(reader.client_record(row))
+        )
+        bank._credentials = LazyMap(reader.clients, reader.credential)
+        bank._failed_attempts = FailureTracker(
+            MAX_FAILED_ATTEMPTS,
+            window=FAILED_LOGIN_WINDOW,
+            lockout=LOCKOUT_SECONDS,
+            seed=LazyMap(reader.clients, reader.failed_attempts),
+        )
+        bank._accounts = LazyAccountMap(
+            reader, lambda row: bank._load_account(reader.account_record(row)), cls._account_row
+        )
+        bank._prices.restore(reader.price_book())
+        bank._derived_stale = True
+        return bank
+
+    @classmethod
+    def open_store(
+        cls, path: str | Path, *, history: TransactionHistory | None = None, **store_options
+    ) -> Bank:
+        # Bank over a SQLite database, created when missing. Clients and accounts are
+        # loaded on first access and every change is written through. Until something
+        # needs the in-memory index and ranking, searches, rankings and totals are
+        # answered by indexed queries, so opening a large database costs nothing.
+        store = SqliteStore(path, **store_options)
+        bank = cls(_history=history or TransactionHistory())
+        bank._store = store
+
+        def load_client(client_id: str) -> Client | None:
+            record = store.client_record(client_id)
+            return None if record is None else bank._client_from_record(record)
+
+        def load_account(account_id: str) -> BankAccount | None:
+            record = store.account_record(account_id)
+            return None if record is None else bank._load_account(record)
+
+        bank._clients = StoreMap(store, "clients", load_client)
+        bank._credentials = StoreMap(store, "clients", store.credential)
+        bank._accounts = StoreAccountMap(store, load_account, cls._account_row)
+        bank._prices.restore(store.price_book())
+        bank._derived_stale = True
+        return bank
+
+    def statement(
+        self, account_id: str, start: datetime | None = None, end: datetime | None = None
+    ) -> Iterator[StatementLine]:
+        # Postings and asset purchases with start <= timestamp < end, oldest first. The
+        # history seeks to start and reads lines as they are consumed.
+        self._get_account(account_id)
+        return self._history.statement(account_id, start, end)
+
+    def write_statement(
+        self,
+        account_id: str,
+        out: IO[str] | str | Path,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        *,
+        chunk_size: int = 4096,
+    ) -> int:
+        # Statement as CSV written chunk_size rows at a time; returns the rows written.
+        lines = self.statement(account_id, start, end)
+        if isinstance(out, (str, Path)):
+            with open(out, "w", newline="") as handle:
+                return write_statement_csv(lines, handle, chunk_size=chunk_size)
+        return write_statement_csv(lines, out, chunk_size=chunk_size)
+
+    def close(self) -> None:
+        # Flush and release the journal, store, history, ledger and security log writer; stop the KDF threads.
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+        if self._kdf_executor is not None:
+            self._kdf_executor.shutdown(wait=True)
+            self._kdf_executor = None
+        self._history.close()
+        if self._ledger is not None:
+            self._ledger.close_file()
+        self._security_log.close()
+
+    @property
+    def columns(self) -> AccountColumns | None:
+        return self._columns
+
+    @property
+    def ledger(self) -> Ledger | None:
+        return self._ledger
+
+    @property
+    def commit_version(self) -> int:
+        return self._versions.version
+
+    @property
+    def prices(self) -> PriceBook:
+        return self._prices
+
+    @property
+    def events(self) -> EventStream:
+        # Subscribe here to follow account opens, status changes, postings and assets.
+        return self._events
 
     @property
     def security_log(self) -> list[BankSecurityLog]:
-        # Expose a copy so callers cannot mutate internal state.
-        return list(self._security_log)
+        # Events still held in memory (bounded by the log's capacity), oldest first.
+        return self._security_log.recent()
+
+    def security_events(
+        self,
+        *,
+        client_id: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: int | None = None,
+    ) -> list[BankSecurityLog]:
+        # Indexed audit query, e.g. one client's events in the last hour.
+        return self._security_log.query(client_id=client_id, since=since, until=until, limit=limit)
+
+    def _await_event_room(self) -> None:
+        # Backpressure from Overflow.BLOCK subscribers, applied before an operation
+        # takes any lock (events are published under the account locks, never waited on there).
+        if self._events.active:
+            self._events.wait_for_room()
 
     def _ensure_operating_hours(self, *, now: datetime | None, client_id: str) -> None:
         # Block operations during quiet hours and log the event.
@@ -172,6 +773,376 @@ class Bank:
             self._log_security_event(client_id, "operation blocked during quiet hours")
             raise InvalidOperationError("Operations are not allowed between 00:00 and 05:00.")
 
+    def _ensure_operating_hours_bulk(self, now: datetime | None, specs: list[AccountSpec]) -> None:
+        # One clock check for a whole batch; a refusal is logged for every client in it.
+        current = now or datetime.now()
+        if QUIET_HOURS_START <= current.time() < QUIET_HOURS_END:
+            for client_id in dict.fromkeys(spec.client_id for spec in specs):
+                self._log_security_event(client_id, "operation blocked during quiet hours")
+            raise InvalidOperationError("Operations are not allowed between 00:00 and 05:00.")
+
+    def _insert_client(self, client: Client, credential: str) -> None:
+        # Register a client whose credential is already hashed (or legacy plaintext).
+        with self._lock:
+            if client.client_id in self._clients:
+                raise InvalidOperationError("Client already exists.")
+            self._clients[client.client_id] = client
+            self._credentials[client.client_id] = credential
+            self._versions.client_added(client.client_id)
+            if not self._derived_stale:
+                self._ranking.add_client(client.client_id)
+            if self._store is not None:
+                self._store.add_client(self._client_record(client))
+        if self._journal is not None:
+            self._journal.append_json(JournalOp.ADD_CLIENT, self._client_record(client))
+
+    def _verify_password(self, password: str, credential: str | None) -> tuple[bool, str | None]:
+        # KDF work only, safe on any thread. Also returns a fresh hash when the stored
+        # one is plaintext or uses outdated parameters.
+        if credential is None or not self._hasher.verify(password, credential):
+            return False, None
+        return True, self._hasher.hash(password) if self._hasher.needs_rehash(credential) else None
+
+    def _admit_login(self, client_id: str, source: str | None) -> Client | None:
+        # Client to verify a password for, or None when the attempt is refused without
+        # running the KDF (unknown client, blocked client, or locked-out source).
+        self._release_lockouts()
+        if source is not None and self._failed_sources.is_locked(source):
+            return None
+        client = self._clients.get(client_id)
+        if client is None:
+            if source is not None:
+                self._record_source_failure(client_id, source)
+            return None
+        if client.status == ClientStatus.LOCKED:
+            if not self._failed_attempts.is_locked(client_id):
+                # Locked out before this process started (journal or snapshot): the
+                # lockout period starts now.
+                self._failed_attempts.lock(client_id)
+            return None
+        if client.status != ClientStatus.ACTIVE:
+            return None
+        return client
+
+    def _release_lockouts(self) -> None:
+        # Unblock clients and sources whose lockout has run out. Cheap when nothing is
+        # due: the timer wheel only steps through the ticks since the last call.
+        self._failed_sources.expired()
+        for client_id in self._failed_attempts.expired():
+            client = self._clients.get(client_id)
+            if client is None:
+                continue
+            with DEFAULT_STRIPES.lock_for(client_id):
+                # Only the tracker's own lockouts end here; an operator's block stays.
+                if client.status != ClientStatus.LOCKED or self._failed_attempts.is_locked(client_id):
+                    continue
+                self._set_client_status(client, ClientStatus.ACTIVE)
+            self._log_security_event(client_id, "account unlocked after lockout expired")
+
+    def _set_client_status(self, client: Client, status: ClientStatus) -> None:
+        # Caller holds the client's stripe.
+        client.status = status
+        if self._journal is not None:
+            self._journal.append_client_status(client.client_id, status)
+        if self._store is not None:
+            self._store.set_client_status(client.client_id, status)
+
+    def _record_source_failure(self, client_id: str, source: str) -> None:
+        if self._failed_sources.record_failure(source):
+            self._log_security_event(client_id, f"source {source} locked after failed logins")
+
+    def _finish_authentication(
+        self, client: Client, ok: bool, upgraded: str | None, source: str | None = None
+    ) -> bool:
+        # Apply a verification result; lockout rules are unchanged from the plaintext era.
+        client_id = client.client_id
+        with DEFAULT_STRIPES.lock_for(client_id):
+            if client.status != ClientStatus.ACTIVE:
+                return False
+            if ok:
+                self._failed_attempts.reset(client_id)
+                if upgraded is not None:
+                    self._credentials[client_id] = upgraded
+                    if self._store is not None:
+                        self._store.set_credential(client_id, upgraded)
+                return True
+            if source is not None:
+                self._record_source_failure(client_id, source)
+            if self._failed_attempts.record_failure(client_id):
+                self._set_client_status(client, ClientStatus.LOCKED)
+                self._sessions.revoke_client(client_id)
+                self._log_security_event(client_id, "account locked after failed logins")
+            else:
+                self._log_security_event(client_id, "failed login attempt")
+            return False
+
+    def _kdf_pool(self) -> ThreadPoolExecutor:
+        if self._kdf_executor is None:
+            with self._lock:
+                if self._kdf_executor is None:
+                    self._kdf_executor = ThreadPoolExecutor(
+                        max_workers=os.cpu_count() or 1, thread_name_prefix="banking-kdf"
+                    )
+        return self._kdf_executor
+
+    def _register_account(self, account: BankAccount, client: Client) -> None:
+        # Single entry point for inserting an account and keeping indexes in sync.
+        with self._lock:
+            if account.id in self._accounts:
+                raise InvalidOperationError("Account already exists.")
+            self._accounts[account.id] = account
+            self._versions.opened((account.id,))
+            self._track_account(account)
+            client.add_account(account.id)
+            if self._store is not None:
+                self._store.add_accounts([self._account_record(account)])
+        if self._journal is not None:
+            self._journal.append_json(JournalOp.OPEN_ACCOUNT, self._account_record(account))
+        if self._events.active:
+            self._publish_opened(account)
+
+    def _register_accounts(
+        self, accounts: list[BankAccount | None], errors: dict[int, str], clients: dict[str, Client]
+    ) -> None:
+        # Bulk counterpart of _register_account: one pass under the lock, then one
+        # update per client, ranking entry and currency total, and one journal batch.
+        # A row whose id is already taken is turned into an error.
+        with self._lock:
+            registry = self._accounts
+            fresh: dict[str, BankAccount] = {}
+            by_owner: dict[str, list[str]] = {}
+            deltas: dict[str, int] = {}
+            currency_cents: dict[Currency, int] = {}
+            for row, account in enumerate(accounts):
+                if account is None:
+                    continue
+                account_id = account.id
+                if account_id in registry or account_id in fresh:
+                    accounts[row] = None
+                    errors[row] = "Account already exists."
+                    continue
+                fresh[account_id] = account
+                owner_id = account.owner.doc_id or ""
+                cents = account.balance_cents
+                ids = by_owner.get(owner_id)
+                if ids is None:
+                    by_owner[owner_id] = [account_id]
+                    deltas[owner_id] = cents
+                else:
+                    ids.append(account_id)
+                    deltas[owner_id] += cents
+                currency = account.currency
+                currency_cents[currency] = currency_cents.get(currency, 0) + cents
+            registry.update(fresh)
+            self._versions.opened(fresh)
+            for owner_id, account_ids in by_owner.items():
+                clients[owner_id].add_accounts(account_ids)
+            if self._columns is not None:
+                for account in fresh.values():
+                    self._columns.append(account)
+            if self._ledger is not None:
+                for account in fresh.values():
+                    self._ledger.open(account.id, account.currency, account.balance_cents)
+            if not self._derived_stale:
+                self._index.add_many(fresh.values())
+                self._ranking.adjust_many(deltas)
+                for currency, cents in currency_cents.items():
+                    self._currency_totals.adjust(currency, cents)
+            if self._store is not None and fresh:
+                self._store.add_accounts([self._account_record(account) for account in fresh.values()])
+        if self._journal is not None and fresh:
+            with self._journal.atomic():
+                for account in fresh.values():
+                    self._journal.append_json(JournalOp.OPEN_ACCOUNT, self._account_record(account))
+        if self._events.active:
+            for account in fresh.values():
+                self._publish_opened(account)
+
+    def _publish_opened(self, account: BankAccount) -> None:
+        account_type = ACCOUNT_TYPE_BY_CLASS[type(account)].value
+        self._events.publish(
+            EventKind.OPENED, account.id, account.owner.doc_id or "", account.balance_cents, account_type
+        )
+
+    def _track_account(self, account: BankAccount) -> None:
+        if self._columns is not None:
+            self._columns.append(account)
+        if self._ledger is not None:
+            self._ledger.open(
+                account.id, account.currency, account.balance_cents, closed=account.status == AccountStatus.CLOSED
+            )
+        if not self._derived_stale:
+            self._index.add(account)
+            if account.status != AccountStatus.CLOSED:
+                self._ranking.adjust(account.owner.doc_id or "", account.balance_cents)
+                self._currency_totals.adjust(account.currency, account.balance_cents)
+        account.add_listener(self._on_account_event)
+        self._attach_shared(account)
+
+    def _on_account_event(self, account: BankAccount, kind: PostingKind, delta: Money) -> None:
+        # Keep running totals in step with every balance change on a tracked account.
+        # Runs under the account's lock, so events for one account arrive in order.
+        with self._lock:
+            self._versions.changed(account.id, account.balance_cents - delta.cents, account.status)
+            if account.status != AccountStatus.CLOSED and not self._derived_stale:
+                self._ranking.adjust(account.owner.doc_id or "", delta.cents)
+                self._currency_totals.adjust(account.currency, delta.cents)
+            if self._columns is not None:
+                self._columns.add_balance(account.id, delta.cents)
+            ledger = self._ledger
+            # Posted unless the ledger was seeded after this change was made.
+            if ledger is not None and ledger.balance(account.id) != account.balance_cents:
+                ledger.post(account.id, kind, delta.cents)
+            if self._store is not None:
+                self._store.apply_posting(account.id, delta.cents)
+        if self._journal is not None:
+            self._journal.append_posting(account.id, kind, delta.cents)
+        if self._history.recording:
+            self._history.record(account.id, POSTING_EVENTS[kind], delta.cents, account.balance_cents)
+        if self._events.active:
+            self._events.publish(POSTING_EVENTS[kind], account.id, account.owner.doc_id or "", delta.cents)
+
+    def _on_asset_added(self, account: InvestmentAccount, asset_type: str, value: Money) -> None:
+        # Asset purchases change no balance, so they are persisted here rather than
+        # through _on_account_event. Runs under the account's lock.
+        if self._store is not None:
+            with self._lock:
+                self._store.set_account_options(account.id, self._account_record(account)["options"])
+        if self._journal is not None:
+            self._journal.append_asset(account.id, asset_type, value.cents)
+
+    def _on_book_change(self, change: BookChange, payload) -> None:
+        # Listings, holdings and prices live in the shared price book; persist each
+        # change. Runs after the book's lock is released, in the book's change order.
+        store, journal = self._store, self._journal
+        if change == BookChange.LISTED:
+            instrument, asset_type, cents = payload
+            if store is not None:
+                store.list_instrument(instrument, asset_type, cents)
+            if journal is not None:
+                journal.append_json(JournalOp.INSTRUMENT, _instrument_record(instrument, asset_type, cents))
+        elif change == BookChange.HOLDING:
+            account_id, instrument, quantity, units = payload
+            if store is not None:
+                store.set_holding(account_id, instrument, units)
+            if journal is not None:
+                journal.append_holding(account_id, instrument, quantity)
+        else:
+            if store is not None:
+                store.set_prices(payload)
+            if journal is not None:
+                journal.append_json(JournalOp.PRICES, payload)
+
+    def _attach_shared(self, account: BankAccount) -> None:
+        account.attach_events(self._events)
+        account.attach_history(self._history)
+        if isinstance(account, InvestmentAccount):
+            account.attach_prices(self._prices)
+            account.add_asset_listener(self._on_asset_added)
+
+    def _set_status(self, account: BankAccount, status: AccountStatus) -> None:
+        # Caller holds the account's lock.
+        with self._lock:
+            old = account.status
+            self._versions.changed(account.id, account.balance_cents, old)
+            account._status = status
+            if not self._derived_stale:
+                self._index.move_status(account.id, old, status)
+                if status == AccountStatus.CLOSED and old != AccountStatus.CLOSED:
+                    self._ranking.adjust(account.owner.doc_id or "", -account.balance_cents)
+                    self._currency_totals.adjust(account.currency, -account.balance_cents)
+            if self._columns is not None:
+                self._columns.set_status(account.id, status)
+            if self._ledger is not None and status == AccountStatus.CLOSED and old != AccountStatus.CLOSED:
+                self._ledger.close(account.id)
+            if self._store is not None:
+                self._store.set_account_status(account.id, status)
+        if self._journal is not None:
+            self._journal.append_account_status(account.id, status)
+        if self._events.active:
+            self._events.publish(STATUS_EVENTS[status], account.id, account.owner.doc_id or "")
+
+    def _ensure_derived(self) -> None:
+        if self._derived_stale:
+            with self._lock:
+                if self._derived_stale:
+                    self._rebuild_derived()
+
+    def _rebuild_derived(self) -> None:
+        # Build the index and ranking from current state without decoding lazy rows.
+        index = AccountIndex()
+        totals: dict[str, int] = {}
+        currency_totals = CurrencyTotals()
+        for account_id, owner_id, status, currency, cents in self._iter_account_rows():
+            index.add_row(account_id, owner_id, status, currency)
+            if status != AccountStatus.CLOSED:
+                totals[owner_id] = totals.get(owner_id, 0) + cents
+                currency_totals.adjust(currency, cents)
+        self._index = index
+        self._currency_totals = currency_totals
+        self._ranking = ClientRanking.from_totals(self._clients, totals)
+        self._derived_stale = False
+
+    def _iter_account_rows(self) -> Iterator[AccountRow]:
+        if isinstance(self._accounts, (LazyAccountMap, StoreAccountMap)):
+            return self._accounts.iter_rows()
+        return map(self._account_row, list(self._accounts.values()))
+
+    @contextmanager
+    def _atomic(self) -> Iterator[None]:
+        # Journal batch and store transaction around a multi-step operation.
+        journal, store = self._journal, self._store
+        with journal.atomic() if journal else nullcontext(), store.atomic() if store else nullcontext():
+            yield
+
+    def _pushdown(self) -> SqliteStore | None:
+        # Store to answer a query from while the in-memory index and ranking are not
+        # built; flushed first so it has every write made so far.
+        store = self._store
+        if store is None or not self._derived_stale:
+            return None
+        store.flush()
+        return store
+
+    def _stored_totals(self, store: SqliteStore) -> CurrencyTotals:
+        totals = CurrencyTotals()
+        for currency, cents in store.currency_cents().items():
+            totals.adjust(currency, cents)
+        return totals
+
+    @staticmethod
+    def _stored_ranking(store: SqliteStore, offset: int, limit: int | None) -> list[tuple[str, Decimal]]:
+        if offset < 0 or (limit is not None and limit < 0):
+            raise InvalidOperationError("Offset and limit cannot be negative.")
+        rows = store.ranking(offset, -1 if limit is None else limit)
+        return [(client_id, Money(cents).to_decimal()) for client_id, cents in rows]
+
+    def _total_of(self, totals: CurrencyTotals, currency: Currency | None) -> Decimal:
+        if currency is None:
+            return Money(totals.total_cents()).to_decimal()
+        if self._fx_rates is None:
+            raise InvalidOperationError("No FX rates attached.")
+        return totals.convert(self._fx_rates.factors(Currency(currency)))
+
+    def _require_ledger(self) -> Ledger:
+        if self._ledger is None:
+            raise InvalidOperationError("Ledger is not enabled.")
+        return self._ledger
+
+    def _release_view(self, version: int) -> None:
+        with self._lock:
+            self._versions.release(version)
+
+    @staticmethod
+    def _account_row(account: BankAccount) -> AccountRow:
+        return account.id, account.owner.doc_id or "", account.status, account.currency, account.balance_cents
+
+    def _load_account(self, record: dict) -> BankAccount:
+        account = self._account_from_record(record)
+        account.add_listener(self._on_account_event)
+        self._attach_shared(account)
+        return account
+
     def _get_account(self, account_id: str) -> BankAccount:
         # Centralized lookup with consistent error.
         account = self._accounts.get(account_id)
@@ -193,6 +1164,27 @@ class Bank:
         account = self._get_account(account_id)
         return account.owner.doc_id or ""
 
+    def _build_account(
+        self,
+        owner: Owner,
+        account_id: str,
+        account_type: AccountType | str,
+        currency: Currency,
+        balance: Decimal,
+        options: AccountOptions | None,
+    ) -> BankAccount:
+        account_type_normalized = self._normalize_account_type(account_type)
+        if account_type_normalized not in ACCOUNT_TYPE_MAP: raise InvalidOperationError("Unknown account type.")
+        account_cls, options_cls = ACCOUNT_TYPE_MAP[account_type_normalized]
+        opts = self._ensure_options(options, options_cls)
+        return account_cls(
+            owner=owner,
+            account_id=account_id,
+            currency=currency,
+            balance=balance,
+            **asdict(opts),
+        )
+
     def _normalize_account_type(self, account_type: AccountType | str) -> AccountType:
         if isinstance(account_type, AccountType):
             return account_type
@@ -208,6 +1200,101 @@ class Bank:
             raise InvalidOperationError("Options type does not match account type.")
         return options
 
+    def _client_record(self, client: Client) -> dict:
+        return {
+            "client_id": client.client_id,
+            "full_name": client.full_name,
+            "age": client.age,
+            "status": client.status.value,
+            "contacts": client.contacts,
+            "password_hash": self._credentials[client.client_id],
+        }
+
+    def _account_record(self, account: BankAccount) -> dict:
+        account_type = ACCOUNT_TYPE_BY_CLASS[type(account)]
+        info = account.get_account_info()
+        options = {}
+        for name in OPTION_FIELDS[account_type]:
+            value = info[name]
+            if isinstance(value, dict):
+                options[name] = {key: str(item) for key, item in value.items()}
+            else:
+                options[name] = str(value)
+        return {
+            "account_id": account.id,
+            "client_id": account.owner.doc_id,
+            "owner_name": account.owner.name,
+            "account_type": account_type.value,
+            "currency": account.currency.value,
+            "status": account.status.value,
+            "balance": account.balance_cents,
+            "options": options,
+        }
+
+    @staticmethod
+    def _client_from_record(data: dict) -> Client:
+        client = Client(
+            full_name=data["full_name"],
+            client_id=data["client_id"],
+            age=data["age"],
+            status=ClientStatus(data["status"]),
+            contacts=data["contacts"],
+        )
+        client.add_accounts(data.get("accounts", ()))
+        return client
+
+    @staticmethod
+    def _account_from_record(data: dict) -> BankAccount:
+        account_cls, _ = ACCOUNT_TYPE_MAP[AccountType(data["account_type"])]
+        options = {
+            name: {key: Decimal(item) for key, item in value.items()}
+            if isinstance(value, dict)
+            else Decimal(value)
+            for name, value in data["options"].items()
+        }
+        balance = data["balance"]
+        account = account_cls(
+            owner=Owner(name=data["owner_name"], doc_id=data["client_id"]),
+            account_id=data["account_id"],
+            balance=Money(max(balance, 0)).to_decimal(),
+            status=AccountStatus(data["status"]),
+            currency=Currency(data["currency"]),
+            **options,
+        )
+        if balance < 0:
+            # Overdrawn premium balances cannot be passed to the constructor.
+            account._balance = Money(balance)
+        return account
+
+    def _replay(self, op: JournalOp, data) -> None:
+        # Apply one journal record without re-checking hours or re-journaling it.
+        if op == JournalOp.ADD_CLIENT:
+            # Journals written before hashing carry a plaintext "password"; it is kept
+            # as is and replaced by a hash on the client's next successful login.
+            self._insert_client(self._client_from_record(data), data.get("password_hash") or data["password"])
+        elif op == JournalOp.OPEN_ACCOUNT:
+            account = self._account_from_record(data)
+            self._register_account(account, self._clients[data["client_id"]])
+        elif op == JournalOp.POSTING:
+            account_id, kind, cents = data
+            self._get_account(account_id)._apply_posting(kind, Money(cents))
+        elif op == JournalOp.ACCOUNT_STATUS:
+            account_id, status = data
+            self._set_status(self._get_account(account_id), status)
+        elif op == JournalOp.CLIENT_STATUS:
+            client_id, status = data
+            self._clients[client_id].status = status
+        elif op == JournalOp.ASSET:
+            account_id, asset_type, cents = data
+            self._get_account(account_id)._apply_asset(asset_type, Money(cents))
+        elif op == JournalOp.INSTRUMENT:
+            self._prices.restore({"instruments": [[data["instrument"], data["asset_type"], data["price"]]]})
+        elif op == JournalOp.HOLDING:
+            account_id, instrument, quantity = data
+            self._prices.restore({"holdings": {account_id: {instrument: quantity}}})
+        elif op == JournalOp.PRICES:
+            self._prices.apply_ticks(data.items())
+
     def _log_security_event(self, client_id: str, reason: str) -> None:
         # Append security events for auditing.
         self._security_log.append(BankSecurityLog(client_id=client_id, reason=reason, created_at=datetime.now()))
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from typing import Iterable
 
 from banking.errors import InvalidOperationError
 from banking.types import ClientStatus
@@ -25,13 +26,32 @@ class Client:
             raise InvalidOperationError("Client must be at least 18 years old.")
         if not isinstance(self.status, ClientStatus):
             raise InvalidOperationError("Client status must be a ClientStatus.")
+        # Shadow of accounts for O(1) membership, kept off the dataclass fields so repr,
+        # equality and asdict are unchanged; rebuilt when callers edit the list directly.
+        self._account_ids: dict[str, None] = dict.fromkeys(self.accounts)
 
     def add_account(self, account_id: str) -> None:
         # Track unique account ids for the client.
-        if account_id not in self.accounts:
+        ids = self._synced_ids()
+        if account_id not in ids:
+            ids[account_id] = None
             self.accounts.append(account_id)
 
+    def add_accounts(self, account_ids: Iterable[str]) -> None:
+        # Bulk add_account: ids already tracked keep their position.
+        ids = self._synced_ids()
+        fresh = [account_id for account_id in dict.fromkeys(account_ids) if account_id not in ids]
+        ids.update(dict.fromkeys(fresh))
+        self.accounts.extend(fresh)
+
     def remove_account(self, account_id: str) -> None:
         # Remove account id if it exists.
-        if account_id in self.accounts:
+        ids = self._synced_ids()
+        if account_id in ids:
+            del ids[account_id]
             self.accounts.remove(account_id)
+
+    def _synced_ids(self) -> dict[str, None]:
+        if len(self._account_ids) != len(self.accounts):
+            self._account_ids = dict.fromkeys(self.accounts)
+        return self._account_ids
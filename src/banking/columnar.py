@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import threading
+from array import array
+from decimal import Decimal
+from itertools import compress
+
+from banking.accounts.base import BankAccount
+from banking.errors import InvalidOperationError
+from banking.money import Money
+from banking.types import AccountStatus, Currency
+
+try:  # NumPy is optional; the array module covers the same operations more slowly.
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+__all__ = ["AccountColumns", "STATUS_CODES", "CURRENCY_CODES"]
+
+STATUS_CODES: dict[AccountStatus, int] = {status: code for code, status in enumerate(AccountStatus)}
+CURRENCY_CODES: dict[Currency, int] = {currency: code for code, currency in enumerate(Currency)}
+_STATUSES = list(AccountStatus)
+_CURRENCIES = list(Currency)
+_CLOSED = STATUS_CODES[AccountStatus.CLOSED]
+
+
+class AccountColumns:
+    # Column-per-field copy of the core account state. Rows are append-only because
+    # accounts are closed, never deleted, so a row number is stable for an account.
+    # This is an opt-in analytics mirror (Bank.enable_columnar_store); no Bank
+    # aggregate reads it, so those stay correct whether or not it is enabled.
+
+    def __init__(self, *, use_numpy: bool | None = None) -> None:
+        if use_numpy and np is None:
+            raise InvalidOperationError("NumPy is not installed.")
+        self._use_numpy = np is not None if use_numpy is None else use_numpy
+        self._rows: dict[str, int] = {}
+        self._ids: list[str] = []
+        self._owner_codes: dict[str, int] = {}
+        self._owner_ids: list[str] = []
+        self.balances = array("q")
+        self.statuses = array("B")
+        self.currencies = array("B")
+        self.owners = array("q")
+        # NumPy readers hold this while their views over the columns exist, since an
+        # array with an exported buffer cannot grow and append would raise BufferError.
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.balances)
+
+    def __contains__(self, account_id: object) -> bool:
+        return account_id in self._rows
+
+    def append(self, account: BankAccount) -> int:
+        if account.id in self._rows:
+            raise InvalidOperationError("Account already exists.")
+        owner = self._intern_owner(account.owner.doc_id or "")
+        with self._lock:
+            row = len(self.balances)
+            self.balances.append(account.balance_cents)
+            self.statuses.append(STATUS_CODES[account.status])
+            self.currencies.append(CURRENCY_CODES[account.currency])
+            self.owners.append(owner)
+        self._ids.append(account.id)
+        self._rows[account.id] = row
+        return row
+
+    def row(self, account_id: str) -> int:
+        row = self._rows.get(account_id)
+        if row is None:
+            raise InvalidOperationError("Account not found.")
+        return row
+
+    def account_id(self, row: int) -> str:
+        return self._ids[row]
+
+    def add_balance(self, account_id: str, delta_cents: int) -> None:
+        self.balances[self.row(account_id)] += delta_cents
+
+    def set_status(self, account_id: str, status: AccountStatus) -> None:
+        self.statuses[self.row(account_id)] = STATUS_CODES[status]
+
+    def balance(self, account_id: str) -> Decimal:
+        return Money(self.balances[self.row(account_id)]).to_decimal()
+
+    def total_balance_cents(
+        self,
+        *,
+        status: AccountStatus | None = None,
+        currency: Currency | None = None,
+        client_id: str | None = None,
+    ) -> int:
+        # Sum of balances matching the filters; closed accounts are skipped unless asked for.
+        if client_id is not None and client_id not in self._owner_codes:
+            return 0
+        if self._use_numpy and self.balances:
+            with self._lock:
+                return self._numpy_total(status, currency, client_id)
+        return sum(compress(self.balances, self._python_mask(status, currency, client_id)))
+
+    def filter_rows(
+        self,
+        *,
+        status: AccountStatus | None = None,
+        currency: Currency | None = None,
+        client_id: str | None = None,
+    ) -> list[int]:
+        if client_id is not None and client_id not in self._owner_codes:
+            return []
+        if self._use_numpy and self.balances:
+            with self._lock:
+                return np.flatnonzero(self._numpy_mask(status, currency, client_id)).tolist()
+        mask = self._python_mask(status, currency, client_id)
+        return list(compress(range(len(self.balances)), mask))
+
+    def totals_by_owner(self) -> dict[str, int]:
+        # Group-by owner over non-closed accounts, in cents.
+        totals = self._group_sum(self.owners, len(self._owner_ids))
+        return {self._owner_ids[code]: cents for code, cents in enumerate(totals)}
+
+    def totals_by_currency(self) -> dict[Currency, int]:
+        totals = self._group_sum(self.currencies, len(_CURRENCIES))
+        return {_CURRENCIES[code]: cents for code, cents in enumerate(totals)}
+
+    def totals_by_status(self) -> dict[AccountStatus, int]:
+        # Closed accounts are a group of their own here rather than skipped.
+        if self._use_numpy and self.balances:
+            with self._lock:
+                totals = self._numpy_group_sum(self.statuses, len(_STATUSES), skip_closed=False)
+        else:
+            totals = [0] * len(_STATUSES)
+            for code, cents in zip(self.statuses, self.balances):
+                totals[code] += cents
+        return {_STATUSES[code]: cents for code, cents in enumerate(totals)}
+
+    def _group_sum(self, keys: array, size: int) -> list[int]:
+        if self._use_numpy and self.balances:
+            with self._lock:
+                return self._numpy_group_sum(keys, size, skip_closed=True)
+        totals = [0] * size
+        for key, status, cents in zip(keys, self.statuses, self.balances):
+            if status != _CLOSED:
+                totals[key] += cents
+        return totals
+
+    # The _numpy_* helpers run under _lock and return plain values or fresh arrays,
+    # so no view over a column outlives the lock.
+
+    def _numpy_total(self, status, currency, client_id) -> int:
+        balances = np.frombuffer(self.balances, dtype=np.int64)
+        return int(balances[self._numpy_mask(status, currency, client_id)].sum())
+
+    def _numpy_group_sum(self, keys: array, size: int, *, skip_closed: bool) -> list[int]:
+        out = np.zeros(size, dtype=np.int64)
+        key_view = np.frombuffer(keys, dtype=np.uint8 if keys.typecode == "B" else np.int64)
+        balances = np.frombuffer(self.balances, dtype=np.int64)
+        if skip_closed:
+            open_rows = np.frombuffer(self.statuses, dtype=np.uint8) != _CLOSED
+            key_view, balances = key_view[open_rows], balances[open_rows]
+        np.add.at(out, key_view, balances)
+        return out.tolist()
+
+    def _numpy_mask(self, status, currency, client_id):
+        statuses = np.frombuffer(self.statuses, dtype=np.uint8)
+        if status is None:
+            mask = statuses != _CLOSED
+        else:
+            mask = statuses == STATUS_CODES[status]
+        if currency is not None:
+            mask &= np.frombuffer(self.currencies, dtype=np.uint8) == CURRENCY_CODES[currency]
+        if client_id is not None:
+            mask &= np.frombuffer(self.owners, dtype=np.int64) == self._owner_codes[client_id]
+        return mask
+
+    def _python_mask(self, status, currency, client_id):
+        wanted_status = None if status is None else STATUS_CODES[status]
+        wanted_currency = None if currency is None else CURRENCY_CODES[currency]
+        wanted_owner = None if client_id is None else self._owner_codes[client_id]
+        for status_code, currency_code, owner in zip(self.statuses, self.currencies, self.owners):
+            if wanted_status is None:
+                if status_code == _CLOSED:
+                    yield False
+                    continue
+            elif status_code != wanted_status:
+                yield False
+                continue
+            yield (
+                (wanted_currency is None or currency_code == wanted_currency)
+                and (wanted_owner is None or owner == wanted_owner)
+            )
+
+    def _intern_owner(self, owner_id: str) -> int:
+        code = self._owner_codes.get(owner_id)
+        if code is None:
+            code = len(self._owner_ids)
+            self._owner_codes[owner_id] = code
+            self._owner_ids.append(owner_id)
+        return code
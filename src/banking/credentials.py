@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+from banking.errors import InvalidOperationError
+
+__all__ = ["PasswordHasher", "SessionStore"]
+
+_SCHEME = "scrypt"
+
+
+class PasswordHasher:
+    # scrypt from hashlib. Each hash is stored as "scrypt$n$r$p$salt$key" so the cost
+    # can be raised later without invalidating existing hashes. hashlib releases the
+    # GIL while deriving, so verification scales on a thread pool.
+
+    def __init__(self, *, n: int = 2 ** 14, r: int = 8, p: int = 1, salt_bytes: int = 16, key_bytes: int = 32):
+        if n < 2 or n & (n - 1):
+            raise InvalidOperationError("scrypt n must be a power of two.")
+        self._n = n
+        self._r = r
+        self._p = p
+        self._salt_bytes = salt_bytes
+        self._key_bytes = key_bytes
+
+    def hash(self, password: str) -> str:
+        salt = os.urandom(self._salt_bytes)
+        key = self._derive(password, salt, self._n, self._r, self._p, self._key_bytes)
+        return "$".join((_SCHEME, str(self._n), str(self._r), str(self._p), _b64(salt), _b64(key)))
+
+    def verify(self, password: str, encoded: str | None) -> bool:
+        if not encoded:
+            return False
+        parts = encoded.split("$")
+        if len(parts) != 6 or parts[0] != _SCHEME:
+            # Legacy plaintext credential from an old journal or snapshot.
+            return hmac.compare_digest(password.encode(), encoded.encode())
+        _, n, r, p, salt, key = parts
+        expected = base64.b64decode(key)
+        actual = self._derive(password, base64.b64decode(salt), int(n), int(r), int(p), len(expected))
+        return hmac.compare_digest(actual, expected)
+
+    def needs_rehash(self, encoded: str) -> bool:
+        parts = encoded.split("$")
+        if len(parts) != 6 or parts[0] != _SCHEME:
+            return True
+        return (int(parts[1]), int(parts[2]), int(parts[3])) != (self._n, self._r, self._p)
+
+    @staticmethod
+    def _derive(password: str, salt: bytes, n: int, r: int, p: int, key_bytes: int) -> bytes:
+        return hashlib.scrypt(
+            password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r * p, dklen=key_bytes
+        )
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+
+class SessionStore:
+    # Short-lived bearer tokens issued after a successful login. Lookups are one dict
+    # probe. Every token has the same lifetime, so issue order is expiry order and a
+    # FIFO of issued tokens lets expired entries be dropped in O(1) amortized time.
+
+    def __init__(self, ttl: float = 900.0, *, clock: Callable[[], float] = time.monotonic) -> None:
+        if ttl <= 0:
+            raise InvalidOperationError("Session ttl must be positive.")
+        self._ttl = ttl
+        self._clock = clock
+        self._sessions: dict[str, tuple[str, float]] = {}
+        self._by_client: dict[str, set[str]] = {}
+        self._expiry: deque[tuple[float, str]] = deque()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def issue(self, client_id: str) -> str:
+        token = secrets.token_urlsafe(32)
+        with self._lock:
+            now = self._clock()
+            self._sweep(now)
+            expires_at = now + self._ttl
+            self._sessions[token] = (client_id, expires_at)
+            self._by_client.setdefault(client_id, set()).add(token)
+            self._expiry.append((expires_at, token))
+        return token
+
+    def client_for(self, token: str) -> str | None:
+        # Owner of a live token, or None for unknown and expired tokens.
+        session = self._sessions.get(token)
+        if session is None:
+            return None
+        if session[1] <= self._clock():
+            self.revoke(token)
+            return None
+        return session[0]
+
+    def revoke(self, token: str) -> None:
+        with self._lock:
+            self._revoke(token)
+
+    def revoke_client(self, client_id: str) -> None:
+        with self._lock:
+            for token in list(self._by_client.get(client_id, ())):
+                self._revoke(token)
+
+    def _revoke(self, token: str) -> None:
+        session = self._sessions.pop(token, None)
+        if session is None:
+            return
+        tokens = self._by_client.get(session[0])
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._by_client[session[0]]
+
+    def _sweep(self, now: float) -> None:
+        expiry = self._expiry
+        while expiry and expiry[0][0] <= now:
+            self._revoke(expiry.popleft()[1])
@@ -12,3 +12,7 @@ class InvalidOperationError(Exception):
 
 class InsufficientFundsError(Exception):
     pass
+
+
+class ProtocolError(Exception):
+    pass
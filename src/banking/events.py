@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from enum import Enum
+from typing import Iterator
+
+from banking.errors import InvalidOperationError
+from banking.money import Money
+
+__all__ = ["AccountEvent", "EventKind", "EventStream", "Overflow", "Subscription"]
+
+
+class EventKind(str, Enum):
+    OPENED = "opened"
+    CLOSED = "closed"
+    FROZEN = "frozen"
+    UNFROZEN = "unfrozen"
+    DEPOSIT = "deposit"
+    WITHDRAW = "withdraw"
+    FEE = "fee"
+    INTEREST = "interest"
+    ASSET_ADDED = "asset_added"
+
+
+class Overflow(str, Enum):
+    # What happens when a subscriber is `maxsize` events behind: DROP skips its oldest
+    # unread events (counted in Subscription.dropped); BLOCK makes producers wait in
+    # EventStream.wait_for_room before their next operation.
+    DROP = "drop"
+    BLOCK = "block"
+
+
+@dataclass(frozen=True)
+class AccountEvent:
+    # cents is the signed balance change for postings, the opening balance for
+    # OPENED, the amount for ASSET_ADDED and 0 for status changes; detail is the
+    # account type for OPENED and the asset type for ASSET_ADDED.
+    offset: int
+    kind: EventKind
+    account_id: str
+    client_id: str
+    cents: int = 0
+    detail: str | None = None
+    timestamp: float = 0.0
+
+    @property
+    def amount(self) -> Decimal:
+        return Money(self.cents).to_decimal()
+
+
+class EventStream:
+    # Change-data-capture log of account events. Events go into one ring buffer of the
+    # last `retention` events, numbered by a global offset; each subscriber is just a
+    # cursor into it, so its queue is the span between its cursor and the head, bounded
+    # by its maxsize. While nobody is subscribed the stream is inactive and publish()
+    # is never called: producers check the plain `active` attribute first. Waiting
+    # threads are counted so publish() only notifies when someone is waiting.
+    #
+    # publish() never waits: it runs under account locks, and a BLOCK consumer that
+    # calls back into the bank (or a barrier over every account) would otherwise wait
+    # on a publisher that waits on the consumer. Producers apply the backpressure
+    # with wait_for_room() while holding no locks, so a BLOCK subscriber can be
+    # briefly more than maxsize behind, by the events of operations already running.
+
+    def __init__(self, retention: int = 100_000) -> None:
+        if retention <= 0:
+            raise InvalidOperationError("Event retention must be positive.")
+        self.active = False
+        self._retention = retention
+        self._ring: list[AccountEvent | None] = [None] * retention
+        self._first = 0
+        self._next = 0
+        self._cond = threading.Condition(threading.Lock())
+        self._subscribers: list[Subscription] = []
+        self._blocking: list[Subscription] = []
+        # Threads blocked in _cond.wait(); guarded by _cond.
+        self._waiting = 0
+        # Marks threads that never wait for room: BLOCK consumers and exempt_thread().
+        self._local = threading.local()
+
+    @property
+    def head(self) -> int:
+        # Offset the next event will get.
+        return self._next
+
+    @property
+    def first_retained(self) -> int:
+        return self._first
+
+    def subscribe(
+        self,
+        *,
+        offset: int | None = None,
+        maxsize: int = 1_024,
+        overflow: Overflow = Overflow.DROP,
+    ) -> Subscription:
+        # Read from offset (default: only new events). A consumer that stores
+        # Subscription.offset can resume from it while it is still retained. The queue
+        # cannot be longer than the retention.
+        if maxsize <= 0:
+            raise InvalidOperationError("Queue size must be positive.")
+        maxsize = min(maxsize, self._retention)
+        with self._cond:
+            if offset is None:
+                offset = self._next
+            if not self._first <= offset <= self._next:
+                raise InvalidOperationError("Offset is not retained.")
+            subscription = Subscription(self, offset, maxsize, Overflow(overflow))
+            self._subscribers.append(subscription)
+            if subscription.overflow == Overflow.BLOCK:
+                self._blocking.append(subscription)
+            self.active = True
+        return subscription
+
+    def publish(
+        self, kind: EventKind, account_id: str, client_id: str, cents: int = 0, detail: str | None = None
+    ) -> AccountEvent:
+        with self._cond:
+            event = AccountEvent(self._next, kind, account_id, client_id, cents, detail, time.time())
+            self._ring[self._next % self._retention] = event
+            self._next += 1
+            if self._next - self._first > self._retention:
+                self._first += 1
+            if self._waiting:
+                self._cond.notify_all()
+            for subscription in self._subscribers:
+                if subscription._waiters:
+                    subscription._wake()
+        return event
+
+    def wait_for_room(self, timeout: float | None = None) -> bool:
+        # Wait until every BLOCK subscriber is less than maxsize behind; False after the
+        # timeout. Call it holding no locks. Returns at once on a thread that reads a
+        # BLOCK subscription, since it would be waiting for itself.
+        if not self._blocking or getattr(self._local, "exempt", False):
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._has_room():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._wait(remaining)
+        return True
+
+    def has_room(self) -> bool:
+        # What wait_for_room() waits for, without waiting.
+        if not self._blocking:
+            return True
+        with self._cond:
+            return self._has_room()
+
+    def exempt_thread(self) -> None:
+        # The calling thread never waits in wait_for_room(), e.g. an event loop thread
+        # that must stay responsive; it checks has_room() itself before producing.
+        self._local.exempt = True
+
+    def _has_room(self) -> bool:
+        # Caller holds self._cond.
+        return all(self._next - sub._cursor < sub.maxsize for sub in self._blocking)
+
+    def _wait(self, timeout: float | None) -> None:
+        # Caller holds self._cond.
+        self._waiting += 1
+        try:
+            self._cond.wait(timeout)
+        finally:
+            self._waiting -= 1
+
+    def _remove(self, subscription: Subscription) -> None:
+        # Caller holds self._cond.
+        if subscription in self._subscribers:
+            self._subscribers.remove(subscription)
+        if subscription in self._blocking:
+            self._blocking.remove(subscription)
+        if not self._subscribers:
+            self.active = False
+        if self._waiting:
+            self._cond.notify_all()
+
+
+class Subscription:
+    # One consumer's cursor. Iterate it with `for` in a thread or `async for` in an
+    # event loop; after close() both return what is already queued, then stop. A BLOCK
+    # consumer may call back into the bank: its thread is not held by wait_for_room.
+    # If it falls behind by more than the retention (producers that skip
+    # wait_for_room), the lost events are counted in dropped as with DROP.
+
+    def __init__(self, stream: EventStream, offset: int, maxsize: int, overflow: Overflow) -> None:
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self._stream = stream
+        self._cursor = offset
+        self._dropped = 0
+        self._closed = False
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+
+    @property
+    def offset(self) -> int:
+        # Offset of the next event this subscriber will read.
+        return self._cursor
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def get(self, timeout: float | None = None) -> AccountEvent | None:
+        # Next event; None after the timeout or once closed.
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._stream._cond:
+            while True:
+                event = self._take()
+                if event is not None or self._closed:
+                    return event
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._stream._wait(remaining)
+
+    def poll(self) -> AccountEvent | None:
+        with self._stream._cond:
+            return self._take()
+
+    def close(self) -> None:
+        with self._stream._cond:
+            self._closed = True
+            self._stream._remove(self)
+            self._wake()
+
+    def __iter__(self) -> Iterator[AccountEvent]:
+        while (event := self.get()) is not None:
+            yield event
+
+    def __aiter__(self) -> Subscription:
+        return self
+
+    async def __anext__(self) -> AccountEvent:
+        loop = asyncio.get_running_loop()
+        while True:
+            waiter = asyncio.Event()
+            with self._stream._cond:
+                event = self._take()
+                if event is not None:
+                    return event
+                if self._closed:
+                    raise StopAsyncIteration
+                # Registered under the lock, so a publish after _take() still wakes us.
+                entry = (loop, waiter)
+                self._waiters.append(entry)
+            try:
+                await waiter.wait()
+            finally:
+                with self._stream._cond:
+                    if entry in self._waiters:
+                        self._waiters.remove(entry)
+
+    def __enter__(self) -> Subscription:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _take(self) -> AccountEvent | None:
+        # Caller holds the stream's condition.
+        stream = self._stream
+        if self.overflow == Overflow.BLOCK:
+            stream._local.exempt = True
+        if self._cursor == stream._next:
+            return None
+        if self.overflow == Overflow.BLOCK:
+            if stream._waiting:
+                stream._cond.notify_all()
+            oldest = stream._first
+        else:
+            oldest = stream._next - self.maxsize
+        if self._cursor < oldest:
+            self._dropped += oldest - self._cursor
+            self._cursor = oldest
+        event = stream._ring[self._cursor % stream._retention]
+        self._cursor += 1
+        return event
+
+    def _wake(self) -> None:
+        # Caller holds the stream's condition.
+        waiters, self._waiters = self._waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(waiter.set)
+            except RuntimeError:  # the consumer's loop is already closed
+                pass
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from pathlib import Path
+
+from banking.errors import InvalidOperationError
+from banking.money import Money
+from banking.types import Currency
+
+__all__ = ["CurrencyTotals", "FxRates", "FxRateTable"]
+
+_ONE = Decimal(1)
+
+
+class CurrencyTotals:
+    # Running balance in cents per currency, kept in step with every balance change
+    # so totals never rescan the accounts.
+
+    def __init__(self) -> None:
+        self._cents: dict[Currency, int] = {}
+
+    def adjust(self, currency: Currency, delta: int) -> None:
+        self._cents[currency] = self._cents.get(currency, 0) + delta
+
+    def cents(self) -> dict[Currency, int]:
+        return {currency: cents for currency, cents in self._cents.items() if cents}
+
+    def subtotals(self) -> dict[Currency, Decimal]:
+        return {currency: Money(cents).to_decimal() for currency, cents in self.cents().items()}
+
+    def total_cents(self) -> int:
+        # Sum without conversion, for a bank holding at most one currency; several
+        # currencies need a target to convert into.
+        cents = self.cents()
+        if len(cents) > 1:
+            raise InvalidOperationError("Balances are held in several currencies; give a currency to convert into.")
+        return sum(cents.values())
+
+    def convert(self, factors: dict[Currency, Decimal]) -> Decimal:
+        # Total in the currency the factors convert into, rounded to cents once.
+        total = Decimal(0)
+        for currency, cents in self._cents.items():
+            if not cents:
+                continue
+            factor = factors.get(currency)
+            if factor is None:
+                raise InvalidOperationError(f"No FX rate for {currency.value}.")
+            total += cents * factor
+        return Money(int(total.quantize(_ONE, rounding=ROUND_HALF_UP))).to_decimal()
+
+
+@dataclass(frozen=True)
+class FxRates:
+    # One version of the rate table: the value of one unit of each currency in `base`.
+    base: Currency
+    rates: dict[Currency, Decimal]
+    version: int = 0
+
+    @classmethod
+    def from_json(cls, data: dict, *, version: int = 0) -> FxRates:
+        # {"base": "USD", "rates": {"EUR": "1.08", "RUB": "0.011", ...}}; the base rate is 1.
+        try:
+            base = Currency(data["base"])
+            rates = {Currency(code): Decimal(str(rate)) for code, rate in data["rates"].items()}
+        except (KeyError, TypeError, ValueError, AttributeError, InvalidOperation) as exc:
+            raise InvalidOperationError(f"Malformed FX rate table: {exc}")
+        rates[base] = _ONE
+        if any(not rate.is_finite() or rate <= 0 for rate in rates.values()):
+            raise InvalidOperationError("FX rates must be positive.")
+        return cls(base, rates, version)
+
+    def factors(self, target: Currency) -> dict[Currency, Decimal]:
+        # Multipliers from each currency into target.
+        if target not in self.rates:
+            raise InvalidOperationError(f"No FX rate for {target.value}.")
+        target_rate = self.rates[target]
+        return {currency: rate / target_rate for currency, rate in self.rates.items()}
+
+
+class FxRateTable:
+    # Rates loaded from a local JSON file. The parsed table and the per-target factors
+    # are cached; a stat() per lookup notices a replaced file, and only then is it
+    # re-read and the version bumped.
+
+    def __init__(self, path: str | Path) -> None:
+        self._path = Path(path)
+        self._lock = threading.Lock()
+        self._stamp: tuple[int, int] | None = None
+        self._rates: FxRates | None = None
+        self._factors: dict[tuple[int, Currency], dict[Currency, Decimal]] = {}
+
+    @property
+    def version(self) -> int:
+        return self.current().version
+
+    def current(self) -> FxRates:
+        try:
+            stat = os.stat(self._path)
+        except OSError as exc:
+            if self._rates is None:
+                raise InvalidOperationError(f"Cannot read FX rates: {exc}")
+            return self._rates  # keep serving the last good table
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self._stamp:
+            return self._rates  # type: ignore[return-value]
+        with self._lock:
+            if stamp != self._stamp:
+                version = self._rates.version + 1 if self._rates is not None else 1
+                try:
+                    data = json.loads(self._path.read_text())
+                except (OSError, ValueError) as exc:
+                    raise InvalidOperationError(f"Cannot read FX rates: {exc}")
+                self._rates = FxRates.from_json(data, version=version)
+                self._factors = {}
+                self._stamp = stamp
+            return self._rates
+
+    def factors(self, target: Currency) -> dict[Currency, Decimal]:
+        rates = self.current()
+        key = (rates.version, target)
+        factors = self._factors.get(key)
+        if factors is None:
+            factors = self._factors[key] = rates.factors(target)
+        return factors
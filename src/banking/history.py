@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import csv
+import os
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import IO, Callable, Iterator
+
+from banking.errors import InvalidOperationError
+from banking.events import EventKind
+from banking.money import Money
+
+__all__ = ["StatementLine", "TransactionHistory", "write_statement_csv"]
+
+# Record: microseconds since the epoch, signed amount in cents, balance after it,
+# kind code, account id length, detail length; followed by the id and the detail.
+_RECORD = struct.Struct("<qqqBHH")
+_KINDS = list(EventKind)
+_KIND_CODES = {kind: code for code, kind in enumerate(_KINDS)}
+_LOAD_CHUNK = 1 << 20
+STATEMENT_HEADER = ("timestamp", "kind", "amount", "balance", "detail")
+
+
+@dataclass(frozen=True)
+class StatementLine:
+    # amount is the signed balance change; for ASSET_ADDED it is the amount bought
+    # (the cash balance does not move) and detail is the asset type.
+    timestamp: datetime
+    kind: EventKind
+    amount: Decimal
+    balance: Decimal
+    detail: str | None = None
+
+    def as_row(self) -> tuple[str, str, str, str, str]:
+        return (self.timestamp.isoformat(), self.kind.value, str(self.amount), str(self.balance), self.detail or "")
+
+
+class TransactionHistory:
+    # Append-only record of every posting and asset purchase, per account. Records
+    # go to one log, a file when a path is given (reopened by scanning it) or a
+    # bytearray otherwise, and each account keeps two arrays: record timestamps and
+    # record offsets. A statement bisects the timestamps for its start and then reads
+    # its records one at a time, so its cost is the records it returns and its memory
+    # is one record. An account's timestamps never go backwards, even if the clock
+    # does. The file is flushed before reads and on close, not fsynced: balances are
+    # recovered from the journal, and history is the statement trail beside it.
+    # Producers check the plain `recording` attribute first; Bank clears it while
+    # replaying a journal whose postings are already in the file.
+
+    def __init__(self, path: str | Path | None = None, *, clock: Callable[[], int] = time.time_ns) -> None:
+        self.recording = True
+        self._clock = clock
+        self._lock = threading.Lock()
+        # account id -> (record timestamps, record offsets)
+        self._index: dict[str, tuple[array, array]] = {}
+        self._size = 0
+        self._path = Path(path) if path is not None else None
+        self._buffer: bytearray | None = None
+        self._file: IO[bytes] | None = None
+        if self._path is None:
+            self._buffer = bytearray()
+        else:
+            self._file = open(self._path, "a+b")
+            self._load()
+
+    @property
+    def path(self) -> Path | None:
+        return self._path
+
+    def __len__(self) -> int:
+        return sum(len(times) for times, _ in self._index.values())
+
+    def entries(self, account_id: str) -> int:
+        entry = self._index.get(account_id)
+        return 0 if entry is None else len(entry[0])
+
+    def record(
+        self, account_id: str, kind: EventKind, cents: int, balance_cents: int, detail: str | None = None
+    ) -> None:
+        # Caller holds the account's lock, so one account's records arrive in order.
+        encoded_id = account_id.encode()
+        encoded_detail = detail.encode() if detail else b""
+        with self._lock:
+            entry = self._index.get(account_id)
+            if entry is None:
+                entry = self._index[account_id] = (array("q"), array("q"))
+            times, offsets = entry
+            stamp = self._clock() // 1000
+            if times and stamp < times[-1]:
+                stamp = times[-1]
+            data = (
+                _RECORD.pack(stamp, cents, balance_cents, _KIND_CODES[kind], len(encoded_id), len(encoded_detail))
+                + encoded_id
+                + encoded_detail
+            )
+            if self._buffer is not None:
+                self._buffer += data
+            else:
+                self._check_open()
+                self._file.write(data)
+            times.append(stamp)
+            offsets.append(self._size)
+            self._size += len(data)
+
+    def statement(
+        self, account_id: str, start: datetime | None = None, end: datetime | None = None
+    ) -> Iterator[StatementLine]:
+        # Records with start <= timestamp < end, oldest first, read lazily. Records
+        # appended after the call are not included.
+        entry = self._index.get(account_id)
+        if entry is None:
+            return iter(())
+        times, offsets = entry
+        with self._lock:
+            if self._file is not None:
+                self._check_open()
+                self._file.flush()
+            first = 0 if start is None else bisect_left(times, _micros(start))
+            last = len(times) if end is None else bisect_left(times, _micros(end))
+        return self._lines(offsets, first, last)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None and not self._file.closed:
+                self._file.close()
+
+    def __enter__(self) -> TransactionHistory:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _lines(self, offsets: array, first: int, last: int) -> Iterator[StatementLine]:
+        for index in range(first, last):
+            stamp, cents, balance, kind, id_length, detail_length = _RECORD.unpack(
+                self._read(offsets[index], _RECORD.size)
+            )
+            detail = None
+            if detail_length:
+                detail = self._read(offsets[index] + _RECORD.size + id_length, detail_length).decode()
+            yield StatementLine(
+                datetime.fromtimestamp(stamp // 1_000_000).replace(microsecond=stamp % 1_000_000),
+                _KINDS[kind],
+                Money(cents).to_decimal(),
+                Money(balance).to_decimal(),
+                detail,
+            )
+
+    def _read(self, offset: int, size: int) -> bytes:
+        if self._buffer is not None:
+            return bytes(self._buffer[offset : offset + size])
+        self._check_open()
+        return os.pread(self._file.fileno(), size, offset)
+
+    def _load(self) -> None:
+        # Rebuild the per-account index from an existing file, a chunk at a time. A
+        # torn or unreadable tail (crash mid-write) is cut off.
+        self._file.seek(0)
+        offset = 0  # file offset of data[0]
+        data = b""
+        corrupt = False
+        while not corrupt and (chunk := self._file.read(_LOAD_CHUNK)):
+            data += chunk
+            position = 0
+            while position + _RECORD.size <= len(data):
+                stamp, _, _, kind, id_length, detail_length = _RECORD.unpack_from(data, position)
+                if kind >= len(_KINDS):
+                    corrupt = True
+                    break
+                end = position + _RECORD.size + id_length + detail_length
+                if end > len(data):
+                    break
+                account_id = data[position + _RECORD.size : position + _RECORD.size + id_length].decode()
+                entry = self._index.get(account_id)
+                if entry is None:
+                    entry = self._index[account_id] = (array("q"), array("q"))
+                entry[0].append(stamp)
+                entry[1].append(offset + position)
+                position = end
+            data = data[position:]
+            offset += position
+        if self._file.seek(0, os.SEEK_END) > offset:
+            self._file.truncate(offset)
+        self._size = offset
+
+    def _check_open(self) -> None:
+        if self._file is None or self._file.closed:
+            raise InvalidOperationError("Transaction history is closed.")
+
+
+def write_statement_csv(lines: Iterator[StatementLine], out: IO[str], *, chunk_size: int = 4096) -> int:
+    # Write a statement as CSV in chunks of chunk_size rows; returns the rows written.
+    if chunk_size <= 0:
+        raise InvalidOperationError("Chunk size must be positive.")
+    writer = csv.writer(out)
+    writer.writerow(STATEMENT_HEADER)
+    written = 0
+    chunk: list[tuple[str, ...]] = []
+    for line in lines:
+        chunk.append(line.as_row())
+        if len(chunk) == chunk_size:
+            writer.writerows(chunk)
+            written += len(chunk)
+            chunk.clear()
+    writer.writerows(chunk)
+    return written + len(chunk)
+
+
+def _micros(moment: datetime) -> int:
+    return round(moment.timestamp() * 1_000_000)
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Protocol
+
+from banking.errors import InvalidOperationError
+
+__all__ = ["IdGenerator", "SnowflakeIds", "claim_node_id", "decode_id", "default_generator"]
+
+# 41 bits of milliseconds since EPOCH_MS, 10 bits of node id, 12 bits of sequence.
+EPOCH_MS = 1_704_067_200_000  # 2024-01-01T00:00:00Z
+NODE_BITS = 10
+SEQUENCE_BITS = 12
+MAX_NODE_ID = (1 << NODE_BITS) - 1
+# Crockford base32 (no I, L, O, U), lowercase; 13 characters hold the 63-bit id and
+# fixed width keeps string order equal to numeric (creation) order.
+_ALPHABET = "0123456789abcdefghjkmnpqrstvwxyz"
+_DECODE = {char: value for value, char in enumerate(_ALPHABET)}
+ID_WIDTH = 13
+
+
+_SEQUENCE_MASK = (1 << SEQUENCE_BITS) - 1
+# The last three characters (15 bits: the sequence and the low node bits) come from a table.
+_TAIL_CHARS = 3
+_TAIL_MASK = (1 << 5 * _TAIL_CHARS) - 1
+_TAIL = [
+    _ALPHABET[value >> 10] + _ALPHABET[value >> 5 & 31] + _ALPHABET[value & 31] for value in range(_TAIL_MASK + 1)
+]
+
+
+class IdGenerator(Protocol):
+    # Anything that hands out unique account ids; Bank takes one as `_ids`.
+
+    def next_id(self) -> str: ...
+
+    def reserve(self, count: int) -> list[str]: ...
+
+
+def _encode(value: int) -> str:
+    chars = [""] * ID_WIDTH
+    for position in range(ID_WIDTH - 1, -1, -1):
+        chars[position] = _ALPHABET[value & 31]
+        value >>= 5
+    return "".join(chars)
+
+
+def decode_id(account_id: str) -> tuple[int, int, int]:
+    # Split a generated id into (unix milliseconds, node id, sequence).
+    if len(account_id) != ID_WIDTH:
+        raise InvalidOperationError("Not a generated account id.")
+    value = 0
+    for char in account_id:
+        digit = _DECODE.get(char)
+        if digit is None:
+            raise InvalidOperationError("Not a generated account id.")
+        value = value << 5 | digit
+    sequence = value & _SEQUENCE_MASK
+    node = (value >> SEQUENCE_BITS) & MAX_NODE_ID
+    return (value >> (SEQUENCE_BITS + NODE_BITS)) + EPOCH_MS, node, sequence
+
+
+class SnowflakeIds:
+    # Time-ordered ids that are unique as long as no two live generators share a node
+    # id. The (millisecond, sequence) pair is kept as one counter that only moves
+    # forward: it jumps to the clock when the clock is ahead and otherwise just
+    # increments, so a burst of more than 4096 ids in a millisecond borrows from the
+    # next millisecond instead of waiting, and a clock stepping backwards cannot
+    # repeat an id within the process.
+
+    def __init__(self, node_id: int, *, clock: Callable[[], int] = time.time_ns) -> None:
+        if not 0 <= node_id <= MAX_NODE_ID:
+            raise InvalidOperationError(f"Node id must be between 0 and {MAX_NODE_ID}.")
+        self._node = node_id
+        self._clock = clock
+        self._last = -1
+        self._lock = threading.Lock()
+        # The first ten characters only change with the millisecond; cache them.
+        # Held as one tuple so concurrent callers never see a mismatched pair.
+        self._prefix: tuple[int, str] = (-1, "")
+
+    @property
+    def node_id(self) -> int:
+        return self._node
+
+    def next_id(self) -> str:
+        return self._format(self._claim(1))
+
+    def reserve(self, count: int) -> list[str]:
+        # Preallocate a block of consecutive ids with a single clock read and lock.
+        if count < 0:
+            raise InvalidOperationError("Count must not be negative.")
+        if count == 0:
+            return []
+        start = self._claim(count)
+        return [self._format(tick) for tick in range(start, start + count)]
+
+    def _claim(self, count: int) -> int:
+        now = (self._clock() // 1_000_000 - EPOCH_MS) << SEQUENCE_BITS
+        with self._lock:
+            start = max(now, self._last + 1)
+            self._last = start + count - 1
+        return start
+
+    def _format(self, tick: int) -> str:
+        millis = tick >> SEQUENCE_BITS
+        value = (millis << (NODE_BITS + SEQUENCE_BITS)) | (self._node << SEQUENCE_BITS) | (tick & _SEQUENCE_MASK)
+        prefix_for, prefix = self._prefix
+        if prefix_for != millis:
+            prefix = _encode(value)[:-_TAIL_CHARS]
+            self._prefix = (millis, prefix)
+        return prefix + _TAIL[value & _TAIL_MASK]
+
+
+# Lease files stay open (and flock-ed) for the life of the process.
+_leases: list = []
+
+
+def claim_node_id(directory: str | Path | None = None) -> int:
+    # Lease the lowest free node id on this host with an advisory lock on a file in
+    # directory. The kernel drops the lock when the process exits, so ids are
+    # recycled without cleanup. Hosts sharing ids must set BANKING_NODE_ID instead.
+    try:
+        import fcntl
+    except ImportError:  # pragma: no cover - no flock on this platform
+        return os.getpid() & MAX_NODE_ID
+    root = Path(directory) if directory is not None else Path(tempfile.gettempdir()) / "banking-node-ids"
+    root.mkdir(parents=True, exist_ok=True)
+    for node_id in range(MAX_NODE_ID + 1):
+        handle = open(root / f"node-{node_id}.lock", "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            continue
+        _leases.append(handle)
+        return node_id
+    raise InvalidOperationError("All node ids on this host are taken.")
+
+
+_default: SnowflakeIds | None = None
+_default_pid = 0
+_default_lock = threading.Lock()
+
+
+def default_generator() -> SnowflakeIds:
+    # Process-wide generator; BANKING_NODE_ID pins the node id, otherwise one is
+    # leased on first use. A forked child leases its own instead of sharing the parent's.
+    global _default, _default_pid
+    pid = os.getpid()
+    if _default is None or _default_pid != pid:
+        with _default_lock:
+            if _default is None or _default_pid != pid:
+                configured = os.environ.get("BANKING_NODE_ID")
+                node_id = int(configured) if configured is not None else claim_node_id()
+                _default, _default_pid = SnowflakeIds(node_id), pid
+    return _default
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from typing import Iterable, Iterator
+
+from banking.accounts.base import BankAccount
+from banking.types import AccountStatus, Currency
+
+__all__ = ["AccountIndex"]
+
+# Buckets are dicts used as insertion-ordered sets of account ids.
+_Bucket = dict[str, None]
+_EMPTY: _Bucket = {}
+
+
+class AccountIndex:
+    def __init__(self) -> None:
+        self._by_owner: dict[str, _Bucket] = {}
+        self._by_status: dict[AccountStatus, _Bucket] = {}
+        self._by_currency: dict[Currency, _Bucket] = {}
+
+    def add(self, account: BankAccount) -> None:
+        self.add_row(account.id, account.owner.doc_id or "", account.status, account.currency)
+
+    def add_row(self, account_id: str, owner_id: str, status: AccountStatus, currency: Currency) -> None:
+        self._by_owner.setdefault(owner_id, {})[account_id] = None
+        self._by_status.setdefault(status, {})[account_id] = None
+        self._by_currency.setdefault(currency, {})[account_id] = None
+
+    def add_many(self, accounts: Iterable[BankAccount]) -> None:
+        # Same as add() per account, without the per-call lookups of the bucket maps.
+        by_owner, by_status, by_currency = self._by_owner, self._by_status, self._by_currency
+        for account in accounts:
+            account_id = account.id
+            by_owner.setdefault(account.owner.doc_id or "", {})[account_id] = None
+            by_status.setdefault(account.status, {})[account_id] = None
+            by_currency.setdefault(account.currency, {})[account_id] = None
+
+    def remove(self, account: BankAccount) -> None:
+        account_id = account.id
+        self._discard(self._by_owner, account.owner.doc_id or "", account_id)
+        self._discard(self._by_status, account.status, account_id)
+        self._discard(self._by_currency, account.currency, account_id)
+
+    def move_status(self, account_id: str, old: AccountStatus, new: AccountStatus) -> None:
+        # Re-bucket an account after a status transition.
+        if old == new:
+            return
+        self._discard(self._by_status, old, account_id)
+        self._by_status.setdefault(new, {})[account_id] = None
+
+    def clear(self) -> None:
+        self._by_owner.clear()
+        self._by_status.clear()
+        self._by_currency.clear()
+
+    def count(
+        self,
+        *,
+        client_id: str | None = None,
+        status: AccountStatus | None = None,
+        currency: Currency | None = None,
+    ) -> int | None:
+        # Size of the most selective bucket, or None when no filter is given.
+        buckets = self._buckets(client_id, status, currency)
+        if not buckets:
+            return None
+        return len(buckets[0])
+
+    def iter_ids(
+        self,
+        *,
+        client_id: str | None = None,
+        status: AccountStatus | None = None,
+        currency: Currency | None = None,
+    ) -> Iterator[str] | None:
+        # Lazily intersect buckets, driving the scan from the smallest one.
+        # Returns None when no filter is given so the caller can fall back to a full scan.
+        buckets = self._buckets(client_id, status, currency)
+        if not buckets:
+            return None
+        smallest, rest = buckets[0], buckets[1:]
+        if not rest:
+            return iter(smallest)
+        return (account_id for account_id in smallest if all(account_id in b for b in rest))
+
+    def _buckets(
+        self,
+        client_id: str | None,
+        status: AccountStatus | None,
+        currency: Currency | None,
+    ) -> list[_Bucket]:
+        buckets: list[_Bucket] = []
+        if client_id is not None:
+            buckets.append(self._by_owner.get(client_id, _EMPTY))
+        if status is not None:
+            buckets.append(self._by_status.get(status, _EMPTY))
+        if currency is not None:
+            buckets.append(self._by_currency.get(currency, _EMPTY))
+        buckets.sort(key=len)
+        return buckets
+
+    @staticmethod
+    def _discard(index: dict, key, account_id: str) -> None:
+        bucket = index.get(key)
+        if bucket is None:
+            return
+        bucket.pop(account_id, None)
+        if not bucket:
+            del index[key]
@@ -0,0 +1,377 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import heapq
+import json
+import multiprocessing
+import queue
+import time
+import zlib
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import IO, Iterable, Iterator
+
+from banking.accounts.base import BankAccount
+from banking.bank import Bank
+from banking.errors import (
+    AccountClosedError,
+    AccountFrozenError,
+    InsufficientFundsError,
+    InvalidOperationError,
+)
+from banking.money import Money
+from banking.types import PostingKind
+
+__all__ = ["IngestStats", "ingest_file", "iter_operations"]
+
+# (line number, account id, operation, amount text)
+Operation = tuple[int, str, str, str]
+# An accepted row and the postings it made, in order.
+AcceptedRow = tuple[Operation, tuple[tuple[PostingKind, int], ...]]
+
+_ROW_ERRORS = (AccountClosedError, AccountFrozenError, InsufficientFundsError, InvalidOperationError)
+_FIELDS = ("account_id", "op", "amount")
+# Chunks a shard may have queued or in progress before the reader waits for results.
+_IN_FLIGHT = 2
+
+
+@dataclass
+class IngestStats:
+    rows: int = 0
+    applied: int = 0
+    rejected: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"rows {self.rows:,}  applied {self.applied:,}  rejected {self.rejected:,}  "
+            f"in {self.seconds:.2f}s ({self.rows_per_second:,.0f} rows/s)"
+        )
+
+
+def iter_operations(path: str | Path, *, fmt: str | None = None) -> Iterator[Operation]:
+    # Stream operations from a CSV file with an account_id,op,amount header or from
+    # JSON lines with the same keys. The format defaults to the file extension.
+    path = Path(path)
+    fmt = fmt or ("jsonl" if path.suffix in (".jsonl", ".ndjson") else "csv")
+    with open(path, newline="", encoding="utf-8") as handle:
+        if fmt == "csv":
+            reader = csv.DictReader(handle)
+            if reader.fieldnames is None or not set(_FIELDS) <= set(reader.fieldnames):
+                raise InvalidOperationError("CSV header must contain account_id, op and amount.")
+            for row in reader:
+                yield reader.line_num, row["account_id"] or "", row["op"] or "", row["amount"] or ""
+        elif fmt == "jsonl":
+            for line_no, line in enumerate(handle, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                    yield line_no, str(row["account_id"]), str(row["op"]), str(row["amount"])
+                except (ValueError, KeyError, TypeError):
+                    yield line_no, "", "", ""  # rejected downstream as a malformed row
+        else:
+            raise InvalidOperationError(f"Unknown ingest format: {fmt}.")
+
+
+def ingest_file(
+    bank: Bank,
+    path: str | Path,
+    *,
+    rejects_path: str | Path | None = None,
+    workers: int = 0,
+    fmt: str | None = None,
+    chunk_size: int = 4096,
+) -> IngestStats:
+    # Apply every deposit/withdraw row in the file, streaming it row by row. Rows that
+    # fail validation are written to rejects_path as JSON lines (ordered by line) and do
+    # not stop the batch.
+    #
+    # With workers > 1 the file is read once here and its rows are sharded by account
+    # id across worker processes in chunks of chunk_size rows, so rows for one account
+    # are checked in file order by a single worker. A worker is sent a copy of an
+    # account along with the first chunk that touches it, and sends back each chunk's
+    # accepted rows with their postings, which are applied here as they arrive, so
+    # the journal, history and events see every transaction. At most _IN_FLIGHT
+    # chunks per shard are outstanding, which keeps memory flat however long the
+    # file is. An account whose balance or status no longer matches the worker's copy
+    # (live traffic during the batch) has its accepted rows applied again through
+    # deposit/withdraw against its live state instead, so no row lands on a frozen
+    # account or overdraws it; rows that fail then are rejected. Rows the workers
+    # rejected stay rejected, and an account is only seen if it exists when the
+    # first of its rows is read.
+    if chunk_size <= 0:
+        raise InvalidOperationError("Chunk size must be positive.")
+    started = time.perf_counter()
+    stats = IngestStats()
+    with _RejectWriter(rejects_path) as rejects:
+        if workers > 1:
+            _ingest_sharded(bank, iter_operations(path, fmt=fmt), rejects, stats, workers, chunk_size)
+        else:
+            _ingest_inline(bank, iter_operations(path, fmt=fmt), rejects, stats)
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def _ingest_inline(bank: Bank, operations: Iterable[Operation], rejects: _RejectWriter, stats: IngestStats) -> None:
+    accounts = bank._accounts
+    for operation in operations:
+        stats.rows += 1
+        account = accounts.get(operation[1])
+        error = _apply(account, operation)
+        if error is None:
+            stats.applied += 1
+        else:
+            stats.rejected += 1
+            rejects.write(operation, *error)
+
+
+def _ingest_sharded(
+    bank: Bank,
+    operations: Iterable[Operation],
+    rejects: _RejectWriter,
+    stats: IngestStats,
+    workers: int,
+    chunk_size: int,
+) -> None:
+    context = multiprocessing.get_context()
+    results = context.Queue()
+    inboxes = [context.Queue() for _ in range(workers)]
+    parts = [rejects.part(shard) for shard in range(workers)]
+    processes = [
+        context.Process(target=_shard_worker, args=(shard, inboxes[shard], results, parts[shard]), daemon=True)
+        for shard in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    accounts = bank._accounts
+    shipped: list[set[str]] = [set() for _ in range(workers)]
+    copies: list[list[dict]] = [[] for _ in range(workers)]
+    chunks: list[list[Operation]] = [[] for _ in range(workers)]
+    in_flight = [0] * workers
+    late_rejects: list[tuple[Operation, tuple[str, str]]] = []
+
+    def apply_next() -> None:
+        shard, rows, applied, rejected, accepted = _next_result(results, processes)
+        in_flight[shard] -= 1
+        stats.rows += rows
+        stats.applied += applied
+        stats.rejected += rejected
+        _apply_accepted(accounts, accepted, stats, late_rejects)
+
+    def send(shard: int) -> None:
+        while in_flight[shard] >= _IN_FLIGHT:
+            apply_next()
+        inboxes[shard].put((copies[shard], chunks[shard]))
+        copies[shard], chunks[shard] = [], []
+        in_flight[shard] += 1
+
+    try:
+        for operation in operations:
+            account_id = operation[1]
+            shard = _shard_of(account_id, workers)
+            if account_id not in shipped[shard]:
+                account = accounts.get(account_id)
+                if account is not None:
+                    shipped[shard].add(account_id)
+                    copies[shard].append(_account_copy(bank, account))
+            chunk = chunks[shard]
+            chunk.append(operation)
+            if len(chunk) >= chunk_size:
+                send(shard)
+        for shard in range(workers):
+            if chunks[shard]:
+                send(shard)
+            inboxes[shard].put(None)
+        while any(in_flight):
+            apply_next()
+    except BaseException:
+        for process in processes:
+            process.terminate()
+        raise
+    finally:
+        for process in processes:
+            process.join()
+    late_rejects.sort(key=lambda item: item[0][0])
+    rejects.merge(parts, late_rejects)
+
+
+def _account_copy(bank: Bank, account: BankAccount) -> dict:
+    # Record of the account as it is now, for the worker that checks its rows.
+    with account._lock:
+        return bank._account_record(account)
+
+
+def _next_result(results, processes: list) -> tuple:
+    while True:
+        try:
+            return results.get(timeout=1)
+        except queue.Empty:
+            if any(process.exitcode not in (None, 0) for process in processes):
+                raise InvalidOperationError("An ingest worker failed.") from None
+
+
+def _apply_accepted(
+    accounts,
+    accepted: dict[str, tuple[tuple[int, str], list[AcceptedRow]]],
+    stats: IngestStats,
+    late_rejects: list[tuple[Operation, tuple[str, str]]],
+) -> None:
+    # Apply one chunk's accepted rows: replay the postings where the account still is
+    # what the worker started the chunk from, re-run the rows otherwise.
+    for account_id, (before, account_rows) in accepted.items():
+        account = accounts[account_id]
+        # Held across the check and the postings so nothing slips in between.
+        with account._lock:
+            if (account.balance_cents, account.status.value) == before:
+                for _, postings in account_rows:
+                    for kind, cents in postings:
+                        account._apply_posting(kind, Money(cents))
+                continue
+            for operation, _ in account_rows:
+                error = _apply(account, operation)
+                if error is not None:
+                    stats.applied -= 1
+                    stats.rejected += 1
+                    late_rejects.append((operation, error))
+
+
+def _shard_worker(shard: int, inbox, results, rejects_part: Path | None) -> None:
+    # Check one shard's chunks in order against private copies of its accounts; for
+    # each chunk, send back the counts and, per account, its state before the chunk
+    # and the accepted rows with their postings.
+    postings: list[tuple[PostingKind, int]] = []
+
+    def record(account: BankAccount, kind: PostingKind, delta: Money) -> None:
+        postings.append((kind, delta.cents))
+
+    accounts: dict[str, BankAccount] = {}
+    with _RejectWriter(rejects_part) as rejects:
+        while (message := inbox.get()) is not None:
+            copies, operations = message
+            for data in copies:
+                account = Bank._account_from_record(data)
+                account.add_listener(record)
+                accounts[account.id] = account
+            stats = IngestStats()
+            accepted: dict[str, tuple[tuple[int, str], list[AcceptedRow]]] = {}
+            for operation in operations:
+                stats.rows += 1
+                account = accounts.get(operation[1])
+                entry = accepted.get(operation[1])
+                before = None if entry is not None or account is None else (account.balance_cents, account.status.value)
+                error = _apply(account, operation)
+                if error is None:
+                    stats.applied += 1
+                    if entry is None:
+                        entry = accepted[operation[1]] = (before, [])
+                    entry[1].append((operation, tuple(postings)))
+                else:
+                    stats.rejected += 1
+                    rejects.write(operation, *error)
+                postings.clear()
+            results.put((shard, stats.rows, stats.applied, stats.rejected, accepted))
+
+
+def _shard_of(account_id: str, workers: int) -> int:
+    return zlib.crc32(account_id.encode()) % workers
+
+
+def _apply(account: BankAccount | None, operation: Operation) -> tuple[str, str] | None:
+    # Apply one row; returns (error type, message) when the row is rejected.
+    _, _, op, amount_text = operation
+    try:
+        if account is None:
+            raise InvalidOperationError("Account not found.")
+        try:
+            amount = Decimal(amount_text)
+        except InvalidOperation:
+            raise InvalidOperationError("Amount is not a number.") from None
+        if op == "deposit":
+            account.deposit(amount)
+        elif op == "withdraw":
+            account.withdraw(amount)
+        else:
+            raise InvalidOperationError(f"Unknown operation: {op!r}.")
+    except _ROW_ERRORS as exc:
+        return type(exc).__name__, str(exc)
+    return None
+
+
+class _RejectWriter:
+    def __init__(self, path: str | Path | None) -> None:
+        self._path = path
+        self._handle: IO[str] | None = None
+
+    def __enter__(self) -> _RejectWriter:
+        if self._path is not None:
+            self._handle = open(self._path, "w", encoding="utf-8")
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._handle is not None:
+            self._handle.close()
+
+    def write(self, operation: Operation, error_type: str, error: str) -> None:
+        if self._handle is None:
+            return
+        self._handle.write(self._line(operation, error_type, error))
+
+    @staticmethod
+    def _line(operation: Operation, error_type: str, error: str) -> str:
+        line, account_id, op, amount = operation
+        record = {"line": line, "account_id": account_id, "op": op, "amount": amount,
+                  "error": error_type, "message": error}
+        return json.dumps(record) + "\n"
+
+    def part(self, shard: int) -> Path | None:
+        # Per-worker reject file, merged back by merge().
+        return None if self._path is None else Path(f"{self._path}.part{shard}")
+
+    def merge(self, parts: list[Path | None], extra: list[tuple[Operation, tuple[str, str]]] = ()) -> None:
+        # Each part, and extra (rows rejected here, as (operation, error)), is already in
+        # line order, so a k-way merge keeps the file ordered.
+        if self._handle is None:
+            return
+        handles = [open(part, encoding="utf-8") for part in parts if part is not None]
+        try:
+            keyed = [((json.loads(line)["line"], line) for line in handle) for handle in handles]
+            keyed.append((operation[0], self._line(operation, *error)) for operation, error in extra)
+            for _, line in heapq.merge(*keyed):
+                self._handle.write(line)
+        finally:
+            for handle in handles:
+                handle.close()
+            for part in parts:
+                if part is not None:
+                    part.unlink(missing_ok=True)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Apply a file of deposits and withdrawals to a bank.")
+    parser.add_argument("path", help="CSV (account_id,op,amount) or JSON lines file")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--journal", help="recover the bank from this journal and append to it")
+    source.add_argument("--snapshot", help="load the bank from this snapshot and rewrite it afterwards")
+    parser.add_argument("--rejects", help="write rejected rows here as JSON lines")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    args = parser.parse_args(argv)
+
+    bank = Bank.recover(args.journal) if args.journal else Bank.load_snapshot(args.snapshot)
+    try:
+        stats = ingest_file(bank, args.path, rejects_path=args.rejects, workers=args.workers)
+        if args.snapshot:
+            bank.snapshot(args.snapshot)
+    finally:
+        bank.close()
+    print(stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from contextlib import contextmanager
+from enum import IntEnum
+from pathlib import Path
+from typing import Iterator
+
+from banking.errors import InvalidOperationError
+from banking.types import AccountStatus, ClientStatus, PostingKind
+
+__all__ = ["Journal", "JournalOp", "read_journal"]
+
+# Frame: payload length, crc32 of (op + payload), op code; followed by the payload.
+_HEADER = struct.Struct("<IIB")
+_POSTING = struct.Struct("<Bq")
+_STATUS = struct.Struct("<B")
+# Asset purchase or holding change: amount in cents or units, then the length of the
+# asset type or instrument; followed by that name and the account id.
+_NAMED_AMOUNT = struct.Struct("<qB")
+
+_POSTING_KINDS = list(PostingKind)
+_POSTING_CODES = {kind: code for code, kind in enumerate(_POSTING_KINDS)}
+_ACCOUNT_STATUSES = list(AccountStatus)
+_ACCOUNT_STATUS_CODES = {status: code for code, status in enumerate(_ACCOUNT_STATUSES)}
+_CLIENT_STATUSES = list(ClientStatus)
+_CLIENT_STATUS_CODES = {status: code for code, status in enumerate(_CLIENT_STATUSES)}
+
+
+class JournalOp(IntEnum):
+    ADD_CLIENT = 1
+    OPEN_ACCOUNT = 2
+    POSTING = 3
+    ACCOUNT_STATUS = 4
+    CLIENT_STATUS = 5
+    # Frames written together by Journal.atomic(); the payload is a run of inner frames.
+    BATCH = 6
+    ASSET = 7
+    # Price book: a listing (JSON), a holding change, and a batch of new prices (JSON).
+    INSTRUMENT = 8
+    HOLDING = 9
+    PRICES = 10
+
+
+_OPS = frozenset(op.value for op in JournalOp)
+
+
+class Journal:
+    # Append-only operation log with group commit. Appends go to an in-memory buffer;
+    # a writer thread flushes and fsyncs the buffer once per commit window, so many
+    # operations share one fsync.
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        commit_window: float = 0.005,
+        max_batch_bytes: int = 1 << 20,
+        wait_for_commit: bool = False,
+        fsync: bool = True,
+    ) -> None:
+        if commit_window < 0:
+            raise InvalidOperationError("Commit window cannot be negative.")
+        self._path = Path(path)
+        self._file = open(self._path, "ab")
+        self._commit_window = commit_window
+        self._max_batch_bytes = max_batch_bytes
+        self._wait_for_commit = wait_for_commit
+        self._fsync = fsync
+        self._buffer = bytearray()
+        self._cond = threading.Condition()
+        self._appended_lsn = 0
+        self._durable_lsn = 0
+        self._flush_requested = False
+        self._batch: bytearray | None = None
+        self._closed = False
+        self._error: BaseException | None = None
+        self._writer = threading.Thread(target=self._run, name="banking-journal", daemon=True)
+        self._writer.start()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def durable_lsn(self) -> int:
+        return self._durable_lsn
+
+    def is_empty(self) -> bool:
+        with self._cond:
+            return self._appended_lsn == 0 and self._path.stat().st_size == 0
+
+    def append_json(self, op: JournalOp, payload: dict) -> int:
+        return self._append(op, json.dumps(payload, separators=(",", ":")).encode())
+
+    def append_posting(self, account_id: str, kind: PostingKind, cents: int) -> int:
+        payload = _POSTING.pack(_POSTING_CODES[kind], cents) + account_id.encode()
+        return self._append(JournalOp.POSTING, payload)
+
+    def append_account_status(self, account_id: str, status: AccountStatus) -> int:
+        payload = _STATUS.pack(_ACCOUNT_STATUS_CODES[status]) + account_id.encode()
+        return self._append(JournalOp.ACCOUNT_STATUS, payload)
+
+    def append_client_status(self, client_id: str, status: ClientStatus) -> int:
+        payload = _STATUS.pack(_CLIENT_STATUS_CODES[status]) + client_id.encode()
+        return self._append(JournalOp.CLIENT_STATUS, payload)
+
+    def append_asset(self, account_id: str, asset_type: str, cents: int) -> int:
+        return self._append(JournalOp.ASSET, _pack_named(cents, asset_type, account_id))
+
+    def append_holding(self, account_id: str, instrument: str, quantity: int) -> int:
+        return self._append(JournalOp.HOLDING, _pack_named(quantity, instrument, account_id))
+
+    @contextmanager
+    def atomic(self) -> Iterator[None]:
+        # Records appended inside the block are written as a single batch frame, so
+        # recovery sees all of them or none. Other writers wait until the block ends.
+        with self._cond:
+            outer = self._batch is None
+            if outer:
+                self._batch = bytearray()
+            try:
+                yield
+            finally:
+                if outer:
+                    batch, self._batch = self._batch, None
+                    lsn = self._push(_frame(JournalOp.BATCH, bytes(batch))) if batch else self._appended_lsn
+        if outer and self._wait_for_commit:
+            self.wait(lsn)
+
+    def wait(self, lsn: int) -> None:
+        # Block until the record with this sequence number is on disk.
+        with self._cond:
+            while self._durable_lsn < lsn:
+                self._raise_if_failed()
+                self._flush_requested = True
+                self._cond.notify_all()
+                self._cond.wait()
+
+    def flush(self) -> None:
+        self.wait(self._appended_lsn)
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join()
+        self._file.close()
+        self._raise_if_failed()
+
+    def __enter__(self) -> Journal:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _append(self, op: JournalOp, payload: bytes) -> int:
+        frame = _frame(op, payload)
+        with self._cond:
+            if self._batch is not None:
+                # Inside atomic(): the whole batch gets the next sequence number.
+                self._batch += frame
+                return self._appended_lsn + 1
+            lsn = self._push(frame)
+        if self._wait_for_commit:
+            self.wait(lsn)
+        return lsn
+
+    def _push(self, frame: bytes) -> int:
+        # Caller holds self._cond.
+        if self._closed:
+            raise InvalidOperationError("Journal is closed.")
+        self._raise_if_failed()
+        if not self._buffer:
+            self._cond.notify_all()
+        self._buffer += frame
+        self._appended_lsn += 1
+        if len(self._buffer) >= self._max_batch_bytes:
+            self._flush_requested = True
+            self._cond.notify_all()
+        return self._appended_lsn
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._buffer and not self._closed and not self._flush_requested:
+                    self._cond.wait()
+                if not self._closed and not self._flush_requested and self._commit_window:
+                    # Hold the batch open for the commit window so concurrent writers join it.
+                    self._cond.wait(self._commit_window)
+                batch = bytes(self._buffer)
+                self._buffer.clear()
+                lsn = self._appended_lsn
+                self._flush_requested = False
+                closing = self._closed
+            try:
+                if batch:
+                    self._file.write(batch)
+                    self._file.flush()
+                    if self._fsync:
+                        os.fsync(self._file.fileno())
+            except BaseException as exc:  # surface IO errors to writers instead of dying silently
+                with self._cond:
+                    self._error = exc
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                self._durable_lsn = lsn
+                self._cond.notify_all()
+                if closing and not self._buffer:
+                    return
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise InvalidOperationError(f"Journal write failed: {self._error}")
+
+
+def read_journal(
+    path: str | Path, *, truncate_torn_tail: bool = True
+) -> Iterator[tuple[JournalOp, object]]:
+    # Decode records in order. A partial or corrupt record can only be the tail of a
+    # crashed write; it is dropped (and cut from the file) once iteration reaches it.
+    path = Path(path)
+    if not path.exists() or path.stat().st_size == 0:
+        return
+    offset = 0
+    with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        end = len(data)
+        for op, payload, offset in _frames(data, 0, end):
+            if op == JournalOp.BATCH:
+                for inner_op, inner_payload, _ in _frames(payload, 0, len(payload)):
+                    yield _decode(JournalOp(inner_op), inner_payload)
+            else:
+                yield _decode(JournalOp(op), payload)
+    if offset != end and truncate_torn_tail:
+        with open(path, "r+b") as handle:
+            handle.truncate(offset)
+
+
+def _frame(op: JournalOp, payload: bytes) -> bytes:
+    crc = zlib.crc32(payload, zlib.crc32(bytes((op,))))
+    return _HEADER.pack(len(payload), crc, op) + payload
+
+
+def _frames(data, offset: int, end: int) -> Iterator[tuple[int, bytes, int]]:
+    # Yield (op, payload, offset after the frame) until the data ends or a frame is bad.
+    while offset + _HEADER.size <= end:
+        length, crc, op = _HEADER.unpack_from(data, offset)
+        start = offset + _HEADER.size
+        payload = data[start:start + length]
+        if (
+            op not in _OPS
+            or len(payload) != length
+            or zlib.crc32(payload, zlib.crc32(bytes((op,)))) != crc
+        ):
+            return
+        offset = start + length
+        yield op, payload, offset
+
+
+def _decode(op: JournalOp, payload: bytes) -> tuple[JournalOp, object]:
+    if op == JournalOp.POSTING:
+        code, cents = _POSTING.unpack_from(payload)
+        return op, (payload[_POSTING.size:].decode(), _POSTING_KINDS[code], cents)
+    if op == JournalOp.ACCOUNT_STATUS:
+        (code,) = _STATUS.unpack_from(payload)
+        return op, (payload[_STATUS.size:].decode(), _ACCOUNT_STATUSES[code])
+    if op == JournalOp.CLIENT_STATUS:
+        (code,) = _STATUS.unpack_from(payload)
+        return op, (payload[_STATUS.size:].decode(), _CLIENT_STATUSES[code])
+    if op in (JournalOp.ASSET, JournalOp.HOLDING):
+        amount, name_length = _NAMED_AMOUNT.unpack_from(payload)
+        start = _NAMED_AMOUNT.size + name_length
+        return op, (payload[start:].decode(), payload[_NAMED_AMOUNT.size:start].decode(), amount)
+    return op, json.loads(payload)
+
+
+def _pack_named(amount: int, name: str, account_id: str) -> bytes:
+    encoded_name = name.encode()
+    return _NAMED_AMOUNT.pack(amount, len(encoded_name)) + encoded_name + account_id.encode()
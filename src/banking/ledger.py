@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import os
+import struct
+import time
+from array import array
+from bisect import bisect_right
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Callable
+
+from banking.errors import InvalidOperationError
+from banking.fx import CurrencyTotals
+from banking.types import Currency, PostingKind
+
+try:  # NumPy is optional; without it the batch query sums entries in a Python loop.
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+__all__ = ["CHECKPOINT_EVERY", "CONTRA_ACCOUNTS", "Ledger"]
+
+# Entries between two checkpoints of the bank-wide totals; an as-of total sums at
+# most this many entries on top of the checkpoint before it.
+CHECKPOINT_EVERY = 1_024
+
+# Entry kind codes: an account's opening balance, its postings, and its closing.
+_OPENING = 0
+_POSTING_CODES = {kind: code for code, kind in enumerate(PostingKind, start=1)}
+_CLOSING = len(_POSTING_CODES) + 1
+_CURRENCIES = list(Currency)
+_CURRENCY_CODES = {currency: code for code, currency in enumerate(_CURRENCIES)}
+# File record: microseconds since the epoch, account row, signed cents, kind code,
+# currency code, account id length; opening records are followed by the account id.
+_RECORD = struct.Struct("<qqqBBH")
+_LOAD_CHUNK = 1 << 20
+
+# Other leg of each entry: money entering an account comes out of the contra account
+# for its kind, so accounts and contra accounts sum to zero in every currency.
+CONTRA_ACCOUNTS = {
+    "opening": "equity:opening",
+    PostingKind.DEPOSIT.value: "cash",
+    PostingKind.WITHDRAW.value: "cash",
+    PostingKind.FEE.value: "income:fees",
+    PostingKind.INTEREST.value: "expense:interest",
+}
+_CONTRA_BY_CODE = {
+    _OPENING: CONTRA_ACCOUNTS["opening"],
+    **{code: CONTRA_ACCOUNTS[kind.value] for kind, code in _POSTING_CODES.items()},
+}
+
+
+class Ledger:
+    # Time-ordered record of every balance change, for as-of queries. Entries live in
+    # parallel arrays (timestamp, account row, signed cents, kind, currency) in one
+    # bank-wide sequence whose timestamps never go backwards; each has a second leg
+    # against the contra account of its kind. Every CHECKPOINT_EVERY entries the
+    # running totals are saved, so a bank-wide total as of a moment is a bisect, a
+    # checkpoint and at most checkpoint_every entries. Each account also keeps its
+    # entry timestamps and the balance after each one, which makes every entry a
+    # checkpoint: an account's balance as of a moment is a single bisect. Closing an
+    # account adds an entry that drops its balance from the totals (closed accounts
+    # do not count, as in get_total_balance) and leaves its own balance alone.
+    # With a path, every entry is also appended to that file, and reopening it
+    # replays the entries, with their original timestamps, to rebuild the arrays and
+    # checkpoints. As with the transaction history, the file is flushed by
+    # close_file, not fsynced. Writers are serialized by the caller (Bank holds its
+    # lock); readers take no lock and see the entries present when they start.
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        *,
+        checkpoint_every: int = CHECKPOINT_EVERY,
+        use_numpy: bool | None = None,
+        clock: Callable[[], int] = time.time_ns,
+    ) -> None:
+        if checkpoint_every <= 0:
+            raise InvalidOperationError("Checkpoint interval must be positive.")
+        if use_numpy and np is None:
+            raise InvalidOperationError("NumPy is not installed.")
+        self._use_numpy = np is not None if use_numpy is None else use_numpy
+        self._every = checkpoint_every
+        self._clock = clock
+        self._times = array("q")
+        self._rows = array("q")
+        self._cents = array("q")
+        self._kinds = array("B")
+        self._currencies = array("B")
+        self._row_of: dict[str, int] = {}
+        self._ids: list[str] = []
+        self._row_currency: list[Currency] = []
+        # Per row: entry timestamps and the balance after each entry.
+        self._account_times: list[array] = []
+        self._account_balances: list[array] = []
+        # Checkpoint c holds the totals over entries [0, c * checkpoint_every).
+        self._totals = [0] * len(_CURRENCIES)
+        self._contras: dict[tuple[str, int], int] = {}
+        self._checkpoints: list[tuple[list[int], dict[tuple[str, int], int]]] = [(list(self._totals), {})]
+        self._path = Path(path) if path is not None else None
+        self._file: IO[bytes] | None = None
+        if self._path is not None:
+            self._file = open(self._path, "a+b")
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._times)
+
+    def __contains__(self, account_id: object) -> bool:
+        return account_id in self._row_of
+
+    @property
+    def checkpoint_every(self) -> int:
+        return self._every
+
+    @property
+    def path(self) -> Path | None:
+        return self._path
+
+    def balance(self, account_id: str) -> int:
+        # Balance in cents after the account's latest entry.
+        return self._account_balances[self._row(account_id)][-1]
+
+    def open(self, account_id: str, currency: Currency, cents: int, *, closed: bool = False) -> None:
+        # Opening entry for a new account; closed=True also records its closing, for
+        # seeding from accounts that are already closed.
+        if account_id in self._row_of:
+            raise InvalidOperationError("Account already exists.")
+        row = self._add_row(account_id, currency)
+        self._append(row, _OPENING, cents, cents)
+        if closed:
+            self._append(row, _CLOSING, -cents, cents)
+
+    def post(self, account_id: str, kind: PostingKind, cents: int) -> None:
+        row = self._row(account_id)
+        balances = self._account_balances[row]
+        self._append(row, _POSTING_CODES[kind], cents, balances[-1] + cents)
+
+    def close(self, account_id: str) -> None:
+        row = self._row(account_id)
+        balance = self._account_balances[row][-1]
+        self._append(row, _CLOSING, -balance, balance)
+
+    def balance_at(self, account_id: str, moment: datetime) -> int:
+        # Balance in cents after every entry stamped at or before moment.
+        row = self._row(account_id)
+        times = self._account_times[row]
+        position = bisect_right(times, _micros(moment))
+        if position == 0:
+            raise InvalidOperationError("Account did not exist at that time.")
+        return self._account_balances[row][position - 1]
+
+    def total_at(self, moment: datetime) -> CurrencyTotals:
+        # Balance of non-closed accounts per currency, as of moment.
+        end = bisect_right(self._times, _micros(moment))
+        start = end - end % self._every
+        cents = list(self._checkpoints[end // self._every][0])
+        amounts, currencies = self._cents, self._currencies
+        for position in range(start, end):
+            cents[currencies[position]] += amounts[position]
+        totals = CurrencyTotals()
+        for code, amount in enumerate(cents):
+            totals.adjust(_CURRENCIES[code], amount)
+        return totals
+
+    def contra_balances_at(self, moment: datetime) -> dict[str, dict[Currency, int]]:
+        # Balance in cents of each contra account as of moment; with the balances of
+        # every account ever opened it sums to zero per currency.
+        end = bisect_right(self._times, _micros(moment))
+        contras = dict(self._checkpoints[end // self._every][1])
+        for position in range(end - end % self._every, end):
+            self._add_contra(contras, position)
+        result: dict[str, dict[Currency, int]] = {}
+        for (name, code), cents in contras.items():
+            if cents:
+                result.setdefault(name, {})[_CURRENCIES[code]] = cents
+        return result
+
+    def balances_at(self, moment: datetime) -> dict[str, int]:
+        # Balance in cents of every account opened by moment, closed ones included, in
+        # one pass over the entries up to moment.
+        end = bisect_right(self._times, _micros(moment))
+        ids = self._ids
+        if self._use_numpy and end:
+            rows = np.frombuffer(self._rows[:end], dtype=np.int64)
+            cents = np.frombuffer(self._cents[:end], dtype=np.int64)
+            kinds = np.frombuffer(self._kinds[:end], dtype=np.uint8)
+            keep = kinds != _CLOSING
+            balances = np.zeros(int(rows.max()) + 1, dtype=np.int64)
+            np.add.at(balances, rows[keep], cents[keep])
+            opened = np.flatnonzero(kinds == _OPENING)
+            opened_rows = rows[opened].tolist()
+            return dict(zip([ids[row] for row in opened_rows], balances[opened_rows].tolist()))
+        totals: dict[str, int] = {}
+        rows, amounts, kinds = self._rows, self._cents, self._kinds
+        for position in range(end):
+            kind = kinds[position]
+            if kind == _CLOSING:
+                continue
+            account_id = ids[rows[position]]
+            if kind == _OPENING:
+                totals[account_id] = amounts[position]
+            else:
+                totals[account_id] += amounts[position]
+        return totals
+
+    def close_file(self) -> None:
+        # Flush and close the backing file; close() is an account's closing entry.
+        if self._file is not None and not self._file.closed:
+            self._file.close()
+
+    def __enter__(self) -> Ledger:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close_file()
+
+    def _add_row(self, account_id: str, currency: Currency) -> int:
+        row = self._row_of[account_id] = len(self._ids)
+        self._ids.append(account_id)
+        self._row_currency.append(currency)
+        self._account_times.append(array("q"))
+        self._account_balances.append(array("q"))
+        return row
+
+    def _append(self, row: int, kind: int, cents: int, balance: int) -> None:
+        stamp = self._clock() // 1000
+        if self._times and stamp < self._times[-1]:
+            stamp = self._times[-1]
+        currency = _CURRENCY_CODES[self._row_currency[row]]
+        if self._file is not None:
+            if self._file.closed:
+                raise InvalidOperationError("Ledger is closed.")
+            encoded_id = self._ids[row].encode() if kind == _OPENING else b""
+            self._file.write(_RECORD.pack(stamp, row, cents, kind, currency, len(encoded_id)) + encoded_id)
+        self._add(stamp, row, kind, cents, balance, currency)
+
+    def _add(self, stamp: int, row: int, kind: int, cents: int, balance: int, currency: int) -> None:
+        # The timestamp goes in last: readers bound their work by len(self._times), so
+        # everything below it, including a checkpoint it completes, is already there.
+        position = len(self._times)
+        self._rows.append(row)
+        self._cents.append(cents)
+        self._kinds.append(kind)
+        self._currencies.append(currency)
+        self._totals[currency] += cents
+        self._add_contra(self._contras, position)
+        if (position + 1) % self._every == 0:
+            self._checkpoints.append((list(self._totals), dict(self._contras)))
+        self._account_balances[row].append(balance)
+        self._account_times[row].append(stamp)
+        self._times.append(stamp)
+
+    def _add_contra(self, contras: dict[tuple[str, int], int], position: int) -> None:
+        kind = self._kinds[position]
+        if kind == _CLOSING:
+            return
+        key = (_CONTRA_BY_CODE[kind], self._currencies[position])
+        contras[key] = contras.get(key, 0) - self._cents[position]
+
+    def _load(self) -> None:
+        # Replay an existing file a chunk at a time. A torn or unreadable tail (crash
+        # mid-write) is cut off.
+        self._file.seek(0)
+        offset = 0  # file offset of data[0]
+        data = b""
+        corrupt = False
+        while not corrupt and (chunk := self._file.read(_LOAD_CHUNK)):
+            data += chunk
+            position = 0
+            while position + _RECORD.size <= len(data):
+                stamp, row, cents, kind, currency, id_length = _RECORD.unpack_from(data, position)
+                end = position + _RECORD.size + id_length
+                if end > len(data):
+                    break
+                if kind > _CLOSING or currency >= len(_CURRENCIES):
+                    corrupt = True
+                    break
+                if kind == _OPENING:
+                    account_id = data[position + _RECORD.size : end].decode()
+                    if row != len(self._ids) or account_id in self._row_of:
+                        corrupt = True
+                        break
+                    self._add_row(account_id, _CURRENCIES[currency])
+                    balance = cents
+                elif not 0 <= row < len(self._ids) or _CURRENCIES[currency] != self._row_currency[row]:
+                    corrupt = True
+                    break
+                else:
+                    balance = self._account_balances[row][-1] + (0 if kind == _CLOSING else cents)
+                self._add(stamp, row, kind, cents, balance, currency)
+                position = end
+            data = data[position:]
+            offset += position
+        if self._file.seek(0, os.SEEK_END) > offset:
+            self._file.truncate(offset)
+
+    def _row(self, account_id: str) -> int:
+        row = self._row_of.get(account_id)
+        if row is None:
+            raise InvalidOperationError("Account not in ledger.")
+        return row
+
+
+def _micros(moment: datetime) -> int:
+    return round(moment.timestamp() * 1_000_000)
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import Iterator
+
+__all__ = ["DEFAULT_STRIPES", "LockStripes"]
+
+
+class LockStripes:
+    # Fixed pool of re-entrant locks; a key always maps to the same stripe. Several
+    # keys are locked in ascending stripe order, so any two callers agree on the
+    # acquisition order and cannot deadlock.
+
+    def __init__(self, stripes: int = 1024) -> None:
+        if stripes <= 0:
+            raise ValueError("Stripe count must be positive.")
+        self._locks = tuple(threading.RLock() for _ in range(stripes))
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    def stripe(self, key: str) -> int:
+        # crc32 rather than hash() so the mapping is stable across processes.
+        return zlib.crc32(key.encode()) % len(self._locks)
+
+    def lock_for(self, key: str) -> threading.RLock:
+        return self._locks[self.stripe(key)]
+
+    @contextmanager
+    def hold(self, *keys: str) -> Iterator[None]:
+        stripes = sorted({self.stripe(key) for key in keys})
+        acquired = []
+        try:
+            for stripe in stripes:
+                lock = self._locks[stripe]
+                lock.acquire()
+                acquired.append(lock)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
+
+    @contextmanager
+    def hold_all(self) -> Iterator[None]:
+        # Every stripe, in ascending order: a barrier that waits out all current holders.
+        acquired = []
+        try:
+            for lock in self._locks:
+                lock.acquire()
+                acquired.append(lock)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
+
+
+DEFAULT_STRIPES = LockStripes()
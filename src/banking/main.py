@@ -1,5 +1,41 @@
-def main():
-    print("Banking System project initialized")
+import argparse
+import asyncio
+import os
+
+from banking.bank import Bank
+from banking.metrics import serve_metrics
+from banking.server import serve
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve Bank operations over a local socket.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--journal", metavar="PATH", help="recover from and append to this journal")
+    parser.add_argument(
+        "--security-log", metavar="DIR", help="archive security events here (otherwise old events are dropped)"
+    )
+    parser.add_argument("--workers", type=int, default=4, help="threads for account scans and reports")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on 127.0.0.1:PORT/metrics")
+    args = parser.parse_args(argv)
+
+    bank = Bank.recover(args.journal) if args.journal else Bank()
+    if args.security_log:
+        bank.attach_security_archive(args.security_log)
+    if args.metrics_port is not None:
+        serve_metrics("127.0.0.1", args.metrics_port)
+    print("Banking System listening on", args.unix or f"{args.host}:{args.port}")
+    try:
+        # Read from the environment so the credential does not show up in process lists.
+        operator_token = os.environ.get("BANKING_OPERATOR_TOKEN")
+        asyncio.run(
+            serve(bank, args.host, args.port, path=args.unix, max_workers=args.workers, operator_token=operator_token)
+        )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        bank.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,351 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import itertools
+import os
+import threading
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Callable
+
+__all__ = [
+    "ENABLED",
+    "REGISTRY",
+    "SAMPLE_EVERY",
+    "LatencyHistogram",
+    "Metrics",
+    "instrument_public_methods",
+    "instrumented",
+    "serve_metrics",
+    "track_bank",
+]
+
+# Instrumentation is wired in at import time; BANKING_METRICS=0 leaves every method
+# unwrapped, so switching it off costs nothing.
+ENABLED = os.environ.get("BANKING_METRICS", "1") != "0"
+# Every call is counted; one in SAMPLE_EVERY synchronous calls is also timed, which
+# keeps the clock reads off most calls. Must be a power of two; 1 times every call.
+SAMPLE_EVERY = int(os.environ.get("BANKING_METRICS_SAMPLE", "64"))
+if SAMPLE_EVERY < 1 or SAMPLE_EVERY & (SAMPLE_EVERY - 1):
+    raise ValueError("BANKING_METRICS_SAMPLE must be a power of two.")
+
+_SUB_BITS = 3
+_SUB_BUCKETS = 1 << _SUB_BITS
+_BUCKETS = _SUB_BUCKETS * 64
+# Prometheus buckets: powers of two from ~1us to ~68s.
+_EXPORT_EXPONENTS = range(10, 37)
+
+
+class LatencyHistogram:
+    # HDR-style log-linear histogram of nanosecond latencies: 8 linear sub-buckets
+    # per power of two, so any recorded value is known to within 12.5%.
+    #
+    # Calls are counted by next() on a private itertools.count, one C call and no
+    # lock on the hot path. Readers take a value with next() as well and subtract the
+    # ticks earlier reads consumed, so only readers pay for the bookkeeping. Timed
+    # calls also append their latency to a pending list (atomic under the GIL), which
+    # is folded into the buckets in batches, when it grows past _FOLD_AT or a reader
+    # asks for the counts. Failed calls are rarer and take the lock to count their
+    # exception type.
+
+    _FOLD_AT = 4096
+
+    def __init__(self) -> None:
+        self._pending: list[int] = []
+        self._counts = [0] * _BUCKETS
+        self._sum_ns = 0
+        self._ticks = itertools.count()
+        # Counts one call and returns the number of calls before it.
+        self._tick = self._ticks.__next__
+        self._cleared_at = 0
+        # Ticks taken by _ticked itself rather than by recorded calls.
+        self._reads = 0
+        self._errors: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, nanos: int | None) -> None:
+        # Count one call, timed (nanos) or only counted (None).
+        self._tick()
+        if nanos is not None:
+            pending = self._pending
+            pending.append(nanos)
+            if len(pending) >= self._FOLD_AT:
+                self._fold()
+
+    def record_error(self, nanos: int | None, outcome: str) -> None:
+        self.count_error(outcome)
+        self.record(nanos)
+
+    def count_error(self, outcome: str) -> None:
+        # Attribute an already recorded call to a failure outcome.
+        with self._lock:
+            self._errors[outcome] = self._errors.get(outcome, 0) + 1
+
+    @property
+    def calls(self) -> int:
+        with self._lock:
+            return self._ticked() - self._cleared_at
+
+    def outcomes(self) -> dict[str, int]:
+        # Calls by outcome: "ok" or the name of the exception raised.
+        return self.snapshot()[2]
+
+    def percentile(self, q: float) -> int:
+        # Upper bound in nanoseconds of the bucket holding the q-th percentile (0-100).
+        counts = self.snapshot()[0]
+        total = sum(counts)
+        if not total:
+            return 0
+        rank = max(1, -(-total * q // 100))
+        seen = 0
+        for index, count in enumerate(counts):
+            seen += count
+            if seen >= rank:
+                return _bucket_upper(index)
+        return _bucket_upper(len(counts) - 1)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pending.clear()
+            self._counts = [0] * _BUCKETS
+            self._sum_ns = 0
+            self._cleared_at = self._ticked()
+            self._errors = {}
+
+    def snapshot(self) -> tuple[list[int], int, dict[str, int]]:
+        # (bucket counts of timed calls, their latency sum in ns, all calls by outcome)
+        self._fold()
+        with self._lock:
+            outcomes = dict(self._errors)
+            ok = self._ticked() - self._cleared_at - sum(outcomes.values())
+            if ok:
+                outcomes["ok"] = ok
+            return list(self._counts), self._sum_ns, outcomes
+
+    def _fold(self) -> None:
+        with self._lock:
+            pending = self._pending
+            taken = len(pending)
+            if not taken:
+                return
+            samples = pending[:taken]
+            # Appends that race with this land after `taken` and stay pending.
+            del pending[:taken]
+            counts = self._counts
+            for nanos in samples:
+                shift = nanos.bit_length() - _SUB_BITS - 1
+                counts[nanos if shift < 0 else (shift << _SUB_BITS) + (nanos >> shift)] += 1
+            self._sum_ns += sum(samples)
+
+    def _ticked(self) -> int:
+        # Calls counted so far; the caller holds _lock.
+        ticked = next(self._ticks) - self._reads
+        self._reads += 1
+        return ticked
+
+
+def _bucket_upper(index: int) -> int:
+    if index < _SUB_BUCKETS * 2:
+        return index
+    shift, sub = divmod(index, _SUB_BUCKETS)
+    shift -= 1
+    return ((sub + _SUB_BUCKETS + 1) << shift) - 1
+
+
+class Metrics:
+    # Registry of per-operation latency histograms and gauges, rendered in the
+    # Prometheus text exposition format.
+
+    def __init__(self, prefix: str = "banking") -> None:
+        self._prefix = prefix
+        self._histograms: dict[str, LatencyHistogram] = {}
+        self._gauges: dict[str, tuple[str, Callable[[], float]]] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, operation: str) -> LatencyHistogram:
+        histogram = self._histograms.get(operation)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(operation, LatencyHistogram())
+        return histogram
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], float]) -> None:
+        with self._lock:
+            self._gauges[name] = (help_text, read)
+
+    def reset(self) -> None:
+        # Zero every histogram; instrumented methods keep their references.
+        with self._lock:
+            histograms = list(self._histograms.values())
+        for histogram in histograms:
+            histogram.clear()
+
+    def render(self) -> str:
+        prefix = self._prefix
+        lines = [
+            f"# HELP {prefix}_operation_duration_seconds Latency of Bank and account operations.",
+            f"# TYPE {prefix}_operation_duration_seconds histogram",
+        ]
+        totals = [
+            f"# HELP {prefix}_operations_total Completed operations by outcome (ok or exception type).",
+            f"# TYPE {prefix}_operations_total counter",
+        ]
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            gauges = sorted(self._gauges.items())
+        for operation, histogram in histograms:
+            counts, sum_ns, outcomes = histogram.snapshot()
+            label = f'operation="{operation}"'
+            cumulative = 0
+            index = 0
+            for exponent in _EXPORT_EXPONENTS:
+                # Buckets below 2**exponent end at index (exponent - 2) * 8.
+                end = (exponent - _SUB_BITS + 1) << _SUB_BITS
+                cumulative += sum(counts[index:end])
+                index = end
+                le = f"{2 ** exponent / 1e9:g}"
+                lines.append(f'{prefix}_operation_duration_seconds_bucket{{{label},le="{le}"}} {cumulative}')
+            total = cumulative + sum(counts[index:])
+            lines.append(f'{prefix}_operation_duration_seconds_bucket{{{label},le="+Inf"}} {total}')
+            lines.append(f"{prefix}_operation_duration_seconds_sum{{{label}}} {sum_ns / 1e9:.9f}")
+            lines.append(f"{prefix}_operation_duration_seconds_count{{{label}}} {total}")
+            for outcome, count in sorted(outcomes.items()):
+                totals.append(f'{prefix}_operations_total{{{label},outcome="{outcome}"}} {count}')
+        lines.extend(totals)
+        for name, (help_text, read) in gauges:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {read():g}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str | Path) -> None:
+        # Atomically replace path, e.g. for node_exporter's textfile collector.
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(self.render())
+        os.replace(tmp, path)
+
+
+REGISTRY = Metrics()
+
+# Banks currently alive, for the account and client gauges. Keyed by id because
+# Bank compares by value and is unhashable.
+_BANKS: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+
+
+def track_bank(bank) -> None:
+    _BANKS[id(bank)] = bank
+
+
+def _live_total(attribute: str) -> int:
+    return sum(len(getattr(bank, attribute)) for bank in list(_BANKS.values()))
+
+
+REGISTRY.gauge("accounts", "Accounts held by live Bank instances.", lambda: _live_total("_accounts"))
+REGISTRY.gauge("clients", "Clients registered with live Bank instances.", lambda: _live_total("_clients"))
+
+
+def instrumented(operation: str, registry: Metrics = REGISTRY):
+    # Decorator counting every call by outcome and timing one call in SAMPLE_EVERY;
+    # a no-op when metrics are disabled.
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+        histogram = registry.histogram(operation)
+        record = histogram.record
+        record_error = histogram.record_error
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                started = perf_counter_ns()
+                try:
+                    result = await fn(*args, **kwargs)
+                except Exception as exc:
+                    record_error(perf_counter_ns() - started, type(exc).__name__)
+                    raise
+                record(perf_counter_ns() - started)
+                return result
+
+            return async_wrapper
+
+        return _sync_wrapper(fn, histogram)
+
+    return decorate
+
+
+def _sync_wrapper(fn, histogram: LatencyHistogram):
+    # Untimed calls only tick the counter; the histogram's hot-path state is bound
+    # to locals here so the wrapper does no attribute lookups per call.
+    pending = histogram._pending
+    append = pending.append
+    fold = histogram._fold
+    fold_at = histogram._FOLD_AT
+    tick = histogram._tick
+    count_error = histogram.count_error
+    mask = SAMPLE_EVERY - 1
+    clock = perf_counter_ns
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if tick() & mask:
+            try:
+                return fn(*args, **kwargs)
+            except Exception as exc:
+                count_error(type(exc).__name__)
+                raise
+        started = clock()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as exc:
+            append(clock() - started)
+            count_error(type(exc).__name__)
+            raise
+        append(clock() - started)
+        if len(pending) >= fold_at:
+            fold()
+        return result
+
+    return wrapper
+
+
+def instrument_public_methods(prefix: str, registry: Metrics = REGISTRY):
+    # Class decorator applying `instrumented` to every public method defined on the
+    # class itself (plain, async, class and static methods; properties are skipped).
+    def decorate(cls):
+        for name, attr in list(vars(cls).items()):
+            if name.startswith("_"):
+                continue
+            operation = f"{prefix}.{name}"
+            if isinstance(attr, (classmethod, staticmethod)):
+                setattr(cls, name, type(attr)(instrumented(operation, registry)(attr.__func__)))
+            elif inspect.isfunction(attr):
+                setattr(cls, name, instrumented(operation, registry)(attr))
+        return cls
+
+    return decorate
+
+
+def serve_metrics(host: str = "127.0.0.1", port: int = 9100, registry: Metrics = REGISTRY) -> ThreadingHTTPServer:
+    # Serve GET /metrics from a daemon thread; call shutdown() on the result to stop.
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="banking-metrics", daemon=True).start()
+    return server
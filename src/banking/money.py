@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 
 from banking.errors import InvalidOperationError
@@ -6,27 +8,135 @@ __all__ = [
     "MONEY_QUANT",
     "ZERO_MONEY",
     "DEFAULT_MAX_WITHDRAW",
+    "Money",
     "to_money",
     "validate_amount",
+    "validate_money",
 ]
 
 MONEY_QUANT = Decimal("0.01")
 ZERO_MONEY = Decimal("0.00")
 DEFAULT_MAX_WITHDRAW = Decimal("10000.00")
 
+_HUNDRED = Decimal(100)
+_ONE = Decimal(1)
 
-def to_money(amount: Decimal) -> Decimal:
-    try:
-        value = Decimal(str(amount))
-    except (TypeError, ValueError, InvalidOperation):
+
+class Money:
+    # Immutable amount stored as integer cents. Arithmetic stays in ints; Decimal is
+    # only produced at the API boundary via to_decimal().
+    __slots__ = ("_cents",)
+
+    def __init__(self, cents: int = 0) -> None:
+        self._cents = cents
+
+    @classmethod
+    def of(cls, amount: Money | Decimal | int | float | str) -> Money:
+        # Parse any supported amount, rounding to cents with ROUND_HALF_UP.
+        kind = type(amount)
+        if kind is Money:
+            return amount  # type: ignore[return-value]
+        if kind is int:
+            return cls(amount * 100)  # type: ignore[operator]
+        if kind is Decimal and amount.is_finite():  # type: ignore[union-attr]
+            scaled = amount * _HUNDRED  # type: ignore[operator]
+            cents = int(scaled)
+            if scaled != cents:
+                cents = int(scaled.quantize(_ONE, rounding=ROUND_HALF_UP))
+            return cls(cents)
+        try:
+            value = Decimal(str(amount))
+        except (TypeError, ValueError, InvalidOperation):
+            raise InvalidOperationError("Amount must be a number.")
+        return cls(_decimal_to_cents(value))
+
+    @property
+    def cents(self) -> int:
+        return self._cents
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(self._cents).scaleb(-2)
+
+    def multiply(self, rate: Decimal, *, rounding: str = ROUND_HALF_UP) -> Money:
+        # Scale by a Decimal factor, rounding the result back to whole cents.
+        scaled = Decimal(self._cents) * rate
+        return Money(int(scaled.quantize(_ONE, rounding=rounding)))
+
+    def __add__(self, other: Money) -> Money:
+        return Money(self._cents + other._cents)
+
+    def __sub__(self, other: Money) -> Money:
+        return Money(self._cents - other._cents)
+
+    def __neg__(self) -> Money:
+        return Money(-self._cents)
+
+    def __bool__(self) -> bool:
+        return self._cents != 0
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Money):
+            return self._cents == other._cents
+        return NotImplemented
+
+    def __lt__(self, other: Money) -> bool:
+        return self._cents < other._cents
+
+    def __le__(self, other: Money) -> bool:
+        return self._cents <= other._cents
+
+    def __gt__(self, other: Money) -> bool:
+        return self._cents > other._cents
+
+    def __ge__(self, other: Money) -> bool:
+        return self._cents >= other._cents
+
+    def __hash__(self) -> int:
+        return hash(self._cents)
+
+    def __format__(self, spec: str) -> str:
+        return format(self.to_decimal(), spec)
+
+    def __str__(self) -> str:
+        return str(self.to_decimal())
+
+    def __repr__(self) -> str:
+        return f"Money('{self.to_decimal()}')"
+
+    def __reduce__(self):
+        return (Money, (self._cents,))
+
+
+def _decimal_to_cents(value: Decimal) -> int:
+    if not value.is_finite():
         raise InvalidOperationError("Amount must be a number.")
-    return value.quantize(MONEY_QUANT, rounding=ROUND_HALF_UP)
+    scaled = value * _HUNDRED
+    cents = int(scaled)
+    if scaled != cents:
+        cents = int(scaled.quantize(_ONE, rounding=ROUND_HALF_UP))
+    return cents
+
+
+def to_money(amount: Decimal) -> Decimal:
+    return Money.of(amount).to_decimal()
+
+
+def validate_money(amount: Money | Decimal, allow_zero: bool = False) -> Money:
+    # Hot path for deposits and withdrawals: Decimal inputs skip the generic parser.
+    if type(amount) is Decimal and amount.is_finite():
+        scaled = amount * _HUNDRED
+        cents = int(scaled)
+        if scaled != cents:
+            cents = int(scaled.quantize(_ONE, rounding=ROUND_HALF_UP))
+    else:
+        cents = Money.of(amount)._cents
+    if cents <= 0:
+        if cents < 0:
+            raise InvalidOperationError("Amount cannot be negative.")
+        if not allow_zero:
+            raise InvalidOperationError("Amount must be greater than zero.")
+    return Money(cents)
 
 
 def validate_amount(amount: Decimal, allow_zero: bool = False) -> Decimal:
-    value = to_money(amount)
-    if value < 0:
-        raise InvalidOperationError("Amount cannot be negative.")
-    if not allow_zero and value == 0:
-        raise InvalidOperationError("Amount must be greater than zero.")
-    return value
+    return validate_money(amount, allow_zero=allow_zero).to_decimal()
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import threading
+from decimal import Decimal
+from enum import Enum
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from banking.accounts.investment import ASSET_TYPES
+from banking.errors import InvalidOperationError
+from banking.money import Money
+
+try:  # NumPy is optional; without it ticks update the holders one by one.
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+__all__ = ["BookChange", "PriceBook", "TICK_BATCH", "read_ticks", "replay_ticks"]
+
+# Ticks read from a file and applied per batch; within a batch only the last price of
+# each instrument matters, so repeated ticks of a busy instrument collapse into one.
+TICK_BATCH = 8_192
+# Distinct price strings remembered by read_ticks before its cache is dropped.
+_PARSED_PRICES = 65_536
+
+
+class BookChange(str, Enum):
+    # What a price book listener is told about, with its payload:
+    LISTED = "listed"  # (instrument, asset type, price cents)
+    HOLDING = "holding"  # (account id, instrument, quantity bought or sold, units now held)
+    PRICES = "prices"  # {instrument: price cents} for the prices that changed
+
+
+BookListener = Callable[[BookChange, object], None]
+
+
+class PriceBook:
+    # Shared price table for instrument holdings. Holdings are whole-unit quantities
+    # per (account, instrument), kept both ways: per account, and per instrument as a
+    # reverse index of the accounts holding it. Each account's market value and the
+    # value per asset class across the book are running sums, so a price tick costs
+    # one update per holder of that instrument and nothing for anyone else. With
+    # NumPy the values live in one int64 array and the holders of an instrument are
+    # updated with a single vectorized add. Listeners hear about every change, in the
+    # order the changes were made, after the book's lock is released: readers of the
+    # book (account info) may run under locks a listener also takes.
+
+    def __init__(self, *, use_numpy: bool | None = None) -> None:
+        if use_numpy and np is None:
+            raise InvalidOperationError("NumPy is not installed.")
+        self._use_numpy = np is not None if use_numpy is None else use_numpy
+        self._lock = threading.Lock()
+        # Serializes changes together with their notification.
+        self._write_lock = threading.Lock()
+        self._listeners: tuple[BookListener, ...] = ()
+        self._prices: dict[str, int] = {}
+        self._asset_types: dict[str, str] = {}
+        self._holdings: dict[str, dict[str, int]] = {}
+        # instrument -> {account row: units}; rows index self._values.
+        self._holders: dict[str, dict[int, int]] = {}
+        # (rows, units) arrays per instrument, rebuilt after its holders change.
+        self._vectors: dict[str, tuple] = {}
+        self._open_units: dict[str, int] = {}
+        self._rows: dict[str, int] = {}
+        self._ids: list[str] = []
+        self._values = np.zeros(1_024, dtype=np.int64) if self._use_numpy else []
+        self._totals: dict[str, int] = {asset_type: 0 for asset_type in ASSET_TYPES}
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def __contains__(self, instrument: object) -> bool:
+        return instrument in self._prices
+
+    def add_listener(self, listener: BookListener) -> None:
+        self._listeners = (*self._listeners, listener)
+
+    def list_instrument(self, instrument: str, asset_type: str, price: Decimal) -> None:
+        # Add an instrument to the table; asset_type is one of stocks, bonds, etf.
+        cents = _price_cents(price)
+        with self._write_lock:
+            self._list(instrument, asset_type, cents)
+            self._notify(BookChange.LISTED, (instrument, asset_type, cents))
+
+    def state(self) -> dict:
+        # Listings with their last prices and every non-empty holding, as JSON-ready
+        # data for snapshots; restore() reads it back.
+        with self._lock:
+            return {
+                "instruments": [
+                    [instrument, self._asset_types[instrument], cents] for instrument, cents in self._prices.items()
+                ],
+                "holdings": {account_id: dict(held) for account_id, held in self._holdings.items() if held},
+            }
+
+    def restore(self, state: dict) -> None:
+        # Load state() output into the book without notifying listeners.
+        with self._write_lock:
+            for instrument, asset_type, cents in state.get("instruments", ()):
+                self._list(instrument, asset_type, cents)
+            for account_id, held in state.get("holdings", {}).items():
+                for instrument, units in held.items():
+                    self._hold(account_id, instrument, units)
+
+    def price(self, instrument: str) -> Decimal:
+        return Money(self._price_of(instrument)).to_decimal()
+
+    def asset_type(self, instrument: str) -> str:
+        self._price_of(instrument)
+        return self._asset_types[instrument]
+
+    def holders(self, instrument: str) -> dict[str, int]:
+        # Accounts holding the instrument and their quantities.
+        self._price_of(instrument)
+        with self._lock:
+            return {self._ids[row]: units for row, units in self._holders[instrument].items()}
+
+    def add_holding(self, account_id: str, instrument: str, quantity: int) -> int:
+        # Buy (positive) or sell (negative) units; returns the quantity now held.
+        if type(quantity) is not int or quantity == 0:
+            raise InvalidOperationError("Quantity must be a non-zero whole number.")
+        with self._write_lock:
+            units = self._hold(account_id, instrument, quantity)
+            self._notify(BookChange.HOLDING, (account_id, instrument, quantity, units))
+            return units
+
+    def _hold(self, account_id: str, instrument: str, quantity: int) -> int:
+        with self._lock:
+            cents = self._price_of(instrument)
+            held = self._holdings.get(account_id, {})
+            units = held.get(instrument, 0) + quantity
+            if units < 0:
+                raise InvalidOperationError("Cannot sell more units than are held.")
+            row = self._rows.get(account_id)
+            if row is None:
+                row = self._add_row(account_id)
+                self._holdings[account_id] = held
+            holders = self._holders[instrument]
+            if units:
+                held[instrument] = holders[row] = units
+            else:
+                del held[instrument]
+                del holders[row]
+            self._vectors.pop(instrument, None)
+            self._open_units[instrument] += quantity
+            self._values[row] += quantity * cents
+            self._totals[self._asset_types[instrument]] += quantity * cents
+            return units
+
+    def holdings(self, account_id: str) -> dict[str, int]:
+        with self._lock:
+            return dict(self._holdings.get(account_id, {}))
+
+    def value_cents(self, account_id: str) -> int:
+        # Market value of the account's holdings at the current prices.
+        row = self._rows.get(account_id)
+        return 0 if row is None else int(self._values[row])
+
+    def value_by_asset_cents(self, account_id: str) -> dict[str, int]:
+        with self._lock:
+            by_asset = {asset_type: 0 for asset_type in ASSET_TYPES}
+            for instrument, units in self._holdings.get(account_id, {}).items():
+                by_asset[self._asset_types[instrument]] += units * self._prices[instrument]
+            return by_asset
+
+    def totals(self) -> dict[str, Decimal]:
+        # Market value of all holdings in the book per asset class.
+        return {asset_type: Money(cents).to_decimal() for asset_type, cents in self._totals.items()}
+
+    def total_value(self) -> Decimal:
+        return Money(sum(self._totals.values())).to_decimal()
+
+    def set_price(self, instrument: str, price: Decimal) -> None:
+        self.apply_ticks([(instrument, _price_cents(price))])
+
+    def apply_ticks(self, ticks: Iterable[tuple[str, int]]) -> int:
+        # Apply (instrument, price in cents) ticks in order. Instruments that are not
+        # listed are skipped, since a market feed carries far more than the book holds.
+        # Returns the number of ticks read.
+        latest: dict[str, int] = {}
+        count = 0
+        for instrument, cents in ticks:
+            if cents <= 0:
+                raise InvalidOperationError("Prices must be positive.")
+            latest[instrument] = cents
+            count += 1
+        with self._write_lock:
+            changed = self._apply_prices(latest)
+            if changed:
+                self._notify(BookChange.PRICES, changed)
+        return count
+
+    def _apply_prices(self, latest: dict[str, int]) -> dict[str, int]:
+        changed: dict[str, int] = {}
+        with self._lock:
+            prices = self._prices
+            totals = self._totals
+            use_numpy = self._use_numpy
+            for instrument, cents in latest.items():
+                old = prices.get(instrument)
+                if old is None or old == cents:
+                    continue
+                delta = cents - old
+                prices[instrument] = changed[instrument] = cents
+                if use_numpy:
+                    rows, units = self._vector(instrument)
+                    self._values[rows] += units * delta
+                else:
+                    values = self._values
+                    for row, units in self._holders[instrument].items():
+                        values[row] += units * delta
+                totals[self._asset_types[instrument]] += self._open_units[instrument] * delta
+        return changed
+
+    def _list(self, instrument: str, asset_type: str, cents: int) -> None:
+        if asset_type not in self._totals:
+            raise InvalidOperationError("Asset type must be one of: stocks, bonds, etf.")
+        with self._lock:
+            if instrument in self._prices:
+                raise InvalidOperationError("Instrument already listed.")
+            self._prices[instrument] = cents
+            self._asset_types[instrument] = asset_type
+            self._holders[instrument] = {}
+            self._open_units[instrument] = 0
+
+    def _notify(self, change: BookChange, payload: object) -> None:
+        # Caller holds self._write_lock, so listeners see changes in order.
+        for listener in self._listeners:
+            listener(change, payload)
+
+    def _add_row(self, account_id: str) -> int:
+        row = len(self._ids)
+        self._rows[account_id] = row
+        self._ids.append(account_id)
+        if not self._use_numpy:
+            self._values.append(0)
+        elif row == len(self._values):
+            self._values = np.concatenate([self._values, np.zeros(row, dtype=np.int64)])
+        return row
+
+    def _vector(self, instrument: str) -> tuple:
+        vector = self._vectors.get(instrument)
+        if vector is None:
+            holders = self._holders[instrument]
+            vector = self._vectors[instrument] = (
+                np.fromiter(holders.keys(), dtype=np.int64, count=len(holders)),
+                np.fromiter(holders.values(), dtype=np.int64, count=len(holders)),
+            )
+        return vector
+
+    def _price_of(self, instrument: str) -> int:
+        cents = self._prices.get(instrument)
+        if cents is None:
+            raise InvalidOperationError("Unknown instrument.")
+        return cents
+
+
+def _price_cents(price: Decimal) -> int:
+    cents = Money.of(price).cents
+    if cents <= 0:
+        raise InvalidOperationError("Prices must be positive.")
+    return cents
+
+
+def read_ticks(path: str | Path) -> Iterator[tuple[str, int]]:
+    # Recorded feed: one "instrument,price" line per tick, oldest first. Feeds repeat
+    # the same price levels constantly, so parsed prices are remembered.
+    parsed: dict[str, int] = {}
+    with open(path, encoding="utf-8") as handle:
+        for number, line in enumerate(handle, start=1):
+            instrument, sep, text = line.rstrip("\n").partition(",")
+            if not sep:
+                if not line.strip():
+                    continue
+                raise InvalidOperationError(f"Malformed tick on line {number}.")
+            cents = parsed.get(text)
+            if cents is None:
+                if len(parsed) >= _PARSED_PRICES:
+                    parsed.clear()
+                try:
+                    cents = parsed[text] = Money.of(text).cents
+                except InvalidOperationError:
+                    raise InvalidOperationError(f"Malformed tick on line {number}.")
+            yield instrument, cents
+
+
+def replay_ticks(book: PriceBook, path: str | Path, *, batch: int = TICK_BATCH) -> int:
+    # Apply a recorded tick file to the book in batches; returns the number of ticks.
+    if batch <= 0:
+        raise InvalidOperationError("Batch size must be positive.")
+    ticks = read_ticks(path)
+    count = 0
+    while chunk := list(islice(ticks, batch)):
+        count += book.apply_ticks(chunk)
+    return count
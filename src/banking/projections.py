@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import math
+import multiprocessing
+import random
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Iterable, Sequence
+
+from banking.accounts.investment import ASSET_TYPES, InvestmentAccount
+from banking.errors import InvalidOperationError
+from banking.money import Money
+
+try:  # NumPy is optional; the pure-Python engine gives the same statistics more slowly.
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+__all__ = ["AssetModel", "DEFAULT_CORRELATION", "DEFAULT_MODELS", "ProjectionResult", "project_portfolios"]
+
+
+@dataclass(frozen=True)
+class AssetModel:
+    # Expected yearly return and its volatility (standard deviation) for one asset
+    # class; yearly returns are log-normal with this mean.
+    mean: float
+    volatility: float
+
+
+DEFAULT_MODELS: dict[str, AssetModel] = {
+    "stocks": AssetModel(mean=0.07, volatility=0.18),
+    "bonds": AssetModel(mean=0.03, volatility=0.06),
+    "etf": AssetModel(mean=0.06, volatility=0.15),
+}
+# Correlation of yearly returns, rows and columns in ASSET_TYPES order.
+DEFAULT_CORRELATION: tuple[tuple[float, ...], ...] = (
+    (1.0, 0.1, 0.9),
+    (0.1, 1.0, 0.2),
+    (0.9, 0.2, 1.0),
+)
+# Accounts valued per block; bounds memory at CHUNK_ACCOUNTS x scenarios floats.
+CHUNK_ACCOUNTS = 2_048
+
+
+@dataclass(frozen=True)
+class ProjectionResult:
+    # Portfolio value after `years` at each requested percentile, per account id and
+    # for the whole book (the percentiles of the per-scenario sum, not a sum of bands).
+    percentiles: tuple[float, ...]
+    accounts: dict[str, tuple[Decimal, ...]]
+    aggregate: tuple[Decimal, ...]
+    years: int
+    scenarios: int
+    seed: int
+
+
+def project_portfolios(
+    accounts: Iterable[InvestmentAccount],
+    *,
+    years: int = 1,
+    scenarios: int = 10_000,
+    seed: int = 0,
+    percentiles: Sequence[float] = (5, 50, 95),
+    models: dict[str, AssetModel] | None = None,
+    correlation: Sequence[Sequence[float]] = DEFAULT_CORRELATION,
+    workers: int = 0,
+    use_numpy: bool | None = None,
+) -> ProjectionResult:
+    # Monte Carlo projection of the stocks/bonds/etf holdings of every account. Each
+    # scenario is one market outcome shared by all accounts: a correlated draw of the
+    # asset classes' cumulative growth over `years`. Account values are then the
+    # holdings matrix times the growth matrix. The same seed gives the same result
+    # for any worker count; the NumPy and pure-Python engines use different random
+    # streams, so their results agree statistically, not digit for digit.
+    if years < 0 or scenarios <= 0:
+        raise InvalidOperationError("Years cannot be negative and scenarios must be positive.")
+    if any(not 0 <= q <= 100 for q in percentiles):
+        raise InvalidOperationError("Percentiles must be between 0 and 100.")
+    if use_numpy and np is None:
+        raise InvalidOperationError("NumPy is not installed.")
+    models = {**DEFAULT_MODELS, **(models or {})}
+    ids: list[str] = []
+    holdings: list[list[int]] = []
+    for account in accounts:
+        ids.append(account.id)
+        cents = account.portfolio_cents
+        holdings.append([cents[asset] for asset in ASSET_TYPES])
+    chol = _cholesky(correlation)
+    qs = tuple(float(q) for q in percentiles)
+    if np is not None if use_numpy is None else use_numpy:
+        bands, aggregate = _project_numpy(holdings, models, chol, years, scenarios, seed, qs, workers)
+    else:
+        bands, aggregate = _project_python(holdings, models, chol, years, scenarios, seed, qs)
+    return ProjectionResult(
+        percentiles=qs,
+        accounts={account_id: tuple(map(_to_money, row)) for account_id, row in zip(ids, bands)},
+        aggregate=tuple(map(_to_money, aggregate)),
+        years=years,
+        scenarios=scenarios,
+        seed=seed,
+    )
+
+
+def _drift_and_scale(models: dict[str, AssetModel], years: int) -> tuple[list[float], list[float]]:
+    # Parameters of the summed log-returns over the horizon: a yearly log-return of
+    # N(log(1 + mean) - v^2 / 2, v) keeps the expected gross return at 1 + mean.
+    drift, scale = [], []
+    for asset in ASSET_TYPES:
+        model = models[asset]
+        if model.mean <= -1 or model.volatility < 0:
+            raise InvalidOperationError(f"Invalid model for {asset}.")
+        drift.append(years * (math.log1p(model.mean) - model.volatility ** 2 / 2))
+        scale.append(model.volatility * math.sqrt(years))
+    return drift, scale
+
+
+def _cholesky(matrix: Sequence[Sequence[float]]) -> list[list[float]]:
+    size = len(ASSET_TYPES)
+    if len(matrix) != size or any(len(row) != size for row in matrix):
+        raise InvalidOperationError(f"Correlation must be a {size}x{size} matrix.")
+    lower = [[0.0] * size for _ in range(size)]
+    for i in range(size):
+        for j in range(i + 1):
+            if matrix[i][j] != matrix[j][i]:
+                raise InvalidOperationError("Correlation matrix must be symmetric.")
+            total = matrix[i][j] - sum(lower[i][k] * lower[j][k] for k in range(j))
+            if i == j:
+                if total <= 0:
+                    raise InvalidOperationError("Correlation matrix must be positive definite.")
+                lower[i][i] = math.sqrt(total)
+            else:
+                lower[i][j] = total / lower[j][j]
+    return lower
+
+
+def _to_money(cents: float) -> Decimal:
+    return Money(int(round(cents))).to_decimal()
+
+
+def _project_numpy(holdings, models, chol, years, scenarios, seed, qs, workers):
+    drift, scale = _drift_and_scale(models, years)
+    rng = np.random.default_rng(seed)
+    shocks = rng.standard_normal((scenarios, len(ASSET_TYPES))) @ np.asarray(chol).T
+    growth = np.exp(np.asarray(drift) + shocks * np.asarray(scale))  # scenarios x assets
+    book = np.asarray(holdings, dtype=np.float64).reshape(-1, len(ASSET_TYPES))
+    chunks = [(book[start:start + CHUNK_ACCOUNTS], growth, qs) for start in range(0, len(book), CHUNK_ACCOUNTS)]
+    if workers > 1 and len(chunks) > 1:
+        with multiprocessing.get_context().Pool(workers) as pool:
+            results = pool.starmap(_value_chunk, chunks)
+    else:
+        results = [_value_chunk(*chunk) for chunk in chunks]
+    bands = [row for chunk_bands, _ in results for row in chunk_bands.tolist()]
+    totals = np.zeros(scenarios)
+    for _, chunk_totals in results:
+        totals += chunk_totals
+    return bands, np.percentile(totals, qs).tolist()
+
+
+def _value_chunk(holdings, growth, qs):
+    # Per-account percentile bands and per-scenario totals for one block of accounts.
+    values = holdings @ growth.T  # accounts x scenarios
+    return np.percentile(values, qs, axis=1).T, values.sum(axis=0)
+
+
+def _project_python(holdings, models, chol, years, scenarios, seed, qs):
+    drift, scale = _drift_and_scale(models, years)
+    rng = random.Random(seed)
+    size = len(ASSET_TYPES)
+    growth = []
+    for _ in range(scenarios):
+        normals = [rng.gauss(0.0, 1.0) for _ in range(size)]
+        shocks = [sum(chol[i][k] * normals[k] for k in range(i + 1)) for i in range(size)]
+        growth.append([math.exp(drift[i] + shocks[i] * scale[i]) for i in range(size)])
+    totals = [0.0] * scenarios
+    bands = []
+    for row in holdings:
+        values = [sum(h * g for h, g in zip(row, factors)) for factors in growth]
+        for index, value in enumerate(values):
+            totals[index] += value
+        values.sort()
+        bands.append([_percentile(values, q) for q in qs])
+    totals.sort()
+    return bands, [_percentile(totals, q) for q in qs]
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    # Linear interpolation between closest ranks, as numpy.percentile does by default.
+    position = (len(ordered) - 1) * q / 100
+    low = math.floor(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import struct
+from decimal import Decimal
+from enum import Enum
+
+from banking.errors import (
+    AccountClosedError,
+    AccountFrozenError,
+    InsufficientFundsError,
+    InvalidOperationError,
+    ProtocolError,
+)
+
+__all__ = ["MAX_FRAME_SIZE", "encode_frame", "error_class", "read_frame"]
+
+# Every message is a 4-byte big-endian length followed by that many bytes of UTF-8 JSON.
+# Requests: {"id": int, "method": str, "params": {...}}
+# Replies:  {"id": int, "result": ...} or {"id": int, "error": {"type": str, "message": str}}
+# Money travels as decimal strings so no precision is lost to JSON floats.
+_LENGTH = struct.Struct(">I")
+MAX_FRAME_SIZE = 1 << 20
+
+_ERRORS = {
+    cls.__name__: cls
+    for cls in (
+        AccountClosedError,
+        AccountFrozenError,
+        InsufficientFundsError,
+        InvalidOperationError,
+        ProtocolError,
+    )
+}
+
+
+def encode_frame(message: dict) -> bytes:
+    body = json.dumps(message, separators=(",", ":"), default=_default).encode()
+    if len(body) > MAX_FRAME_SIZE:
+        raise ProtocolError("Message is too large.")
+    return _LENGTH.pack(len(body)) + body
+
+
+async def read_frame(reader: asyncio.StreamReader, max_size: int = MAX_FRAME_SIZE) -> dict | None:
+    # Next message from the stream, or None when the peer closed between messages.
+    try:
+        header = await reader.readexactly(_LENGTH.size)
+    except asyncio.IncompleteReadError as exc:
+        if exc.partial:
+            raise ProtocolError("Connection closed mid-frame.") from None
+        return None
+    (length,) = _LENGTH.unpack(header)
+    if length > max_size:
+        raise ProtocolError("Message is too large.")
+    try:
+        body = await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        raise ProtocolError("Connection closed mid-frame.") from None
+    try:
+        message = json.loads(body)
+    except ValueError:
+        raise ProtocolError("Message is not valid JSON.") from None
+    if not isinstance(message, dict):
+        raise ProtocolError("Message must be a JSON object.")
+    return message
+
+
+def error_class(name: str) -> type[Exception]:
+    # Map an error type name from a reply back to the local exception class.
+    return _ERRORS.get(name, InvalidOperationError)
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Cannot serialize {type(value).__name__}.")
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from decimal import Decimal
+from itertools import chain, islice
+from typing import Iterable, Iterator
+
+from banking.errors import InvalidOperationError
+from banking.money import Money
+
+__all__ = ["ClientRanking"]
+
+# Keys per bucket of _SortedKeys; a bucket is split when it grows past twice this.
+_LOAD = 512
+
+
+class ClientRanking:
+    # Running per-client totals in cents kept in sorted (-total, seq, client_id) keys.
+    # seq is the registration order, which reproduces the tie order of a stable
+    # sort over the client dict.
+
+    def __init__(self) -> None:
+        self._totals: dict[str, int] = {}
+        self._seq: dict[str, int] = {}
+        self._keys = _SortedKeys()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, client_id: object) -> bool:
+        return client_id in self._totals
+
+    def add_client(self, client_id: str) -> None:
+        if client_id in self._totals:
+            return
+        seq = len(self._seq)
+        self._totals[client_id] = 0
+        self._seq[client_id] = seq
+        self._keys.add((0, seq, client_id))
+
+    @classmethod
+    def from_totals(cls, client_ids: Iterable[str], totals: dict[str, int]) -> ClientRanking:
+        # Bulk build with a single sort; client_ids gives the registration order.
+        ranking = cls()
+        keys = []
+        for seq, client_id in enumerate(client_ids):
+            total = totals.get(client_id, 0)
+            ranking._totals[client_id] = total
+            ranking._seq[client_id] = seq
+            keys.append((-total, seq, client_id))
+        keys.sort()
+        ranking._keys = _SortedKeys(keys)
+        return ranking
+
+    def adjust(self, client_id: str, delta: int) -> None:
+        # Apply a signed change in cents to a client's total and reposition it.
+        total = self._totals.get(client_id)
+        if total is None or not delta:
+            return
+        seq = self._seq[client_id]
+        self._keys.remove((-total, seq, client_id))
+        total += delta
+        self._totals[client_id] = total
+        self._keys.add((-total, seq, client_id))
+
+    def adjust_many(self, deltas: dict[str, int]) -> None:
+        # Apply several clients' changes at once. When a sizeable share of the clients
+        # moves, one re-sort is cheaper than repositioning each key separately.
+        if len(deltas) * 16 < len(self._keys):
+            for client_id, delta in deltas.items():
+                self.adjust(client_id, delta)
+            return
+        totals, seq = self._totals, self._seq
+        for client_id, delta in deltas.items():
+            if client_id in totals:
+                totals[client_id] += delta
+        self._keys = _SortedKeys(sorted((-total, seq[client_id], client_id) for client_id, total in totals.items()))
+
+    def total(self, client_id: str) -> Decimal:
+        return Money(self._total_cents(client_id)).to_decimal()
+
+    def rank(self, client_id: str) -> int:
+        # Zero-based position of the client in the ranking.
+        total = self._total_cents(client_id)
+        return self._keys.index((-total, self._seq[client_id], client_id))
+
+    def top(self, k: int) -> list[tuple[str, Decimal]]:
+        return self.window(0, k)
+
+    def window(self, offset: int, limit: int) -> list[tuple[str, Decimal]]:
+        if offset < 0 or limit < 0:
+            raise InvalidOperationError("Offset and limit cannot be negative.")
+        page = self._keys.window(offset, limit)
+        return [(client_id, Money(-neg).to_decimal()) for neg, _, client_id in page]
+
+    def items(self) -> list[tuple[str, Decimal]]:
+        return [(client_id, Money(-neg).to_decimal()) for neg, _, client_id in self._keys]
+
+    def _total_cents(self, client_id: str) -> int:
+        total = self._totals.get(client_id)
+        if total is None:
+            raise InvalidOperationError("Client not found.")
+        return total
+
+
+class _SortedKeys:
+    # Sorted list split into buckets of at most 2 * _LOAD keys, with each bucket's
+    # last key in _maxes. An insert or delete bisects _maxes and shifts one bucket,
+    # O(log n + _LOAD), where one flat list would move half of all keys; rank sums
+    # the sizes of the buckets before the key's.
+
+    def __init__(self, keys: list[tuple[int, int, str]] | None = None) -> None:
+        # keys must already be sorted.
+        keys = keys or []
+        self._buckets = [keys[start:start + _LOAD] for start in range(0, len(keys), _LOAD)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._len = len(keys)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[tuple[int, int, str]]:
+        return chain.from_iterable(self._buckets)
+
+    def add(self, key: tuple[int, int, str]) -> None:
+        buckets, maxes = self._buckets, self._maxes
+        self._len += 1
+        if not buckets:
+            buckets.append([key])
+            maxes.append(key)
+            return
+        position = bisect_left(maxes, key)
+        if position == len(maxes):
+            position -= 1
+            bucket = buckets[position]
+            bucket.append(key)
+            maxes[position] = key
+        else:
+            bucket = buckets[position]
+            insort(bucket, key)
+        if len(bucket) > 2 * _LOAD:
+            buckets[position:position + 1] = [bucket[:_LOAD], bucket[_LOAD:]]
+            maxes[position:position + 1] = [bucket[_LOAD - 1], bucket[-1]]
+
+    def remove(self, key: tuple[int, int, str]) -> None:
+        position = bisect_left(self._maxes, key)
+        bucket = self._buckets[position]
+        del bucket[bisect_left(bucket, key)]
+        self._len -= 1
+        if bucket:
+            self._maxes[position] = bucket[-1]
+        else:
+            del self._buckets[position]
+            del self._maxes[position]
+
+    def index(self, key: tuple[int, int, str]) -> int:
+        position = bisect_left(self._maxes, key)
+        if position == len(self._maxes):
+            return self._len
+        return sum(map(len, self._buckets[:position])) + bisect_left(self._buckets[position], key)
+
+    def window(self, offset: int, limit: int) -> list[tuple[int, int, str]]:
+        # Keys [offset, offset + limit), skipping whole buckets before offset.
+        for position, bucket in enumerate(self._buckets):
+            if offset < len(bucket):
+                rest = chain.from_iterable(islice(self._buckets, position + 1, None))
+                return list(islice(chain(bucket[offset:], rest), limit))
+            offset -= len(bucket)
+        return []
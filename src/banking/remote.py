@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+from decimal import Decimal
+
+from banking.errors import ProtocolError
+from banking.protocol import encode_frame, error_class, read_frame
+from banking.types import AccountStatus, AccountType, Currency
+
+__all__ = ["AsyncBankClient"]
+
+
+class AsyncBankClient:
+    # Async client for BankServer. Calls may be issued concurrently on one connection;
+    # they are pipelined and matched to replies by id. At most max_in_flight requests
+    # are outstanding, so a slow server pushes back on the caller instead of growing
+    # the pending table without bound.
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        *,
+        max_in_flight: int = 128,
+    ) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count(1)
+        self._pending: dict[int, asyncio.Future] = {}
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._closed = False
+        self._receiver = asyncio.create_task(self._receive())
+
+    @classmethod
+    async def connect(
+        cls,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        *,
+        path: str | None = None,
+        max_in_flight: int = 128,
+    ) -> AsyncBankClient:
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer, max_in_flight=max_in_flight)
+
+    async def call(self, method: str, **params):
+        # Send one request and wait for its reply; server errors are re-raised locally.
+        if self._closed:
+            raise ConnectionError("Client is closed.")
+        async with self._slots:
+            request_id = next(self._ids)
+            future = asyncio.get_running_loop().create_future()
+            self._pending[request_id] = future
+            try:
+                self._writer.write(encode_frame({"id": request_id, "method": method, "params": params}))
+                await self._writer.drain()
+                reply = await future
+            finally:
+                self._pending.pop(request_id, None)
+        error = reply.get("error")
+        if error is not None:
+            raise error_class(error.get("type", ""))(error.get("message", ""))
+        return reply.get("result")
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        await asyncio.gather(self._receiver, return_exceptions=True)
+
+    async def __aenter__(self) -> AsyncBankClient:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def ping(self) -> str:
+        return await self.call("ping")
+
+    async def authenticate_client(self, client_id: str, password: str) -> bool:
+        return await self.call("authenticate_client", client_id=client_id, password=password)
+
+    async def login(self, client_id: str, password: str) -> str | None:
+        # Session token on success, None when the credentials were rejected.
+        return await self.call("login", client_id=client_id, password=password)
+
+    async def logout(self, token: str) -> None:
+        await self.call("logout", token=token)
+
+    async def open_account(
+        self,
+        client_id: str,
+        *,
+        token: str,
+        account_type: AccountType | str = AccountType.BASE,
+        currency: Currency | str = Currency.USD,
+        balance: Decimal | str = "0",
+        options: dict | None = None,
+    ) -> dict:
+        return await self.call(
+            "open_account",
+            client_id=client_id,
+            token=token,
+            account_type=AccountType(account_type).value,
+            currency=Currency(currency).value,
+            balance=str(balance),
+            options=_stringify_options(options or {}),
+        )
+
+    # open_account, deposit, withdraw and transfer need the token from login.
+    async def deposit(self, account_id: str, amount: Decimal | str, *, token: str) -> Decimal:
+        return Decimal(await self.call("deposit", account_id=account_id, amount=str(amount), token=token))
+
+    async def withdraw(self, account_id: str, amount: Decimal | str, *, token: str) -> Decimal:
+        return Decimal(await self.call("withdraw", account_id=account_id, amount=str(amount), token=token))
+
+    async def transfer(
+        self, src_account_id: str, dst_account_id: str, amount: Decimal | str, *, token: str
+    ) -> None:
+        await self.call(
+            "transfer",
+            src_account_id=src_account_id,
+            dst_account_id=dst_account_id,
+            amount=str(amount),
+            token=token,
+        )
+
+    # search_accounts and get_client_rank need the session token (they answer for the
+    # session client only) or the server's operator token; bank-wide reports need the
+    # operator token.
+    async def search_accounts(
+        self,
+        *,
+        token: str | None = None,
+        operator_token: str | None = None,
+        client_id: str | None = None,
+        status: AccountStatus | None = None,
+        currency: Currency | None = None,
+    ) -> list[dict]:
+        params = {"client_id": client_id, "token": token, "operator_token": operator_token}
+        if status is not None:
+            params["status"] = AccountStatus(status).value
+        if currency is not None:
+            params["currency"] = Currency(currency).value
+        return await self.call("search_accounts", **params)
+
+    async def get_total_balance(self, currency: Currency | str | None = None, *, operator_token: str) -> Decimal:
+        params = {"currency": Currency(currency).value} if currency is not None else {}
+        return Decimal(await self.call("get_total_balance", operator_token=operator_token, **params))
+
+    async def get_subtotals(self, *, operator_token: str) -> dict[Currency, Decimal]:
+        totals = await self.call("get_subtotals", operator_token=operator_token)
+        return {Currency(code): Decimal(total) for code, total in totals.items()}
+
+    async def get_clients_ranking(self, *, operator_token: str) -> list[tuple[str, Decimal]]:
+        return _ranking(await self.call("get_clients_ranking", operator_token=operator_token))
+
+    async def get_top_clients(self, k: int, *, operator_token: str) -> list[tuple[str, Decimal]]:
+        return _ranking(await self.call("get_top_clients", k=k, operator_token=operator_token))
+
+    async def get_client_rank(
+        self, client_id: str, *, token: str | None = None, operator_token: str | None = None
+    ) -> int:
+        return await self.call("get_client_rank", client_id=client_id, token=token, operator_token=operator_token)
+
+    async def get_clients_ranking_page(
+        self, offset: int, limit: int, *, operator_token: str
+    ) -> list[tuple[str, Decimal]]:
+        page = await self.call("get_clients_ranking_page", offset=offset, limit=limit, operator_token=operator_token)
+        return _ranking(page)
+
+    async def _receive(self) -> None:
+        error: BaseException = ConnectionError("Connection closed by server.")
+        try:
+            while True:
+                reply = await read_frame(self._reader)
+                if reply is None:
+                    break
+                future = self._pending.get(reply.get("id"))
+                if future is not None and not future.done():
+                    future.set_result(reply)
+        except (ConnectionError, ProtocolError) as exc:
+            error = exc
+        finally:
+            self._closed = True
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+
+
+def _ranking(items: list) -> list[tuple[str, Decimal]]:
+    return [(client_id, Decimal(total)) for client_id, total in items]
+
+
+def _stringify_options(options: dict) -> dict:
+    return {
+        name: {key: str(item) for key, item in value.items()} if isinstance(value, dict) else str(value)
+        for name, value in options.items()
+    }
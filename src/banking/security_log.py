@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import threading
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+from banking.errors import InvalidOperationError
+
+__all__ = ["BankSecurityLog", "SecurityLog"]
+
+
+@dataclass
+class BankSecurityLog:
+    client_id: str
+    reason: str
+    created_at: datetime
+
+
+class SecurityLog:
+    # Security events with bounded memory. The newest `capacity` events live in a ring
+    # buffer indexed by sequence number, with a per-client deque of sequence numbers.
+    # Events are assumed to arrive in created_at order, so time ranges are binary
+    # searches. With a directory, every event is also handed to a background writer
+    # that appends it to gzip segments and rotates them; older history is then served
+    # from the segments whose time range and client set can match the query. Without
+    # one, events past capacity are dropped; attach_archive adds a directory later.
+
+    def __init__(
+        self,
+        capacity: int = 10_000,
+        *,
+        directory: str | Path | None = None,
+        segment_size: int = 100_000,
+        flush_interval: float = 0.5,
+    ) -> None:
+        if capacity <= 0:
+            raise InvalidOperationError("Security log capacity must be positive.")
+        self._capacity = capacity
+        self._ring: list[BankSecurityLog | None] = [None] * capacity
+        self._by_client: dict[str, deque[int]] = {}
+        self._lock = threading.Lock()
+        self._archive = _Archive(Path(directory), segment_size, flush_interval) if directory else None
+        # Sequence numbers continue across restarts so segment names stay unique.
+        self._first = self._next = self._archive.next_seq if self._archive else 0
+
+    def __len__(self) -> int:
+        return self._next - self._first
+
+    def append(self, event: BankSecurityLog) -> None:
+        with self._lock:
+            self._append(event)
+
+    def attach_archive(
+        self, directory: str | Path, *, segment_size: int = 100_000, flush_interval: float = 0.5
+    ) -> None:
+        # Start archiving into directory. Events still in memory are archived first, so
+        # nothing logged before the call is lost once it is evicted.
+        with self._lock:
+            if self._archive is not None:
+                raise InvalidOperationError("Security log is already archived.")
+            events = [self._ring[seq % self._capacity] for seq in range(self._first, self._next)]
+            self._archive = _Archive(Path(directory), segment_size, flush_interval)
+            self._ring = [None] * self._capacity
+            self._by_client = {}
+            self._first = self._next = self._archive.next_seq
+            for event in events:
+                self._append(event)
+
+    def recent(self) -> list[BankSecurityLog]:
+        # Events still held in memory, oldest first.
+        with self._lock:
+            return [self._ring[seq % self._capacity] for seq in range(self._first, self._next)]
+
+    def query(
+        self,
+        *,
+        client_id: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: int | None = None,
+    ) -> list[BankSecurityLog]:
+        # Events matching every given filter, oldest first; since is inclusive and
+        # until exclusive. With a limit, the newest `limit` matches are returned.
+        with self._lock:
+            events = self._query_memory(client_id, since, until)
+            first = self._first
+            # Nothing older than the oldest event in memory can fall inside the range.
+            history_needed = self._archive is not None and not (
+                since is not None and first < self._next and self._ring_time(first) < since
+            )
+        if history_needed and (limit is None or len(events) < limit):
+            events = list(self._archive.query(client_id, since, until, before_seq=first)) + events
+        return events[-limit:] if limit is not None else events
+
+    def flush(self) -> None:
+        # Wait until the background writer has written every submitted event.
+        if self._archive is not None:
+            self._archive.flush()
+
+    def close(self) -> None:
+        if self._archive is not None:
+            self._archive.close()
+
+    def _append(self, event: BankSecurityLog) -> None:
+        seq = self._next
+        if seq - self._first == self._capacity:
+            self._evict_oldest()
+        self._ring[seq % self._capacity] = event
+        self._by_client.setdefault(event.client_id, deque()).append(seq)
+        self._next = seq + 1
+        if self._archive is not None:
+            self._archive.submit(seq, event)
+
+    def _query_memory(
+        self,
+        client_id: str | None,
+        since: datetime | None,
+        until: datetime | None,
+    ) -> list[BankSecurityLog]:
+        ring = self._ring
+        capacity = self._capacity
+        if client_id is not None:
+            seqs = self._by_client.get(client_id)
+            if not seqs:
+                return []
+            seqs = list(seqs)
+        else:
+            seqs = range(self._first, self._next)
+
+        def created_at(seq: int) -> datetime:
+            return ring[seq % capacity].created_at
+
+        low = 0 if since is None else bisect_left(seqs, since, key=created_at)
+        high = len(seqs) if until is None else bisect_left(seqs, until, key=created_at)
+        return [ring[seq % capacity] for seq in seqs[low:high]]
+
+    def _evict_oldest(self) -> None:
+        seq = self._first
+        event = self._ring[seq % self._capacity]
+        seqs = self._by_client[event.client_id]
+        seqs.popleft()
+        if not seqs:
+            del self._by_client[event.client_id]
+        self._ring[seq % self._capacity] = None
+        self._first = seq + 1
+
+    def _ring_time(self, seq: int) -> datetime:
+        return self._ring[seq % self._capacity].created_at
+
+
+@dataclass
+class _Segment:
+    path: str
+    first_seq: int
+    last_seq: int
+    first_time: str
+    last_time: str
+    clients: list[str]
+
+    def may_contain(self, client_id: str | None, since: str | None, until: str | None, before_seq: int) -> bool:
+        if self.first_seq >= before_seq:
+            return False
+        if since is not None and self.last_time < since:
+            return False
+        if until is not None and self.first_time >= until:
+            return False
+        return client_id is None or client_id in self.clients
+
+
+class _Archive:
+    # Background writer for gzip segments plus the manifest used to skip segments.
+    # Times are compared as ISO strings, which sort like the datetimes they encode.
+
+    _MANIFEST = "segments.json"
+
+    def __init__(self, directory: Path, segment_size: int, flush_interval: float) -> None:
+        if segment_size <= 0:
+            raise InvalidOperationError("Segment size must be positive.")
+        directory.mkdir(parents=True, exist_ok=True)
+        self._directory = directory
+        self._segment_size = segment_size
+        self._flush_interval = flush_interval
+        self._segments = self._load_manifest()
+        self.next_seq = self._segments[-1].last_seq + 1 if self._segments else 0
+        self._pending: list[tuple[int, BankSecurityLog]] = []
+        self._submitted = self._written = self.next_seq
+        self._cond = threading.Condition()
+        self._closed = False
+        self._error: BaseException | None = None
+        self._current: _Segment | None = None
+        self._current_clients: set[str] = set()
+        self._handle: gzip.GzipFile | None = None
+        self._writer = threading.Thread(target=self._run, name="banking-security-log", daemon=True)
+        self._writer.start()
+
+    def submit(self, seq: int, event: BankSecurityLog) -> None:
+        with self._cond:
+            if not self._pending:
+                self._cond.notify_all()
+            self._pending.append((seq, event))
+            self._submitted = seq + 1
+
+    def flush(self) -> None:
+        with self._cond:
+            target = self._submitted
+            while self._written < target and self._error is None and self._writer.is_alive():
+                self._cond.notify_all()
+                self._cond.wait(self._flush_interval)
+            if self._error is not None:
+                raise InvalidOperationError(f"Security log write failed: {self._error}")
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join()
+
+    def query(
+        self,
+        client_id: str | None,
+        since: datetime | None,
+        until: datetime | None,
+        *,
+        before_seq: int,
+    ) -> Iterator[BankSecurityLog]:
+        self.flush()
+        since_text = since.isoformat() if since is not None else None
+        until_text = until.isoformat() if until is not None else None
+        with self._cond:
+            segments = list(self._segments)
+            if self._current is not None:
+                segments.append(self._snapshot_current())
+        for segment in segments:
+            if not segment.may_contain(client_id, since_text, until_text, before_seq):
+                continue
+            for seq, record in _read_segment(self._directory / segment.path):
+                if seq >= before_seq:
+                    break
+                if client_id is not None and record["client_id"] != client_id:
+                    continue
+                created = record["created_at"]
+                if (since_text is not None and created < since_text) or (
+                    until_text is not None and created >= until_text
+                ):
+                    continue
+                yield BankSecurityLog(
+                    client_id=record["client_id"],
+                    reason=record["reason"],
+                    created_at=datetime.fromisoformat(created),
+                )
+
+    def _run(self) -> None:
+        # File IO happens outside the lock so appenders never wait for the disk; the
+        # lock only covers the batch hand-off and segment metadata.
+        try:
+            while True:
+                with self._cond:
+                    while not self._pending and not self._closed:
+                        self._cond.wait()
+                    batch, self._pending = self._pending, []
+                    closing = self._closed
+                for seq, event in batch:
+                    self._write(seq, event)
+                if self._handle is not None:
+                    self._handle.flush()
+                with self._cond:
+                    if batch:
+                        self._written = batch[-1][0] + 1
+                    self._cond.notify_all()
+                if closing:
+                    self._rotate()
+                    return
+        except BaseException as exc:  # surface IO errors to flush() callers
+            with self._cond:
+                self._error = exc
+                self._cond.notify_all()
+
+    def _write(self, seq: int, event: BankSecurityLog) -> None:
+        created = event.created_at.isoformat()
+        if self._current is None:
+            name = f"security-{seq:012d}.jsonl.gz"
+            self._handle = gzip.open(self._directory / name, "ab")
+            with self._cond:
+                self._current = _Segment(name, seq, seq, created, created, [])
+                self._current_clients = set()
+        record = {"seq": seq, "client_id": event.client_id, "reason": event.reason, "created_at": created}
+        self._handle.write(json.dumps(record, separators=(",", ":")).encode() + b"\n")
+        with self._cond:
+            self._current.last_seq = seq
+            self._current.last_time = created
+            self._current_clients.add(event.client_id)
+        if seq - self._current.first_seq + 1 >= self._segment_size:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        # Close the open segment and record it in the manifest.
+        if self._current is None:
+            return
+        self._handle.close()
+        self._handle = None
+        with self._cond:
+            self._segments.append(self._snapshot_current())
+            self._current = None
+            segments = [segment.__dict__ for segment in self._segments]
+        manifest = self._directory / self._MANIFEST
+        tmp = manifest.with_name(manifest.name + ".tmp")
+        tmp.write_text(json.dumps(segments))
+        os.replace(tmp, manifest)
+
+    def _snapshot_current(self) -> _Segment:
+        current = self._current
+        return _Segment(
+            current.path, current.first_seq, current.last_seq, current.first_time, current.last_time,
+            sorted(self._current_clients),
+        )
+
+    def _load_manifest(self) -> list[_Segment]:
+        manifest = self._directory / self._MANIFEST
+        segments = [_Segment(**item) for item in json.loads(manifest.read_text())] if manifest.exists() else []
+        known = {segment.path for segment in segments}
+        # A segment missing from the manifest was open when the process stopped.
+        for path in sorted(self._directory.glob("security-*.jsonl.gz")):
+            if path.name in known:
+                continue
+            records = list(_read_segment(path))
+            if records:
+                times = [record["created_at"] for _, record in records]
+                clients = sorted({record["client_id"] for _, record in records})
+                segments.append(_Segment(path.name, records[0][0], records[-1][0], times[0], times[-1], clients))
+        segments.sort(key=lambda segment: segment.first_seq)
+        return segments
+
+
+def _read_segment(path: Path) -> Iterator[tuple[int, dict]]:
+    # Records of one segment; a segment that is still open (or was cut short by a
+    # crash) has no gzip trailer, which only ends iteration early.
+    with gzip.open(path, "rb") as handle:
+        try:
+            for line in handle:
+                if not line.endswith(b"\n"):
+                    return
+                record = json.loads(line)
+                yield record["seq"], record
+        except (EOFError, gzip.BadGzipFile):
+            return
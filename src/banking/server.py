@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import asyncio
+import hmac
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Callable
+
+from banking.bank import ACCOUNT_TYPE_MAP, Bank
+from banking.errors import (
+    AccountClosedError,
+    AccountFrozenError,
+    InsufficientFundsError,
+    InvalidOperationError,
+    ProtocolError,
+)
+from banking.protocol import encode_frame, read_frame
+from banking.types import AccountStatus, AccountType, Currency
+
+__all__ = ["BankServer", "serve"]
+
+_CLIENT_ERRORS = (
+    AccountClosedError,
+    AccountFrozenError,
+    InsufficientFundsError,
+    InvalidOperationError,
+    ProtocolError,
+)
+
+# Methods that scan many accounts run on the executor so they cannot stall the event
+# loop; logins await the bank's KDF pool; everything else is a short in-memory update
+# and runs inline.
+_INLINE = frozenset({
+    "ping", "logout", "open_account", "deposit", "withdraw", "transfer", "get_client_rank",
+})
+# Inline calls that publish events. The loop thread never waits for room behind
+# Overflow.BLOCK subscribers inside the bank; these wait here, asynchronously.
+_PRODUCING = frozenset({"open_account", "deposit", "withdraw", "transfer"})
+_ROOM_POLL_SECONDS = 0.005
+_ASYNC = frozenset({"authenticate_client", "login"})
+_BLOCKING = frozenset({
+    "search_accounts", "get_total_balance", "get_subtotals", "get_clients_ranking", "get_top_clients",
+    "get_clients_ranking_page",
+})
+
+
+class BankServer:
+    # Serves Bank operations over the length-prefixed JSON protocol in banking.protocol.
+    #
+    # Each connection has a reader task and a worker task joined by a bounded queue.
+    # Clients may pipeline requests; they are executed and answered in order. When a
+    # client sends faster than it reads replies, writer.drain() stalls the worker, the
+    # queue fills, the reader stops reading and TCP flow control pushes back on the
+    # client. Scans go to a bounded thread pool (Bank is thread-safe).
+    #
+    # open_account, deposit, withdraw and transfer take the session token from login
+    # and act only on the session client's own accounts (for transfers, the source).
+    # search_accounts and get_client_rank take the same token and only answer for the
+    # session client, or for anyone with operator_token. Bank-wide reports (totals,
+    # subtotals, rankings) need operator_token; without one configured they are off.
+    #
+    # Money moves run inline, so they must not block the loop on a slow
+    # Overflow.BLOCK event subscriber: they wait for room asynchronously, up to
+    # backpressure_timeout seconds, and then fail with a "try again" error.
+
+    def __init__(
+        self,
+        bank: Bank,
+        *,
+        max_workers: int = 4,
+        max_pending: int = 64,
+        clock: Callable[[], datetime] = datetime.now,
+        operator_token: str | None = None,
+        backpressure_timeout: float = 5.0,
+    ) -> None:
+        if max_workers <= 0 or max_pending <= 0:
+            raise InvalidOperationError("max_workers and max_pending must be positive.")
+        self._bank = bank
+        self._operator_token = operator_token
+        self._backpressure_timeout = backpressure_timeout
+        self._max_pending = max_pending
+        self._clock = clock
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="banking-server")
+        # Caps queued executor jobs at the pool size instead of letting them pile up.
+        self._executor_slots: asyncio.Semaphore | None = None
+        self._max_workers = max_workers
+        self._server: asyncio.AbstractServer | None = None
+        self._connections: set[asyncio.Task] = set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0, *, path: str | None = None) -> None:
+        # Listen on TCP, or on a Unix socket when path is given.
+        if self._server is not None:
+            raise InvalidOperationError("Server is already running.")
+        self._executor_slots = asyncio.Semaphore(self._max_workers)
+        self._bank.events.exempt_thread()
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._on_connection, path=path)
+        else:
+            self._server = await asyncio.start_server(self._on_connection, host, port, backlog=4096)
+
+    @property
+    def address(self):
+        # (host, port) for TCP or the socket path for Unix sockets.
+        if self._server is None:
+            raise InvalidOperationError("Server is not running.")
+        return self._server.sockets[0].getsockname()
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            raise InvalidOperationError("Server is not running.")
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> BankServer:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _on_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        queue: asyncio.Queue[dict | None] = asyncio.Queue(self._max_pending)
+        # Failed logins are also counted per peer address; Unix sockets have none.
+        peer = writer.get_extra_info("peername")
+        source = peer[0] if isinstance(peer, tuple) else None
+        tasks = {
+            asyncio.create_task(self._read(reader, queue)),
+            asyncio.create_task(self._work(queue, writer, source)),
+        }
+        try:
+            # Ends when both finish, or early when either side of the connection fails.
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        except asyncio.CancelledError:
+            pass  # server shutdown; the handler task must not end cancelled or asyncio logs it
+        finally:
+            for child in tasks:
+                child.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._connections.discard(task)
+            writer.close()
+
+    async def _read(self, reader: asyncio.StreamReader, queue: asyncio.Queue) -> None:
+        while True:
+            try:
+                request = await read_frame(reader)
+            except ProtocolError:
+                request = None  # a malformed stream cannot be resynchronized; hang up
+            await queue.put(request)
+            if request is None:
+                return
+
+    async def _work(self, queue: asyncio.Queue, writer: asyncio.StreamWriter, source: str | None) -> None:
+        while True:
+            request = await queue.get()
+            if request is None:
+                return
+            writer.write(encode_frame(await self._dispatch(request, source)))
+            await writer.drain()
+
+    async def _dispatch(self, request: dict, source: str | None = None) -> dict:
+        request_id = request.get("id")
+        method = request.get("method")
+        params = request.get("params") or {}
+        try:
+            if not isinstance(params, dict):
+                raise ProtocolError("params must be an object.")
+            if method in _INLINE:
+                if method in _PRODUCING:
+                    await self._wait_for_event_room()
+                result = self._call(method, params)
+            elif method in _ASYNC:
+                # The peer address comes from the socket, never from the request.
+                result = await self._call(method, {**params, "source": source})
+            elif method in _BLOCKING:
+                async with self._executor_slots:
+                    loop = asyncio.get_running_loop()
+                    result = await loop.run_in_executor(self._executor, self._call, method, params)
+            else:
+                raise ProtocolError(f"Unknown method: {method!r}.")
+        except _CLIENT_ERRORS as exc:
+            return {"id": request_id, "error": {"type": type(exc).__name__, "message": str(exc)}}
+        except (KeyError, TypeError, ValueError, InvalidOperation) as exc:
+            return {"id": request_id, "error": {"type": "InvalidOperationError", "message": f"Bad params: {exc}"}}
+        return {"id": request_id, "result": result}
+
+    async def _wait_for_event_room(self) -> None:
+        events = self._bank.events
+        if events.has_room():
+            return
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._backpressure_timeout
+        while not events.has_room():
+            if loop.time() >= deadline:
+                raise InvalidOperationError("Event subscribers are behind; try again later.")
+            await asyncio.sleep(_ROOM_POLL_SECONDS)
+
+    def _call(self, method: str, params: dict):
+        return getattr(self, f"_rpc_{method}")(**params)
+
+    def _rpc_ping(self) -> str:
+        return "pong"
+
+    async def _rpc_authenticate_client(self, client_id: str, password: str, source: str | None) -> bool:
+        return await self._bank.authenticate_client_async(client_id, password, source=source)
+
+    async def _rpc_login(self, client_id: str, password: str, source: str | None) -> str | None:
+        return await self._bank.login_async(client_id, password, source=source)
+
+    def _rpc_logout(self, token: str) -> None:
+        self._bank.logout(token)
+
+    def _rpc_open_account(
+        self,
+        client_id: str,
+        token: str | None = None,
+        account_type: str = AccountType.BASE.value,
+        currency: str = Currency.USD.value,
+        balance: str = "0",
+        options: dict | None = None,
+    ) -> dict:
+        if self._bank.session_client(token) != client_id:
+            raise InvalidOperationError("Client does not match this session.")
+        account_type = AccountType(account_type)
+        _, options_cls = ACCOUNT_TYPE_MAP[account_type]
+        account = self._bank.open_account(
+            client_id,
+            account_type=account_type,
+            currency=Currency(currency),
+            balance=Decimal(balance),
+            now=self._clock(),
+            options=options_cls(**_decimal_options(options or {})),
+        )
+        return account.get_account_info()
+
+    def _rpc_deposit(self, account_id: str, amount: str, token: str | None = None) -> Decimal:
+        self._bank.session_client(token, account_id)
+        return self._bank.deposit(account_id, Decimal(amount), now=self._clock())
+
+    def _rpc_withdraw(self, account_id: str, amount: str, token: str | None = None) -> Decimal:
+        self._bank.session_client(token, account_id)
+        return self._bank.withdraw(account_id, Decimal(amount), now=self._clock())
+
+    def _rpc_transfer(self, src_account_id: str, dst_account_id: str, amount: str, token: str | None = None) -> None:
+        self._bank.session_client(token, src_account_id)
+        self._bank.transfer(src_account_id, dst_account_id, Decimal(amount), now=self._clock())
+
+    def _check_operator(self, operator_token: str | None) -> None:
+        expected = self._operator_token
+        if expected is None or operator_token is None or not hmac.compare_digest(operator_token, expected):
+            raise InvalidOperationError("Operator credential required.")
+
+    def _client_scope(self, client_id: str | None, token: str | None, operator_token: str | None) -> str | None:
+        # Client whose data the caller may read: client_id as given for the operator,
+        # otherwise the session's own client.
+        if operator_token is not None:
+            self._check_operator(operator_token)
+            return client_id
+        session_client = self._bank.session_client(token)
+        if client_id is not None and client_id != session_client:
+            raise InvalidOperationError("Client does not match this session.")
+        return session_client
+
+    def _rpc_search_accounts(
+        self,
+        client_id: str | None = None,
+        status: str | None = None,
+        currency: str | None = None,
+        token: str | None = None,
+        operator_token: str | None = None,
+    ) -> list[dict]:
+        accounts = self._bank.search_accounts(
+            client_id=self._client_scope(client_id, token, operator_token),
+            status=AccountStatus(status) if status is not None else None,
+            currency=Currency(currency) if currency is not None else None,
+        )
+        return [account.get_account_info() for account in accounts]
+
+    def _rpc_get_total_balance(self, currency: str | None = None, operator_token: str | None = None) -> Decimal:
+        self._check_operator(operator_token)
+        return self._bank.get_total_balance(Currency(currency) if currency is not None else None)
+
+    def _rpc_get_subtotals(self, operator_token: str | None = None) -> dict:
+        self._check_operator(operator_token)
+        return {currency.value: total for currency, total in self._bank.get_subtotals().items()}
+
+    def _rpc_get_clients_ranking(self, operator_token: str | None = None) -> list:
+        self._check_operator(operator_token)
+        return self._bank.get_clients_ranking()
+
+    def _rpc_get_top_clients(self, k: int, operator_token: str | None = None) -> list:
+        self._check_operator(operator_token)
+        return self._bank.get_top_clients(int(k))
+
+    def _rpc_get_client_rank(self, client_id: str, token: str | None = None, operator_token: str | None = None) -> int:
+        return self._bank.get_client_rank(self._client_scope(client_id, token, operator_token))
+
+    def _rpc_get_clients_ranking_page(self, offset: int, limit: int, operator_token: str | None = None) -> list:
+        self._check_operator(operator_token)
+        return self._bank.get_clients_ranking_page(int(offset), int(limit))
+
+
+def _decimal_options(options: dict) -> dict:
+    return {
+        name: {key: Decimal(item) for key, item in value.items()} if isinstance(value, dict) else Decimal(value)
+        for name, value in options.items()
+    }
+
+
+async def serve(
+    bank: Bank,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    *,
+    path: str | None = None,
+    **options,
+) -> None:
+    # Run a server until cancelled.
+    async with BankServer(bank, **options) as server:
+        await server.start(host, port, path=path)
+        await server.serve_forever()
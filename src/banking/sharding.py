@@ -0,0 +1,528 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import multiprocessing
+import os
+import threading
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterable
+
+from banking.account_options import AccountOptions
+from banking.bank import Bank
+from banking.client import Client
+from banking.errors import (
+    AccountClosedError,
+    AccountFrozenError,
+    InsufficientFundsError,
+    InvalidOperationError,
+    ProtocolError,
+)
+from banking.fx import CurrencyTotals, FxRateTable
+from banking.ids import MAX_NODE_ID, SnowflakeIds, decode_id
+from banking.money import Money, validate_money
+from banking.protocol import error_class
+from banking.types import AccountStatus, AccountType, Currency, PostingKind
+
+__all__ = ["BatchResult", "ShardedBank", "shard_for"]
+
+_CLIENT_ERRORS = (
+    AccountClosedError,
+    AccountFrozenError,
+    InsufficientFundsError,
+    InvalidOperationError,
+    ProtocolError,
+)
+# Operations execute_many accepts, and the parameter each is routed by.
+_ROUTING = {
+    "open_account": "client_id",
+    "deposit": "account_id",
+    "withdraw": "account_id",
+    "transfer": "src_account_id",
+    "close_account": "account_id",
+    "freeze_account": "account_id",
+    "unfreeze_account": "account_id",
+    "get_account_info": "account_id",
+}
+
+
+def shard_for(client_id: str, shards: int) -> int:
+    # crc32 rather than hash() so placement is stable across processes and restarts.
+    return zlib.crc32(client_id.encode()) % shards
+
+
+@dataclass
+class BatchResult:
+    # results[i] is the return value of operations[i], or None when it failed;
+    # errors maps each failed row number to its message.
+    results: list
+    errors: dict[int, str]
+
+
+class ShardedBank:
+    # Bank partitioned across worker processes. Clients, and with them their
+    # accounts, live on shard crc32(client_id) % shards; an account id is routed by
+    # the generator node id inside it. Each worker leases its own node id, or, when
+    # BANKING_NODE_ID is set, takes that base plus its shard index (so hosts need
+    # bases at least `shards` apart); startup fails if two workers share one. Calls
+    # for one shard are serialized on its pipe while different shards work in
+    # parallel, and execute_many sends each shard its whole share of a batch in one
+    # message.
+    # Reports are scatter-gather: per-currency subtotals are summed in cents and
+    # converted here, rankings are merged. Transfers between shards run in two
+    # steps: the target reserves the credit (the account cannot be closed or frozen
+    # while it is pending) and the source takes the money; then both sides apply, or
+    # the source refunds. This is not a durable two-phase commit: the shards and the
+    # router keep pending transfers in memory only, so a crash between the steps
+    # leaves the debit applied on the source shard without its credit.
+    #
+    # Accounts come back as get_account_info() dicts, not live objects.
+
+    def __init__(self, shards: int | None = None, *, bank_options: dict | None = None) -> None:
+        shards = shards or os.cpu_count() or 1
+        if shards <= 0:
+            raise InvalidOperationError("Shard count must be positive.")
+        configured = os.environ.get("BANKING_NODE_ID")
+        base = int(configured) if configured is not None else None
+        if base is not None and not 0 <= base <= MAX_NODE_ID - shards + 1:
+            raise InvalidOperationError(f"BANKING_NODE_ID must leave room for {shards} node ids up to {MAX_NODE_ID}.")
+        self._closed = False
+        context = multiprocessing.get_context()
+        self._pipes = []
+        self._processes = []
+        for index in range(shards):
+            node_id = None if base is None else base + index
+            parent, child = context.Pipe()
+            process = context.Process(target=_serve_shard, args=(child, bank_options or {}, node_id), daemon=True)
+            process.start()
+            child.close()
+            self._pipes.append(parent)
+            self._processes.append(process)
+        self._locks = [threading.Lock() for _ in range(shards)]
+        node_ids = self._broadcast("node_id")
+        if len(set(node_ids)) != shards:
+            self.close()
+            raise InvalidOperationError("Shard workers share a node id, so their account ids could collide.")
+        self._nodes = {node_id: shard for shard, node_id in enumerate(node_ids)}
+        self._located: dict[str, int] = {}
+        self._fx_rates: FxRateTable | None = None
+        self._txids = itertools.count(1)
+
+    @property
+    def shards(self) -> int:
+        return len(self._pipes)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        for lock, pipe in zip(self._locks, self._pipes):
+            with lock:
+                try:
+                    pipe.send(None)
+                except OSError:
+                    pass
+                pipe.close()
+        for process in self._processes:
+            process.join(5)
+            if process.is_alive():
+                process.terminate()
+
+    def __enter__(self) -> ShardedBank:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def add_client(self, client: Client, password: str) -> None:
+        self._call(shard_for(client.client_id, self.shards), "add_client", client=client, password=password)
+
+    def authenticate_client(self, client_id: str, password: str) -> bool:
+        return self._call(
+            shard_for(client_id, self.shards), "authenticate_client", client_id=client_id, password=password
+        )
+
+    def open_account(
+        self,
+        client_id: str,
+        *,
+        account_type: AccountType | str = AccountType.BASE,
+        currency: Currency = Currency.USD,
+        balance: Decimal = Money().to_decimal(),
+        now: datetime | None = None,
+        options: AccountOptions | None = None,
+    ) -> dict:
+        return self._call(
+            shard_for(client_id, self.shards),
+            "open_account",
+            client_id=client_id,
+            account_type=account_type,
+            currency=currency,
+            balance=balance,
+            now=now,
+            options=options,
+        )
+
+    def get_account_info(self, account_id: str) -> dict:
+        return self._call(self._locate(account_id), "get_account_info", account_id=account_id)
+
+    def close_account(self, account_id: str, *, now: datetime | None = None) -> None:
+        self._call(self._locate(account_id), "close_account", account_id=account_id, now=now)
+
+    def freeze_account(self, account_id: str, *, now: datetime | None = None) -> None:
+        self._call(self._locate(account_id), "freeze_account", account_id=account_id, now=now)
+
+    def unfreeze_account(self, account_id: str, *, now: datetime | None = None) -> None:
+        self._call(self._locate(account_id), "unfreeze_account", account_id=account_id, now=now)
+
+    def deposit(self, account_id: str, amount: Decimal, *, now: datetime | None = None) -> Decimal:
+        return self._call(self._locate(account_id), "deposit", account_id=account_id, amount=amount, now=now)
+
+    def withdraw(self, account_id: str, amount: Decimal, *, now: datetime | None = None) -> Decimal:
+        return self._call(self._locate(account_id), "withdraw", account_id=account_id, amount=amount, now=now)
+
+    def transfer(
+        self,
+        src_account_id: str,
+        dst_account_id: str,
+        amount: Decimal,
+        *,
+        now: datetime | None = None,
+    ) -> None:
+        source = self._locate(src_account_id)
+        target = self._locate(dst_account_id)
+        if source == target:
+            self._call(
+                source,
+                "transfer",
+                src_account_id=src_account_id,
+                dst_account_id=dst_account_id,
+                amount=amount,
+                now=now,
+            )
+            return
+        txid = f"{os.getpid()}-{next(self._txids)}"
+        currency = self._call(target, "prepare_credit", txid=txid, account_id=dst_account_id, amount=amount)
+        try:
+            self._call(
+                source,
+                "prepare_debit",
+                txid=txid,
+                account_id=src_account_id,
+                amount=amount,
+                currency=currency,
+                now=now,
+            )
+        except BaseException:
+            self._call(target, "abort", txid=txid)
+            raise
+        # The credit goes first: if it cannot be applied, the source still refunds.
+        try:
+            self._call(target, "commit", txid=txid)
+        except BaseException:
+            self._call(source, "abort", txid=txid)
+            raise
+        self._call(source, "commit", txid=txid)
+
+    def execute_many(self, operations: Iterable[tuple[str, dict]]) -> BatchResult:
+        # Run (method, params) rows, e.g. ("deposit", {"account_id": ..., "amount": ...,
+        # "now": ...}), with one round trip per shard. Rows succeed or fail
+        # independently; rows for one shard run in order. Transfers between shards
+        # run afterwards, one at a time.
+        operations = list(operations)
+        results: list = [None] * len(operations)
+        errors: dict[int, str] = {}
+        batches: dict[int, list[tuple[int, str, dict]]] = {}
+        cross: list[tuple[int, dict]] = []
+        for row, (method, params) in enumerate(operations):
+            try:
+                key = _ROUTING.get(method)
+                if key is None:
+                    raise InvalidOperationError(f"Unsupported batch operation: {method!r}.")
+                if key == "client_id":
+                    shard = shard_for(params[key], self.shards)
+                else:
+                    shard = self._locate(params[key])
+                if method == "transfer" and self._locate(params["dst_account_id"]) != shard:
+                    cross.append((row, params))
+                    continue
+            except _CLIENT_ERRORS as exc:
+                errors[row] = str(exc)
+                continue
+            except KeyError as exc:
+                errors[row] = f"Missing parameter: {exc}."
+                continue
+            batches.setdefault(shard, []).append((row, method, params))
+        shards = sorted(batches)
+        for shard in shards:
+            self._locks[shard].acquire()
+        try:
+            for shard in shards:
+                self._pipes[shard].send(("batch", [(method, params) for _, method, params in batches[shard]]))
+            for shard in shards:
+                for (row, _, _), reply in zip(batches[shard], self._pipes[shard].recv()):
+                    if reply[0] == "ok":
+                        results[row] = reply[1]
+                    else:
+                        errors[row] = reply[2]
+        finally:
+            for shard in shards:
+                self._locks[shard].release()
+        for row, params in cross:
+            try:
+                self.transfer(**params)
+            except _CLIENT_ERRORS as exc:
+                errors[row] = str(exc)
+        return BatchResult(results, errors)
+
+    def search_accounts(
+        self,
+        *,
+        client_id: str | None = None,
+        status: AccountStatus | None = None,
+        currency: Currency | None = None,
+    ) -> list[dict]:
+        filters = {"client_id": client_id, "status": status, "currency": currency}
+        if client_id is not None:
+            return self._call(shard_for(client_id, self.shards), "search_accounts", **filters)
+        return [info for infos in self._broadcast("search_accounts", **filters) for info in infos]
+
+    def get_subtotals(self) -> dict[Currency, Decimal]:
+        return self._currency_totals().subtotals()
+
+    def get_total_balance(self, currency: Currency | None = None) -> Decimal:
+        # Same rules as Bank.get_total_balance; conversion happens once, here.
+        totals = self._currency_totals()
+        if currency is None:
+            return Money(totals.total_cents()).to_decimal()
+        if self._fx_rates is None:
+            raise InvalidOperationError("No FX rates attached.")
+        return totals.convert(self._fx_rates.factors(Currency(currency)))
+
+    def attach_fx_rates(self, rates: FxRateTable | str | Path) -> None:
+        table = rates if isinstance(rates, FxRateTable) else FxRateTable(rates)
+        table.current()  # fail now on a missing or malformed file
+        self._fx_rates = table
+
+    def get_clients_ranking(self) -> list[tuple[str, Decimal]]:
+        # Each shard's ranking is already sorted; ties keep shard order.
+        return list(heapq.merge(*self._broadcast("get_clients_ranking"), key=_ranking_key))
+
+    def get_top_clients(self, k: int) -> list[tuple[str, Decimal]]:
+        merged = heapq.merge(*self._broadcast("get_top_clients", k=k), key=_ranking_key)
+        return list(itertools.islice(merged, k))
+
+    def _currency_totals(self) -> CurrencyTotals:
+        totals = CurrencyTotals()
+        for subtotals in self._broadcast("get_subtotal_cents"):
+            for currency, cents in subtotals.items():
+                totals.adjust(currency, cents)
+        return totals
+
+    def _locate(self, account_id: str) -> int:
+        shard = self._located.get(account_id)
+        if shard is not None:
+            return shard
+        try:
+            shard = self._nodes.get(decode_id(account_id)[1])
+        except InvalidOperationError:
+            shard = None
+        if shard is None:
+            # Not minted by a current worker (e.g. recovered from elsewhere): ask around.
+            found = self._broadcast("has_account", account_id=account_id)
+            owners = [index for index, has in enumerate(found) if has]
+            if not owners:
+                raise InvalidOperationError("Account not found.")
+            shard = self._located[account_id] = owners[0]
+        return shard
+
+    def _call(self, shard: int, method: str, **params):
+        if self._closed:
+            raise InvalidOperationError("Sharded bank is closed.")
+        with self._locks[shard]:
+            pipe = self._pipes[shard]
+            pipe.send(("call", method, params))
+            reply = pipe.recv()
+        return _unwrap(reply)
+
+    def _broadcast(self, method: str, **params) -> list:
+        # Same call on every shard, in parallel; replies in shard order.
+        if self._closed:
+            raise InvalidOperationError("Sharded bank is closed.")
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            for pipe in self._pipes:
+                pipe.send(("call", method, params))
+            replies = [pipe.recv() for pipe in self._pipes]
+        finally:
+            for lock in self._locks:
+                lock.release()
+        return [_unwrap(reply) for reply in replies]
+
+
+def _ranking_key(item: tuple[str, Decimal]) -> Decimal:
+    return -item[1]
+
+
+def _unwrap(reply: tuple):
+    if reply[0] == "ok":
+        return reply[1]
+    raise error_class(reply[1])(reply[2])
+
+
+def _serve_shard(pipe, bank_options: dict, node_id: int | None) -> None:
+    # Worker process main loop: one Bank, one request at a time from the router.
+    if node_id is not None and "_ids" not in bank_options:
+        bank_options = {**bank_options, "_ids": SnowflakeIds(node_id)}
+    shard = _Shard(Bank(**bank_options))
+    try:
+        while True:
+            try:
+                message = pipe.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+            if message[0] == "batch":
+                pipe.send([shard.handle(method, params) for method, params in message[1]])
+            else:
+                pipe.send(shard.handle(message[1], message[2]))
+    finally:
+        shard.bank.close()
+
+
+class _Shard:
+    # Worker-side dispatcher; also the participant side of cross-shard transfers.
+    # Requests are handled one at a time, so the pending-credit checks cannot race.
+
+    def __init__(self, bank: Bank) -> None:
+        self.bank = bank
+        # txid -> (kind, account id, cents): a credit still to apply, or a debit
+        # already taken that an abort refunds.
+        self._prepared: dict[str, tuple[PostingKind, str, int]] = {}
+        # Pending credits per target account; close and freeze are refused meanwhile.
+        self._crediting: dict[str, int] = {}
+
+    def handle(self, method: str, params: dict) -> tuple:
+        try:
+            return ("ok", getattr(self, f"_rpc_{method}")(**params))
+        except _CLIENT_ERRORS as exc:
+            return ("error", type(exc).__name__, str(exc))
+        except (AttributeError, TypeError) as exc:
+            return ("error", "ProtocolError", f"Bad request {method!r}: {exc}")
+
+    def _rpc_node_id(self) -> int:
+        return self.bank._ids.node_id
+
+    def _rpc_has_account(self, account_id: str) -> bool:
+        return account_id in self.bank._accounts
+
+    def _rpc_add_client(self, client: Client, password: str) -> None:
+        self.bank.add_client(client, password)
+
+    def _rpc_authenticate_client(self, client_id: str, password: str) -> bool:
+        return self.bank.authenticate_client(client_id, password)
+
+    def _rpc_open_account(self, client_id: str, **options) -> dict:
+        return self.bank.open_account(client_id, **options).get_account_info()
+
+    def _rpc_get_account_info(self, account_id: str) -> dict:
+        return self.bank._get_account(account_id).get_account_info()
+
+    def _rpc_close_account(self, account_id: str, now: datetime | None = None) -> None:
+        self._check_no_credit(account_id)
+        self.bank.close_account(account_id, now=now)
+
+    def _rpc_freeze_account(self, account_id: str, now: datetime | None = None) -> None:
+        self._check_no_credit(account_id)
+        self.bank.freeze_account(account_id, now=now)
+
+    def _rpc_unfreeze_account(self, account_id: str, now: datetime | None = None) -> None:
+        self.bank.unfreeze_account(account_id, now=now)
+
+    def _rpc_deposit(self, account_id: str, amount: Decimal, now: datetime | None = None) -> Decimal:
+        return self.bank.deposit(account_id, amount, now=now)
+
+    def _rpc_withdraw(self, account_id: str, amount: Decimal, now: datetime | None = None) -> Decimal:
+        return self.bank.withdraw(account_id, amount, now=now)
+
+    def _rpc_transfer(
+        self, src_account_id: str, dst_account_id: str, amount: Decimal, now: datetime | None = None
+    ) -> None:
+        self.bank.transfer(src_account_id, dst_account_id, amount, now=now)
+
+    def _rpc_search_accounts(self, **filters) -> list[dict]:
+        return [account.get_account_info() for account in self.bank.search_accounts(**filters)]
+
+    def _rpc_get_subtotal_cents(self) -> dict[Currency, int]:
+        with self.bank._lock:
+            self.bank._ensure_derived()
+            return self.bank._currency_totals.cents()
+
+    def _rpc_get_clients_ranking(self) -> list[tuple[str, Decimal]]:
+        return self.bank.get_clients_ranking()
+
+    def _rpc_get_top_clients(self, k: int) -> list[tuple[str, Decimal]]:
+        return self.bank.get_top_clients(k)
+
+    def _rpc_prepare_credit(self, txid: str, account_id: str, amount: Decimal) -> Currency:
+        # Check that the target can take the money and remember the credit.
+        account = self.bank._get_account(account_id)
+        value = validate_money(amount)
+        with account._lock:
+            account._check_can_operate()
+            self._prepared[txid] = (PostingKind.DEPOSIT, account_id, value.cents)
+        self._crediting[account_id] = self._crediting.get(account_id, 0) + 1
+        return account.currency
+
+    def _rpc_prepare_debit(
+        self, txid: str, account_id: str, amount: Decimal, currency: Currency, now: datetime | None = None
+    ) -> None:
+        # Take the money now (fees included), so commit cannot fail on this side.
+        account = self.bank._get_account(account_id)
+        if account.currency != currency:
+            raise InvalidOperationError("Transfer currencies must match.")
+        self.bank._ensure_operating_hours(now=now, client_id=self.bank._account_client_id(account_id))
+        with account._lock:
+            before = account.balance_cents
+            account.withdraw(amount)
+            self._prepared[txid] = (PostingKind.WITHDRAW, account_id, before - account.balance_cents)
+
+    def _rpc_commit(self, txid: str) -> None:
+        kind, account_id, cents = self._take(txid)
+        if kind == PostingKind.DEPOSIT:
+            # Validated at prepare, and the pending credit kept it open and unfrozen.
+            account = self.bank._get_account(account_id)
+            with account._lock:
+                account._check_can_operate()
+                account._apply_posting(PostingKind.DEPOSIT, Money(cents))
+
+    def _rpc_abort(self, txid: str) -> None:
+        entry = self._prepared.get(txid)
+        if entry is None:
+            return
+        kind, account_id, cents = self._take(txid)
+        if kind == PostingKind.WITHDRAW:
+            self.bank._get_account(account_id)._apply_posting(PostingKind.DEPOSIT, Money(cents))
+
+    def _take(self, txid: str) -> tuple[PostingKind, str, int]:
+        entry = self._prepared.pop(txid, None)
+        if entry is None:
+            raise InvalidOperationError("Unknown transaction.")
+        kind, account_id, _ = entry
+        if kind == PostingKind.DEPOSIT:
+            pending = self._crediting[account_id] - 1
+            if pending:
+                self._crediting[account_id] = pending
+            else:
+                del self._crediting[account_id]
+        return entry
+
+    def _check_no_credit(self, account_id: str) -> None:
+        if account_id in self._crediting:
+            raise InvalidOperationError("Account has a transfer in progress.")
@@ -0,0 +1,367 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import threading
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, TypeVar
+
+from banking.errors import InvalidOperationError
+from banking.types import AccountStatus, AccountType, ClientStatus, Currency
+
+__all__ = ["LazyAccountMap", "LazyMap", "SnapshotReader", "write_snapshot"]
+
+V = TypeVar("V")
+
+MAGIC = b"BNKSNAP2"
+# magic, client key width, account key width, client count, account count,
+# then section offsets: clients, client index, accounts, account index, blobs, and
+# the price book (JSON, to the end of the file).
+_HEADER = struct.Struct("<8sIIQQQQQQQQ")
+# Version 1 files have no price book section.
+_MAGIC_V1 = b"BNKSNAP1"
+_HEADER_V1 = struct.Struct("<8sIIQQQQQQQ")
+_INDEX_ITEM = struct.Struct("<I")
+
+_CLIENT_STATUSES = list(ClientStatus)
+_ACCOUNT_STATUSES = list(AccountStatus)
+_ACCOUNT_TYPES = list(AccountType)
+_CURRENCIES = list(Currency)
+
+# (account_id, owner_id, status, currency, balance_cents)
+AccountRow = tuple[str, str, AccountStatus, Currency, int]
+
+
+def _client_struct(width: int) -> struct.Struct:
+    # key, status, age, failed attempts, blob offset, blob length
+    return struct.Struct(f"<{width}sBHIQI")
+
+
+def _account_struct(width: int) -> struct.Struct:
+    # key, account type, status, currency, balance cents, owner client row, blob offset, blob length
+    return struct.Struct(f"<{width}sBBBqIQI")
+
+
+def write_snapshot(
+    path: str | Path, clients: Iterable[dict], accounts: Iterable[dict], price_book: dict | None = None
+) -> None:
+    # Write client and account records (the same dicts the journal uses) and
+    # PriceBook.state() to a fixed-layout file. Records keep their insertion order; a
+    # per-table index of row numbers sorted by key gives O(log n) lookups straight
+    # from the mapped file.
+    clients = list(clients)
+    accounts = list(accounts)
+    client_width = max((len(c["client_id"].encode()) for c in clients), default=1)
+    account_width = max((len(a["account_id"].encode()) for a in accounts), default=1)
+    client_struct = _client_struct(client_width)
+    account_struct = _account_struct(account_width)
+    client_rows = {client["client_id"]: row for row, client in enumerate(clients)}
+
+    blobs = bytearray()
+
+    def blob(payload: dict) -> tuple[int, int]:
+        data = json.dumps(payload, separators=(",", ":")).encode()
+        offset = len(blobs)
+        blobs.extend(data)
+        return offset, len(data)
+
+    client_section = bytearray()
+    for client in clients:
+        offset, length = blob(
+            {
+                "full_name": client["full_name"],
+                "contacts": client["contacts"],
+                "credential": client["password_hash"],
+                "accounts": client["accounts"],
+            }
+        )
+        client_section += client_struct.pack(
+            client["client_id"].encode(),
+            _CLIENT_STATUSES.index(ClientStatus(client["status"])),
+            client["age"],
+            client["failed_attempts"],
+            offset,
+            length,
+        )
+
+    account_section = bytearray()
+    for account in accounts:
+        offset, length = blob({"owner_name": account["owner_name"], "options": account["options"]})
+        account_section += account_struct.pack(
+            account["account_id"].encode(),
+            _ACCOUNT_TYPES.index(AccountType(account["account_type"])),
+            _ACCOUNT_STATUSES.index(AccountStatus(account["status"])),
+            _CURRENCIES.index(Currency(account["currency"])),
+            account["balance"],
+            client_rows[account["client_id"]],
+            offset,
+            length,
+        )
+
+    client_index = _sorted_index([c["client_id"].encode().ljust(client_width, b"\0") for c in clients])
+    account_index = _sorted_index(
+        [a["account_id"].encode().ljust(account_width, b"\0") for a in accounts]
+    )
+
+    offset = _HEADER.size
+    prices = json.dumps(price_book or {}, separators=(",", ":")).encode()
+    sections = [client_section, client_index, account_section, account_index, blobs, prices]
+    offsets = []
+    for section in sections:
+        offsets.append(offset)
+        offset += len(section)
+    header = _HEADER.pack(MAGIC, client_width, account_width, len(clients), len(accounts), *offsets)
+
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as handle:
+        handle.write(header)
+        for section in sections:
+            handle.write(section)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+
+
+def _sorted_index(keys: list[bytes]) -> bytes:
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    return b"".join(_INDEX_ITEM.pack(row) for row in order)
+
+
+class _Table:
+    # Fixed-width records plus a sorted row index, read directly from the mapping.
+
+    def __init__(
+        self,
+        data: mmap.mmap,
+        record: struct.Struct,
+        width: int,
+        count: int,
+        offset: int,
+        index_offset: int,
+    ) -> None:
+        self._data = data
+        self._record = record
+        self._width = width
+        self._count = count
+        self._offset = offset
+        self._index_offset = index_offset
+
+    def __len__(self) -> int:
+        return self._count
+
+    def unpack(self, row: int) -> tuple:
+        return self._record.unpack_from(self._data, self._offset + row * self._record.size)
+
+    def key(self, row: int) -> str:
+        start = self._offset + row * self._record.size
+        return self._data[start:start + self._width].rstrip(b"\0").decode()
+
+    def find(self, key: str) -> int | None:
+        # Binary search over the sorted index.
+        wanted = key.encode()
+        if len(wanted) > self._width:
+            return None
+        wanted = wanted.ljust(self._width, b"\0")
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            row = self._index_row(middle)
+            start = self._offset + row * self._record.size
+            current = self._data[start:start + self._width]
+            if current < wanted:
+                low = middle + 1
+            elif current > wanted:
+                high = middle
+            else:
+                return row
+        return None
+
+    def iter_records(self) -> Iterator[tuple]:
+        end = self._offset + self._count * self._record.size
+        return self._record.iter_unpack(memoryview(self._data)[self._offset:end])
+
+    def _index_row(self, position: int) -> int:
+        return _INDEX_ITEM.unpack_from(self._data, self._index_offset + position * _INDEX_ITEM.size)[0]
+
+
+class SnapshotReader:
+    def __init__(self, path: str | Path) -> None:
+        with open(path, "rb") as handle:
+            self._data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic = self._data[:len(MAGIC)]
+        if magic == MAGIC:
+            header = _HEADER.unpack_from(self._data, 0)
+        elif magic == _MAGIC_V1:
+            header = (*_HEADER_V1.unpack_from(self._data, 0), len(self._data))
+        else:
+            raise InvalidOperationError("Not a bank snapshot.")
+        _, client_width, account_width, n_clients, n_accounts, *offsets = header
+        client_off, client_index_off, account_off, account_index_off, blob_off, prices_off = offsets
+        self._blob_offset = blob_off
+        self._prices_offset = prices_off
+        self.clients = _Table(
+            self._data, _client_struct(client_width), client_width, n_clients, client_off, client_index_off,
+        )
+        self.accounts = _Table(
+            self._data, _account_struct(account_width), account_width, n_accounts, account_off,
+            account_index_off,
+        )
+
+    def client_record(self, row: int) -> dict:
+        key, status, age, failed, offset, length = self.clients.unpack(row)
+        blob = self._blob(offset, length)
+        return {
+            "client_id": key.rstrip(b"\0").decode(),
+            "full_name": blob["full_name"],
+            "age": age,
+            "status": _CLIENT_STATUSES[status].value,
+            "contacts": blob["contacts"],
+            "accounts": blob["accounts"],
+            "password_hash": blob["credential"],
+            "failed_attempts": failed,
+        }
+
+    def credential(self, row: int) -> str:
+        *_, offset, length = self.clients.unpack(row)
+        return self._blob(offset, length)["credential"]
+
+    def failed_attempts(self, row: int) -> int:
+        return self.clients.unpack(row)[3]
+
+    def account_record(self, row: int) -> dict:
+        key, account_type, status, currency, balance, owner_row, offset, length = self.accounts.unpack(row)
+        blob = self._blob(offset, length)
+        return {
+            "account_id": key.rstrip(b"\0").decode(),
+            "client_id": self.clients.key(owner_row),
+            "owner_name": blob["owner_name"],
+            "account_type": _ACCOUNT_TYPES[account_type].value,
+            "currency": _CURRENCIES[currency].value,
+            "status": _ACCOUNT_STATUSES[status].value,
+            "balance": balance,
+            "options": blob["options"],
+        }
+
+    def price_book(self) -> dict:
+        # PriceBook.state() as written; empty for files without a price book.
+        data = self._data[self._prices_offset:]
+        return json.loads(data) if data else {}
+
+    def iter_account_rows(self) -> Iterator[AccountRow]:
+        # Summary of every stored account without building account objects.
+        owner_ids: dict[int, str] = {}
+        for key, _, status, currency, balance, owner_row, _, _ in self.accounts.iter_records():
+            owner_id = owner_ids.get(owner_row)
+            if owner_id is None:
+                owner_id = owner_ids[owner_row] = self.clients.key(owner_row)
+            yield (
+                key.rstrip(b"\0").decode(),
+                owner_id,
+                _ACCOUNT_STATUSES[status],
+                _CURRENCIES[currency],
+                balance,
+            )
+
+    def _blob(self, offset: int, length: int) -> dict:
+        start = self._blob_offset + offset
+        return json.loads(self._data[start:start + length])
+
+
+_MISSING = object()
+
+
+class LazyMap(MutableMapping[str, V]):
+    # Dict-like view over a snapshot table. Values are decoded on first access and
+    # cached; writes and deletions are kept in overlays so the mapped file stays read-only.
+
+    def __init__(self, table: _Table, decode: Callable[[int], V]) -> None:
+        self._table = table
+        self._decode = decode
+        self._loaded: dict[str, V] = {}
+        self._added: dict[str, V] = {}
+        self._deleted: set[str] = set()
+        # Two threads must not decode the same row into two different objects.
+        self._decode_lock = threading.Lock()
+
+    def __getitem__(self, key: str) -> V:
+        value = self._loaded.get(key, _MISSING)
+        if value is not _MISSING:
+            return value  # type: ignore[return-value]
+        value = self._added.get(key, _MISSING)
+        if value is not _MISSING:
+            return value  # type: ignore[return-value]
+        if key in self._deleted:
+            raise KeyError(key)
+        row = self._table.find(key)
+        if row is None:
+            raise KeyError(key)
+        with self._decode_lock:
+            value = self._loaded.get(key, _MISSING)
+            if value is _MISSING:
+                value = self._loaded[key] = self._decode(row)
+        return value  # type: ignore[return-value]
+
+    def __setitem__(self, key: str, value: V) -> None:
+        if key in self._loaded or self._table.find(key) is not None:
+            self._deleted.discard(key)
+            self._loaded[key] = value
+        else:
+            self._added[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._added:
+            del self._added[key]
+            return
+        if key in self._deleted or (key not in self._loaded and self._table.find(key) is None):
+            raise KeyError(key)
+        self._loaded.pop(key, None)
+        self._deleted.add(key)
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._loaded or key in self._added:
+            return True
+        if not isinstance(key, str) or key in self._deleted:
+            return False
+        return self._table.find(key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for row in range(len(self._table)):
+            key = self._table.key(row)
+            if key not in self._deleted:
+                yield key
+        yield from self._added
+
+    def __len__(self) -> int:
+        return len(self._table) - len(self._deleted) + len(self._added)
+
+    def is_loaded(self, key: str) -> bool:
+        return key in self._loaded or key in self._added
+
+
+class LazyAccountMap(LazyMap):
+    def __init__(
+        self,
+        reader: SnapshotReader,
+        decode: Callable[[int], V],
+        summarize: Callable[[V], AccountRow],
+    ) -> None:
+        super().__init__(reader.accounts, decode)
+        self._reader = reader
+        self._summarize = summarize
+
+    def iter_rows(self) -> Iterator[AccountRow]:
+        # Current state of every account: decoded objects where loaded, raw rows otherwise.
+        loaded = self._loaded
+        deleted = self._deleted
+        for summary in self._reader.iter_account_rows():
+            account_id = summary[0]
+            if account_id in deleted:
+                continue
+            account = loaded.get(account_id)
+            yield summary if account is None else self._summarize(account)
+        for account in list(self._added.values()):
+            yield self._summarize(account)
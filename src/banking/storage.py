@@ -0,0 +1,539 @@
+from __future__ import annotations
+
+import json
+import queue
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, TypeVar
+
+from banking.errors import InvalidOperationError
+from banking.snapshot import AccountRow
+from banking.types import AccountStatus, ClientStatus, Currency
+
+__all__ = ["SqliteStore", "StoreAccountMap", "StoreMap"]
+
+V = TypeVar("V")
+
+# seq (the rowid) is the registration order: accounts are listed in it and ranking
+# ties are broken by it, as in memory. clients.total and currency_totals hold the
+# cents of non-closed accounts and are kept by the triggers, so the ranking and
+# the totals are index reads rather than scans.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS clients (
+    seq INTEGER PRIMARY KEY,
+    client_id TEXT NOT NULL UNIQUE,
+    full_name TEXT NOT NULL,
+    age INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    contacts TEXT NOT NULL,
+    password_hash TEXT NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS clients_by_total ON clients (total DESC, seq);
+CREATE TABLE IF NOT EXISTS accounts (
+    seq INTEGER PRIMARY KEY,
+    account_id TEXT NOT NULL UNIQUE,
+    client_id TEXT NOT NULL,
+    owner_name TEXT NOT NULL,
+    account_type TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    status TEXT NOT NULL,
+    balance INTEGER NOT NULL,
+    options TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS accounts_by_client ON accounts (client_id, status, currency);
+CREATE INDEX IF NOT EXISTS accounts_by_status ON accounts (status, currency);
+CREATE INDEX IF NOT EXISTS accounts_by_currency ON accounts (currency);
+CREATE TABLE IF NOT EXISTS currency_totals (
+    currency TEXT PRIMARY KEY,
+    cents INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS instruments (
+    seq INTEGER PRIMARY KEY,
+    instrument TEXT NOT NULL UNIQUE,
+    asset_type TEXT NOT NULL,
+    price INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS holdings (
+    account_id TEXT NOT NULL,
+    instrument TEXT NOT NULL,
+    units INTEGER NOT NULL,
+    PRIMARY KEY (account_id, instrument)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS account_opened AFTER INSERT ON accounts
+WHEN NEW.status != 'closed' BEGIN
+    UPDATE clients SET total = total + NEW.balance WHERE client_id = NEW.client_id;
+    INSERT INTO currency_totals VALUES (NEW.currency, NEW.balance)
+        ON CONFLICT (currency) DO UPDATE SET cents = cents + excluded.cents;
+END;
+CREATE TRIGGER IF NOT EXISTS account_changed AFTER UPDATE OF balance, status ON accounts
+BEGIN
+    UPDATE clients SET total = total
+        + (CASE WHEN NEW.status != 'closed' THEN NEW.balance ELSE 0 END)
+        - (CASE WHEN OLD.status != 'closed' THEN OLD.balance ELSE 0 END)
+    WHERE client_id = NEW.client_id;
+    UPDATE currency_totals SET cents = cents
+        + (CASE WHEN NEW.status != 'closed' THEN NEW.balance ELSE 0 END)
+        - (CASE WHEN OLD.status != 'closed' THEN OLD.balance ELSE 0 END)
+    WHERE currency = NEW.currency;
+END;
+"""
+
+_INSERT_CLIENT = (
+    "INSERT INTO clients (client_id, full_name, age, status, contacts, password_hash) VALUES (?, ?, ?, ?, ?, ?)"
+)
+_INSERT_ACCOUNT = (
+    "INSERT INTO accounts (account_id, client_id, owner_name, account_type, currency, status, balance, options)"
+    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_POSTING = "UPDATE accounts SET balance = balance + ? WHERE account_id = ?"
+_ACCOUNT_STATUS = "UPDATE accounts SET status = ? WHERE account_id = ?"
+_ACCOUNT_OPTIONS = "UPDATE accounts SET options = ? WHERE account_id = ?"
+_CLIENT_STATUS = "UPDATE clients SET status = ? WHERE client_id = ?"
+_CREDENTIAL = "UPDATE clients SET password_hash = ? WHERE client_id = ?"
+_CLIENT = "SELECT client_id, full_name, age, status, contacts, password_hash FROM clients WHERE client_id = ?"
+_CLIENT_ACCOUNTS = "SELECT account_id FROM accounts WHERE client_id = ? ORDER BY seq"
+_ACCOUNT = (
+    "SELECT account_id, client_id, owner_name, account_type, currency, status, balance, options"
+    " FROM accounts WHERE account_id = ?"
+)
+_ACCOUNT_ROWS = "SELECT account_id, client_id, status, currency, balance FROM accounts ORDER BY seq"
+_RANKING = "SELECT client_id, total FROM clients ORDER BY total DESC, seq LIMIT ? OFFSET ?"
+_RANK = "SELECT COUNT(*) FROM clients WHERE total > ?1 OR (total = ?1 AND seq < ?2)"
+_CLIENT_TOTAL = "SELECT total, seq FROM clients WHERE client_id = ?"
+_CURRENCY_TOTALS = "SELECT currency, cents FROM currency_totals WHERE cents != 0"
+_INSERT_INSTRUMENT = "INSERT INTO instruments (instrument, asset_type, price) VALUES (?, ?, ?)"
+_PRICE = "UPDATE instruments SET price = ? WHERE instrument = ?"
+_HOLDING = (
+    "INSERT INTO holdings (account_id, instrument, units) VALUES (?, ?, ?)"
+    " ON CONFLICT (account_id, instrument) DO UPDATE SET units = excluded.units"
+)
+_DROP_HOLDING = "DELETE FROM holdings WHERE account_id = ? AND instrument = ?"
+_INSTRUMENTS = "SELECT instrument, asset_type, price FROM instruments ORDER BY seq"
+_HOLDINGS = "SELECT account_id, instrument, units FROM holdings"
+_KEYS = {"clients": "client_id", "accounts": "account_id"}
+
+
+class SqliteStore:
+    # Clients and accounts as rows of a SQLite database in WAL mode, for a Bank
+    # opened with Bank.open_store. The bank writes through: each change is applied
+    # to its objects and then to the tables by the single writer connection. The
+    # writer keeps one transaction open and a thread commits it once per commit
+    # window, so many writes share a commit (as with Journal); flush() commits at
+    # once. Statements inside atomic() blocks are never split across commits.
+    # Queries run on a pool of read-only connections and see committed data only, so
+    # the bank flushes before reading. Every statement is a module constant, so each
+    # connection compiles it once and reuses it from its statement cache.
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        readers: int = 4,
+        commit_window: float = 0.005,
+        synchronous: str = "NORMAL",
+    ) -> None:
+        if readers <= 0:
+            raise InvalidOperationError("Reader pool size must be positive.")
+        if commit_window < 0:
+            raise InvalidOperationError("Commit window cannot be negative.")
+        if synchronous.upper() not in ("OFF", "NORMAL", "FULL", "EXTRA"):
+            raise InvalidOperationError(f"Unknown synchronous mode: {synchronous!r}.")
+        self._path = Path(path)
+        self._writer = self._connect()
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._writer.execute(f"PRAGMA synchronous={synchronous.upper()}")
+        self._writer.executescript(_SCHEMA)
+        self._readers: queue.SimpleQueue[sqlite3.Connection] = queue.SimpleQueue()
+        self._all_readers: list[sqlite3.Connection] = []
+        for _ in range(readers):
+            reader = self._connect()
+            reader.execute("PRAGMA query_only=ON")
+            self._readers.put(reader)
+            self._all_readers.append(reader)
+        self._commit_window = commit_window
+        self._cond = threading.Condition()
+        self._in_transaction = False
+        self._atomic_depth = 0
+        self._closed = False
+        self._error: BaseException | None = None
+        self._committer = threading.Thread(target=self._run, name="banking-store", daemon=True)
+        self._committer.start()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def add_client(self, record: dict) -> None:
+        self._execute(
+            _INSERT_CLIENT,
+            (
+                record["client_id"],
+                record["full_name"],
+                record["age"],
+                record["status"],
+                json.dumps(record["contacts"]),
+                record["password_hash"],
+            ),
+        )
+
+    def add_accounts(self, records: list[dict]) -> None:
+        # One executemany for the batch, e.g. from Bank.open_accounts_bulk.
+        self._execute_many(
+            _INSERT_ACCOUNT,
+            (
+                (
+                    record["account_id"],
+                    record["client_id"],
+                    record["owner_name"],
+                    record["account_type"],
+                    record["currency"],
+                    record["status"],
+                    record["balance"],
+                    json.dumps(record["options"], separators=(",", ":")),
+                )
+                for record in records
+            ),
+        )
+
+    def apply_posting(self, account_id: str, cents: int) -> None:
+        self._execute(_POSTING, (cents, account_id))
+
+    def set_account_status(self, account_id: str, status: AccountStatus) -> None:
+        self._execute(_ACCOUNT_STATUS, (status.value, account_id))
+
+    def set_account_options(self, account_id: str, options: dict) -> None:
+        self._execute(_ACCOUNT_OPTIONS, (json.dumps(options, separators=(",", ":")), account_id))
+
+    def set_client_status(self, client_id: str, status: ClientStatus) -> None:
+        self._execute(_CLIENT_STATUS, (status.value, client_id))
+
+    def set_credential(self, client_id: str, credential: str) -> None:
+        self._execute(_CREDENTIAL, (credential, client_id))
+
+    def list_instrument(self, instrument: str, asset_type: str, cents: int) -> None:
+        self._execute(_INSERT_INSTRUMENT, (instrument, asset_type, cents))
+
+    def set_holding(self, account_id: str, instrument: str, units: int) -> None:
+        if units:
+            self._execute(_HOLDING, (account_id, instrument, units))
+        else:
+            self._execute(_DROP_HOLDING, (account_id, instrument))
+
+    def set_prices(self, prices: dict[str, int]) -> None:
+        self._execute_many(_PRICE, ((cents, instrument) for instrument, cents in prices.items()))
+
+    @contextmanager
+    def atomic(self) -> Iterator[None]:
+        # Writes made inside the block are committed together. Other writers are not
+        # held up; the commit waits until the block ends.
+        with self._cond:
+            self._atomic_depth += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._atomic_depth -= 1
+                self._cond.notify_all()
+
+    def flush(self) -> None:
+        # Commit everything written so far.
+        with self._cond:
+            while self._atomic_depth:
+                self._cond.wait()
+            self._commit()
+
+    def client_record(self, client_id: str) -> dict | None:
+        with self._reader() as reader:
+            row = reader.execute(_CLIENT, (client_id,)).fetchone()
+            if row is None:
+                return None
+            accounts = [account_id for (account_id,) in reader.execute(_CLIENT_ACCOUNTS, (client_id,))]
+        return {
+            "client_id": row[0],
+            "full_name": row[1],
+            "age": row[2],
+            "status": row[3],
+            "contacts": json.loads(row[4]),
+            "password_hash": row[5],
+            "accounts": accounts,
+        }
+
+    def credential(self, client_id: str) -> str | None:
+        record = self.client_record(client_id)
+        return None if record is None else record["password_hash"]
+
+    def account_record(self, account_id: str) -> dict | None:
+        with self._reader() as reader:
+            row = reader.execute(_ACCOUNT, (account_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "account_id": row[0],
+            "client_id": row[1],
+            "owner_name": row[2],
+            "account_type": row[3],
+            "currency": row[4],
+            "status": row[5],
+            "balance": row[6],
+            "options": json.loads(row[7]),
+        }
+
+    def keys(self, table: str) -> list[str]:
+        # Primary keys of "clients" or "accounts" in registration order.
+        with self._reader() as reader:
+            return [key for (key,) in reader.execute(f"SELECT {_KEYS[table]} FROM {table} ORDER BY seq")]
+
+    def count(self, table: str) -> int:
+        with self._reader() as reader:
+            return reader.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def count_missing(self, table: str, keys: set[str]) -> tuple[int, set[str]]:
+        # Row count plus the given keys not stored yet, read from one snapshot so a
+        # commit landing in between cannot count a row twice.
+        sql = f"SELECT 1 FROM {table} WHERE {_KEYS[table]} = ?"
+        with self._reader() as reader:
+            reader.execute("BEGIN")
+            try:
+                count = reader.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                missing = {key for key in keys if reader.execute(sql, (key,)).fetchone() is None}
+            finally:
+                reader.execute("COMMIT")
+        return count, missing
+
+    def has(self, table: str, key: str) -> bool:
+        with self._reader() as reader:
+            return reader.execute(f"SELECT 1 FROM {table} WHERE {_KEYS[table]} = ?", (key,)).fetchone() is not None
+
+    def iter_account_rows(self) -> Iterator[AccountRow]:
+        with self._reader() as reader:
+            for account_id, client_id, status, currency, cents in reader.execute(_ACCOUNT_ROWS):
+                yield account_id, client_id, AccountStatus(status), Currency(currency), cents
+
+    def search_ids(
+        self,
+        *,
+        client_id: str | None = None,
+        status: AccountStatus | None = None,
+        currency: Currency | None = None,
+    ) -> list[str]:
+        # Account ids matching every given filter, in registration order.
+        where, params = [], []
+        for column, value in (("client_id", client_id), ("status", status), ("currency", currency)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value.value if isinstance(value, (AccountStatus, Currency)) else value)
+        sql = "SELECT account_id FROM accounts"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self._reader() as reader:
+            return [account_id for (account_id,) in reader.execute(sql + " ORDER BY seq", params)]
+
+    def ranking(self, offset: int = 0, limit: int = -1) -> list[tuple[str, int]]:
+        # (client id, total cents) by descending total; limit -1 means no limit.
+        with self._reader() as reader:
+            return reader.execute(_RANKING, (limit, offset)).fetchall()
+
+    def rank(self, client_id: str) -> int:
+        with self._reader() as reader:
+            row = reader.execute(_CLIENT_TOTAL, (client_id,)).fetchone()
+            if row is None:
+                raise InvalidOperationError("Client not found.")
+            return reader.execute(_RANK, row).fetchone()[0]
+
+    def price_book(self) -> dict:
+        # Stored listings and holdings in PriceBook.state() form.
+        with self._reader() as reader:
+            instruments = [list(row) for row in reader.execute(_INSTRUMENTS)]
+            holdings: dict[str, dict[str, int]] = {}
+            for account_id, instrument, units in reader.execute(_HOLDINGS):
+                holdings.setdefault(account_id, {})[instrument] = units
+        return {"instruments": instruments, "holdings": holdings}
+
+    def currency_cents(self) -> dict[Currency, int]:
+        with self._reader() as reader:
+            return {Currency(currency): cents for currency, cents in reader.execute(_CURRENCY_TOTALS)}
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._committer.join()
+        with self._cond:
+            self._commit()
+        self._writer.close()
+        for reader in self._all_readers:
+            reader.close()
+
+    def __enter__(self) -> SqliteStore:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode; the writer issues BEGIN and COMMIT itself.
+        return sqlite3.connect(self._path, isolation_level=None, check_same_thread=False, cached_statements=64)
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        if self._closed:
+            raise InvalidOperationError("Store is closed.")
+        reader = self._readers.get()
+        try:
+            yield reader
+        finally:
+            self._readers.put(reader)
+
+    def _execute(self, sql: str, params: tuple) -> None:
+        with self._cond:
+            self._begin()
+            try:
+                self._writer.execute(sql, params)
+            except sqlite3.Error as exc:
+                raise InvalidOperationError(f"Store write failed: {exc}") from exc
+
+    def _execute_many(self, sql: str, rows) -> None:
+        with self._cond:
+            self._begin()
+            try:
+                self._writer.executemany(sql, rows)
+            except sqlite3.Error as exc:
+                raise InvalidOperationError(f"Store write failed: {exc}") from exc
+
+    def _begin(self) -> None:
+        # Caller holds self._cond.
+        if self._closed:
+            raise InvalidOperationError("Store is closed.")
+        if self._error is not None:
+            raise InvalidOperationError(f"Store commit failed: {self._error}")
+        if not self._in_transaction:
+            self._writer.execute("BEGIN")
+            self._in_transaction = True
+            self._cond.notify_all()
+
+    def _commit(self) -> None:
+        # Caller holds self._cond.
+        if self._in_transaction:
+            self._in_transaction = False
+            self._writer.execute("COMMIT")
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._in_transaction and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                if self._commit_window:
+                    # Hold the transaction open for the window so concurrent writes join it.
+                    self._cond.wait(self._commit_window)
+                while self._atomic_depth and not self._closed:
+                    self._cond.wait()
+                try:
+                    self._commit()
+                except sqlite3.Error as exc:  # surface to writers instead of dying silently
+                    self._error = exc
+                    return
+
+
+class StoreMap(MutableMapping[str, V]):
+    # Dict-like view over a store table, used as the bank's registry. Values are
+    # loaded by primary key on first access and kept; values the bank stores are
+    # kept too, as the bank writes them through to the table itself. Nothing is
+    # evicted, so memory grows with the rows touched, not with the table.
+
+    def __init__(self, store: SqliteStore, table: str, load: Callable[[str], V | None]) -> None:
+        self._store = store
+        self._table = table
+        self._load = load
+        self._cached: dict[str, V] = {}
+        # Keys stored here that may not be written through yet; __len__ adds them to
+        # the table's row count once it has checked they are still missing there.
+        self._unwritten: set[str] = set()
+        # Two threads must not load the same row into two different objects.
+        self._load_lock = threading.Lock()
+
+    def __getitem__(self, key: str) -> V:
+        value = self._cached.get(key)
+        if value is not None:
+            return value
+        with self._load_lock:
+            value = self._cached.get(key)
+            if value is None:
+                value = self._load(key)
+                if value is None:
+                    raise KeyError(key)
+                self._cached[key] = value
+        return value
+
+    def __setitem__(self, key: str, value: V) -> None:
+        if key not in self._cached:
+            with self._load_lock:
+                self._unwritten.add(key)
+        self._cached[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        raise InvalidOperationError("Rows cannot be deleted from the store.")
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._cached:
+            return True
+        return isinstance(key, str) and self._store.has(self._table, key)
+
+    def __iter__(self) -> Iterator[str]:
+        # Stored keys in registration order, then any stored by the bank but not
+        # written through yet.
+        cached = self._cached
+        seen = []
+        for key in self._store.keys(self._table):
+            if key in cached:
+                seen.append(key)
+            yield key
+        if len(seen) < len(cached):
+            seen_keys = set(seen)
+            yield from [key for key in list(cached) if key not in seen_keys]
+
+    def __len__(self) -> int:
+        # One COUNT(*) rather than a walk over every key.
+        if not self._unwritten:
+            return self._store.count(self._table)
+        with self._load_lock:
+            count, self._unwritten = self._store.count_missing(self._table, set(self._unwritten))
+            return count + len(self._unwritten)
+
+    def is_loaded(self, key: str) -> bool:
+        return key in self._cached
+
+
+class StoreAccountMap(StoreMap):
+    def __init__(
+        self,
+        store: SqliteStore,
+        load: Callable[[str], V | None],
+        summarize: Callable[[V], AccountRow],
+    ) -> None:
+        super().__init__(store, "accounts", load)
+        self._summarize = summarize
+
+    def iter_rows(self) -> Iterator[AccountRow]:
+        # Current state of every account: loaded objects where cached, table rows otherwise.
+        cached = self._cached
+        seen = 0
+        for summary in self._store.iter_account_rows():
+            account = cached.get(summary[0])
+            if account is None:
+                yield summary
+            else:
+                seen += 1
+                yield self._summarize(account)
+        if seen < len(cached):
+            stored = set(self._store.keys("accounts"))
+            for account_id, account in list(cached.items()):
+                if account_id not in stored:
+                    yield self._summarize(account)
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Callable, Hashable, MutableMapping
+
+from banking.errors import InvalidOperationError
+
+__all__ = ["FailureTracker", "TimerWheel"]
+
+
+class TimerWheel:
+    # Hierarchical timing wheel. Level 0 has one slot per tick; each higher level has
+    # slots `slots` times wider and is cascaded into the level below when the clock
+    # reaches the start of a slot. Scheduling and cancelling are O(1); advancing costs
+    # one step per elapsed tick plus the timers that fire, and an empty wheel jumps
+    # straight to the target time. Cancelled and rescheduled timers are dropped lazily
+    # when their slot comes up.
+
+    def __init__(self, tick: float = 1.0, *, slots: int = 64, levels: int = 4, start: float = 0.0) -> None:
+        if tick <= 0 or slots < 2 or levels < 1:
+            raise InvalidOperationError("Timer wheel needs a positive tick, 2+ slots and 1+ levels.")
+        self._tick = tick
+        self._slots = slots
+        self._spans = [slots ** level for level in range(levels)]
+        self._wheels: list[list[list[tuple[Hashable, int]]]] = [
+            [[] for _ in range(slots)] for _ in range(levels)
+        ]
+        self._deadlines: dict[Hashable, int] = {}
+        self._due: list[tuple[Hashable, int]] = []
+        self._now = self._ticks(start)
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._deadlines
+
+    def schedule(self, key: Hashable, deadline: float) -> None:
+        # (Re)arm the timer for key; a later advance() past deadline returns it once.
+        # Rounding up means a timer never fires before its deadline.
+        at = math.ceil(deadline / self._tick)
+        self._deadlines[key] = at
+        if at <= self._now:
+            self._due.append((key, at))
+        else:
+            self._place(key, at)
+
+    def cancel(self, key: Hashable) -> None:
+        self._deadlines.pop(key, None)
+
+    def advance(self, now: float) -> list[Hashable]:
+        # Move the clock to now and return the keys whose deadline has passed.
+        target = self._ticks(now)
+        fired = self._collect(self._due)
+        self._due = []
+        if not self._deadlines:
+            self._now = max(self._now, target)
+            return fired
+        while self._now < target and self._deadlines:
+            self._now += 1
+            self._cascade()
+            slot = self._wheels[0][self._now % self._slots]
+            if slot:
+                self._wheels[0][self._now % self._slots] = []
+                fired.extend(self._collect(slot))
+        self._now = max(self._now, target)
+        return fired
+
+    def _ticks(self, when: float) -> int:
+        return int(when // self._tick)
+
+    def _place(self, key: Hashable, at: int) -> None:
+        # at == now only happens while cascading, right before that level-0 slot is read.
+        for level, span in enumerate(self._spans):
+            # Buckets ahead of the current one at this level; must stay inside the ring.
+            if at // span - self._now // span < self._slots:
+                self._wheels[level][(at // span) % self._slots].append((key, at))
+                return
+        # Beyond the wheel's horizon: park in the farthest top-level slot and re-place
+        # it when that slot is cascaded.
+        span = self._spans[-1]
+        self._wheels[-1][(self._now // span + self._slots - 1) % self._slots].append((key, at))
+
+    def _cascade(self) -> None:
+        # Redistribute the higher-level slots that start at the current tick, top down.
+        for level in range(len(self._spans) - 1, 0, -1):
+            span = self._spans[level]
+            if self._now % span:
+                continue
+            index = (self._now // span) % self._slots
+            entries = self._wheels[level][index]
+            if entries:
+                self._wheels[level][index] = []
+                for key, at in entries:
+                    if self._deadlines.get(key) == at:
+                        self._place(key, at)
+
+    def _collect(self, entries: list[tuple[Hashable, int]]) -> list[Hashable]:
+        fired = []
+        for key, at in entries:
+            if self._deadlines.get(key) == at and at <= self._now:
+                del self._deadlines[key]
+                fired.append(key)
+        return fired
+
+
+class FailureTracker:
+    # Failed attempts per key (a client id, a source address, ...) over a sliding
+    # window, with a lockout once `threshold` failures fall inside the window.
+    #
+    # Each key keeps a tuple of at most `threshold` failure times (far smaller than a
+    # deque when there are millions of keys), so an update is O(1). Every
+    # failure also goes on a FIFO of (expiry, key); all failures share one window, so
+    # the FIFO is in expiry order and each call drops the keys whose failures have all
+    # aged out, which keeps memory proportional to recent failures rather than to
+    # every key ever seen. Lockouts end on a TimerWheel; `expired()` reports them so
+    # the owner can lift whatever the lockout stood for. lockout=None never expires.
+
+    def __init__(
+        self,
+        threshold: int,
+        *,
+        window: float = 900.0,
+        lockout: float | None = 900.0,
+        clock: Callable[[], float] = time.monotonic,
+        seed: MutableMapping[str, int] | None = None,
+    ) -> None:
+        if threshold <= 0 or window <= 0 or (lockout is not None and lockout <= 0):
+            raise InvalidOperationError("threshold, window and lockout must be positive.")
+        self._threshold = threshold
+        self._window = window
+        self._lockout = lockout
+        self._clock = clock
+        # Counts from an older process (e.g. a snapshot); taken over on first use and
+        # treated as failures that happened at that moment.
+        self._seed = seed
+        self._failures: dict[str, tuple[float, ...]] = {}
+        self._expiry: deque[tuple[float, str]] = deque()
+        self._locked: dict[str, float] = {}
+        self._wheel = TimerWheel(tick=min(1.0, lockout or 1.0), start=clock())
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        # Keys currently holding state (recent failures or an active lockout).
+        with self._lock:
+            return len(self._failures.keys() | self._locked.keys())
+
+    def failures(self, key: str) -> int:
+        # Failures inside the window that have not yet caused a lockout.
+        with self._lock:
+            now = self._clock()
+            times = self._times(key, now)
+            return len(times) if times is not None else 0
+
+    def record_failure(self, key: str) -> bool:
+        # Count one failure; True when it locks the key.
+        with self._lock:
+            now = self._clock()
+            self._sweep(now)
+            if key in self._locked:
+                return False
+            times = (self._times(key, now) or ()) + (now,)
+            self._expiry.append((now + self._window, key))
+            if len(times) < self._threshold:
+                self._failures[key] = times
+                return False
+            self._failures.pop(key, None)
+            self._lock_key(key, now)
+            return True
+
+    def reset(self, key: str) -> None:
+        # Forget the key's failures, e.g. after a successful attempt.
+        with self._lock:
+            self._failures.pop(key, None)
+            if self._seed is not None:
+                self._seed.pop(key, None)
+
+    def lock(self, key: str) -> None:
+        # Start a lockout without counting failures (e.g. a lock restored from disk).
+        with self._lock:
+            self._failures.pop(key, None)
+            self._lock_key(key, self._clock())
+
+    def unlock(self, key: str) -> None:
+        with self._lock:
+            if self._locked.pop(key, None) is not None:
+                self._wheel.cancel(key)
+
+    def is_locked(self, key: str) -> bool:
+        with self._lock:
+            until = self._locked.get(key)
+            return until is not None and until > self._clock()
+
+    def expired(self) -> list[str]:
+        # Keys whose lockout has ended since the last call; each is reported once.
+        with self._lock:
+            now = self._clock()
+            released = []
+            for key in self._wheel.advance(now):
+                if self._locked.get(key, now + 1) <= now:
+                    del self._locked[key]
+                    released.append(key)
+            return released
+
+    def _lock_key(self, key: str, now: float) -> None:
+        if self._lockout is None:
+            self._locked[key] = float("inf")
+            return
+        self._locked[key] = now + self._lockout
+        self._wheel.schedule(key, now + self._lockout)
+
+    def _times(self, key: str, now: float) -> tuple[float, ...] | None:
+        # The key's in-window failure times, adopting a seeded count on first sight.
+        times = self._failures.get(key)
+        if times is None and self._seed is not None:
+            count = self._seed.pop(key, 0)
+            if count:
+                times = self._failures[key] = (now,) * min(count, self._threshold - 1)
+                self._expiry.append((now + self._window, key))
+        if not times or times[0] > now - self._window:
+            return times
+        cutoff = now - self._window
+        times = self._failures[key] = tuple(at for at in times if at > cutoff)
+        return times
+
+    def _sweep(self, now: float) -> None:
+        expiry = self._expiry
+        cutoff = now - self._window
+        while expiry and expiry[0][0] <= now:
+            key = expiry.popleft()[1]
+            times = self._failures.get(key)
+            if times is not None and (not times or times[-1] <= cutoff):
+                del self._failures[key]
@@ -24,9 +24,19 @@ class AccountType(str, Enum):
     INVESTMENT = "investment"
 
 
+class PostingKind(str, Enum):
+    DEPOSIT = "deposit"
+    WITHDRAW = "withdraw"
+    FEE = "fee"
+    INTEREST = "interest"
+
+
 class ClientStatus(str, Enum):
+    # BLOCKED is set by an operator and stays until unblock_client; LOCKED is a
+    # lockout after failed logins and ends by itself.
     ACTIVE = "active"
     BLOCKED = "blocked"
+    LOCKED = "locked"
 
 
 @dataclass(frozen=True)
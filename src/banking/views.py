@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+from banking.errors import InvalidOperationError
+from banking.fx import CurrencyTotals
+from banking.locks import DEFAULT_STRIPES
+from banking.money import Money
+from banking.ranking import ClientRanking
+from banking.snapshot import AccountRow
+from banking.types import AccountStatus, Currency
+
+if TYPE_CHECKING:
+    from banking.bank import Bank
+
+__all__ = ["ReadView", "VersionStore"]
+
+# State of an account just before the change that got `version`; a None status marks
+# an account that did not exist yet.
+_Record = tuple[int, int, AccountStatus | None]
+
+
+class VersionStore:
+    # Commit versions and the before-images needed by open read views. Every change
+    # to an account's balance or status, every account opened and every client added
+    # gets the next version. Only while a view is open is the state before the change
+    # recorded, per account in version order; a view at version V reads an account
+    # from its first record newer than V, or from the live account when there is
+    # none. When the oldest view is released, records no view can need are dropped.
+    # Writes run under the bank's lock; state_at and client_visible are lock-free
+    # reads (pruning replaces the dicts rather than editing them).
+
+    def __init__(self) -> None:
+        self.version = 0
+        self._views: dict[int, int] = {}
+        self._history: dict[str, list[_Record]] = {}
+        self._clients: dict[str, int] = {}
+
+    @property
+    def open_views(self) -> int:
+        return sum(self._views.values())
+
+    @property
+    def retained(self) -> int:
+        # Number of before-images held for open views.
+        return sum(map(len, self._history.values()))
+
+    def changed(self, account_id: str, balance_before: int, status_before: AccountStatus) -> None:
+        self.version += 1
+        if self._views:
+            self._history.setdefault(account_id, []).append((self.version, balance_before, status_before))
+
+    def opened(self, account_ids: Iterable[str]) -> None:
+        # Accounts registered together share one version.
+        self.version += 1
+        if self._views:
+            record = (self.version, 0, None)
+            for account_id in account_ids:
+                self._history.setdefault(account_id, []).append(record)
+
+    def client_added(self, client_id: str) -> None:
+        self.version += 1
+        if self._views:
+            self._clients[client_id] = self.version
+
+    def pin(self) -> int:
+        # Open a view at the current version. Only versions with no operation in
+        # flight are consistent, so past versions cannot be pinned.
+        version = self.version
+        self._views[version] = self._views.get(version, 0) + 1
+        return version
+
+    def release(self, version: int) -> None:
+        oldest = min(self._views)
+        if self._views[version] > 1:
+            self._views[version] -= 1
+            return
+        del self._views[version]
+        if not self._views:
+            self._history = {}
+            self._clients = {}
+        elif version == oldest:
+            self._prune(min(self._views))
+
+    def state_at(self, account_id: str, version: int) -> _Record | None:
+        # Before-image to use instead of the live account at version, if any.
+        for record in self._history.get(account_id, ()):
+            if record[0] > version:
+                return record
+        return None
+
+    def client_visible(self, client_id: str, version: int) -> bool:
+        return self._clients.get(client_id, 0) <= version
+
+    def _prune(self, oldest: int) -> None:
+        history = {}
+        for account_id, records in self._history.items():
+            kept = [record for record in records if record[0] > oldest]
+            if kept:
+                history[account_id] = kept
+        self._history = history
+        self._clients = {client_id: version for client_id, version in self._clients.items() if version > oldest}
+
+
+class ReadView:
+    # Account state frozen at one commit version, read while writers carry on. Rows
+    # come from the live accounts except where a change newer than the view left a
+    # before-image. Each account is read under its stripe lock, so a write in flight
+    # is either fully visible (and then replaced by its before-image) or not at all;
+    # writers only wait for that single read. Release the view (or use it as a
+    # context manager) so the history it pins can be dropped.
+
+    def __init__(self, bank: Bank, version: int) -> None:
+        self._bank = bank
+        self._version = version
+        self._released = False
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def rows(self) -> Iterator[AccountRow]:
+        # Every account that existed at the view's version, e.g. for an export.
+        self._check_open()
+        versions = self._bank._versions
+        version = self._version
+        for row in self._bank._iter_account_rows():
+            account_id = row[0]
+            with DEFAULT_STRIPES.lock_for(account_id):
+                record = versions.state_at(account_id, version)
+            if record is None:
+                yield row
+            elif record[2] is not None:
+                yield account_id, row[1], record[2], row[3], record[1]
+
+    def get_balance(self, account_id: str) -> Decimal:
+        self._check_open()
+        account = self._bank._accounts.get(account_id)
+        if account is None:
+            raise InvalidOperationError("Account not found.")
+        with account._lock:
+            cents = account.balance_cents
+            record = self._bank._versions.state_at(account_id, self._version)
+        if record is not None:
+            if record[2] is None:
+                raise InvalidOperationError("Account not found.")
+            cents = record[1]
+        return Money(cents).to_decimal()
+
+    def search_accounts(
+        self,
+        *,
+        client_id: str | None = None,
+        status: AccountStatus | None = None,
+        currency: Currency | None = None,
+    ) -> list[AccountRow]:
+        return [
+            row
+            for row in self.rows()
+            if (client_id is None or row[1] == client_id)
+            and (status is None or row[2] == status)
+            and (currency is None or row[3] == currency)
+        ]
+
+    def get_subtotals(self) -> dict[Currency, Decimal]:
+        return self._currency_totals().subtotals()
+
+    def get_total_balance(self, currency: Currency | None = None) -> Decimal:
+        # Same rules as Bank.get_total_balance, at the view's version; FX rates are
+        # the ones attached now.
+        totals = self._currency_totals()
+        if currency is None:
+            return Money(totals.total_cents()).to_decimal()
+        rates = self._bank._fx_rates
+        if rates is None:
+            raise InvalidOperationError("No FX rates attached.")
+        return totals.convert(rates.factors(Currency(currency)))
+
+    def get_clients_ranking(self) -> list[tuple[str, Decimal]]:
+        totals: dict[str, int] = {}
+        for _, owner_id, status, _, cents in self.rows():
+            if status != AccountStatus.CLOSED:
+                totals[owner_id] = totals.get(owner_id, 0) + cents
+        versions = self._bank._versions
+        clients = [
+            client_id
+            for client_id in list(self._bank._clients)
+            if versions.client_visible(client_id, self._version)
+        ]
+        return ClientRanking.from_totals(clients, totals).items()
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._bank._release_view(self._version)
+
+    def __enter__(self) -> ReadView:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+    def _currency_totals(self) -> CurrencyTotals:
+        totals = CurrencyTotals()
+        for _, _, status, currency, cents in self.rows():
+            if status != AccountStatus.CLOSED:
+                totals.adjust(currency, cents)
+        return totals
+
+    def _check_open(self) -> None:
+        if self._released:
+            raise InvalidOperationError("Read view has been released.")
@@ -1,10 +1,16 @@
+import tempfile
 import unittest
+from dataclasses import asdict
 from datetime import datetime
 from decimal import Decimal
+from pathlib import Path
 
-from banking.bank import Bank
+from banking.account_options import InvestmentOptions, PremiumOptions, SavingsOptions
+from banking.bank import AccountSpec, Bank
 from banking.client import Client
+from banking.credentials import PasswordHasher
 from banking.errors import InvalidOperationError
+from banking.journal import Journal
 from banking.types import AccountStatus, AccountType, ClientStatus, Currency
 
 
@@ -27,7 +33,7 @@ class TestBank(unittest.TestCase):
         self.assertFalse(self.bank.authenticate_client("C-001", "wrong1"))
         self.assertFalse(self.bank.authenticate_client("C-001", "wrong2"))
         self.assertFalse(self.bank.authenticate_client("C-001", "wrong3"))
-        self.assertEqual(self.client.status, ClientStatus.BLOCKED)
+        self.assertEqual(self.client.status, ClientStatus.LOCKED)
         self.assertFalse(self.bank.authenticate_client("C-001", "secret"))
 
     def test_open_freeze_unfreeze_close(self):
@@ -81,6 +87,153 @@ class TestBank(unittest.TestCase):
         ranking = self.bank.get_clients_ranking()
         self.assertEqual(ranking[0][0], "C-001")
 
+    def test_search_accounts_uses_indexes(self):
+        usd = self.bank.open_account("C-001", currency=Currency.USD, balance=Decimal("10.00"))
+        eur = self.bank.open_account("C-001", currency=Currency.EUR, balance=Decimal("20.00"))
+        frozen_eur = self.bank.open_account("C-001", currency=Currency.EUR)
+        self.bank.freeze_account(frozen_eur.id)
+
+        self.assertEqual(
+            self.bank.search_accounts(client_id="C-001", status=AccountStatus.FROZEN, currency=Currency.EUR),
+            [frozen_eur],
+        )
+        self.assertEqual(self.bank.search_accounts(status=AccountStatus.ACTIVE), [usd, eur])
+        self.assertEqual(self.bank.search_accounts(client_id="C-404"), [])
+        self.assertEqual(len(self.bank.search_accounts()), 3)
+
+        self.bank.unfreeze_account(frozen_eur.id)
+        self.bank.close_account(usd.id)
+        self.assertEqual(self.bank.search_accounts(status=AccountStatus.FROZEN), [])
+        self.assertEqual(self.bank.search_accounts(status=AccountStatus.CLOSED), [usd])
+
+    def test_iter_accounts_is_lazy(self):
+        self.bank.open_account("C-001", currency=Currency.USD)
+        results = self.bank.iter_accounts(currency=Currency.USD)
+        self.assertNotIsInstance(results, list)
+        self.assertEqual(len(list(results)), 1)
+
+    def test_client_account_ids_are_unique(self):
+        self.client.add_account("A-1")
+        self.client.add_account("A-1")
+        self.assertEqual(self.client.accounts, ["A-1"])
+        self.client.remove_account("A-1")
+        self.client.remove_account("A-1")
+        self.assertEqual(self.client.accounts, [])
+
+    def test_client_removal_keeps_opening_order(self):
+        self.client.add_accounts(["A-1", "A-2", "A-3", "A-2"])
+        self.client.remove_account("A-2")
+        self.client.add_account("A-4")
+        self.assertEqual(self.client.accounts, ["A-1", "A-3", "A-4"])
+
+    def test_client_accounts_field_is_public(self):
+        client = Client("Anna Petrova", "C-010", 30, ClientStatus.ACTIVE, ["A-1"], {"email": "a@example.com"})
+        self.assertEqual(client.contacts, {"email": "a@example.com"})
+        client.accounts.append("A-2")
+        client.add_account("A-2")
+        client.remove_account("A-1")
+        self.assertEqual(client.accounts, ["A-2"])
+        self.assertEqual(
+            asdict(client),
+            {
+                "full_name": "Anna Petrova",
+                "client_id": "C-010",
+                "age": 30,
+                "status": ClientStatus.ACTIVE,
+                "accounts": ["A-2"],
+                "contacts": {"email": "a@example.com"},
+            },
+        )
+
+
+class TestOpenAccountsBulk(unittest.TestCase):
+    NOON = datetime(2024, 1, 1, 12, 0)
+
+    def setUp(self):
+        self.bank = Bank(_hasher=PasswordHasher(n=2 ** 8))
+        for client_id, name in (("C-001", "Ilya Yarets"), ("C-002", "Anna Petrova"), ("C-003", "Oleg Ivanov")):
+            self.bank.add_client(Client(full_name=name, client_id=client_id, age=30), password="secret")
+        self.bank._clients["C-003"].status = ClientStatus.BLOCKED
+
+    def test_rows_fail_independently(self):
+        savings = SavingsOptions(min_balance=Decimal("10.00"), monthly_interest_rate=Decimal("0.01"))
+        specs = [
+            AccountSpec("C-001", AccountType.SAVINGS, balance=Decimal("50.00"), options=savings),
+            AccountSpec("C-404"),
+            AccountSpec("C-003"),
+            AccountSpec("C-002", AccountType.SAVINGS, balance=Decimal("5.00"), options=savings),
+            AccountSpec("C-002", AccountType.SAVINGS, balance=Decimal("15.00"), options=savings),
+            AccountSpec("C-001", AccountType.PREMIUM, options=savings),
+            AccountSpec("C-001", "gold"),
+            AccountSpec("C-002", balance=Decimal("-1")),
+            AccountSpec("C-002", currency=Currency.EUR, balance=Decimal("7.50")),
+        ]
+        result = self.bank.open_accounts_bulk(specs, now=self.NOON)
+        self.assertEqual(sorted(result.errors), [1, 2, 3, 5, 6, 7])
+        self.assertEqual(result.errors[1], "Client not found.")
+        self.assertEqual(result.errors[2], "Client is not active.")
+        self.assertIn("min_balance", result.errors[3])
+        self.assertEqual([row for row, account in enumerate(result.accounts) if account], [0, 4, 8])
+        first, second, third = result.opened
+        self.assertEqual(second.balance, Decimal("15.00"))
+        self.assertEqual(second.min_balance, Decimal("10.00"))
+        self.assertEqual(second.owner.doc_id, "C-002")
+        self.assertEqual(self.bank._clients["C-002"].accounts, [second.id, third.id])
+        self.assertEqual(self.bank.search_accounts(client_id="C-001"), [first])
+        self.assertEqual(self.bank.get_subtotals(), {Currency.USD: Decimal("65.00"), Currency.EUR: Decimal("7.50")})
+        self.assertEqual(self.bank.get_clients_ranking()[0], ("C-001", Decimal("50.00")))
+
+        second.deposit(Decimal("1.00"))
+        self.assertEqual(self.bank.get_clients_ranking()[1], ("C-002", Decimal("23.50")))
+        self.assertEqual(first.balance, Decimal("50.00"))
+
+    def test_matches_opening_one_by_one(self):
+        kinds = [
+            (AccountType.BASE, None),
+            (AccountType.PREMIUM, PremiumOptions(overdraft_limit=Decimal("100.00"))),
+            (AccountType.INVESTMENT, InvestmentOptions(portfolios={"etf": Decimal("3.00")})),
+        ]
+        specs = [
+            AccountSpec(f"C-00{1 + i % 2}", kinds[i % 3][0], balance=Decimal(i), options=kinds[i % 3][1])
+            for i in range(30)
+        ]
+        single = Bank(_hasher=PasswordHasher(n=2 ** 8))
+        for client_id in ("C-001", "C-002"):
+            single.add_client(Client(full_name="Someone", client_id=client_id, age=30), password="secret")
+        for spec in specs:
+            single.open_account(
+                spec.client_id, account_type=spec.account_type, balance=spec.balance, options=spec.options,
+                now=self.NOON,
+            )
+        opened = self.bank.open_accounts_bulk(specs, now=self.NOON).opened
+        self.assertEqual(
+            [account.get_account_info() | {"id": None, "owner_name": None} for account in opened],
+            [account.get_account_info() | {"id": None, "owner_name": None} for account in single._accounts.values()],
+        )
+        self.assertEqual(self.bank.get_clients_ranking()[:2], single.get_clients_ranking()[:2])
+        investments = [account for account in opened if account.get_account_info()["type"] == "InvestmentAccount"]
+        investments[0].add_asset("stocks", Decimal("1.00"))
+        self.assertEqual(investments[1].portfolio_value, Decimal("3.00"))
+
+    def test_quiet_hours_refuse_the_batch(self):
+        with self.assertRaises(InvalidOperationError):
+            self.bank.open_accounts_bulk([AccountSpec("C-001"), AccountSpec("C-002")], now=datetime(2024, 1, 1, 1, 0))
+        self.assertEqual(self.bank._accounts, {})
+        self.assertEqual({event.client_id for event in self.bank.security_log}, {"C-001", "C-002"})
+
+    def test_journaled_and_recovered(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "bank.journal"
+            self.bank.attach_journal(Journal(path, commit_window=0.001))
+            result = self.bank.open_accounts_bulk(
+                [AccountSpec("C-001", balance=Decimal("1.00")), AccountSpec("C-002", currency=Currency.RUB)],
+                now=self.NOON,
+            )
+            self.bank.close()
+            recovered = Bank.recover(path)
+            self.assertEqual(sorted(recovered._accounts), sorted(account.id for account in result.opened))
+            recovered.close()
+
 
 if __name__ == "__main__":
     unittest.main()
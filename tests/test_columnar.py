@@ -0,0 +1,101 @@
+import threading
+import unittest
+from decimal import Decimal
+
+from banking import columnar
+from banking.bank import AccountSpec, Bank
+from banking.client import Client
+from banking.columnar import AccountColumns
+from banking.types import AccountStatus, Currency
+
+
+class ColumnarBankMixin:
+    use_numpy = False
+
+    def setUp(self):
+        self.bank = Bank()
+        for client_id in ("C-001", "C-002"):
+            self.bank.add_client(Client(full_name="Client", client_id=client_id, age=30), password="pw")
+        self.usd = self.bank.open_account("C-001", currency=Currency.USD, balance=Decimal("100.00"))
+        self.eur = self.bank.open_account("C-002", currency=Currency.EUR, balance=Decimal("40.50"))
+        self.columns = self.bank.enable_columnar_store(use_numpy=self.use_numpy)
+        self.late = self.bank.open_account("C-002", currency=Currency.EUR, balance=Decimal("9.50"))
+
+    def test_columns_follow_account_changes(self):
+        self.usd.deposit(Decimal("0.25"))
+        self.eur.withdraw(Decimal("0.50"))
+        self.bank.freeze_account(self.late.id)
+
+        self.assertEqual(self.columns.balance(self.usd.id), Decimal("100.25"))
+        self.assertEqual(self.columns.total_balance_cents(currency=Currency.EUR), 4950)
+        self.assertEqual(self.columns.total_balance_cents(status=AccountStatus.FROZEN), 950)
+        self.assertEqual(self.bank.get_subtotals(), {Currency.USD: Decimal("100.25"), Currency.EUR: Decimal("49.50")})
+
+    def test_closed_accounts_are_excluded_from_aggregates(self):
+        self.bank.close_account(self.eur.id)
+
+        self.assertEqual(self.bank.get_subtotals(), {Currency.USD: Decimal("100.00"), Currency.EUR: Decimal("9.50")})
+        self.assertEqual(self.columns.totals_by_owner(), {"C-001": 10000, "C-002": 950})
+        self.assertEqual(self.columns.totals_by_currency()[Currency.EUR], 950)
+        self.assertEqual(self.columns.totals_by_status()[AccountStatus.CLOSED], 4050)
+
+    def test_filter_rows(self):
+        rows = self.columns.filter_rows(client_id="C-002", currency=Currency.EUR)
+        self.assertEqual([self.columns.account_id(row) for row in rows], [self.eur.id, self.late.id])
+        self.assertEqual(self.columns.filter_rows(client_id="C-404"), [])
+
+    def test_totals_by_status(self):
+        self.bank.freeze_account(self.late.id)
+        totals = self.columns.totals_by_status()
+        self.assertEqual(totals[AccountStatus.ACTIVE], 14050)
+        self.assertEqual(totals[AccountStatus.FROZEN], 950)
+
+    def test_reads_while_accounts_are_opened(self):
+        stop = threading.Event()
+        errors = []
+
+        def read():
+            while not stop.is_set():
+                try:
+                    self.columns.total_balance_cents()
+                    self.columns.filter_rows(currency=Currency.USD)
+                    self.columns.totals_by_owner()
+                    self.columns.totals_by_status()
+                except Exception as exc:  # noqa: BLE001 - reported below
+                    errors.append(exc)
+                    return
+
+        readers = [threading.Thread(target=read) for _ in range(2)]
+        for reader in readers:
+            reader.start()
+        try:
+            for _ in range(20):
+                result = self.bank.open_accounts_bulk([AccountSpec("C-001", balance=Decimal("1.00"))] * 50)
+                self.assertEqual(result.errors, {})
+        finally:
+            stop.set()
+            for reader in readers:
+                reader.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.columns), len(self.bank._accounts))
+        self.assertEqual(self.columns.totals_by_owner()["C-001"], 10000 + 1000 * 100)
+
+
+class TestAccountColumnsArray(ColumnarBankMixin, unittest.TestCase):
+    use_numpy = False
+
+
+@unittest.skipIf(columnar.np is None, "NumPy is not installed")
+class TestAccountColumnsNumpy(ColumnarBankMixin, unittest.TestCase):
+    use_numpy = True
+
+
+class TestAccountColumnsEmpty(unittest.TestCase):
+    def test_empty_store(self):
+        columns = AccountColumns()
+        self.assertEqual(columns.total_balance_cents(), 0)
+        self.assertEqual(columns.totals_by_owner(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import random
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+from banking.account_options import PremiumOptions
+from banking.bank import Bank
+from banking.client import Client
+from banking.errors import AccountFrozenError, InsufficientFundsError, InvalidOperationError
+from banking.journal import Journal, JournalOp, read_journal
+from banking.locks import LockStripes
+from banking.types import AccountType, Currency
+
+NOON = datetime(2024, 1, 1, 12, 0)
+
+
+class TestLockStripes(unittest.TestCase):
+    def test_same_key_maps_to_same_lock(self):
+        stripes = LockStripes(8)
+        self.assertIs(stripes.lock_for("A-1"), stripes.lock_for("A-1"))
+        self.assertEqual(len(stripes), 8)
+
+    def test_hold_accepts_keys_sharing_a_stripe(self):
+        stripes = LockStripes(1)
+        with stripes.hold("a", "b", "a"):
+            self.assertTrue(stripes.lock_for("a")._is_owned())
+        with self.assertRaises(ValueError):
+            LockStripes(0)
+
+
+class TestTransfer(unittest.TestCase):
+    def setUp(self):
+        self.bank = Bank()
+        self.bank.add_client(Client(full_name="Ilya Yarets", client_id="C-001", age=30), password="secret")
+        self.source = self.bank.open_account("C-001", balance=Decimal("100.00"), now=NOON)
+        self.target = self.bank.open_account("C-001", balance=Decimal("10.00"), now=NOON)
+
+    def test_moves_money_between_accounts(self):
+        self.bank.transfer(self.source.id, self.target.id, Decimal("40.00"), now=NOON)
+
+        self.assertEqual(self.source.balance, Decimal("60.00"))
+        self.assertEqual(self.target.balance, Decimal("50.00"))
+        self.assertEqual(self.bank.get_total_balance(), Decimal("110.00"))
+
+    def test_failed_transfer_changes_nothing(self):
+        self.bank.freeze_account(self.target.id, now=NOON)
+        with self.assertRaises(AccountFrozenError):
+            self.bank.transfer(self.source.id, self.target.id, Decimal("40.00"), now=NOON)
+        self.bank.unfreeze_account(self.target.id, now=NOON)
+        with self.assertRaises(InsufficientFundsError):
+            self.bank.transfer(self.target.id, self.source.id, Decimal("500.00"), now=NOON)
+        self.assertEqual(self.source.balance, Decimal("100.00"))
+        self.assertEqual(self.target.balance, Decimal("10.00"))
+
+    def test_rejects_invalid_pairs(self):
+        other = self.bank.open_account("C-001", currency=Currency.EUR, now=NOON)
+        with self.assertRaises(InvalidOperationError):
+            self.bank.transfer(self.source.id, self.source.id, Decimal("1.00"), now=NOON)
+        with self.assertRaises(InvalidOperationError):
+            self.bank.transfer(self.source.id, other.id, Decimal("1.00"), now=NOON)
+        with self.assertRaises(InvalidOperationError):
+            self.bank.transfer(self.source.id, self.target.id, Decimal("1.00"), now=datetime(2024, 1, 1, 1, 0))
+
+    def test_premium_source_pays_its_fee(self):
+        premium = self.bank.open_account(
+            "C-001",
+            account_type=AccountType.PREMIUM,
+            options=PremiumOptions(overdraft_limit=Decimal("50.00"), withdraw_fee=Decimal("1.00")),
+            now=NOON,
+        )
+        self.bank.transfer(premium.id, self.target.id, Decimal("20.00"), now=NOON)
+        self.assertEqual(premium.balance, Decimal("-21.00"))
+        self.assertEqual(self.target.balance, Decimal("30.00"))
+
+    def test_transfer_is_one_journal_record(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "bank.journal"
+            self.bank.attach_journal(Journal(path, commit_window=0))
+            self.bank.transfer(self.source.id, self.target.id, Decimal("40.00"), now=NOON)
+            self.bank.close()
+
+            size = path.stat().st_size
+            records = list(read_journal(path))
+            self.assertEqual([op for op, _ in records[-2:]], [JournalOp.POSTING, JournalOp.POSTING])
+
+            # A crash in the middle of the batch frame loses both postings, never just one.
+            with open(path, "r+b") as handle:
+                handle.truncate(size - 3)
+            recovered = Bank.recover(path)
+            try:
+                self.assertEqual(recovered._accounts[self.source.id].balance, Decimal("100.00"))
+                self.assertEqual(recovered._accounts[self.target.id].balance, Decimal("10.00"))
+            finally:
+                recovered.close()
+
+
+class TestConcurrentLoad(unittest.TestCase):
+    def test_total_balance_is_conserved(self):
+        bank = Bank()
+        for i in range(4):
+            bank.add_client(Client(full_name=f"Client {i}", client_id=f"C-{i}", age=30), password="pw")
+        accounts = [bank.open_account(f"C-{i % 4}", balance=Decimal("100.00"), now=NOON) for i in range(12)]
+        bank.enable_columnar_store(use_numpy=False)
+        expected = bank.get_total_balance()
+        ids = [account.id for account in accounts]
+        errors = []
+
+        def worker(seed: int) -> None:
+            rng = random.Random(seed)
+            try:
+                for _ in range(400):
+                    src, dst = rng.sample(ids, 2)
+                    try:
+                        bank.transfer(src, dst, Decimal(rng.randrange(1, 5000)) / 100, now=NOON)
+                    except InsufficientFundsError:
+                        pass
+                    bank.get_top_clients(2)
+            except BaseException as exc:  # pragma: no cover - surfaced below
+                errors.append(exc)
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(bank.get_total_balance(), expected)
+        self.assertEqual(sum(account.balance for account in accounts), expected)
+        self.assertEqual(sum(total for _, total in bank.get_clients_ranking()), expected)
+        self.assertTrue(all(account.balance >= 0 for account in accounts))
+
+    def test_concurrent_deposits_are_not_lost(self):
+        bank = Bank()
+        bank.add_client(Client(full_name="Ilya Yarets", client_id="C-001", age=30), password="secret")
+        account = bank.open_account("C-001", now=NOON)
+
+        def worker() -> None:
+            for _ in range(500):
+                account.deposit(Decimal("0.01"))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(account.balance, Decimal("40.00"))
+        self.assertEqual(bank.get_clients_ranking(), [("C-001", Decimal("40.00"))])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+from banking.bank import MAX_FAILED_ATTEMPTS, Bank
+from banking.client import Client
+from banking.credentials import PasswordHasher, SessionStore
+from banking.errors import InvalidOperationError
+from banking.journal import Journal
+from banking.types import ClientStatus
+
+FAST = PasswordHasher(n=2 ** 8)
+
+
+class TestPasswordHasher(unittest.TestCase):
+    def test_hash_round_trip(self):
+        encoded = FAST.hash("secret")
+        self.assertTrue(encoded.startswith("scrypt$256$8$1$"))
+        self.assertNotIn("secret", encoded)
+        self.assertNotEqual(encoded, FAST.hash("secret"))
+        self.assertTrue(FAST.verify("secret", encoded))
+        self.assertFalse(FAST.verify("Secret", encoded))
+        self.assertFalse(FAST.verify("secret", None))
+
+    def test_rehash_on_parameter_change_or_plaintext(self):
+        self.assertFalse(FAST.needs_rehash(FAST.hash("pw")))
+        self.assertTrue(PasswordHasher(n=2 ** 9).needs_rehash(FAST.hash("pw")))
+        self.assertTrue(FAST.needs_rehash("pw"))
+        self.assertTrue(FAST.verify("pw", "pw"))
+        with self.assertRaises(InvalidOperationError):
+            PasswordHasher(n=1000)
+
+
+class TestSessionStore(unittest.TestCase):
+    def test_tokens_expire(self):
+        now = [0.0]
+        store = SessionStore(ttl=10, clock=lambda: now[0])
+        first = store.issue("C-001")
+        self.assertEqual(store.client_for(first), "C-001")
+        now[0] = 5
+        second = store.issue("C-002")
+        now[0] = 10
+        self.assertIsNone(store.client_for(first))
+        self.assertEqual(store.client_for(second), "C-002")
+        now[0] = 20
+        store.issue("C-003")  # sweeps the expired tokens
+        self.assertEqual(len(store), 1)
+
+    def test_revoke_client(self):
+        store = SessionStore()
+        tokens = [store.issue("C-001") for _ in range(3)]
+        other = store.issue("C-002")
+        store.revoke_client("C-001")
+        self.assertEqual([store.client_for(token) for token in tokens], [None, None, None])
+        self.assertEqual(store.client_for(other), "C-002")
+
+
+class TestBankCredentials(unittest.TestCase):
+    def setUp(self):
+        self.bank = Bank(_hasher=FAST)
+        self.bank.add_client(Client(full_name="Ilya Yarets", client_id="C-001", age=30), password="secret")
+
+    def test_credentials_are_hashed(self):
+        self.assertNotEqual(self.bank._credentials["C-001"], "secret")
+        self.assertTrue(self.bank.authenticate_client("C-001", "secret"))
+        self.assertFalse(self.bank.authenticate_client("C-001", "wrong"))
+
+    def test_login_issues_session(self):
+        token = self.bank.login("C-001", "secret")
+        self.assertEqual(self.bank.session_client(token), "C-001")
+        self.assertIsNone(self.bank.login("C-001", "wrong"))
+        self.bank.logout(token)
+        with self.assertRaises(InvalidOperationError):
+            self.bank.session_client(token)
+
+    def test_lockout_is_unchanged_and_ends_sessions(self):
+        token = self.bank.login("C-001", "secret")
+        for _ in range(MAX_FAILED_ATTEMPTS):
+            self.assertFalse(self.bank.authenticate_client("C-001", "wrong"))
+        self.assertEqual(self.bank._clients["C-001"].status, ClientStatus.LOCKED)
+        self.assertFalse(self.bank.authenticate_client("C-001", "secret"))
+        self.assertEqual(
+            [event.reason for event in self.bank.security_log],
+            ["failed login attempt", "failed login attempt", "account locked after failed logins"],
+        )
+        with self.assertRaises(InvalidOperationError):
+            self.bank.session_client(token)
+
+    def test_legacy_plaintext_is_upgraded_on_login(self):
+        bank = Bank(
+            _clients={"C-9": Client(full_name="Old Client", client_id="C-9", age=50)},
+            _credentials={"C-9": "legacy"},
+            _hasher=FAST,
+        )
+        self.assertTrue(bank.authenticate_client("C-9", "legacy"))
+        self.assertTrue(bank._credentials["C-9"].startswith("scrypt$"))
+        self.assertTrue(bank.authenticate_client("C-9", "legacy"))
+
+    def test_journal_and_snapshot_store_hashes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            journal_path = Path(tmp) / "bank.journal"
+            snapshot_path = Path(tmp) / "bank.snap"
+            self.bank.attach_journal(Journal(journal_path, commit_window=0))
+            self.bank.snapshot(snapshot_path)
+            self.bank.close()
+            self.assertNotIn(b"secret", journal_path.read_bytes())
+            self.assertNotIn(b"secret", snapshot_path.read_bytes())
+
+            recovered = Bank.recover(journal_path)
+            recovered._hasher = FAST
+            try:
+                self.assertTrue(recovered.authenticate_client("C-001", "secret"))
+            finally:
+                recovered.close()
+            self.assertTrue(Bank.load_snapshot(snapshot_path).authenticate_client("C-001", "secret"))
+
+
+class TestAsyncAuthentication(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.bank = Bank()
+        self.bank.add_client(Client(full_name="Ilya Yarets", client_id="C-001", age=30), password="secret")
+
+    async def asyncTearDown(self):
+        self.bank.close()
+
+    async def test_kdf_runs_off_the_event_loop(self):
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        try:
+            self.assertTrue(await self.bank.authenticate_client_async("C-001", "secret"))
+        finally:
+            task.cancel()
+        self.assertGreater(ticks, 1)
+
+    async def test_async_login_and_lockout(self):
+        token = await self.bank.login_async("C-001", "secret")
+        self.assertEqual(self.bank.session_client(token), "C-001")
+        results = await asyncio.gather(
+            *(self.bank.authenticate_client_async("C-001", "wrong") for _ in range(MAX_FAILED_ATTEMPTS))
+        )
+        self.assertEqual(results, [False] * MAX_FAILED_ATTEMPTS)
+        self.assertEqual(self.bank._clients["C-001"].status, ClientStatus.LOCKED)
+        self.assertIsNone(await self.bank.login_async("C-001", "secret"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,197 @@
+import asyncio
+import threading
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from banking.bank import Bank
+from banking.client import Client
+from banking.credentials import PasswordHasher
+from banking.errors import InvalidOperationError
+from banking.events import EventKind, EventStream, Overflow
+from banking.types import AccountStatus
+
+NOON = datetime(2024, 1, 1, 12, 0)
+
+
+def publish(stream, count, start=0):
+    for i in range(start, start + count):
+        stream.publish(EventKind.DEPOSIT, f"A-{i}", "C-001", i)
+
+
+class TestEventStream(unittest.TestCase):
+    def test_inactive_until_first_subscriber(self):
+        stream = EventStream()
+        self.assertFalse(stream.active)
+        subscription = stream.subscribe()
+        self.assertTrue(stream.active)
+        publish(stream, 3)
+        self.assertEqual([event.offset for event in (subscription.poll(), subscription.poll())], [0, 1])
+        self.assertEqual(subscription.offset, 2)
+        other = stream.subscribe()
+        subscription.close()
+        self.assertTrue(stream.active)
+        other.close()
+        self.assertFalse(stream.active)
+
+    def test_has_room_and_exempt_threads(self):
+        stream = EventStream()
+        subscription = stream.subscribe(maxsize=1, overflow=Overflow.BLOCK)
+        self.assertTrue(stream.has_room())
+        publish(stream, 1)
+        self.assertFalse(stream.has_room())
+        results = []
+        exempt = threading.Thread(target=lambda: (stream.exempt_thread(), results.append(stream.wait_for_room())))
+        exempt.start()
+        exempt.join(5)
+        self.assertEqual(results, [True])
+        subscription.poll()
+        self.assertTrue(stream.has_room())
+
+    def test_drop_policy_skips_the_oldest_unread_events(self):
+        stream = EventStream(retention=10)
+        subscription = stream.subscribe(maxsize=3)
+        publish(stream, 8)
+        self.assertEqual(subscription.poll().offset, 5)
+        self.assertEqual(subscription.dropped, 5)
+        subscription.close()
+        self.assertEqual([event.offset for event in subscription], [6, 7])
+
+    def test_resume_from_a_retained_offset(self):
+        stream = EventStream(retention=4)
+        first = stream.subscribe()
+        publish(stream, 3)
+        first.poll()
+        resume_at = first.offset
+        first.close()
+        publish(stream, 1, start=3)
+        again = stream.subscribe(offset=resume_at, maxsize=4)
+        again.close()
+        self.assertEqual([event.account_id for event in again], ["A-1", "A-2", "A-3"])
+        publish(stream, 2, start=4)
+        self.assertEqual(stream.first_retained, 2)
+        with self.assertRaises(InvalidOperationError):
+            stream.subscribe(offset=1)
+        with self.assertRaises(InvalidOperationError):
+            stream.subscribe(maxsize=0)
+
+    def test_block_policy_holds_producers_until_the_consumer_catches_up(self):
+        stream = EventStream(retention=16)
+        subscription = stream.subscribe(maxsize=2, overflow="block")
+        publish(stream, 2)
+        self.assertFalse(stream.wait_for_room(timeout=0.01))
+
+        def produce():
+            for i in range(2, 5):
+                stream.wait_for_room()
+                publish(stream, 1, start=i)
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        producer.join(0.2)
+        self.assertTrue(producer.is_alive())
+        self.assertEqual(stream.head, 2)
+        received = [subscription.get(timeout=5).offset for _ in range(5)]
+        producer.join(5)
+        self.assertEqual(received, [0, 1, 2, 3, 4])
+        self.assertEqual(subscription.dropped, 0)
+        self.assertIsNone(subscription.get(timeout=0.01))
+
+    def test_block_subscriber_past_the_retention_counts_drops(self):
+        stream = EventStream(retention=4)
+        subscription = stream.subscribe(maxsize=4, overflow=Overflow.BLOCK)
+        publish(stream, 6)  # publish() itself never waits
+        self.assertEqual(subscription.poll().offset, 2)
+        self.assertEqual(subscription.dropped, 2)
+
+    def test_async_iteration(self):
+        stream = EventStream()
+        subscription = stream.subscribe(overflow=Overflow.DROP)
+
+        async def consume():
+            received = []
+            async for event in subscription:
+                received.append(event.cents)
+                if len(received) == 3:
+                    subscription.close()
+            return received
+
+        async def main():
+            task = asyncio.create_task(consume())
+            await asyncio.sleep(0)
+            await asyncio.to_thread(publish, stream, 3)
+            return await asyncio.wait_for(task, 5)
+
+        self.assertEqual(asyncio.run(main()), [0, 1, 2])
+
+
+class TestBankEvents(unittest.TestCase):
+    def setUp(self):
+        self.bank = Bank(_hasher=PasswordHasher(n=2 ** 8))
+        self.bank.add_client(Client(full_name="Ilya Yarets", client_id="C-001", age=30), password="secret")
+
+    def test_block_consumer_can_call_back_into_the_bank(self):
+        bank = self.bank
+        accounts = [bank.open_account("C-001", balance=Decimal("5.00"), now=NOON).id for _ in range(3)]
+        subscription = bank.events.subscribe(maxsize=1, overflow=Overflow.BLOCK)
+
+        def consume():
+            # Freezes every account it sees a deposit on, while producers are held back.
+            for event in subscription:
+                if event.kind == EventKind.DEPOSIT:
+                    bank.freeze_account(event.account_id, now=NOON)
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        producers = [
+            threading.Thread(target=bank.deposit, args=(account_id, Decimal("1.00")), kwargs={"now": NOON})
+            for account_id in accounts
+        ]
+        for producer in producers:
+            producer.start()
+        for producer in producers:
+            producer.join(5)
+        self.assertFalse(any(producer.is_alive() for producer in producers))
+        # Barriers over every account are not stuck behind a waiting producer.
+        bank.read_view().release()
+        bank.enable_ledger()
+        subscription.close()
+        consumer.join(5)
+        self.assertFalse(consumer.is_alive())
+        self.assertEqual([bank._accounts[a].status for a in accounts], [AccountStatus.FROZEN] * 3)
+        self.assertEqual(subscription.dropped, 0)
+
+    def test_no_events_are_kept_without_subscribers(self):
+        self.bank.open_account("C-001", balance=Decimal("5.00"), now=NOON)
+        self.assertEqual(self.bank.events.head, 0)
+
+    def test_account_lifecycle_and_postings(self):
+        subscription = self.bank.events.subscribe()
+        account = self.bank.open_account("C-001", account_type="savings", balance=Decimal("10.00"), now=NOON)
+        other = self.bank.open_account("C-001", account_type="investment", now=NOON)
+        self.bank.deposit(account.id, Decimal("2.50"), now=NOON)
+        self.bank.transfer(account.id, other.id, Decimal("1.00"), now=NOON)
+        other.add_asset("bonds", Decimal("0.50"))
+        self.bank.freeze_account(account.id, now=NOON)
+        self.bank.unfreeze_account(account.id, now=NOON)
+        self.bank.close_account(other.id, now=NOON)
+        subscription.close()
+        events = [(event.kind, event.account_id, event.amount, event.detail) for event in subscription]
+        self.assertEqual(
+            events,
+            [
+                (EventKind.OPENED, account.id, Decimal("10.00"), "savings"),
+                (EventKind.OPENED, other.id, Decimal("0.00"), "investment"),
+                (EventKind.DEPOSIT, account.id, Decimal("2.50"), None),
+                (EventKind.WITHDRAW, account.id, Decimal("-1.00"), None),
+                (EventKind.DEPOSIT, other.id, Decimal("1.00"), None),
+                (EventKind.ASSET_ADDED, other.id, Decimal("0.50"), "bonds"),
+                (EventKind.FROZEN, account.id, Decimal("0.00"), None),
+                (EventKind.UNFROZEN, account.id, Decimal("0.00"), None),
+                (EventKind.CLOSED, other.id, Decimal("0.00"), None),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
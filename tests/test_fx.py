@@ -0,0 +1,121 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+from banking.bank import Bank
+from banking.client import Client
+from banking.credentials import PasswordHasher
+from banking.errors import InvalidOperationError
+from banking.fx import FxRates, FxRateTable
+from banking.types import Currency
+
+NOON = datetime(2024, 1, 1, 12, 0)
+
+
+def write_rates(path: Path, rates: dict, *, base: str = "USD", bump: int = 0) -> None:
+    path.write_text(json.dumps({"base": base, "rates": rates}))
+    # Make the change visible even on filesystems with coarse timestamps.
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump))
+
+
+class TestFxRates(unittest.TestCase):
+    def test_factors_cross_through_the_base(self):
+        rates = FxRates.from_json({"base": "USD", "rates": {"EUR": "1.10", "RUB": "0.01"}})
+        factors = rates.factors(Currency.EUR)
+        self.assertEqual(factors[Currency.EUR], Decimal(1))
+        self.assertEqual(factors[Currency.USD] * Decimal("1.10"), Decimal(1))
+        self.assertEqual(rates.factors(Currency.RUB)[Currency.USD], Decimal(100))
+
+    def test_rejects_bad_tables(self):
+        with self.assertRaises(InvalidOperationError):
+            FxRates.from_json({"base": "USD", "rates": {"EUR": "-1"}})
+        with self.assertRaises(InvalidOperationError):
+            FxRates.from_json({"base": "GBP", "rates": {}})
+        with self.assertRaises(InvalidOperationError):
+            FxRates.from_json({"base": "USD", "rates": {}}).factors(Currency.EUR)
+
+
+class TestFxRateTable(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "rates.json"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_reloads_only_when_the_file_changes(self):
+        write_rates(self.path, {"EUR": "1.10"})
+        table = FxRateTable(self.path)
+        first = table.factors(Currency.USD)
+        self.assertIs(table.factors(Currency.USD), first)
+        self.assertEqual(table.version, 1)
+
+        write_rates(self.path, {"EUR": "1.20"}, bump=1_000_000)
+        self.assertEqual(table.factors(Currency.USD)[Currency.EUR], Decimal("1.20"))
+        self.assertEqual(table.version, 2)
+
+    def test_missing_file(self):
+        with self.assertRaises(InvalidOperationError):
+            FxRateTable(self.path).current()
+
+
+class TestBankCurrencyTotals(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.rates = Path(self._tmp.name) / "rates.json"
+        write_rates(self.rates, {"EUR": "1.10", "RUB": "0.01"})
+        self.bank = Bank(_hasher=PasswordHasher(n=2 ** 8))
+        self.bank.add_client(Client(full_name="Ilya Yarets", client_id="C-001", age=30), password="secret")
+        self.usd = self.bank.open_account("C-001", balance=Decimal("100.00"), now=NOON)
+        self.eur = self.bank.open_account("C-001", currency=Currency.EUR, balance=Decimal("50.00"), now=NOON)
+        self.rub = self.bank.open_account("C-001", currency=Currency.RUB, balance=Decimal("1000.00"), now=NOON)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_subtotals_follow_balance_changes(self):
+        self.eur.deposit(Decimal("5.00"))
+        self.usd.withdraw(Decimal("10.00"))
+        self.bank.close_account(self.rub.id, now=NOON)
+        self.assertEqual(
+            self.bank.get_subtotals(), {Currency.USD: Decimal("90.00"), Currency.EUR: Decimal("55.00")}
+        )
+
+    def test_total_in_reporting_currency(self):
+        with self.assertRaises(InvalidOperationError):
+            self.bank.get_total_balance(Currency.USD)
+        self.bank.attach_fx_rates(self.rates)
+        self.assertEqual(self.bank.get_total_balance(Currency.USD), Decimal("165.00"))
+        self.assertEqual(self.bank.get_total_balance(Currency.RUB), Decimal("16500.00"))
+        self.assertEqual(self.bank.get_total_balance(Currency.EUR), Decimal("150.00"))
+
+        write_rates(self.rates, {"EUR": "1.00", "RUB": "0.02"}, bump=1_000_000)
+        self.assertEqual(self.bank.get_total_balance(Currency.USD), Decimal("170.00"))
+
+    def test_unconverted_total_needs_a_single_currency(self):
+        with self.assertRaisesRegex(InvalidOperationError, "several currencies"):
+            self.bank.get_total_balance()
+        self.bank.close_account(self.eur.id, now=NOON)
+        self.bank.close_account(self.rub.id, now=NOON)
+        self.assertEqual(self.bank.get_total_balance(), Decimal("100.00"))
+
+    def test_missing_rate_is_an_error(self):
+        write_rates(self.rates, {"EUR": "1.10"})
+        self.bank.attach_fx_rates(self.rates)
+        with self.assertRaises(InvalidOperationError):
+            self.bank.get_total_balance(Currency.USD)
+
+    def test_snapshot_rebuilds_subtotals(self):
+        path = Path(self._tmp.name) / "bank.snap"
+        self.bank.snapshot(path)
+        loaded = Bank.load_snapshot(path)
+        self.assertEqual(loaded.get_subtotals(), self.bank.get_subtotals())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import io
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from banking.account_options import PremiumOptions, SavingsOptions
+from banking.bank import Bank
+from banking.client import Client
+from banking.credentials import PasswordHasher
+from banking.errors import InvalidOperationError
+from banking.events import EventKind
+from banking.history import TransactionHistory
+from banking.journal import Journal
+from banking.types import AccountType
+
+NOON = datetime(2024, 1, 1, 12, 0)
+EPOCH = datetime(2024, 3, 1, 9, 0)
+
+
+class FakeClock:
+    # Nanosecond clock that moves one minute per reading, or where it is set.
+    def __init__(self, start: datetime = EPOCH) -> None:
+        self.now = start
+
+    def __call__(self) -> int:
+        self.now += timedelta(minutes=1)
+        return round(self.now.timestamp() * 1_000_000) * 1000
+
+
+class TestStatements(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+        self.clock = FakeClock()
+        self.bank = Bank(_hasher=PasswordHasher(n=2 ** 8), _history=TransactionHistory(clock=self.clock))
+        self.bank.add_client(Client(full_name="Ilya Yarets", client_id="C-001", age=30), password="secret")
+
+    def tearDown(self):
+        self.bank.close()
+        self._tmp.cleanup()
+
+    def test_every_kind_of_change_is_recorded(self):
+        premium = self.bank.open_account(
+            "C-001",
+            account_type=AccountType.PREMIUM,
+            balance=Decimal("100.00"),
+            now=NOON,
+            options=PremiumOptions(withdraw_fee=Decimal("1.50")),
+        ).id
+        savings = self.bank.open_account(
+            "C-001",
+            account_type=AccountType.SAVINGS,
+            balance=Decimal("100.00"),
+            now=NOON,
+            options=SavingsOptions(monthly_interest_rate=Decimal("0.01")),
+        )
+        investment = self.bank.open_account(
+            "C-001", account_type=AccountType.INVESTMENT, balance=Decimal("50.00"), now=NOON
+        )
+        self.bank.deposit(premium, Decimal("10.00"), now=NOON)
+        self.bank.withdraw(premium, Decimal("20.00"), now=NOON)
+        savings.apply_monthly_interest()
+        investment.add_asset("stocks", Decimal("30.00"))
+
+        lines = list(self.bank.statement(premium))
+        self.assertEqual(
+            [(line.kind, line.amount, line.balance) for line in lines],
+            [
+                (EventKind.DEPOSIT, Decimal("10.00"), Decimal("110.00")),
+                (EventKind.WITHDRAW, Decimal("-20.00"), Decimal("90.00")),
+                (EventKind.FEE, Decimal("-1.50"), Decimal("88.50")),
+            ],
+        )
+        self.assertEqual(
+            [(line.kind, line.amount) for line in self.bank.statement(savings.id)],
+            [(EventKind.INTEREST, Decimal("1.00"))],
+        )
+        (asset,) = self.bank.statement(investment.id)
+        self.assertEqual(
+            (asset.kind, asset.amount, asset.balance, asset.detail),
+            (EventKind.ASSET_ADDED, Decimal("30.00"), Decimal("50.00"), "stocks"),
+        )
+        with self.assertRaises(InvalidOperationError):
+            self.bank.statement("missing")
+
+    def test_statement_range_is_half_open(self):
+        account = self.bank.open_account("C-001", now=NOON).id
+        for _ in range(10):
+            self.bank.deposit(account, Decimal("1.00"), now=NOON)
+        stamps = [line.timestamp for line in self.bank.statement(account)]
+        self.assertEqual(stamps, [EPOCH + timedelta(minutes=i + 1) for i in range(10)])
+        window = list(self.bank.statement(account, stamps[3], stamps[6]))
+        self.assertEqual([line.timestamp for line in window], stamps[3:6])
+        self.assertEqual([line.balance for line in window], [Decimal("4.00"), Decimal("5.00"), Decimal("6.00")])
+        self.assertEqual(list(self.bank.statement(account, end=EPOCH)), [])
+
+    def test_statement_is_lazy_and_fixed_at_the_call(self):
+        account = self.bank.open_account("C-001", now=NOON).id
+        self.bank.deposit(account, Decimal("1.00"), now=NOON)
+        lines = self.bank.statement(account)
+        self.bank.deposit(account, Decimal("2.00"), now=NOON)
+        self.assertEqual([line.amount for line in lines], [Decimal("1.00")])
+
+    def test_timestamps_never_go_backwards(self):
+        account = self.bank.open_account("C-001", now=NOON).id
+        self.bank.deposit(account, Decimal("1.00"), now=NOON)
+        self.clock.now -= timedelta(hours=1)
+        self.bank.deposit(account, Decimal("1.00"), now=NOON)
+        first, second = self.bank.statement(account)
+        self.assertEqual(second.timestamp, first.timestamp)
+
+    def test_csv_is_written_in_chunks(self):
+        account = self.bank.open_account("C-001", now=NOON).id
+        for _ in range(7):
+            self.bank.deposit(account, Decimal("1.25"), now=NOON)
+        out = io.StringIO()
+        self.assertEqual(self.bank.write_statement(account, out, chunk_size=3), 7)
+        rows = out.getvalue().splitlines()
+        self.assertEqual(rows[0], "timestamp,kind,amount,balance,detail")
+        self.assertEqual(rows[-1], f"{(EPOCH + timedelta(minutes=7)).isoformat()},deposit,1.25,8.75,")
+        path = self.dir / "statement.csv"
+        self.assertEqual(self.bank.write_statement(account, path, start=EPOCH + timedelta(minutes=5)), 3)
+        self.assertEqual(len(path.read_text().splitlines()), 4)
+
+    def test_file_history_survives_recovery(self):
+        journal_path = self.dir / "bank.journal"
+        history_path = self.dir / "bank.history"
+        bank = Bank(_hasher=PasswordHasher(n=2 ** 8), _history=TransactionHistory(history_path, clock=FakeClock()))
+        bank.attach_journal(Journal(journal_path, commit_window=0))
+        bank.add_client(Client(full_name="Ilya Yarets", client_id="C-001", age=30), password="secret")
+        account = bank.open_account("C-001", now=NOON).id
+        for amount in ("1.00", "2.00", "3.00"):
+            bank.deposit(account, Decimal(amount), now=NOON)
+        bank.close()
+        with history_path.open("ab") as handle:
+            handle.write(b"\x01\x02")  # torn record from a crash
+
+        recovered = Bank.recover(journal_path, history=TransactionHistory(history_path), commit_window=0)
+        try:
+            recovered.deposit(account, Decimal("4.00"), now=NOON)
+            self.assertEqual(
+                [(line.amount, line.balance) for line in recovered.statement(account)],
+                [(Decimal(n), Decimal(b)) for n, b in (("1", "1"), ("2", "3"), ("3", "6"), ("4", "10"))],
+            )
+        finally:
+            recovered.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+from banking.bank import Bank
+from banking.client import Client
+from banking.credentials import PasswordHasher
+from banking.errors import InvalidOperationError
+from banking.ids import EPOCH_MS, ID_WIDTH, SnowflakeIds, claim_node_id, decode_id
+
+NOON = datetime(2024, 1, 1, 12, 0)
+
+
+class FixedClock:
+    def __init__(self, millis: int) -> None:
+        self.nanos = millis * 1_000_000
+
+    def __call__(self) -> int:
+        return self.nanos
+
+
+class TestSnowflakeIds(unittest.TestCase):
+    def test_ids_are_ordered_and_decodable(self):
+        clock = FixedClock(EPOCH_MS + 5_000)
+        ids = SnowflakeIds(7, clock=clock)
+        first, second = ids.next_id(), ids.next_id()
+        self.assertEqual(len(first), ID_WIDTH)
+        self.assertLess(first, second)
+        self.assertEqual(decode_id(first), (EPOCH_MS + 5_000, 7, 0))
+        self.assertEqual(decode_id(second), (EPOCH_MS + 5_000, 7, 1))
+
+    def test_burst_borrows_the_next_millisecond_and_clock_skew_is_harmless(self):
+        clock = FixedClock(EPOCH_MS + 1)
+        ids = SnowflakeIds(1, clock=clock)
+        block = ids.reserve(5_000)
+        self.assertEqual(len(set(block)), 5_000)
+        self.assertEqual(block, sorted(block))
+        self.assertEqual(decode_id(block[-1])[0], EPOCH_MS + 2)
+        clock.nanos -= 10_000_000
+        self.assertGreater(ids.next_id(), block[-1])
+
+    def test_nodes_never_collide(self):
+        clock = FixedClock(EPOCH_MS)
+        left, right = SnowflakeIds(1, clock=clock), SnowflakeIds(2, clock=clock)
+        self.assertFalse(set(left.reserve(100)) & set(right.reserve(100)))
+
+    def test_threads_get_distinct_ids(self):
+        ids = SnowflakeIds(3)
+        seen: list[list[str]] = [[] for _ in range(4)]
+
+        def worker(out):
+            for _ in range(2_000):
+                out.append(ids.next_id())
+
+        threads = [threading.Thread(target=worker, args=(out,)) for out in seen]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len({value for out in seen for value in out}), 8_000)
+
+    def test_rejects_bad_input(self):
+        with self.assertRaises(InvalidOperationError):
+            SnowflakeIds(1024)
+        with self.assertRaises(InvalidOperationError):
+            decode_id("abcd1234")
+
+
+class TestNodeLease(unittest.TestCase):
+    def test_live_processes_get_different_node_ids(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            mine = claim_node_id(tmp)
+            src = str(Path(__file__).resolve().parents[1] / "src")
+            output = subprocess.run(
+                [sys.executable, "-c", f"from banking.ids import claim_node_id; print(claim_node_id({tmp!r}))"],
+                env={**os.environ, "PYTHONPATH": src},
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            self.assertNotEqual(int(output.stdout), mine)
+
+
+class TestBankAccountIds(unittest.TestCase):
+    def test_bank_uses_its_generator(self):
+        ids = SnowflakeIds(42)
+        bank = Bank(_hasher=PasswordHasher(n=2 ** 8), _ids=ids)
+        bank.add_client(Client(full_name="Ilya Yarets", client_id="C-001", age=30), password="secret")
+        account = bank.open_account("C-001", balance=Decimal("1.00"), now=NOON)
+        self.assertEqual(decode_id(account.id)[1], 42)
+        self.assertIn(f"id=****{account.id[-4:]}", str(account))
+
+
+if __name__ == "__main__":
+    unittest.main()
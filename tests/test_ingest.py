@@ -0,0 +1,167 @@
+import json
+import tempfile
+import tracemalloc
+import unittest
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+from banking.account_options import PremiumOptions
+from banking.bank import Bank
+from banking.client import Client
+from banking.errors import InvalidOperationError
+from banking import ingest
+from banking.ingest import ingest_file, iter_operations
+from banking.types import AccountType
+
+
+class TestIngest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _bank(self) -> tuple[Bank, list[str]]:
+        bank = Bank()
+        bank.add_client(Client(full_name="Ilya Yarets", client_id="C-001", age=30), password="secret")
+        ids = [bank.open_account("C-001", balance=Decimal("10.00")).id for _ in range(6)]
+        premium = bank.open_account(
+            "C-001",
+            account_type=AccountType.PREMIUM,
+            options=PremiumOptions(overdraft_limit=Decimal("5.00"), withdraw_fee=Decimal("1.00")),
+        )
+        frozen = bank.open_account("C-001", balance=Decimal("50.00"))
+        bank.freeze_account(frozen.id)
+        return bank, [*ids, premium.id, frozen.id]
+
+    def _write_csv(self, ids: list[str]) -> Path:
+        rows = ["account_id,op,amount"]
+        for round_no in range(20):
+            for account_id in ids[:6]:
+                rows.append(f"{account_id},deposit,1.25")
+                rows.append(f"{account_id},withdraw,{'3.00' if round_no % 2 else '0.50'}")
+        premium, frozen = ids[6], ids[7]
+        rows += [
+            f"{premium},withdraw,3.00",   # -> -4.00 after the fee
+            f"{premium},withdraw,3.00",   # overdraft exceeded
+            f"{frozen},deposit,1.00",
+            "missing,deposit,1.00",
+            f"{ids[0]},deposit,abc",
+            f"{ids[0]},transfer,1.00",
+        ]
+        path = self.dir / "batch.csv"
+        path.write_text("\n".join(rows) + "\n")
+        return path
+
+    def _run(self, workers: int) -> tuple[Bank, list[str], object, list[dict]]:
+        bank, ids = self._bank()
+        rejects = self.dir / f"rejects-{workers}.jsonl"
+        stats = ingest_file(bank, self._write_csv(ids), rejects_path=rejects, workers=workers, chunk_size=16)
+        lines = [json.loads(line) for line in rejects.read_text().splitlines()]
+        return bank, ids, stats, sorted(lines, key=lambda item: item["line"])
+
+    def test_inline_and_sharded_runs_agree(self):
+        inline_bank, inline_ids, inline_stats, inline_rejects = self._run(workers=0)
+        sharded_bank, sharded_ids, sharded_stats, sharded_rejects = self._run(workers=3)
+
+        for stats in (inline_stats, sharded_stats):
+            self.assertEqual(stats.rows, 246)
+            self.assertEqual(stats.rejected, inline_stats.rejected)
+            self.assertEqual(stats.applied + stats.rejected, stats.rows)
+        self.assertEqual(
+            [inline_bank._accounts[i].balance for i in inline_ids],
+            [sharded_bank._accounts[i].balance for i in sharded_ids],
+        )
+        self.assertEqual(inline_bank.get_total_balance(), sharded_bank.get_total_balance())
+        self.assertEqual(
+            sum(total for _, total in sharded_bank.get_clients_ranking()),
+            sum(sharded_bank._accounts[i].balance for i in sharded_ids),
+        )
+        self.assertEqual(
+            [(r["line"], r["error"]) for r in inline_rejects],
+            [(r["line"], r["error"]) for r in sharded_rejects],
+        )
+
+    def test_sharded_run_checks_accounts_changed_during_the_batch(self):
+        bank, ids = self._bank()
+        inline_bank, inline_ids = self._bank()
+        ingest_file(inline_bank, self._write_csv(inline_ids))
+        account_copy = ingest._account_copy
+
+        def changed_after_copy(bank_, account):
+            record = account_copy(bank_, account)
+            if account.id == ids[0]:
+                bank.freeze_account(ids[0])
+            elif account.id == ids[1]:
+                bank.withdraw(ids[1], Decimal("10.00"))
+            return record
+
+        rejects = self.dir / "rejects.jsonl"
+        with mock.patch("banking.ingest._account_copy", changed_after_copy):
+            stats = ingest_file(bank, self._write_csv(ids), rejects_path=rejects, workers=3, chunk_size=16)
+
+        lines = [json.loads(line) for line in rejects.read_text().splitlines()]
+        self.assertEqual(stats.rejected, len(lines))
+        self.assertEqual(stats.applied + stats.rejected, 246)
+        self.assertEqual([r["line"] for r in lines], sorted(r["line"] for r in lines))
+        self.assertEqual(bank._accounts[ids[0]].balance, Decimal("10.00"))
+        self.assertEqual(sum(r["account_id"] == ids[0] for r in lines), 42)  # 40 frozen, 2 malformed
+        self.assertGreaterEqual(bank._accounts[ids[1]].balance, Decimal("0.00"))
+        self.assertIn("InsufficientFundsError", {r["error"] for r in lines if r["account_id"] == ids[1]})
+        # Unchanged accounts get one statement line per row, as an inline run does.
+        self.assertEqual(
+            [(line.kind, line.amount) for line in bank.statement(ids[2])],
+            [(line.kind, line.amount) for line in inline_bank.statement(inline_ids[2])],
+        )
+
+    def test_sharded_memory_stays_flat_as_the_file_grows(self):
+        def peak(rows: int) -> int:
+            bank, ids = self._bank()
+            bank._history.recording = False  # the statement trail grows with the postings by design
+            path = self.dir / f"grow-{rows}.csv"
+            with open(path, "w") as handle:
+                handle.write("account_id,op,amount\n")
+                for row in range(rows):
+                    handle.write(f"{ids[row % 6]},{'withdraw' if row % 2 else 'deposit'},1.00\n")
+            tracemalloc.start()
+            try:
+                ingest_file(bank, path, workers=2, chunk_size=100)
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        peak(1_000)  # warm up imports and caches
+        small, large = peak(4_000), peak(32_000)
+        self.assertLess(large, small * 2)
+
+    def test_rejects_report_the_failure(self):
+        bank, ids, stats, rejects = self._run(workers=0)
+        errors = {r["error"] for r in rejects}
+        self.assertEqual(
+            errors, {"InsufficientFundsError", "AccountFrozenError", "InvalidOperationError"}
+        )
+        self.assertEqual(bank._accounts[ids[6]].balance, Decimal("-4.00"))
+        self.assertEqual(bank._accounts[ids[7]].balance, Decimal("50.00"))
+        self.assertIn("missing", [r["account_id"] for r in rejects])
+
+    def test_jsonl_input(self):
+        bank, ids = self._bank()
+        path = self.dir / "batch.jsonl"
+        path.write_text(
+            json.dumps({"account_id": ids[0], "op": "deposit", "amount": "2.50"}) + "\n\nnot json\n"
+        )
+        stats = ingest_file(bank, path)
+        self.assertEqual((stats.rows, stats.applied, stats.rejected), (2, 1, 1))
+        self.assertEqual(bank._accounts[ids[0]].balance, Decimal("12.50"))
+
+    def test_csv_requires_header(self):
+        path = self.dir / "bad.csv"
+        path.write_text("a,b\n1,2\n")
+        with self.assertRaises(InvalidOperationError):
+            list(iter_operations(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
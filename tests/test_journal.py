@@ -0,0 +1,145 @@
+import tempfile
+import threading
+import unittest
+from decimal import Decimal
+from pathlib import Path
+
+from banking.account_options import InvestmentOptions, PremiumOptions, SavingsOptions
+from banking.bank import Bank
+from banking.client import Client
+from banking.journal import Journal, JournalOp, read_journal
+from banking.types import AccountStatus, AccountType, ClientStatus, Currency
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "bank.journal"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _open_bank(self) -> Bank:
+        bank = Bank()
+        bank.attach_journal(Journal(self.path, commit_window=0.001))
+        bank.add_client(Client(full_name="Ilya Yarets", client_id="C-001", age=30), password="secret")
+        bank.add_client(Client(full_name="Anna Petrova", client_id="C-002", age=40), password="pass")
+        return bank
+
+    def test_recover_replays_all_state_changes(self):
+        bank = self._open_bank()
+        base = bank.open_account("C-001", balance=Decimal("100.00"))
+        savings = bank.open_account(
+            "C-001",
+            account_type=AccountType.SAVINGS,
+            currency=Currency.EUR,
+            balance=Decimal("200.00"),
+            options=SavingsOptions(min_balance=Decimal("10.00"), monthly_interest_rate=Decimal("0.015")),
+        )
+        premium = bank.open_account(
+            "C-002",
+            account_type=AccountType.PREMIUM,
+            balance=Decimal("5.00"),
+            options=PremiumOptions(overdraft_limit=Decimal("50.00"), withdraw_fee=Decimal("1.00")),
+        )
+        bank.open_account(
+            "C-002",
+            account_type=AccountType.INVESTMENT,
+            options=InvestmentOptions(portfolios={"etf": Decimal("7.00")}, expected_yearly_growth=Decimal("0.1")),
+        )
+        base.deposit(Decimal("25.50"))
+        savings.apply_monthly_interest()
+        premium.withdraw(Decimal("20.00"))
+        bank.freeze_account(base.id)
+        for _ in range(3):
+            bank.authenticate_client("C-002", "wrong")
+        bank.close()
+
+        recovered = Bank.recover(self.path)
+        try:
+            self.assertEqual(
+                [acc.get_account_info() for acc in recovered.search_accounts()],
+                [acc.get_account_info() for acc in bank.search_accounts()],
+            )
+            self.assertEqual(recovered.get_clients_ranking(), bank.get_clients_ranking())
+            self.assertEqual(recovered._accounts[base.id].status, AccountStatus.FROZEN)
+            self.assertEqual(recovered._clients["C-002"].status, ClientStatus.LOCKED)
+            self.assertTrue(recovered.authenticate_client("C-001", "secret"))
+
+            recovered._accounts[savings.id].deposit(Decimal("1.00"))
+        finally:
+            recovered.close()
+        again = Bank.recover(self.path)
+        again.close()
+        self.assertEqual(again._accounts[savings.id].balance, Decimal("204.00"))
+
+    def test_asset_purchases_survive_recovery(self):
+        bank = self._open_bank()
+        investment = bank.open_account("C-001", account_type=AccountType.INVESTMENT, balance=Decimal("50.00"))
+        investment.add_asset("stocks", Decimal("5.00"))
+        investment.add_asset("bonds", Decimal("2.50"))
+        bank.close()
+        self.assertIn((JournalOp.ASSET, (investment.id, "bonds", 250)), list(read_journal(self.path)))
+
+        recovered = Bank.recover(self.path)
+        try:
+            portfolios = recovered._accounts[investment.id].get_account_info()["portfolios"]
+            self.assertEqual(portfolios["stocks"], Decimal("5.00"))
+            self.assertEqual(recovered._accounts[investment.id].portfolio_value, Decimal("7.50"))
+            recovered._accounts[investment.id].add_asset("stocks", Decimal("1.00"))
+        finally:
+            recovered.close()
+        again = Bank.recover(self.path)
+        again.close()
+        self.assertEqual(again._accounts[investment.id].portfolio_value, Decimal("8.50"))
+
+    def test_torn_tail_is_dropped(self):
+        bank = self._open_bank()
+        account = bank.open_account("C-001", balance=Decimal("10.00"))
+        account.deposit(Decimal("1.00"))
+        bank.close()
+        with open(self.path, "ab") as handle:
+            handle.write(b"\x20\x00\x00\x00garbage")
+
+        recovered = Bank.recover(self.path)
+        account_copy = recovered._accounts[account.id]
+        account_copy.deposit(Decimal("2.00"))
+        recovered.close()
+
+        self.assertEqual(Bank.recover(self.path)._accounts[account.id].balance, Decimal("13.00"))
+
+    def test_attach_seeds_existing_state(self):
+        bank = Bank()
+        bank.add_client(Client(full_name="Ilya Yarets", client_id="C-001", age=30), password="secret")
+        premium = bank.open_account(
+            "C-001",
+            account_type=AccountType.PREMIUM,
+            options=PremiumOptions(overdraft_limit=Decimal("30.00")),
+        )
+        premium.withdraw(Decimal("12.00"))
+        bank.attach_journal(Journal(self.path))
+        bank.close()
+
+        recovered = Bank.recover(self.path)
+        recovered.close()
+        self.assertEqual(recovered._accounts[premium.id].balance, Decimal("-12.00"))
+
+    def test_group_commit_from_many_threads(self):
+        journal = Journal(self.path, commit_window=0.002, wait_for_commit=True)
+
+        def writer(n):
+            for i in range(50):
+                journal.append_json(JournalOp.ADD_CLIENT, {"writer": n, "i": i})
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(journal.durable_lsn, 400)
+        journal.close()
+        self.assertEqual(sum(1 for _ in read_journal(self.path)), 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,262 @@
+import json
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from banking.account_options import PremiumOptions, SavingsOptions
+from banking.bank import Bank
+from banking.client import Client
+from banking.credentials import PasswordHasher
+from banking.errors import InvalidOperationError
+from banking.journal import Journal
+from banking.ledger import Ledger, np
+from banking.types import AccountType, Currency, PostingKind
+
+NOON = datetime(2024, 1, 1, 12, 0)
+EPOCH = datetime(2024, 3, 1, 9, 0)
+
+
+class FakeClock:
+    # Nanosecond clock that moves one minute per reading.
+    def __init__(self, start: datetime = EPOCH) -> None:
+        self.now = start
+
+    def __call__(self) -> int:
+        self.now += timedelta(minutes=1)
+        return round(self.now.timestamp() * 1_000_000) * 1000
+
+
+def minute(n: int) -> datetime:
+    return EPOCH + timedelta(minutes=n)
+
+
+def as_of(ledger: Ledger, moment: datetime) -> tuple:
+    return ledger.balances_at(moment), ledger.total_at(moment).cents(), ledger.contra_balances_at(moment)
+
+
+class TestLedger(unittest.TestCase):
+    def setUp(self):
+        self.ledger = Ledger(checkpoint_every=4, use_numpy=False, clock=FakeClock())
+
+    def test_as_of_queries_match_a_full_replay(self):
+        # Entries land at minutes 1, 2, 3, ...; compare every query with a replay.
+        ledger = self.ledger
+        ledger.open("A", Currency.USD, 1_000)
+        ledger.open("B", Currency.EUR, 500)
+        expected = {"A": 1_000, "B": 500}
+        history = [dict(expected)]
+        for step in range(20):
+            account_id = "A" if step % 3 else "B"
+            kind, cents = (PostingKind.DEPOSIT, 100) if step % 2 else (PostingKind.WITHDRAW, -30)
+            ledger.post(account_id, kind, cents)
+            expected[account_id] += cents
+            history.append(dict(expected))
+        for index, balances in enumerate(history):
+            moment = minute(index + 2)
+            self.assertEqual(ledger.balances_at(moment), balances)
+            self.assertEqual(ledger.balance_at("A", moment), balances["A"])
+            self.assertEqual(
+                ledger.total_at(moment).cents(), {Currency.USD: balances["A"], Currency.EUR: balances["B"]}
+            )
+        self.assertEqual(len(ledger), 22)
+
+    def test_closing_leaves_the_totals_not_the_balance(self):
+        ledger = self.ledger
+        ledger.open("A", Currency.USD, 700)
+        ledger.open("B", Currency.USD, 300)
+        ledger.close("B")
+        self.assertEqual(ledger.total_at(minute(2)).cents(), {Currency.USD: 1_000})
+        self.assertEqual(ledger.total_at(minute(3)).cents(), {Currency.USD: 700})
+        self.assertEqual(ledger.balance_at("B", minute(3)), 300)
+        self.assertEqual(ledger.balances_at(minute(3)), {"A": 700, "B": 300})
+
+    def test_contra_accounts_balance_the_books(self):
+        ledger = self.ledger
+        ledger.open("A", Currency.USD, 1_000)
+        ledger.post("A", PostingKind.DEPOSIT, 250)
+        ledger.post("A", PostingKind.FEE, -20)
+        ledger.post("A", PostingKind.INTEREST, 5)
+        ledger.close("A")
+        contras = ledger.contra_balances_at(minute(10))
+        self.assertEqual(
+            contras,
+            {
+                "equity:opening": {Currency.USD: -1_000},
+                "cash": {Currency.USD: -250},
+                "income:fees": {Currency.USD: 20},
+                "expense:interest": {Currency.USD: -5},
+            },
+        )
+        balances = ledger.balances_at(minute(10))
+        self.assertEqual(sum(balances.values()) + sum(c[Currency.USD] for c in contras.values()), 0)
+        self.assertEqual(ledger.contra_balances_at(minute(1)), {"equity:opening": {Currency.USD: -1_000}})
+
+    def test_before_opening_and_unknown_accounts(self):
+        self.ledger.open("A", Currency.USD, 100)
+        with self.assertRaises(InvalidOperationError):
+            self.ledger.balance_at("A", EPOCH)
+        with self.assertRaises(InvalidOperationError):
+            self.ledger.post("missing", PostingKind.DEPOSIT, 1)
+        with self.assertRaises(InvalidOperationError):
+            self.ledger.open("A", Currency.USD, 1)
+        self.assertEqual(self.ledger.balances_at(EPOCH), {})
+        self.assertEqual(self.ledger.total_at(EPOCH).cents(), {})
+        with self.assertRaises(InvalidOperationError):
+            Ledger(checkpoint_every=0)
+
+    def test_timestamps_never_go_backwards(self):
+        clock = FakeClock()
+        ledger = Ledger(clock=clock)
+        ledger.open("A", Currency.USD, 100)
+        clock.now -= timedelta(hours=1)
+        ledger.post("A", PostingKind.DEPOSIT, 5)
+        self.assertEqual(ledger.balance_at("A", minute(1)), 105)
+
+    def test_reopened_file_keeps_entries_and_checkpoints(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "bank.ledger"
+            with Ledger(path, checkpoint_every=4, clock=FakeClock()) as ledger:
+                ledger.open("A", Currency.USD, 1_000)
+                ledger.open("B", Currency.EUR, 500)
+                for step in range(9):
+                    ledger.post("A" if step % 2 else "B", PostingKind.DEPOSIT, step)
+                ledger.close("B")
+                expected = [as_of(ledger, minute(n)) for n in range(14)]
+            with open(path, "ab") as handle:
+                handle.write(b"\x01\x02torn")  # a crash mid-write
+            reopened = Ledger(path, checkpoint_every=4, clock=FakeClock(minute(20)))
+            try:
+                self.assertEqual(len(reopened), 12)
+                self.assertEqual(len(reopened._checkpoints), 4)
+                self.assertEqual([as_of(reopened, minute(n)) for n in range(14)], expected)
+                reopened.post("A", PostingKind.WITHDRAW, -4)
+                self.assertEqual(reopened.balance_at("A", minute(21)), 1_012)
+            finally:
+                reopened.close_file()
+            self.assertEqual(len(Ledger(path)), 13)
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_numpy_batch_matches_the_loop(self):
+        ledgers = [Ledger(use_numpy=flag, clock=FakeClock()) for flag in (False, True)]
+        for ledger in ledgers:
+            for i in range(10):
+                ledger.open(f"A{i}", Currency.USD, i * 100)
+            for i in range(50):
+                ledger.post(f"A{i % 10}", PostingKind.DEPOSIT, i)
+            ledger.close("A3")
+        for moment in (minute(5), minute(30), minute(100)):
+            self.assertEqual(ledgers[0].balances_at(moment), ledgers[1].balances_at(moment))
+
+
+class TestBankAsOf(unittest.TestCase):
+    def setUp(self):
+        self.bank = Bank(_hasher=PasswordHasher(n=2 ** 8))
+        self.bank.add_client(Client(full_name="Ilya Yarets", client_id="C-001", age=30), password="secret")
+        self.clock = FakeClock()
+
+    def test_balances_as_of_a_moment(self):
+        bank = self.bank
+        before = bank.open_account("C-001", balance=Decimal("100.00"), now=NOON).id
+        bank.enable_ledger(checkpoint_every=2, clock=self.clock)  # opening entry at minute 1
+        premium = bank.open_account(
+            "C-001",
+            account_type=AccountType.PREMIUM,
+            balance=Decimal("50.00"),
+            now=NOON,
+            options=PremiumOptions(withdraw_fee=Decimal("1.00")),
+        ).id  # minute 2
+        bank.transfer(before, premium, Decimal("30.00"), now=NOON)  # minutes 3, 4
+        bank.withdraw(premium, Decimal("10.00"), now=NOON)  # minutes 5, 6 (fee)
+        bank.close_account(before, now=NOON)  # minute 7
+
+        self.assertEqual(bank.balance_at(before, minute(2)), Decimal("100.00"))
+        self.assertEqual(bank.balance_at(before, minute(7)), Decimal("70.00"))
+        self.assertEqual(bank.balance_at(premium, minute(5)), Decimal("70.00"))
+        self.assertEqual(bank.balance_at(premium, minute(6)), Decimal("69.00"))
+        self.assertEqual(bank.total_balance_at(minute(4)), Decimal("150.00"))
+        self.assertEqual(bank.total_balance_at(minute(6)), Decimal("139.00"))
+        self.assertEqual(bank.total_balance_at(minute(7)), bank.get_total_balance())
+        self.assertEqual(bank.balances_at(minute(1)), {before: Decimal("100.00")})
+        self.assertEqual(bank.balances_at(minute(7)), {before: Decimal("70.00"), premium: Decimal("69.00")})
+        with self.assertRaises(InvalidOperationError):
+            bank.balance_at("missing", minute(7))
+
+    def test_converts_totals_with_fx_rates(self):
+        bank = self.bank
+        bank.enable_ledger(clock=self.clock)
+        bank.open_account("C-001", balance=Decimal("10.00"), now=NOON)
+        savings = bank.open_account(
+            "C-001",
+            account_type=AccountType.SAVINGS,
+            currency=Currency.EUR,
+            balance=Decimal("100.00"),
+            now=NOON,
+            options=SavingsOptions(monthly_interest_rate=Decimal("0.01")),
+        )
+        savings.apply_monthly_interest()
+        with tempfile.TemporaryDirectory() as directory:
+            rates = Path(directory) / "rates.json"
+            rates.write_text(json.dumps({"base": "USD", "rates": {"EUR": "1.10"}}))
+            bank.attach_fx_rates(rates)
+        self.assertEqual(bank.total_balance_at(minute(2), Currency.USD), Decimal("120.00"))
+        self.assertEqual(bank.total_balance_at(minute(3), Currency.USD), Decimal("121.10"))
+
+    def test_requires_the_ledger(self):
+        account = self.bank.open_account("C-001", now=NOON).id
+        self.assertIsNone(self.bank.ledger)
+        with self.assertRaises(InvalidOperationError):
+            self.bank.balance_at(account, NOON)
+        with self.assertRaises(InvalidOperationError):
+            self.bank.total_balance_at(NOON)
+        self.assertIs(self.bank.enable_ledger(), self.bank.enable_ledger())
+
+    def test_recovered_bank_reopens_its_ledger(self):
+        with tempfile.TemporaryDirectory() as directory:
+            journal, ledger = Path(directory) / "bank.journal", Path(directory) / "bank.ledger"
+            bank = self.bank
+            bank.attach_journal(Journal(journal, commit_window=0.001))
+            account = bank.open_account("C-001", balance=Decimal("100.00"), now=NOON).id
+            bank.enable_ledger(ledger, clock=self.clock)  # minute 1
+            bank.deposit(account, Decimal("5.00"), now=NOON)  # minute 2
+            bank.close()
+
+            recovered = Bank.recover(journal)
+            try:
+                recovered.enable_ledger(ledger, clock=FakeClock(minute(10)))
+                recovered.withdraw(account, Decimal("20.00"), now=NOON)  # minute 11
+                other = recovered.open_account("C-001", balance=Decimal("1.00"), now=NOON).id  # minute 12
+                self.assertEqual(recovered.balance_at(account, minute(1)), Decimal("100.00"))
+                self.assertEqual(recovered.balance_at(account, minute(5)), Decimal("105.00"))
+                self.assertEqual(recovered.balance_at(account, minute(11)), Decimal("85.00"))
+                self.assertEqual(recovered.total_balance_at(minute(12)), recovered.get_total_balance())
+                self.assertEqual(recovered.balances_at(minute(11)), {account: Decimal("85.00")})
+                self.assertEqual(recovered.balance_at(other, minute(12)), Decimal("1.00"))
+            finally:
+                recovered.close()
+
+    def test_seeding_does_not_wait_for_account_locks(self):
+        # A deposit that has changed the balance but not yet reached the bank's lock
+        # still holds its account stripe; seeding must neither wait for it nor count
+        # the deposit twice.
+        bank = self.bank
+        account = bank.open_account("C-001", balance=Decimal("100.00"), now=NOON)
+        with bank._lock:
+            depositing = threading.Thread(target=bank.deposit, args=(account.id, Decimal("5.00")), kwargs={"now": NOON})
+            depositing.start()
+            while account.balance_cents != 10_500:
+                time.sleep(0.001)
+            ledger = bank.enable_ledger(clock=self.clock)
+        depositing.join(timeout=5)
+        self.assertFalse(depositing.is_alive())
+        self.assertEqual(len(ledger), 1)
+        self.assertEqual(bank.balance_at(account.id, minute(1)), Decimal("105.00"))
+        bank.withdraw(account.id, Decimal("1.00"), now=NOON)
+        self.assertEqual(bank.balance_at(account.id, minute(2)), Decimal("104.00"))
+
+
+if __name__ == "__main__":
+    unittest.main()
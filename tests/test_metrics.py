@@ -0,0 +1,124 @@
+import tempfile
+import threading
+import unittest
+import urllib.request
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+from banking import metrics
+from banking.bank import Bank
+from banking.client import Client
+from banking.credentials import PasswordHasher
+from banking.errors import InsufficientFundsError
+from banking.metrics import REGISTRY, LatencyHistogram, Metrics, instrumented, serve_metrics
+
+NOON = datetime(2024, 1, 1, 12, 0)
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_percentiles_are_within_bucket_precision(self):
+        histogram = LatencyHistogram()
+        for nanos in range(1, 100_001):
+            histogram.record(nanos)
+        for q, exact in ((50, 50_000), (99, 99_000), (100, 100_000)):
+            value = histogram.percentile(q)
+            self.assertGreaterEqual(value, exact)
+            self.assertLessEqual(value, exact * 1.125)
+        self.assertEqual(histogram.calls, 100_000)
+
+    def test_untimed_calls_are_counted_only(self):
+        histogram = LatencyHistogram()
+        histogram.record(None)
+        histogram.record(1_000)
+        histogram.record_error(None, "ValueError")
+        counts, sum_ns, outcomes = histogram.snapshot()
+        self.assertEqual(sum(counts), 1)
+        self.assertEqual(sum_ns, 1_000)
+        self.assertEqual(outcomes, {"ok": 2, "ValueError": 1})
+
+    def test_reads_do_not_count_as_calls(self):
+        histogram = LatencyHistogram()
+        threads = [threading.Thread(target=lambda: [histogram.record(None) for _ in range(5_000)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([histogram.calls for _ in range(3)], [20_000] * 3)
+        histogram.clear()
+        histogram.record(None)
+        self.assertEqual(histogram.outcomes(), {"ok": 1})
+        self.assertEqual(histogram.calls, 1)
+
+
+@unittest.skipUnless(metrics.ENABLED, "metrics disabled by BANKING_METRICS=0")
+class TestInstrumented(unittest.TestCase):
+    def test_counts_outcomes_and_keeps_the_signature(self):
+        registry = Metrics()
+
+        @instrumented("demo.op", registry)
+        def op(a, /, b=2, *rest, c, d=4, **extra):
+            if a < 0:
+                raise ValueError("negative")
+            return (a, b, rest, c, d, extra)
+
+        self.assertEqual(op(1, c=3), (1, 2, (), 3, 4, {}))
+        self.assertEqual(op(1, 5, 6, c=3, d=7, e=8), (1, 5, (6,), 3, 7, {"e": 8}))
+        with self.assertRaises(ValueError):
+            op(-1, c=0)
+        self.assertEqual(op.__name__, "op")
+        self.assertEqual(registry.histogram("demo.op").outcomes(), {"ok": 2, "ValueError": 1})
+
+    def test_bank_and_account_methods_are_instrumented(self):
+        REGISTRY.reset()
+        bank = Bank(_hasher=PasswordHasher(n=2 ** 8))
+        bank.add_client(Client(full_name="Ilya Yarets", client_id="C-001", age=30), password="secret")
+        account = bank.open_account("C-001", balance=Decimal("10.00"), now=NOON)
+        for _ in range(20):
+            bank.deposit(account.id, Decimal("1.00"), now=NOON)
+        with self.assertRaises(InsufficientFundsError):
+            account.withdraw(Decimal("1000.00"))
+
+        self.assertEqual(REGISTRY.histogram("bank.deposit").outcomes(), {"ok": 20})
+        self.assertEqual(REGISTRY.histogram("account.deposit").outcomes(), {"ok": 20})
+        self.assertEqual(REGISTRY.histogram("account.withdraw").outcomes(), {"InsufficientFundsError": 1})
+
+        text = REGISTRY.render()
+        self.assertIn('banking_operations_total{operation="bank.open_account",outcome="ok"} 1', text)
+        self.assertIn('banking_operation_duration_seconds_bucket{operation="bank.deposit",le="+Inf"}', text)
+        self.assertIn("# TYPE banking_accounts gauge", text)
+        bank.close()
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.registry = Metrics(prefix="test")
+        self.registry.histogram("op").record(2_000)
+        self.registry.gauge("things", "Things.", lambda: 3)
+
+    def test_render_is_cumulative(self):
+        lines = self.registry.render().splitlines()
+        buckets = [int(line.rsplit(" ", 1)[1]) for line in lines if line.startswith("test_operation_duration_seconds_bucket")]
+        self.assertEqual(buckets, sorted(buckets))
+        self.assertEqual(buckets[0], 0)
+        self.assertEqual(buckets[-1], 1)
+        self.assertIn("test_things 3", lines)
+
+    def test_write_and_serve(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "bank.prom"
+            self.registry.write(path)
+            self.assertEqual(path.read_text(), self.registry.render())
+
+        server = serve_metrics("127.0.0.1", 0, self.registry)
+        try:
+            host, port = server.server_address[:2]
+            with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+                self.assertEqual(response.read().decode(), self.registry.render())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
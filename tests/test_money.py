@@ -0,0 +1,52 @@
+import unittest
+from decimal import Decimal, ROUND_HALF_EVEN
+
+from banking.errors import InvalidOperationError
+from banking.money import Money, to_money, validate_amount, validate_money
+
+
+class TestMoney(unittest.TestCase):
+    def test_parsing_rounds_half_up(self):
+        self.assertEqual(Money.of(Decimal("1.005")).cents, 101)
+        self.assertEqual(Money.of(Decimal("-1.005")).cents, -101)
+        self.assertEqual(Money.of(Decimal("2.5")).cents, 250)
+        self.assertEqual(Money.of(7).cents, 700)
+        self.assertEqual(Money.of("0.015").cents, 2)
+        self.assertEqual(Money.of(0.1 + 0.2).cents, 30)
+
+    def test_invalid_amounts(self):
+        for amount in ("abc", None, Decimal("NaN"), Decimal("Infinity"), True):
+            with self.assertRaises(InvalidOperationError):
+                Money.of(amount)
+
+    def test_arithmetic_and_ordering(self):
+        a = Money.of(Decimal("10.25"))
+        b = Money.of(Decimal("0.75"))
+        self.assertEqual(a + b, Money(1100))
+        self.assertEqual(a - b, Money(950))
+        self.assertEqual(-b, Money(-75))
+        self.assertTrue(b < a <= a)
+        self.assertFalse(Money())
+        self.assertEqual(f"{a:.2f}", "10.25")
+
+    def test_decimal_boundary(self):
+        value = Money(150).to_decimal()
+        self.assertEqual(value, Decimal("1.50"))
+        self.assertEqual(str(value), "1.50")
+        self.assertEqual(str(to_money(Decimal("3"))), "3.00")
+
+    def test_multiply_rounding(self):
+        self.assertEqual(Money(5).multiply(Decimal("0.5")), Money(3))
+        self.assertEqual(Money(5).multiply(Decimal("0.5"), rounding=ROUND_HALF_EVEN), Money(2))
+
+    def test_validation(self):
+        self.assertEqual(validate_money(Decimal("0"), allow_zero=True), Money(0))
+        self.assertEqual(validate_amount(Decimal("1.234")), Decimal("1.23"))
+        with self.assertRaises(InvalidOperationError):
+            validate_money(Decimal("0"))
+        with self.assertRaises(InvalidOperationError):
+            validate_money(Decimal("-0.01"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,237 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+from banking import prices
+from banking.account_options import InvestmentOptions
+from banking.accounts.investment import InvestmentAccount
+from banking.bank import AccountSpec, Bank
+from banking.client import Client
+from banking.credentials import PasswordHasher
+from banking.journal import Journal
+from banking.errors import AccountClosedError, InvalidOperationError
+from banking.prices import PriceBook, replay_ticks
+from banking.types import AccountType, Owner
+
+NOON = datetime(2024, 1, 1, 12, 0)
+
+
+class PriceBookMixin:
+    use_numpy = False
+
+    def setUp(self):
+        self.book = PriceBook(use_numpy=self.use_numpy)
+        self.book.list_instrument("ACME", "stocks", Decimal("10.00"))
+        self.book.list_instrument("GOVT", "bonds", Decimal("100.00"))
+        self.book.list_instrument("WRLD", "etf", Decimal("50.00"))
+
+    def write_ticks(self, text):
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(handle, "w") as file:
+            file.write(text)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_holdings_are_quantities_valued_at_current_prices(self):
+        self.assertEqual(self.book.add_holding("A-1", "ACME", 5), 5)
+        self.assertEqual(self.book.add_holding("A-1", "ACME", 3), 8)
+        self.book.add_holding("A-1", "GOVT", 2)
+        self.assertEqual(self.book.holdings("A-1"), {"ACME": 8, "GOVT": 2})
+        self.assertEqual(self.book.value_cents("A-1"), 28_000)
+        self.assertEqual(self.book.value_by_asset_cents("A-1"), {"stocks": 8_000, "bonds": 20_000, "etf": 0})
+        self.assertEqual(self.book.add_holding("A-1", "ACME", -8), 0)
+        self.assertEqual(self.book.holdings("A-1"), {"GOVT": 2})
+        self.assertEqual(self.book.holders("ACME"), {})
+        self.assertEqual(self.book.value_cents("A-1"), 20_000)
+
+    def test_tick_updates_only_holders_and_running_totals(self):
+        self.book.add_holding("A-1", "ACME", 10)
+        self.book.add_holding("A-2", "ACME", 1)
+        self.book.add_holding("A-2", "WRLD", 2)
+        self.book.add_holding("A-3", "GOVT", 1)
+        self.book.set_price("ACME", Decimal("12.50"))
+        self.assertEqual(self.book.holders("ACME"), {"A-1": 10, "A-2": 1})
+        self.assertEqual(self.book.value_cents("A-1"), 12_500)
+        self.assertEqual(self.book.value_cents("A-2"), 11_250)
+        self.assertEqual(self.book.value_cents("A-3"), 10_000)
+        self.assertEqual(
+            self.book.totals(),
+            {"stocks": Decimal("137.50"), "bonds": Decimal("100.00"), "etf": Decimal("100.00")},
+        )
+        self.assertEqual(self.book.total_value(), Decimal("337.50"))
+
+    def test_last_tick_in_a_batch_wins_and_unknown_instruments_are_skipped(self):
+        self.book.add_holding("A-1", "ACME", 2)
+        count = self.book.apply_ticks([("ACME", 1_100), ("XXXX", 500), ("ACME", 900)])
+        self.assertEqual(count, 3)
+        self.assertEqual(self.book.price("ACME"), Decimal("9.00"))
+        self.assertEqual(self.book.value_cents("A-1"), 1_800)
+        self.assertNotIn("XXXX", self.book)
+
+    def test_replay_matches_a_full_revaluation(self):
+        for i in range(40):
+            self.book.add_holding(f"A-{i}", ("ACME", "GOVT", "WRLD")[i % 3], i + 1)
+            self.book.add_holding(f"A-{i}", "ACME", 1)
+        lines = [f"{('ACME', 'GOVT', 'WRLD')[i % 3]},{10 + i % 7}.{i % 100:02d}\n" for i in range(100)]
+        path = self.write_ticks("".join(lines) + "\n")
+        self.assertEqual(replay_ticks(self.book, path, batch=7), 100)
+        self.assertEqual(self.book.price("GOVT"), Decimal("16.97"))
+        total = 0
+        for i in range(40):
+            value = sum(self.book.value_by_asset_cents(f"A-{i}").values())
+            self.assertEqual(self.book.value_cents(f"A-{i}"), value)
+            total += value
+        self.assertEqual(self.book.total_value(), Decimal(total) / 100)
+
+    def test_rejects_bad_input(self):
+        with self.assertRaises(InvalidOperationError):
+            self.book.list_instrument("ACME", "stocks", Decimal("1.00"))
+        with self.assertRaises(InvalidOperationError):
+            self.book.list_instrument("GOLD", "metals", Decimal("1.00"))
+        with self.assertRaises(InvalidOperationError):
+            self.book.add_holding("A-1", "NOPE", 1)
+        with self.assertRaises(InvalidOperationError):
+            self.book.add_holding("A-1", "ACME", -1)
+        with self.assertRaises(InvalidOperationError):
+            self.book.add_holding("A-1", "ACME", 1.5)
+        with self.assertRaises(InvalidOperationError):
+            self.book.set_price("ACME", Decimal("0"))
+        with self.assertRaises(InvalidOperationError):
+            replay_ticks(self.book, self.write_ticks("ACME,10.00\nACME 11.00\n"))
+        self.assertEqual(self.book.price("ACME"), Decimal("10.00"))
+
+
+class TestPythonPriceBook(PriceBookMixin, unittest.TestCase):
+    use_numpy = False
+
+
+@unittest.skipIf(prices.np is None, "NumPy is not installed")
+class TestNumpyPriceBook(PriceBookMixin, unittest.TestCase):
+    use_numpy = True
+
+    def test_values_grow_past_the_initial_capacity(self):
+        for i in range(3_000):
+            self.book.add_holding(f"A-{i}", "ACME", 1)
+        self.book.set_price("ACME", Decimal("11.00"))
+        self.assertEqual(self.book.value_cents("A-2999"), 1_100)
+        self.assertEqual(self.book.totals()["stocks"], Decimal("33000.00"))
+
+
+class TestInvestmentHoldings(unittest.TestCase):
+    def setUp(self):
+        self.bank = Bank(_hasher=PasswordHasher(n=2 ** 8))
+        self.bank.add_client(Client(full_name="Ilya Yarets", client_id="C-001", age=30), password="secret")
+        self.bank.prices.list_instrument("ACME", "stocks", Decimal("10.00"))
+
+    def test_bank_accounts_share_the_price_book(self):
+        single = self.bank.open_account(
+            "C-001",
+            account_type="investment",
+            now=NOON,
+            options=InvestmentOptions(portfolios={"bonds": Decimal("5.00")}),
+        )
+        bulk = self.bank.open_accounts_bulk(
+            [AccountSpec("C-001", AccountType.INVESTMENT)] * 2, now=NOON
+        ).opened
+        for account in (single, *bulk):
+            account.add_holding("ACME", 3)
+        self.bank.prices.set_price("ACME", Decimal("20.00"))
+        self.assertEqual(single.holdings, {"ACME": 3})
+        self.assertEqual(single.portfolio_value, Decimal("65.00"))
+        self.assertEqual(single.portfolio_cents, {"stocks": 6_000, "bonds": 500, "etf": 0})
+        self.assertEqual(single.get_account_info()["portfolios"]["stocks"], Decimal("0.00"))
+        self.assertEqual(bulk[1].portfolio_value, Decimal("60.00"))
+        self.assertEqual(self.bank.prices.total_value(), Decimal("180.00"))
+
+    def test_replay_price_ticks(self):
+        account = self.bank.open_account("C-001", account_type="investment", now=NOON)
+        account.add_holding("ACME", 4)
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(handle, "w") as file:
+            file.write("ACME,10.50\nACME,11.25\n")
+        self.addCleanup(os.remove, path)
+        self.assertEqual(self.bank.replay_price_ticks(path), 2)
+        self.assertEqual(account.portfolio_value, Decimal("45.00"))
+
+    def test_holdings_need_an_open_account_with_a_price_book(self):
+        account = self.bank.open_account("C-001", account_type="investment", now=NOON)
+        self.bank.close_account(account.id, now=NOON)
+        with self.assertRaises(AccountClosedError):
+            account.add_holding("ACME", 1)
+        loose = InvestmentAccount(owner=Owner(name="Ilya Yarets", doc_id="C-001"), account_id="A-1")
+        self.assertEqual(loose.holdings, {})
+        with self.assertRaises(InvalidOperationError):
+            loose.add_holding("ACME", 1)
+
+
+
+class TestPriceBookPersistence(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _trade(self, bank: Bank) -> str:
+        bank.add_client(Client(full_name="Ilya Yarets", client_id="C-001", age=30), password="secret")
+        bank.prices.list_instrument("ACME", "stocks", Decimal("10.00"))
+        bank.prices.list_instrument("GOVT", "bonds", Decimal("100.00"))
+        account = bank.open_account("C-001", account_type="investment", now=NOON)
+        account.add_holding("ACME", 5)
+        account.add_holding("GOVT", 2)
+        account.add_holding("GOVT", -2)
+        bank.prices.set_price("ACME", Decimal("12.00"))
+        return account.id
+
+    def _check(self, bank: Bank, account_id: str) -> None:
+        self.assertEqual(bank.prices.price("ACME"), Decimal("12.00"))
+        self.assertEqual(bank.prices.asset_type("GOVT"), "bonds")
+        self.assertEqual(bank.prices.holders("ACME"), {account_id: 5})
+        self.assertEqual(bank.prices.holders("GOVT"), {})
+        self.assertEqual(bank._accounts[account_id].portfolio_value, Decimal("60.00"))
+
+    def test_journal_replays_the_price_book(self):
+        path = self.dir / "bank.journal"
+        bank = Bank(_hasher=PasswordHasher(n=2 ** 8))
+        bank.attach_journal(Journal(path, commit_window=0))
+        account_id = self._trade(bank)
+        bank.close()
+        recovered = Bank.recover(path, commit_window=0)
+        try:
+            self._check(recovered, account_id)
+        finally:
+            recovered.close()
+
+    def test_attached_journal_is_seeded_with_the_price_book(self):
+        path = self.dir / "bank.journal"
+        bank = Bank(_hasher=PasswordHasher(n=2 ** 8))
+        account_id = self._trade(bank)
+        bank.attach_journal(Journal(path, commit_window=0))
+        bank.close()
+        recovered = Bank.recover(path, commit_window=0)
+        recovered.close()
+        self._check(recovered, account_id)
+
+    def test_snapshot_keeps_the_price_book(self):
+        bank = Bank(_hasher=PasswordHasher(n=2 ** 8))
+        account_id = self._trade(bank)
+        bank.snapshot(self.dir / "bank.snap")
+        self._check(Bank.load_snapshot(self.dir / "bank.snap"), account_id)
+
+    def test_store_keeps_the_price_book(self):
+        bank = Bank.open_store(self.dir / "bank.db", commit_window=0)
+        bank._hasher = PasswordHasher(n=2 ** 8)
+        account_id = self._trade(bank)
+        bank.close()
+        reopened = Bank.open_store(self.dir / "bank.db", commit_window=0)
+        try:
+            self._check(reopened, account_id)
+        finally:
+            reopened.close()
+
+if __name__ == "__main__":
+    unittest.main()
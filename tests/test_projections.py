@@ -0,0 +1,101 @@
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from banking import projections
+from banking.account_options import InvestmentOptions
+from banking.accounts.investment import InvestmentAccount
+from banking.bank import Bank
+from banking.client import Client
+from banking.credentials import PasswordHasher
+from banking.errors import InvalidOperationError
+from banking.projections import AssetModel, project_portfolios
+from banking.types import Currency, Owner
+
+NOON = datetime(2024, 1, 1, 12, 0)
+OWNER = Owner(name="Ilya Yarets", doc_id="C-001")
+
+
+def investment(account_id: str, **portfolios: str) -> InvestmentAccount:
+    return InvestmentAccount(
+        owner=OWNER,
+        account_id=account_id,
+        portfolios={asset: Decimal(value) for asset, value in portfolios.items()},
+    )
+
+
+class ProjectionMixin:
+    use_numpy = False
+
+    def project(self, accounts, **options):
+        return project_portfolios(accounts, use_numpy=self.use_numpy, **options)
+
+    def test_riskless_models_give_deterministic_growth(self):
+        riskless = {asset: AssetModel(mean=0.1, volatility=0.0) for asset in ("stocks", "bonds", "etf")}
+        result = self.project([investment("A-1", stocks="100.00", etf="50.00")], years=2, models=riskless)
+        self.assertEqual(result.accounts["A-1"], (Decimal("181.50"),) * 3)
+        self.assertEqual(result.aggregate, (Decimal("181.50"),) * 3)
+
+    def test_bands_are_ordered_and_reproducible(self):
+        accounts = [investment("A-1", stocks="1000.00"), investment("A-2", bonds="500.00", etf="250.00")]
+        first = self.project(accounts, years=10, scenarios=2_000, seed=7)
+        again = self.project(accounts, years=10, scenarios=2_000, seed=7)
+        other = self.project(accounts, years=10, scenarios=2_000, seed=8)
+        self.assertEqual(first, again)
+        self.assertNotEqual(first.accounts, other.accounts)
+        low, median, high = first.accounts["A-1"]
+        self.assertLess(low, median)
+        self.assertLess(median, high)
+        # Median of a log-normal outcome: exp(years * (log(1.07) - 0.18^2 / 2)).
+        self.assertAlmostEqual(float(median) / 1000, 1.5957, delta=0.08)
+        # Imperfectly correlated holdings diversify: the book's 5th percentile beats
+        # the sum of the accounts' 5th percentiles.
+        self.assertGreater(first.aggregate[0], first.accounts["A-1"][0] + first.accounts["A-2"][0])
+
+    def test_rejects_bad_input(self):
+        with self.assertRaises(InvalidOperationError):
+            self.project([], scenarios=0)
+        with self.assertRaises(InvalidOperationError):
+            self.project([], correlation=((1.0, 2.0, 0.0), (2.0, 1.0, 0.0), (0.0, 0.0, 1.0)))
+
+
+class TestPythonProjections(ProjectionMixin, unittest.TestCase):
+    use_numpy = False
+
+
+@unittest.skipIf(projections.np is None, "NumPy is not installed")
+class TestNumpyProjections(ProjectionMixin, unittest.TestCase):
+    use_numpy = True
+
+    def test_workers_do_not_change_the_result(self):
+        accounts = [investment(f"A-{i}", stocks=f"{i}.00", bonds="10.00") for i in range(1, 60)]
+        original = projections.CHUNK_ACCOUNTS
+        projections.CHUNK_ACCOUNTS = 16
+        try:
+            serial = self.project(accounts, years=5, scenarios=500, seed=3)
+            parallel = self.project(accounts, years=5, scenarios=500, seed=3, workers=2)
+        finally:
+            projections.CHUNK_ACCOUNTS = original
+        self.assertEqual(serial, parallel)
+
+
+class TestBankProjections(unittest.TestCase):
+    def test_projects_open_investment_accounts(self):
+        bank = Bank(_hasher=PasswordHasher(n=2 ** 8))
+        bank.add_client(Client(full_name="Ilya Yarets", client_id="C-001", age=30), password="secret")
+        kept = bank.open_account(
+            "C-001",
+            account_type="investment",
+            now=NOON,
+            options=InvestmentOptions(portfolios={"stocks": Decimal("100.00")}),
+        )
+        closed = bank.open_account("C-001", account_type="investment", now=NOON)
+        bank.open_account("C-001", account_type="investment", currency=Currency.EUR, now=NOON)
+        bank.open_account("C-001", balance=Decimal("5.00"), now=NOON)
+        bank.close_account(closed.id, now=NOON)
+        result = bank.project_investments(Currency.USD, scenarios=100)
+        self.assertEqual(list(result.accounts), [kept.id])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import random
+import unittest
+from unittest import mock
+from decimal import Decimal
+
+from banking.account_options import PremiumOptions, SavingsOptions
+from banking.bank import Bank
+from banking.client import Client
+from banking.errors import InvalidOperationError
+from banking.money import ZERO_MONEY
+from banking.ranking import ClientRanking
+from banking.types import AccountStatus, AccountType
+
+
+def full_ranking(bank: Bank) -> list[tuple[str, Decimal]]:
+    totals = {client_id: ZERO_MONEY for client_id in bank._clients}
+    for account in bank._accounts.values():
+        if account.status != AccountStatus.CLOSED:
+            totals[account.owner.doc_id] += account.balance
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+class TestClientRanking(unittest.TestCase):
+    def setUp(self):
+        self.bank = Bank()
+        for i in range(6):
+            self.bank.add_client(Client(full_name=f"Client {i}", client_id=f"C-{i}", age=30), password="pw")
+
+    def test_ties_keep_registration_order(self):
+        self.assertEqual([cid for cid, _ in self.bank.get_clients_ranking()], [f"C-{i}" for i in range(6)])
+
+    def test_matches_full_recompute_after_random_operations(self):
+        rng = random.Random(7)
+        accounts = []
+        for i in range(30):
+            kind = rng.choice([AccountType.BASE, AccountType.SAVINGS, AccountType.PREMIUM])
+            options = None
+            if kind == AccountType.SAVINGS:
+                options = SavingsOptions(monthly_interest_rate=Decimal("0.01"))
+            elif kind == AccountType.PREMIUM:
+                options = PremiumOptions(overdraft_limit=Decimal("100.00"), withdraw_fee=Decimal("1.50"))
+            accounts.append(
+                self.bank.open_account(
+                    f"C-{rng.randrange(6)}",
+                    account_type=kind,
+                    balance=Decimal(rng.randrange(0, 500)),
+                    options=options,
+                )
+            )
+        for _ in range(300):
+            account = rng.choice(accounts)
+            action = rng.random()
+            try:
+                if action < 0.4:
+                    account.deposit(Decimal(rng.randrange(1, 100)))
+                elif action < 0.8:
+                    account.withdraw(Decimal(rng.randrange(1, 100)))
+                elif action < 0.9 and hasattr(account, "apply_monthly_interest"):
+                    account.apply_monthly_interest()
+                elif action < 0.95:
+                    self.bank.freeze_account(account.id)
+                else:
+                    self.bank.close_account(account.id)
+            except Exception:
+                pass
+            if rng.random() < 0.1:
+                self.bank.unfreeze_account(account.id)
+
+        expected = full_ranking(self.bank)
+        self.assertEqual(self.bank.get_clients_ranking(), expected)
+        self.assertEqual(self.bank.get_top_clients(3), expected[:3])
+        self.assertEqual(self.bank.get_clients_ranking_page(2, 2), expected[2:4])
+        for position, (client_id, _) in enumerate(expected):
+            self.assertEqual(self.bank.get_client_rank(client_id), position)
+
+    def test_adjust_many_matches_single_adjustments(self):
+        rng = random.Random(3)
+        client_ids = [f"C-{i}" for i in range(40)]
+        for moved in (2, 40):
+            one, many = ClientRanking(), ClientRanking()
+            for client_id in client_ids:
+                one.add_client(client_id)
+                many.add_client(client_id)
+            deltas = {client_id: rng.randrange(-500, 500) for client_id in rng.sample(client_ids, moved)}
+            for client_id, delta in deltas.items():
+                one.adjust(client_id, delta)
+            many.adjust_many(deltas)
+            self.assertEqual(many.items(), one.items())
+
+    def test_bucketed_keys_match_a_flat_list(self):
+        # A tiny bucket size forces splits and emptied buckets.
+        rng = random.Random(11)
+        with mock.patch("banking.ranking._LOAD", 4):
+            ranking = ClientRanking()
+            totals = {}
+            for i in range(60):
+                ranking.add_client(f"C-{i}")
+                totals[f"C-{i}"] = 0
+            for _ in range(500):
+                client_id = f"C-{rng.randrange(60)}"
+                delta = rng.randrange(-50, 50)
+                ranking.adjust(client_id, delta)
+                totals[client_id] += delta
+            expected = sorted(totals, key=lambda client_id: (-totals[client_id], int(client_id[2:])))
+            self.assertEqual([client_id for client_id, _ in ranking.items()], expected)
+            self.assertEqual([client_id for client_id, _ in ranking.window(7, 20)], expected[7:27])
+            self.assertEqual(ranking.window(59, 5)[0][0], expected[59])
+            self.assertEqual(ranking.window(60, 5), [])
+            for position, client_id in enumerate(expected):
+                self.assertEqual(ranking.rank(client_id), position)
+
+    def test_unknown_client_rank(self):
+        with self.assertRaises(InvalidOperationError):
+            self.bank.get_client_rank("C-404")
+
+
+if __name__ == "__main__":
+    unittest.main()
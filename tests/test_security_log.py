@@ -0,0 +1,129 @@
+import gzip
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from banking.bank import MAX_FAILED_ATTEMPTS, Bank
+from banking.client import Client
+from banking.errors import InvalidOperationError
+from banking.security_log import BankSecurityLog, SecurityLog
+
+START = datetime(2024, 1, 1, 12, 0)
+
+
+def event(minute: int, client_id: str, reason: str = "failed login attempt") -> BankSecurityLog:
+    return BankSecurityLog(client_id=client_id, reason=reason, created_at=START + timedelta(minutes=minute))
+
+
+class TestSecurityLogMemory(unittest.TestCase):
+    def test_ring_is_bounded_and_indexes_follow_evictions(self):
+        log = SecurityLog(capacity=4)
+        for minute in range(10):
+            log.append(event(minute, "A" if minute % 2 else "B"))
+
+        self.assertEqual(len(log), 4)
+        self.assertEqual([e.created_at.minute for e in log.recent()], [6, 7, 8, 9])
+        self.assertEqual([e.created_at.minute for e in log.query(client_id="A")], [7, 9])
+        self.assertEqual(log.query(client_id="missing"), [])
+
+    def test_time_range_and_limit(self):
+        log = SecurityLog(capacity=100)
+        for minute in range(30):
+            log.append(event(minute, f"C-{minute % 3}"))
+
+        window = log.query(since=START + timedelta(minutes=10), until=START + timedelta(minutes=15))
+        self.assertEqual([e.created_at.minute for e in window], [10, 11, 12, 13, 14])
+        client = log.query(client_id="C-1", since=START + timedelta(minutes=20))
+        self.assertEqual([e.created_at.minute for e in client], [22, 25, 28])
+        self.assertEqual([e.created_at.minute for e in log.query(limit=2)], [28, 29])
+
+
+class TestSecurityLogArchive(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_history_is_served_from_segments(self):
+        log = SecurityLog(capacity=5, directory=self.dir, segment_size=10)
+        for minute in range(37):
+            log.append(event(minute, "A" if minute % 4 == 0 else "B"))
+
+        everything = log.query()
+        self.assertEqual([e.created_at.minute for e in everything], list(range(37)))
+        self.assertEqual(
+            [e.created_at.minute for e in log.query(client_id="A", since=START + timedelta(minutes=10))],
+            [12, 16, 20, 24, 28, 32, 36],
+        )
+        self.assertEqual(len(log.recent()), 5)
+        log.close()
+
+        segments = sorted(self.dir.glob("security-*.jsonl.gz"))
+        self.assertEqual(len(segments), 4)
+        with gzip.open(segments[0], "rt") as handle:
+            self.assertEqual(len(handle.readlines()), 10)
+
+    def test_restart_continues_sequence_and_keeps_history(self):
+        log = SecurityLog(capacity=2, directory=self.dir, segment_size=3)
+        for minute in range(5):
+            log.append(event(minute, "A"))
+        log.close()
+
+        reopened = SecurityLog(capacity=2, directory=self.dir, segment_size=3)
+        reopened.append(event(5, "A"))
+        reopened.append(event(6, "A"))
+        reopened.append(event(7, "A"))
+        self.assertEqual([e.created_at.minute for e in reopened.query(client_id="A")], list(range(8)))
+        reopened.close()
+
+    def test_unfinished_segment_is_recovered(self):
+        log = SecurityLog(capacity=2, directory=self.dir, segment_size=100)
+        for minute in range(4):
+            log.append(event(minute, "A"))
+        log.flush()
+        # Simulate a crash: the writer never closes the open segment.
+        reopened = SecurityLog(capacity=2, directory=self.dir, segment_size=100)
+        reopened.append(event(4, "A"))
+        self.assertEqual([e.created_at.minute for e in reopened.query()], [0, 1, 2, 3, 4])
+        reopened.close()
+        log.close()
+
+
+class TestBankSecurityEvents(unittest.TestCase):
+    def test_bank_uses_bounded_log(self):
+        bank = Bank(_security_log=SecurityLog(capacity=3))
+        for index in range(5):
+            bank._security_log.append(event(index, f"C-{index % 2}"))
+
+        self.assertEqual(len(bank.security_log), 3)
+        self.assertEqual([e.created_at.minute for e in bank.security_events(client_id="C-0")], [2, 4])
+        self.assertEqual([e.created_at.minute for e in bank.security_events(limit=1)], [4])
+        bank.close()
+
+    def test_archive_keeps_evicted_events(self):
+        with tempfile.TemporaryDirectory() as directory:
+            bank = Bank(_security_log=SecurityLog(capacity=2))
+            bank.add_client(Client(full_name="Ilya Yarets", client_id="C-001", age=30), password="secret")
+            bank._security_log.append(event(0, "C-001", "logged before the archive"))
+            bank.attach_security_archive(directory, segment_size=2)
+            for _ in range(MAX_FAILED_ATTEMPTS - 1):
+                self.assertFalse(bank.authenticate_client("C-001", "wrong"))
+
+            self.assertEqual(len(bank.security_log), 2)
+            reasons = [e.reason for e in bank.security_events(client_id="C-001")]
+            failures = ["failed login attempt"] * (MAX_FAILED_ATTEMPTS - 1)
+            self.assertEqual(reasons, ["logged before the archive", *failures])
+            with self.assertRaises(InvalidOperationError):
+                bank.attach_security_archive(directory)
+            bank.close()
+
+            reopened = SecurityLog(capacity=2, directory=directory)
+            self.assertEqual(len(reopened.query(client_id="C-001")), MAX_FAILED_ATTEMPTS)
+            reopened.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,202 @@
+import asyncio
+import struct
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from banking.bank import Bank
+from banking.client import Client
+from banking.credentials import SessionStore
+from banking.errors import AccountFrozenError, InsufficientFundsError, InvalidOperationError, ProtocolError
+from banking.events import Overflow
+from banking.protocol import encode_frame, read_frame
+from banking.remote import AsyncBankClient
+from banking.server import BankServer
+from banking.types import AccountStatus, AccountType, Currency
+
+NOON = datetime(2024, 1, 1, 12, 0)
+
+
+class TestBankServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.now = 0.0
+        self.bank = Bank(_sessions=SessionStore(ttl=60.0, clock=lambda: self.now))
+        self.bank.add_client(Client(full_name="Ilya Yarets", client_id="C-001", age=30), password="secret")
+        self.bank.add_client(Client(full_name="Anna Petrova", client_id="C-002", age=40), password="pass")
+        self.server = BankServer(
+            self.bank, max_workers=2, max_pending=4, clock=lambda: NOON, operator_token="operator-secret"
+        )
+        await self.server.start()
+        host, port = self.server.address[:2]
+        self.client = await AsyncBankClient.connect(host, port)
+        self.token = await self.client.login("C-001", "secret")
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.server.close()
+        self.bank.close()
+
+    async def test_round_trip_operations(self):
+        self.assertEqual(await self.client.ping(), "pong")
+        self.assertTrue(await self.client.authenticate_client("C-001", "secret"))
+        self.assertFalse(await self.client.authenticate_client("C-001", "wrong"))
+        token = await self.client.login("C-002", "pass")
+        self.assertEqual(self.bank.session_client(token), "C-002")
+        self.assertIsNone(await self.client.login("C-002", "nope"))
+
+        first = await self.client.open_account("C-001", token=self.token, balance=Decimal("100.00"))
+        second = await self.client.open_account(
+            "C-002",
+            token=token,
+            account_type=AccountType.PREMIUM,
+            options={"overdraft_limit": Decimal("50.00"), "withdraw_fee": Decimal("1.00")},
+        )
+        self.assertEqual(second["overdraft_limit"], "50.00")
+        self.assertEqual(await self.client.deposit(first["id"], "25.50", token=self.token), Decimal("125.50"))
+        self.assertEqual(await self.client.withdraw(second["id"], Decimal("10.00"), token=token), Decimal("-11.00"))
+        await self.client.transfer(first["id"], second["id"], Decimal("20.00"), token=self.token)
+        await self.client.logout(token)
+
+        operator = "operator-secret"
+        self.assertEqual(await self.client.get_total_balance(operator_token=operator), Decimal("114.50"))
+        self.assertEqual(await self.client.get_subtotals(operator_token=operator), {Currency.USD: Decimal("114.50")})
+        with self.assertRaises(InvalidOperationError):
+            await self.client.get_total_balance(Currency.EUR, operator_token=operator)  # no FX rates attached
+        self.assertEqual(
+            await self.client.get_clients_ranking(operator_token=operator),
+            [("C-001", Decimal("105.50")), ("C-002", Decimal("9.00"))],
+        )
+        self.assertEqual(await self.client.get_top_clients(1, operator_token=operator), [("C-001", Decimal("105.50"))])
+        self.assertEqual(await self.client.get_client_rank("C-002", operator_token=operator), 1)
+        self.assertEqual(await self.client.get_client_rank("C-001", token=self.token), 0)
+        self.assertEqual(
+            await self.client.get_clients_ranking_page(1, 5, operator_token=operator), [("C-002", Decimal("9.00"))]
+        )
+        found = await self.client.search_accounts(
+            operator_token=operator, client_id="C-002", status=AccountStatus.ACTIVE
+        )
+        self.assertEqual([account["id"] for account in found], [second["id"]])
+        found = await self.client.search_accounts(token=self.token)
+        self.assertEqual([account["id"] for account in found], [first["id"]])
+
+    async def test_reads_need_a_session_or_the_operator(self):
+        await self.client.open_account("C-001", token=self.token, balance=Decimal("5.00"))
+        with self.assertRaisesRegex(InvalidOperationError, "token is required"):
+            await self.client.search_accounts()
+        with self.assertRaisesRegex(InvalidOperationError, "does not match"):
+            await self.client.search_accounts(token=self.token, client_id="C-002")
+        with self.assertRaisesRegex(InvalidOperationError, "does not match"):
+            await self.client.get_client_rank("C-002", token=self.token)
+        for method, params in [
+            ("get_total_balance", {}),
+            ("get_subtotals", {}),
+            ("get_clients_ranking", {}),
+            ("get_top_clients", {"k": 1}),
+            ("get_clients_ranking_page", {"offset": 0, "limit": 1}),
+        ]:
+            with self.assertRaisesRegex(InvalidOperationError, "Operator credential"):
+                await self.client.call(method, **params)
+            with self.assertRaisesRegex(InvalidOperationError, "Operator credential"):
+                await self.client.call(method, operator_token="guess", **params)
+        with self.assertRaisesRegex(InvalidOperationError, "Operator credential"):
+            await self.client.search_accounts(operator_token="guess")
+
+    async def test_errors_are_raised_on_the_client(self):
+        account = await self.client.open_account("C-001", token=self.token, balance=Decimal("5.00"))
+        with self.assertRaises(InsufficientFundsError):
+            await self.client.withdraw(account["id"], "10.00", token=self.token)
+        self.bank.freeze_account(account["id"], now=NOON)
+        with self.assertRaises(AccountFrozenError):
+            await self.client.deposit(account["id"], "1.00", token=self.token)
+        with self.assertRaises(InvalidOperationError):
+            await self.client.deposit("missing", "1.00", token=self.token)
+        with self.assertRaises(InvalidOperationError):
+            await self.client.call("deposit", account_id=account["id"], amount="not a number", token=self.token)
+        with self.assertRaises(ProtocolError):
+            await self.client.call("_rpc_ping")
+        self.assertEqual(await self.client.ping(), "pong")
+
+    async def test_money_moves_need_the_owners_session(self):
+        account = await self.client.open_account("C-001", token=self.token, balance=Decimal("5.00"))
+        other = await self.client.login("C-002", "pass")
+        with self.assertRaisesRegex(InvalidOperationError, "token is required"):
+            await self.client.call("deposit", account_id=account["id"], amount="1.00")
+        with self.assertRaisesRegex(InvalidOperationError, "token is required"):
+            await self.client.call("open_account", client_id="C-001")
+        with self.assertRaisesRegex(InvalidOperationError, "invalid or expired"):
+            await self.client.withdraw(account["id"], "1.00", token="forged")
+        with self.assertRaisesRegex(InvalidOperationError, "does not belong"):
+            await self.client.withdraw(account["id"], "1.00", token=other)
+        with self.assertRaisesRegex(InvalidOperationError, "does not belong"):
+            await self.client.transfer(account["id"], account["id"], "1.00", token=other)
+        with self.assertRaisesRegex(InvalidOperationError, "does not match"):
+            await self.client.open_account("C-001", token=other)
+        self.assertEqual(self.bank.get_total_balance(), Decimal("5.00"))
+
+    async def test_expired_token_is_refused(self):
+        account = await self.client.open_account("C-001", token=self.token)
+        self.assertEqual(await self.client.deposit(account["id"], "1.00", token=self.token), Decimal("1.00"))
+        self.now += 61.0
+        with self.assertRaisesRegex(InvalidOperationError, "invalid or expired"):
+            await self.client.deposit(account["id"], "1.00", token=self.token)
+        with self.assertRaisesRegex(InvalidOperationError, "invalid or expired"):
+            await self.client.open_account("C-001", token=self.token)
+        self.assertEqual(self.bank.get_total_balance(), Decimal("1.00"))
+
+    async def test_pipelined_requests_keep_their_order(self):
+        account = await self.client.open_account("C-001", token=self.token)
+        balances = await asyncio.gather(
+            *(self.client.deposit(account["id"], "1.00", token=self.token) for _ in range(50))
+        )
+        self.assertEqual(balances, [Decimal(n) for n in range(1, 51)])
+
+    async def test_many_connections(self):
+        account = await self.client.open_account("C-001", token=self.token)
+        clients = [await AsyncBankClient.connect(*self.server.address[:2]) for _ in range(20)]
+        try:
+            tokens = [await c.login("C-001", "secret") for c in clients]
+            await asyncio.gather(
+                *(c.deposit(account["id"], "0.10", token=t) for c, t in zip(clients, tokens) for _ in range(5))
+            )
+        finally:
+            await asyncio.gather(*(c.close() for c in clients))
+        self.assertEqual(self.bank.get_total_balance(), Decimal("10.00"))
+
+    async def test_malformed_frame_closes_connection(self):
+        reader, writer = await asyncio.open_connection(*self.server.address[:2])
+        writer.write(struct.pack(">I", 3) + b"{{{")
+        await writer.drain()
+        self.assertIsNone(await read_frame(reader))
+        writer.close()
+
+    async def test_slow_block_subscriber_does_not_stall_the_loop(self):
+        account = await self.client.open_account("C-001", token=self.token)
+        self.server._backpressure_timeout = 0.2
+        subscription = self.bank.events.subscribe(maxsize=1, overflow=Overflow.BLOCK)
+        await self.client.deposit(account["id"], "1.00", token=self.token)  # fills the subscriber's queue
+        other = await AsyncBankClient.connect(*self.server.address[:2])
+        try:
+            blocked = asyncio.create_task(self.client.deposit(account["id"], "1.00", token=self.token))
+            # Other connections are still served while the deposit waits for room.
+            self.assertEqual(await asyncio.wait_for(other.ping(), 0.1), "pong")
+            with self.assertRaisesRegex(InvalidOperationError, "try again"):
+                await blocked
+            self.assertIsNotNone(subscription.poll())
+            self.assertEqual(await self.client.deposit(account["id"], "1.00", token=self.token), Decimal("2.00"))
+        finally:
+            subscription.close()
+            await other.close()
+        self.assertFalse(self.bank.events.active)
+
+    async def test_raw_protocol(self):
+        reader, writer = await asyncio.open_connection(*self.server.address[:2])
+        writer.write(encode_frame({"id": 7, "method": "ping"}) + encode_frame({"id": 8, "method": "nope"}))
+        await writer.drain()
+        self.assertEqual(await read_frame(reader), {"id": 7, "result": "pong"})
+        reply = await read_frame(reader)
+        self.assertEqual(reply["error"]["type"], "ProtocolError")
+        writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+import os
+import unittest
+from datetime import datetime
+from decimal import Decimal
+from unittest import mock
+
+from banking.bank import Bank
+from banking.client import Client
+from banking.credentials import PasswordHasher
+from banking.errors import AccountFrozenError, InsufficientFundsError, InvalidOperationError
+from banking.ids import SnowflakeIds, decode_id
+from banking.sharding import ShardedBank, _Shard, shard_for
+from banking.types import AccountStatus, Currency
+
+NOON = datetime(2024, 1, 1, 12, 0)
+
+
+class TestShardedBank(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.bank = ShardedBank(2, bank_options={"_hasher": PasswordHasher(n=2 ** 8)})
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.bank.close()
+
+    def setUp(self):
+        # Two clients on different shards, with fresh ids per test.
+        prefix = self._testMethodName
+        names = (f"{prefix}-{i}" for i in range(100))
+        by_shard = {}
+        for client_id in names:
+            by_shard.setdefault(shard_for(client_id, 2), client_id)
+        self.left, self.right = by_shard[0], by_shard[1]
+        for client_id in (self.left, self.right):
+            self.bank.add_client(Client(full_name="Ilya Yarets", client_id=client_id, age=30), password="secret")
+
+    def _open(self, client_id: str, balance: str) -> str:
+        return self.bank.open_account(client_id, balance=Decimal(balance), now=NOON)["id"]
+
+    def test_operations_are_routed_to_the_owning_shard(self):
+        account_id = self._open(self.right, "10.00")
+        self.assertEqual(self.bank.deposit(account_id, Decimal("5.00"), now=NOON), Decimal("15.00"))
+        self.assertEqual(self.bank.withdraw(account_id, Decimal("2.50"), now=NOON), Decimal("12.50"))
+        self.assertTrue(self.bank.authenticate_client(self.right, "secret"))
+        self.assertFalse(self.bank.authenticate_client(self.right, "wrong"))
+        self.bank.freeze_account(account_id, now=NOON)
+        with self.assertRaises(AccountFrozenError):
+            self.bank.deposit(account_id, Decimal("1.00"), now=NOON)
+        self.assertEqual(self.bank.get_account_info(account_id)["status"], AccountStatus.FROZEN.value)
+        with self.assertRaises(InvalidOperationError):
+            self.bank.get_account_info("not-an-account")
+
+    def test_reports_are_merged_across_shards(self):
+        left = self._open(self.left, "30.00")
+        right = self._open(self.right, "70.00")
+        ranking = dict(self.bank.get_clients_ranking())
+        self.assertEqual((ranking[self.left], ranking[self.right]), (Decimal("30.00"), Decimal("70.00")))
+        totals = [total for _, total in self.bank.get_clients_ranking()]
+        self.assertEqual(totals, sorted(totals, reverse=True))
+        self.assertEqual(self.bank.get_top_clients(1), self.bank.get_clients_ranking()[:1])
+        self.assertEqual(
+            [info["id"] for info in self.bank.search_accounts(client_id=self.left)], [left]
+        )
+        found = {info["id"] for info in self.bank.search_accounts(status=AccountStatus.ACTIVE)}
+        self.assertTrue({left, right} <= found)
+        total = self.bank.get_total_balance()
+        self.assertEqual(self.bank.get_subtotals(), {Currency.USD: total})
+        self.bank.close_account(left, now=NOON)
+        self.assertEqual(self.bank.get_total_balance(), total - Decimal("30.00"))
+
+    def test_cross_shard_transfer_commits_on_both_sides(self):
+        source = self._open(self.left, "100.00")
+        target = self._open(self.right, "5.00")
+        total = self.bank.get_total_balance()
+        self.bank.transfer(source, target, Decimal("40.00"), now=NOON)
+        self.assertEqual(self.bank.get_account_info(source)["balance"], Decimal("60.00"))
+        self.assertEqual(self.bank.get_account_info(target)["balance"], Decimal("45.00"))
+        self.assertEqual(self.bank.get_total_balance(), total)
+
+    def test_cross_shard_transfer_aborts_without_moving_money(self):
+        source = self._open(self.left, "10.00")
+        target = self._open(self.right, "0.00")
+        with self.assertRaises(InsufficientFundsError):
+            self.bank.transfer(source, target, Decimal("40.00"), now=NOON)
+        self.bank.freeze_account(target, now=NOON)
+        with self.assertRaises(AccountFrozenError):
+            self.bank.transfer(source, target, Decimal("1.00"), now=NOON)
+        self.assertEqual(self.bank.get_account_info(source)["balance"], Decimal("10.00"))
+        self.assertEqual(self.bank.get_account_info(target)["balance"], Decimal("0.00"))
+
+    def test_execute_many_reports_each_row(self):
+        left = self._open(self.left, "10.00")
+        right = self._open(self.right, "10.00")
+        result = self.bank.execute_many(
+            [
+                ("deposit", {"account_id": left, "amount": Decimal("1.00"), "now": NOON}),
+                ("deposit", {"account_id": right, "amount": Decimal("2.00"), "now": NOON}),
+                ("withdraw", {"account_id": left, "amount": Decimal("100.00"), "now": NOON}),
+                ("transfer", {"src_account_id": right, "dst_account_id": left, "amount": Decimal("4.00"), "now": NOON}),
+                ("open_account", {"client_id": self.left, "now": NOON}),
+                ("rename", {"account_id": left}),
+            ]
+        )
+        self.assertEqual(result.results[:2], [Decimal("11.00"), Decimal("12.00")])
+        self.assertEqual(sorted(result.errors), [2, 5])
+        self.assertEqual(result.results[4]["owner_doc_id"], self.left)
+        self.assertEqual(self.bank.get_account_info(left)["balance"], Decimal("15.00"))
+        self.assertEqual(self.bank.get_account_info(right)["balance"], Decimal("8.00"))
+
+
+class TestShardTransfers(unittest.TestCase):
+    # The participant side, driven in-process.
+    def setUp(self):
+        bank = Bank(_hasher=PasswordHasher(n=2 ** 8))
+        bank.add_client(Client(full_name="Ilya Yarets", client_id="C-001", age=30), password="secret")
+        self.shard = _Shard(bank)
+        self.target = bank.open_account("C-001", balance=Decimal("5.00"), now=NOON).id
+
+    def call(self, method, **params):
+        reply = self.shard.handle(method, params)
+        self.assertEqual(reply[0], "ok", reply)
+        return reply[1]
+
+    def test_pending_credit_keeps_the_target_open(self):
+        self.call("prepare_credit", txid="t1", account_id=self.target, amount=Decimal("3.00"))
+        self.call("prepare_credit", txid="t2", account_id=self.target, amount=Decimal("1.00"))
+        for method in ("close_account", "freeze_account"):
+            reply = self.shard.handle(method, {"account_id": self.target, "now": NOON})
+            self.assertEqual(reply[:2], ("error", "InvalidOperationError"))
+        self.call("commit", txid="t1")
+        self.assertEqual(self.shard.handle("close_account", {"account_id": self.target})[0], "error")
+        self.call("abort", txid="t2")
+        self.call("close_account", account_id=self.target, now=NOON)
+        self.assertEqual(self.shard.bank._accounts[self.target].balance, Decimal("8.00"))
+        self.assertEqual(self.shard.bank._accounts[self.target].status, AccountStatus.CLOSED)
+
+    def test_commit_refuses_a_target_that_can_no_longer_take_money(self):
+        self.call("prepare_credit", txid="t1", account_id=self.target, amount=Decimal("3.00"))
+        self.shard.bank.close_account(self.target, now=NOON)  # bypasses the shard, e.g. an operator
+        self.assertEqual(self.shard.handle("commit", {"txid": "t1"})[:2], ("error", "AccountClosedError"))
+        self.assertEqual(self.shard.bank._accounts[self.target].balance, Decimal("5.00"))
+        self.call("close_account", account_id=self.target, now=NOON)  # the reservation is gone
+
+
+class TestShardNodeIds(unittest.TestCase):
+    def test_configured_node_id_is_offset_per_worker(self):
+        options = {"_hasher": PasswordHasher(n=2 ** 8)}
+        with mock.patch.dict(os.environ, {"BANKING_NODE_ID": "7"}):
+            bank = ShardedBank(2, bank_options=options)
+        try:
+            self.assertEqual(bank._nodes, {7: 0, 8: 1})
+            clients = {}
+            for client_id in (f"node-{i}" for i in range(100)):
+                clients.setdefault(shard_for(client_id, 2), client_id)
+            accounts = {}
+            for shard, client_id in clients.items():
+                bank.add_client(Client(full_name="Ilya Yarets", client_id=client_id, age=30), password="secret")
+                accounts[shard] = bank.open_account(client_id, balance=Decimal("10.00"), now=NOON)["id"]
+            self.assertEqual({shard: decode_id(account)[1] for shard, account in accounts.items()}, {0: 7, 1: 8})
+            self.assertEqual(bank.deposit(accounts[0], Decimal("1.00"), now=NOON), Decimal("11.00"))
+            self.assertEqual(bank.get_account_info(accounts[0])["owner_doc_id"], clients[0])
+            self.assertEqual(bank.get_account_info(accounts[1])["balance"], Decimal("10.00"))
+        finally:
+            bank.close()
+
+    def test_workers_sharing_a_node_id_are_refused(self):
+        with self.assertRaises(InvalidOperationError):
+            ShardedBank(2, bank_options={"_ids": SnowflakeIds(5)})
+        with mock.patch.dict(os.environ, {"BANKING_NODE_ID": "1023"}), self.assertRaises(InvalidOperationError):
+            ShardedBank(2)
+
+
+class TestShardFor(unittest.TestCase):
+    def test_placement_is_stable_and_in_range(self):
+        self.assertEqual(shard_for("C-001", 4), shard_for("C-001", 4))
+        self.assertTrue(all(0 <= shard_for(f"C-{i}", 3) < 3 for i in range(100)))
+
+    def test_router_holds_no_bank_and_closes(self):
+        # The router holds no Bank of its own.
+        with ShardedBank(1, bank_options={"_hasher": PasswordHasher(n=2 ** 8)}) as bank:
+            self.assertFalse(any(isinstance(value, Bank) for value in vars(bank).values()))
+            self.assertEqual(bank.get_total_balance(), Decimal("0.00"))
+        with self.assertRaises(InvalidOperationError):
+            bank.get_total_balance()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import tempfile
+import unittest
+from decimal import Decimal
+from pathlib import Path
+
+from banking.account_options import InvestmentOptions, PremiumOptions, SavingsOptions
+from banking.bank import Bank
+from banking.client import Client
+from banking.errors import InvalidOperationError
+from banking.types import AccountStatus, AccountType, ClientStatus, Currency
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "bank.snap"
+        self.bank = Bank()
+        self.bank.add_client(Client(full_name="Ilya Yarets", client_id="C-001", age=30), password="secret")
+        self.bank.add_client(
+            Client(full_name="Anna Petrova", client_id="C-0002", age=40, contacts={"email": "a@b.c"}),
+            password="pass",
+        )
+        self.base = self.bank.open_account("C-001", balance=Decimal("100.00"))
+        self.savings = self.bank.open_account(
+            "C-0002",
+            account_type=AccountType.SAVINGS,
+            currency=Currency.EUR,
+            balance=Decimal("300.00"),
+            options=SavingsOptions(min_balance=Decimal("50.00"), monthly_interest_rate=Decimal("0.0125")),
+        )
+        self.premium = self.bank.open_account(
+            "C-001",
+            account_type=AccountType.PREMIUM,
+            options=PremiumOptions(overdraft_limit=Decimal("20.00"), withdraw_fee=Decimal("1.00")),
+        )
+        self.premium.withdraw(Decimal("10.00"))
+        self.investment = self.bank.open_account(
+            "C-0002",
+            account_type=AccountType.INVESTMENT,
+            options=InvestmentOptions(portfolios={"stocks": Decimal("5.00")}, expected_yearly_growth=Decimal("0.07")),
+        )
+        self.bank.freeze_account(self.investment.id)
+        self.bank.authenticate_client("C-0002", "wrong")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_round_trip(self):
+        self.bank.snapshot(self.path)
+        loaded = Bank.load_snapshot(self.path)
+
+        for account in (self.base, self.savings, self.premium, self.investment):
+            self.assertEqual(loaded._accounts[account.id].get_account_info(), account.get_account_info())
+        self.assertEqual(loaded._clients["C-0002"].contacts, {"email": "a@b.c"})
+        self.assertEqual(loaded._clients["C-001"].accounts, [self.base.id, self.premium.id])
+        self.assertEqual(loaded.failed_attempts("C-0002"), 1)
+        self.assertEqual(loaded.get_clients_ranking(), self.bank.get_clients_ranking())
+        self.assertEqual(loaded.get_subtotals(), self.bank.get_subtotals())
+        self.assertEqual(
+            [a.id for a in loaded.search_accounts(status=AccountStatus.FROZEN)], [self.investment.id]
+        )
+        self.assertEqual(list(loaded._accounts), list(self.bank._accounts))
+
+    def test_loading_is_lazy(self):
+        self.bank.snapshot(self.path)
+        loaded = Bank.load_snapshot(self.path)
+
+        self.assertTrue(loaded.authenticate_client("C-001", "secret"))
+        loaded._accounts[self.base.id].deposit(Decimal("1.00"))
+
+        self.assertFalse(loaded._accounts.is_loaded(self.savings.id))
+        self.assertEqual(loaded.get_subtotals(), {Currency.USD: Decimal("90.00"), Currency.EUR: Decimal("300.00")})
+        self.assertFalse(loaded._accounts.is_loaded(self.savings.id))
+        self.assertEqual(loaded.get_client_rank("C-0002"), 0)
+        self.assertEqual(loaded._clients["C-001"].status, ClientStatus.ACTIVE)
+
+    def test_writes_after_load_stay_consistent(self):
+        self.bank.snapshot(self.path)
+        loaded = Bank.load_snapshot(self.path)
+
+        loaded._accounts[self.savings.id].withdraw(Decimal("100.00"))
+        opened = loaded.open_account("C-001", balance=Decimal("500.00"))
+        loaded.get_clients_ranking()
+        loaded._accounts[self.base.id].deposit(Decimal("25.00"))
+        loaded.close_account(self.premium.id)
+
+        self.assertEqual(loaded.get_clients_ranking(), [("C-001", Decimal("625.00")), ("C-0002", Decimal("200.00"))])
+        self.assertIn(opened, loaded.search_accounts(client_id="C-001"))
+        self.assertEqual(loaded._clients["C-001"].accounts[-1], opened.id)
+        with self.assertRaises(InvalidOperationError):
+            loaded.freeze_account("missing")
+
+    def test_rejects_other_files(self):
+        self.path.write_bytes(b"x" * 128)
+        with self.assertRaises(InvalidOperationError):
+            Bank.load_snapshot(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+from banking.account_options import PremiumOptions
+from banking.bank import AccountSpec, Bank
+from banking.client import Client
+from banking.credentials import PasswordHasher
+from banking.errors import InvalidOperationError
+from banking.storage import SqliteStore
+from banking.types import AccountStatus, AccountType, ClientStatus, Currency
+
+NOON = datetime(2024, 1, 1, 12, 0)
+
+
+class TestSqliteStore(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "bank.db"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _open(self) -> Bank:
+        bank = Bank.open_store(self.path, commit_window=0)
+        bank._hasher = PasswordHasher(n=2 ** 8)
+        self.addCleanup(bank.close)
+        return bank
+
+    def _populate(self, bank: Bank) -> dict[str, str]:
+        for client_id, name in (("C-001", "Ilya Yarets"), ("C-002", "Anna Petrova"), ("C-003", "Oleg Sidorov")):
+            bank.add_client(Client(full_name=name, client_id=client_id, age=30), password="secret")
+        ids = {
+            "first": bank.open_account("C-001", balance=Decimal("100.00"), now=NOON).id,
+            "second": bank.open_account("C-002", balance=Decimal("40.00"), now=NOON).id,
+            "euro": bank.open_account("C-002", currency=Currency.EUR, balance=Decimal("5.00"), now=NOON).id,
+            "premium": bank.open_account(
+                "C-003",
+                account_type=AccountType.PREMIUM,
+                balance=Decimal("10.00"),
+                now=NOON,
+                options=PremiumOptions(overdraft_limit=Decimal("50.00"), withdraw_fee=Decimal("1.00")),
+            ).id,
+        }
+        bank.deposit(ids["first"], Decimal("25.00"), now=NOON)
+        bank.transfer(ids["first"], ids["second"], Decimal("15.00"), now=NOON)
+        bank.withdraw(ids["premium"], Decimal("30.00"), now=NOON)
+        bank.freeze_account(ids["euro"], now=NOON)
+        return ids
+
+    def test_queries_are_answered_by_the_database(self):
+        bank = self._open()
+        ids = self._populate(bank)
+        self.assertTrue(bank._derived_stale)
+        self.assertEqual(
+            bank.get_clients_ranking(),
+            [("C-001", Decimal("110.00")), ("C-002", Decimal("60.00")), ("C-003", Decimal("-21.00"))],
+        )
+        self.assertEqual(bank.get_top_clients(1), [("C-001", Decimal("110.00"))])
+        self.assertEqual(bank.get_clients_ranking_page(1, 1), [("C-002", Decimal("60.00"))])
+        self.assertEqual(bank.get_client_rank("C-003"), 2)
+        self.assertEqual(bank.get_subtotals(), {Currency.USD: Decimal("144.00"), Currency.EUR: Decimal("5.00")})
+        self.assertEqual([a.id for a in bank.search_accounts(client_id="C-002")], [ids["second"], ids["euro"]])
+        self.assertEqual([a.id for a in bank.search_accounts(status=AccountStatus.FROZEN)], [ids["euro"]])
+        bank.close_account(ids["second"], now=NOON)
+        self.assertEqual(bank.get_subtotals(), {Currency.USD: Decimal("89.00"), Currency.EUR: Decimal("5.00")})
+        self.assertEqual(bank.get_clients_ranking()[1], ("C-002", Decimal("5.00")))
+        with self.assertRaises(InvalidOperationError):
+            bank.get_client_rank("C-404")
+        self.assertTrue(bank._derived_stale)
+
+    def test_in_memory_structures_agree_with_the_database(self):
+        bank = self._open()
+        self._populate(bank)
+        def report():
+            return bank.get_clients_ranking(), bank.get_subtotals(), [a.id for a in bank.search_accounts()]
+
+        stored = report()
+        bank._ensure_derived()
+        self.assertFalse(bank._derived_stale)
+        self.assertEqual(report(), stored)
+
+    def test_state_survives_reopening(self):
+        bank = self._open()
+        ids = self._populate(bank)
+        for _ in range(3):
+            bank.authenticate_client("C-003", "wrong")
+        bank.close()
+        reopened = self._open()
+        self.assertEqual(reopened.get_clients_ranking()[0], ("C-001", Decimal("110.00")))
+        self.assertEqual(reopened._accounts[ids["premium"]].balance, Decimal("-21.00"))
+        self.assertEqual(reopened._accounts[ids["euro"]].status, AccountStatus.FROZEN)
+        self.assertEqual(reopened._clients["C-002"].accounts, [ids["second"], ids["euro"]])
+        self.assertEqual(reopened._clients["C-003"].status, ClientStatus.LOCKED)
+        self.assertTrue(reopened.authenticate_client("C-001", "secret"))
+        self.assertEqual(reopened.deposit(ids["second"], Decimal("1.00"), now=NOON), Decimal("56.00"))
+
+    def test_asset_purchases_are_stored(self):
+        bank = self._open()
+        bank.add_client(Client(full_name="Ilya Yarets", client_id="C-001", age=30), password="secret")
+        account = bank.open_account("C-001", account_type=AccountType.INVESTMENT, now=NOON)
+        account.add_asset("etf", Decimal("12.00"))
+        bank.close()
+        reopened = self._open()
+        self.assertEqual(reopened._accounts[account.id].portfolio_value, Decimal("12.00"))
+
+    def test_bulk_open_is_written_in_one_batch(self):
+        bank = self._open()
+        bank.add_client(Client(full_name="Ilya Yarets", client_id="C-001", age=30), password="secret")
+        result = bank.open_accounts_bulk(
+            [AccountSpec("C-001", balance=Decimal(i)) for i in range(50)] + [AccountSpec("C-404")], now=NOON
+        )
+        self.assertEqual(list(result.errors), [50])
+        bank.close()
+        with sqlite3.connect(self.path) as db:
+            self.assertEqual(db.execute("SELECT COUNT(*), SUM(balance) FROM accounts").fetchone(), (50, 122500))
+            self.assertEqual(db.execute("SELECT total FROM clients").fetchone(), (122500,))
+            self.assertEqual(db.execute("PRAGMA journal_mode").fetchone(), ("wal",))
+
+    def test_iteration_covers_stored_and_new_rows(self):
+        bank = self._open()
+        ids = self._populate(bank)
+        bank.close()
+        reopened = self._open()
+        reopened.add_client(Client(full_name="Late Client", client_id="C-004", age=22), password="secret")
+        late = reopened.open_account("C-004", balance=Decimal("1.00"), now=NOON).id
+        self.assertEqual(list(reopened._accounts), [*ids.values(), late])
+        self.assertEqual(len(reopened._clients), 4)
+        self.assertIn(ids["first"], reopened._accounts)
+        self.assertFalse(reopened._accounts.is_loaded(ids["first"]))
+        self.assertNotIn("missing", reopened._accounts)
+
+    def test_length_is_counted_without_iterating(self):
+        bank = self._open()
+        ids = self._populate(bank)
+        bank.close()
+        reopened = self._open()
+        accounts = reopened._accounts
+        with mock.patch.object(SqliteStore, "keys", side_effect=AssertionError("iterated")):
+            self.assertEqual(len(accounts), len(ids))
+            accounts["pending"] = accounts[ids["first"]]  # stored here, not written through yet
+            self.assertEqual(len(accounts), len(ids) + 1)
+            reopened.open_account("C-001", now=NOON)
+            self.assertEqual(len(accounts), len(ids) + 2)
+            self.assertEqual(len(reopened._clients), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
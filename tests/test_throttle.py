@@ -0,0 +1,173 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from banking.bank import LOCKOUT_SECONDS, MAX_FAILED_ATTEMPTS, MAX_FAILED_ATTEMPTS_PER_SOURCE, Bank
+from banking.client import Client
+from banking.credentials import PasswordHasher
+from banking.errors import InvalidOperationError
+from banking.journal import Journal
+from banking.throttle import FailureTracker, TimerWheel
+from banking.types import ClientStatus
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTimerWheel(unittest.TestCase):
+    def test_fires_each_timer_once_at_its_deadline(self):
+        wheel = TimerWheel(tick=1.0, slots=8, levels=3)
+        deadlines = {"a": 3, "b": 9, "c": 70, "d": 300, "e": 5000}
+        for key, deadline in deadlines.items():
+            wheel.schedule(key, deadline)
+
+        fired = {}
+        for now in range(0, 5100):
+            for key in wheel.advance(now):
+                fired[key] = now
+        self.assertEqual(fired, deadlines)
+        self.assertEqual(len(wheel), 0)
+
+    def test_cancel_reschedule_and_large_jumps(self):
+        wheel = TimerWheel(tick=0.5)
+        wheel.schedule("a", 10)
+        wheel.schedule("b", 10)
+        wheel.schedule("a", 20)
+        wheel.cancel("b")
+        self.assertEqual(wheel.advance(15), [])
+        self.assertEqual(wheel.advance(1_000_000), ["a"])
+        wheel.schedule("past", 5)
+        self.assertEqual(wheel.advance(1_000_000), ["past"])
+
+    def test_never_fires_early(self):
+        wheel = TimerWheel(tick=1.0)
+        wheel.schedule("a", 2.5)
+        self.assertEqual(wheel.advance(2.9), [])
+        self.assertEqual(wheel.advance(3.0), ["a"])
+
+
+class TestFailureTracker(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.tracker = FailureTracker(3, window=60, lockout=300, clock=self.clock)
+
+    def test_failures_decay_outside_the_window(self):
+        self.assertFalse(self.tracker.record_failure("k"))
+        self.clock.now += 40
+        self.assertFalse(self.tracker.record_failure("k"))
+        self.clock.now += 30
+        self.assertEqual(self.tracker.failures("k"), 1)
+        self.assertFalse(self.tracker.record_failure("k"))
+        self.assertTrue(self.tracker.record_failure("k"))
+        self.assertTrue(self.tracker.is_locked("k"))
+
+    def test_lockout_expires_through_the_wheel(self):
+        for _ in range(3):
+            self.tracker.record_failure("k")
+        self.clock.now += 299
+        self.assertEqual(self.tracker.expired(), [])
+        self.clock.now += 1
+        self.assertEqual(self.tracker.expired(), ["k"])
+        self.assertFalse(self.tracker.is_locked("k"))
+        self.assertEqual(self.tracker.failures("k"), 0)
+
+    def test_stale_keys_are_swept(self):
+        for index in range(1000):
+            self.tracker.record_failure(f"ip-{index}")
+        self.assertEqual(len(self.tracker), 1000)
+        self.clock.now += 61
+        self.tracker.record_failure("fresh")
+        self.assertEqual(len(self.tracker), 1)
+
+    def test_reset_and_seed(self):
+        tracker = FailureTracker(3, clock=self.clock, seed={"k": 2})
+        self.assertEqual(tracker.failures("k"), 2)
+        self.assertTrue(tracker.record_failure("k"))
+        tracker = FailureTracker(3, clock=self.clock, seed={"k": 2})
+        tracker.reset("k")
+        self.assertEqual(tracker.failures("k"), 0)
+
+    def test_rejects_bad_configuration(self):
+        with self.assertRaises(InvalidOperationError):
+            FailureTracker(0)
+        with self.assertRaises(InvalidOperationError):
+            FailureTracker(3, window=0)
+
+
+class TestBankLockout(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.bank = Bank(
+            _hasher=PasswordHasher(n=2 ** 8),
+            _failed_attempts=FailureTracker(MAX_FAILED_ATTEMPTS, lockout=LOCKOUT_SECONDS, clock=self.clock),
+            _failed_sources=FailureTracker(MAX_FAILED_ATTEMPTS_PER_SOURCE, clock=self.clock),
+        )
+        self.bank.add_client(Client(full_name="Ilya Yarets", client_id="C-001", age=30), password="secret")
+        self.client = self.bank._clients["C-001"]
+
+    def test_client_is_unblocked_after_the_lockout(self):
+        for _ in range(MAX_FAILED_ATTEMPTS):
+            self.assertFalse(self.bank.authenticate_client("C-001", "wrong"))
+        self.assertEqual(self.client.status, ClientStatus.LOCKED)
+        self.assertFalse(self.bank.authenticate_client("C-001", "secret"))
+
+        self.clock.now += LOCKOUT_SECONDS
+        self.assertTrue(self.bank.authenticate_client("C-001", "secret"))
+        self.assertEqual(self.client.status, ClientStatus.ACTIVE)
+        self.assertEqual(self.bank.security_log[-1].reason, "account unlocked after lockout expired")
+
+    def test_restored_lockout_starts_a_fresh_lockout(self):
+        self.client.status = ClientStatus.LOCKED
+        self.assertFalse(self.bank.authenticate_client("C-001", "secret"))
+        self.clock.now += LOCKOUT_SECONDS
+        self.assertTrue(self.bank.authenticate_client("C-001", "secret"))
+
+    def test_operator_block_does_not_expire(self):
+        for _ in range(MAX_FAILED_ATTEMPTS):
+            self.assertFalse(self.bank.authenticate_client("C-001", "wrong"))
+        self.bank.block_client("C-001")  # a block on top of a running lockout
+        self.clock.now += LOCKOUT_SECONDS * 10
+        self.assertFalse(self.bank.authenticate_client("C-001", "secret"))
+        self.assertIsNone(self.bank.login("C-001", "secret"))
+        self.assertEqual(self.client.status, ClientStatus.BLOCKED)
+
+        self.bank.unblock_client("C-001")
+        self.assertEqual(self.bank.failed_attempts("C-001"), 0)
+        self.assertTrue(self.bank.authenticate_client("C-001", "secret"))
+        self.assertEqual(
+            [e.reason for e in self.bank.security_log[-2:]],
+            ["account blocked by operator", "account unblocked by operator"],
+        )
+
+    def test_operator_block_survives_recovery(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "bank.journal"
+            self.bank.attach_journal(Journal(path))
+            token = self.bank.login("C-001", "secret")
+            self.bank.block_client("C-001")
+            with self.assertRaises(InvalidOperationError):
+                self.bank.session_client(token)
+            self.bank.close()
+
+            recovered = Bank.recover(path)
+            recovered._failed_attempts = FailureTracker(MAX_FAILED_ATTEMPTS, lockout=LOCKOUT_SECONDS, clock=self.clock)
+            self.clock.now += LOCKOUT_SECONDS * 10
+            self.assertFalse(recovered.authenticate_client("C-001", "secret"))
+            self.assertEqual(recovered._clients["C-001"].status, ClientStatus.BLOCKED)
+            recovered.close()
+
+    def test_source_is_locked_across_client_ids(self):
+        for index in range(MAX_FAILED_ATTEMPTS_PER_SOURCE):
+            self.assertFalse(self.bank.authenticate_client(f"C-{index}", "guess", source="203.0.113.9"))
+        self.assertFalse(self.bank.authenticate_client("C-001", "secret", source="203.0.113.9"))
+        self.assertEqual(self.client.status, ClientStatus.ACTIVE)
+        self.assertTrue(self.bank.authenticate_client("C-001", "secret", source="198.51.100.1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import random
+import sys
+import threading
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from banking.account_options import PremiumOptions
+from banking.bank import Bank
+from banking.client import Client
+from banking.credentials import PasswordHasher
+from banking.errors import InsufficientFundsError, InvalidOperationError
+from banking.types import AccountStatus, AccountType, Currency
+
+NOON = datetime(2024, 1, 1, 12, 0)
+
+
+class TestReadView(unittest.TestCase):
+    def setUp(self):
+        self.bank = Bank(_hasher=PasswordHasher(n=2 ** 8))
+        self.bank.add_client(Client(full_name="Ilya Yarets", client_id="C-001", age=30), password="secret")
+        self.bank.add_client(Client(full_name="Anna Petrova", client_id="C-002", age=41), password="secret")
+        self.first = self.bank.open_account("C-001", balance=Decimal("100.00"), now=NOON)
+        self.second = self.bank.open_account("C-002", balance=Decimal("40.00"), now=NOON)
+
+    def test_view_is_unaffected_by_later_writes(self):
+        with self.bank.read_view() as view:
+            ranking = view.get_clients_ranking()
+            self.bank.deposit(self.second.id, Decimal("100.00"), now=NOON)
+            self.bank.close_account(self.first.id, now=NOON)
+            self.bank.add_client(Client(full_name="Late Client", client_id="C-003", age=22), password="secret")
+            late = self.bank.open_account("C-003", balance=Decimal("500.00"), now=NOON)
+            self.assertEqual(view.get_clients_ranking(), ranking)
+            self.assertEqual(ranking, [("C-001", Decimal("100.00")), ("C-002", Decimal("40.00"))])
+            self.assertEqual(view.get_total_balance(), Decimal("140.00"))
+            self.assertEqual(view.get_subtotals(), {Currency.USD: Decimal("140.00")})
+            self.assertEqual(view.get_balance(self.second.id), Decimal("40.00"))
+            self.assertEqual(
+                [row[0] for row in view.search_accounts(status=AccountStatus.ACTIVE)], [self.first.id, self.second.id]
+            )
+            with self.assertRaises(InvalidOperationError):
+                view.get_balance(late.id)
+            self.assertEqual(self.bank.get_total_balance(), Decimal("640.00"))
+
+    def test_history_is_kept_only_while_views_are_open(self):
+        versions = self.bank._versions
+        self.bank.deposit(self.first.id, Decimal("1.00"), now=NOON)
+        self.assertEqual(versions.retained, 0)
+        older = self.bank.read_view()
+        self.bank.deposit(self.first.id, Decimal("1.00"), now=NOON)
+        newer = self.bank.read_view()
+        self.bank.deposit(self.first.id, Decimal("1.00"), now=NOON)
+        self.assertEqual(versions.retained, 2)
+        self.assertEqual(older.get_balance(self.first.id), Decimal("101.00"))
+        self.assertEqual(newer.get_balance(self.first.id), Decimal("102.00"))
+        older.release()
+        self.assertEqual(versions.retained, 1)
+        self.assertEqual(newer.get_balance(self.first.id), Decimal("102.00"))
+        newer.release()
+        self.assertEqual((versions.retained, versions.open_views), (0, 0))
+        with self.assertRaises(InvalidOperationError):
+            newer.get_total_balance()
+
+    def test_withdraw_fee_is_part_of_the_same_operation(self):
+        premium = self.bank.open_account(
+            "C-001",
+            account_type=AccountType.PREMIUM,
+            balance=Decimal("10.00"),
+            now=NOON,
+            options=PremiumOptions(withdraw_fee=Decimal("0.50")),
+        )
+        with self.bank.read_view() as view:
+            self.bank.withdraw(premium.id, Decimal("2.00"), now=NOON)
+            self.assertEqual(view.get_balance(premium.id), Decimal("10.00"))
+        self.assertEqual(premium.balance, Decimal("7.50"))
+
+    def test_views_never_see_half_a_transfer(self):
+        accounts = [
+            self.bank.open_account("C-001", balance=Decimal("1000.00"), now=NOON).id for _ in range(8)
+        ]
+        expected = self.bank.get_total_balance()
+        stop = threading.Event()
+
+        def shuffle(seed):
+            rng = random.Random(seed)
+            while not stop.is_set():
+                src, dst = rng.sample(accounts, 2)
+                try:
+                    self.bank.transfer(src, dst, Decimal(rng.randrange(1, 500)), now=NOON)
+                except InsufficientFundsError:
+                    pass
+
+        workers = [threading.Thread(target=shuffle, args=(seed,)) for seed in range(3)]
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # switch threads often enough to land mid-transfer
+        for worker in workers:
+            worker.start()
+        try:
+            for _ in range(200):
+                with self.bank.read_view() as view:
+                    self.assertEqual(view.get_total_balance(), expected)
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join()
+            sys.setswitchinterval(interval)
+        self.assertEqual(self.bank.get_total_balance(), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()